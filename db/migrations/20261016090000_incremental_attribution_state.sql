@@ -0,0 +1,91 @@
+-- Migration: incremental_attribution_state
+-- Created: Fri Oct 16 09:00:00 UTC 2026
+
+-- Ingestion time of each event (part of the report data version, see src/reporting)
+ALTER TABLE attribution_events ADD COLUMN IF NOT EXISTS ingested_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS idx_attribution_events_campaign_ingested ON attribution_events(campaign_id, ingested_at);
+
+-- Per campaign/model running totals
+CREATE TABLE IF NOT EXISTS attribution_state (
+    tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    campaign_id UUID REFERENCES campaigns(campaign_id) ON DELETE CASCADE,
+    model_type VARCHAR(50) NOT NULL,
+    total_conversions INTEGER NOT NULL DEFAULT 0,
+    total_conversion_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    attributed_conversions INTEGER NOT NULL DEFAULT 0,
+    attributed_conversion_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    multi_touch_paths INTEGER NOT NULL DEFAULT 0,
+    user_id_paths INTEGER NOT NULL DEFAULT 0,
+    touchpoint_credits JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (campaign_id, model_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_attribution_state_tenant_id ON attribution_state(tenant_id);
+
+-- Per-path credit contributions, subtracted and replaced when a path changes
+CREATE TABLE IF NOT EXISTS attribution_path_credits (
+    tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    campaign_id UUID REFERENCES campaigns(campaign_id) ON DELETE CASCADE,
+    model_type VARCHAR(50) NOT NULL,
+    path_key VARCHAR(255) NOT NULL,
+    conversion_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    attributed BOOLEAN NOT NULL DEFAULT FALSE,
+    touchpoint_count INTEGER NOT NULL DEFAULT 0,
+    has_user_id BOOLEAN NOT NULL DEFAULT FALSE,
+    touchpoint_credits JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (campaign_id, model_type, path_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_attribution_path_credits_tenant_id ON attribution_path_credits(tenant_id);
+
+-- Paths touched since incremental attribution last ran for their campaign.
+-- Rows become visible when the writing transaction commits, so the engine
+-- drains them (FOR UPDATE SKIP LOCKED) instead of trusting a time-based mark
+CREATE TABLE IF NOT EXISTS attribution_path_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    campaign_id UUID NOT NULL,
+    path_key VARCHAR(255) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_attribution_path_changes_campaign ON attribution_path_changes(campaign_id);
+
+-- Same path key as AttributionEngine._build_attribution_paths
+CREATE OR REPLACE FUNCTION record_attribution_path_change()
+RETURNS trigger AS $$
+DECLARE
+    old_key TEXT;
+    new_key TEXT;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_key := COALESCE(NULLIF(OLD.user_id, ''), NULLIF(OLD.session_id, ''),
+                            NULLIF(OLD.device_id, ''), OLD.event_id::text);
+        INSERT INTO attribution_path_changes (campaign_id, path_key) VALUES (OLD.campaign_id, old_key);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_key := COALESCE(NULLIF(NEW.user_id, ''), NULLIF(NEW.session_id, ''),
+                            NULLIF(NEW.device_id, ''), NEW.event_id::text);
+        IF TG_OP = 'INSERT' OR new_key IS DISTINCT FROM old_key OR NEW.campaign_id IS DISTINCT FROM OLD.campaign_id THEN
+            INSERT INTO attribution_path_changes (campaign_id, path_key) VALUES (NEW.campaign_id, new_key);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS attribution_events_path_changes ON attribution_events;
+CREATE TRIGGER attribution_events_path_changes
+    AFTER INSERT OR UPDATE OR DELETE ON attribution_events
+    FOR EACH ROW EXECUTE FUNCTION record_attribution_path_change();
+
+ALTER TABLE attribution_state ENABLE ROW LEVEL SECURITY;
+ALTER TABLE attribution_path_credits ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY tenant_isolation_attribution_state ON attribution_state
+    USING (tenant_id = current_setting('app.current_tenant', TRUE)::UUID);
+
+CREATE POLICY tenant_isolation_attribution_path_credits ON attribution_path_credits
+    USING (tenant_id = current_setting('app.current_tenant', TRUE)::UUID);
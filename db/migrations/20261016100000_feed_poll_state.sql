@@ -0,0 +1,13 @@
+-- Migration: feed_poll_state
+-- Created: Fri Oct 16 10:00:00 UTC 2026
+
+-- Conditional-GET validators and incremental-parse markers per RSS feed
+CREATE TABLE IF NOT EXISTS feed_poll_state (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash VARCHAR(64),
+    last_seen_guid TEXT,
+    feed_info JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
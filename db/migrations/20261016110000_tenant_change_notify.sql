@@ -0,0 +1,28 @@
+-- Migration: tenant_change_notify
+-- Created: Fri Oct 16 11:00:00 UTC 2026
+
+-- Notify application instances when a tenant changes so cached tenant
+-- resolutions (including cached misses) are evicted immediately
+CREATE OR REPLACE FUNCTION notify_tenant_change()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify(
+            'tenant_changed',
+            json_build_object('tenant_id', OLD.tenant_id::TEXT, 'slug', OLD.slug)::TEXT
+        );
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.slug IS DISTINCT FROM OLD.slug) THEN
+        PERFORM pg_notify(
+            'tenant_changed',
+            json_build_object('tenant_id', NEW.tenant_id::TEXT, 'slug', NEW.slug)::TEXT
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tenants_notify_change ON tenants;
+CREATE TRIGGER tenants_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON tenants
+    FOR EACH ROW EXECUTE FUNCTION notify_tenant_change();
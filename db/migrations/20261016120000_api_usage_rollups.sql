@@ -0,0 +1,36 @@
+-- Migration: api_usage_rollups
+-- Created: Fri Oct 16 12:00:00 UTC 2026
+
+-- Per-minute API usage aggregates written by the usage meter (replaces one
+-- api_usage row per request). Calls without an API key use the nil UUID so
+-- the key can be part of the primary key.
+CREATE TABLE IF NOT EXISTS api_usage_rollups (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    api_key_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    endpoint VARCHAR(255) NOT NULL, -- Route template, e.g. /api/v1/campaigns/{campaign_id}
+    method VARCHAR(10) NOT NULL,
+    status_class VARCHAR(3) NOT NULL, -- 2xx, 3xx, 4xx, 5xx
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    call_count BIGINT NOT NULL DEFAULT 0,
+    total_response_time_ms BIGINT NOT NULL DEFAULT 0,
+    max_response_time_ms INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (tenant_id, bucket_start, api_key_id, endpoint, method, status_class)
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_usage_rollups_api_key_id ON api_usage_rollups(api_key_id, bucket_start);
+
+-- Flush batches already applied; replayed journal batches are skipped so
+-- rollup counts are never added twice
+CREATE TABLE IF NOT EXISTS api_usage_flush_batches (
+    batch_id UUID PRIMARY KEY,
+    flushed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_usage_flush_batches_flushed_at ON api_usage_flush_batches(flushed_at);
+
+ALTER TABLE api_usage_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY tenant_isolation_api_usage_rollups ON api_usage_rollups
+    USING (tenant_id = current_setting('app.current_tenant', TRUE)::UUID);
@@ -0,0 +1,22 @@
+-- Migration: reports
+-- Created: Fri Oct 16 13:00:00 UTC 2026
+
+-- Metadata for generated report files, written by ReportGenerator (report
+-- data itself is not stored; sections are rebuilt from source tables).
+CREATE TABLE IF NOT EXISTS reports (
+    report_id UUID PRIMARY KEY,
+    campaign_id UUID NOT NULL REFERENCES campaigns(campaign_id) ON DELETE CASCADE,
+    user_id UUID,
+    report_type VARCHAR(50) NOT NULL,
+    format VARCHAR(20) NOT NULL,
+    template_id VARCHAR(100),
+    generated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    file_size_bytes BIGINT,
+    file_url TEXT,
+    includes_roi BOOLEAN NOT NULL DEFAULT FALSE,
+    includes_attribution BOOLEAN NOT NULL DEFAULT FALSE,
+    metadata JSONB NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS idx_reports_user_generated ON reports(user_id, generated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_campaign_generated ON reports(campaign_id, generated_at DESC);
@@ -0,0 +1,27 @@
+-- Migration: report_jobs
+-- Created: Fri Oct 16 14:00:00 UTC 2026
+
+-- Batch report jobs (one template over many campaigns) and their progress.
+-- artifacts maps campaign_id -> file_url for per-campaign output; zipped
+-- output has a single artifact_url instead.
+CREATE TABLE IF NOT EXISTS report_jobs (
+    job_id UUID PRIMARY KEY,
+    user_id UUID,
+    template_id VARCHAR(100),
+    report_type VARCHAR(50) NOT NULL,
+    format VARCHAR(20) NOT NULL,
+    package VARCHAR(20) NOT NULL DEFAULT 'zip', -- zip, files
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+    campaign_ids UUID[] NOT NULL,
+    total_count INTEGER NOT NULL,
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    artifact_url TEXT,
+    artifacts JSONB NOT NULL DEFAULT '{}',
+    errors JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_jobs_user_created ON report_jobs(user_id, created_at DESC);
@@ -0,0 +1,12 @@
+-- Migration: ad_detection_checkpoints
+-- Created: Fri Oct 16 15:00:00 UTC 2026
+
+-- Episodes whose ad slots a batch detection run has written. A run that is
+-- interrupted and restarted with the same run_id skips these episodes.
+CREATE TABLE IF NOT EXISTS ad_detection_checkpoints (
+    run_id VARCHAR(255) NOT NULL,
+    episode_id UUID NOT NULL REFERENCES episodes(episode_id) ON DELETE CASCADE,
+    slot_count INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_id, episode_id)
+);
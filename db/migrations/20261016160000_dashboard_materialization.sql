@@ -0,0 +1,131 @@
+-- Migration: dashboard_materialization
+-- Created: Fri Oct 16 16:00:00 UTC 2026
+
+-- Attribution-derived dashboard state, kept up to date by the dashboard
+-- materializer (src/analytics/dashboard_materializer.py). A trigger on
+-- attribution_events records every insert, update and delete as signed
+-- deltas in a changelog, which the materializer drains. Changelog rows only
+-- become visible when the writing transaction commits, so long
+-- transactions are picked up whenever they commit instead of falling
+-- behind a time-based high-water mark.
+
+BEGIN;
+
+-- Lifetime delivery per campaign (pacing and makegood cards), owned by the
+-- campaign's tenant
+CREATE TABLE IF NOT EXISTS dashboard_campaign_delivery (
+    campaign_id UUID PRIMARY KEY REFERENCES campaigns(campaign_id) ON DELETE CASCADE,
+    tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    podcast_id UUID,
+    impressions NUMERIC NOT NULL DEFAULT 0,
+    conversions BIGINT NOT NULL DEFAULT 0,
+    revenue NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_dashboard_campaign_delivery_tenant ON dashboard_campaign_delivery(tenant_id, podcast_id);
+
+-- Attributed revenue per tenant, podcast and event day (sponsor revenue card)
+CREATE TABLE IF NOT EXISTS dashboard_daily_revenue (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    podcast_id UUID NOT NULL,
+    day DATE NOT NULL,
+    revenue NUMERIC NOT NULL DEFAULT 0,
+    conversions BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (tenant_id, day, podcast_id)
+);
+
+-- Attribution event changes not yet folded into the tables above. An
+-- update is recorded as the old row with sign -1 plus the new row with +1
+CREATE TABLE IF NOT EXISTS dashboard_attribution_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    campaign_id UUID NOT NULL,
+    tenant_id UUID,
+    day DATE NOT NULL,
+    impressions NUMERIC NOT NULL,
+    conversion_value NUMERIC,
+    sign SMALLINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION record_dashboard_attribution_change()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO dashboard_attribution_changes (campaign_id, tenant_id, day, impressions, conversion_value, sign)
+        VALUES (
+            OLD.campaign_id,
+            OLD.tenant_id,
+            DATE(OLD.timestamp),
+            COALESCE((OLD.attribution_data->>'impressions')::numeric, 0),
+            (OLD.conversion_data->>'conversion_value')::numeric,
+            -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO dashboard_attribution_changes (campaign_id, tenant_id, day, impressions, conversion_value, sign)
+        VALUES (
+            NEW.campaign_id,
+            NEW.tenant_id,
+            DATE(NEW.timestamp),
+            COALESCE((NEW.attribution_data->>'impressions')::numeric, 0),
+            (NEW.conversion_data->>'conversion_value')::numeric,
+            1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Block attribution writers until the backfill below commits, so every
+-- event is either in the backfill or in the changelog, never both
+LOCK TABLE attribution_events IN SHARE MODE;
+
+DROP TRIGGER IF EXISTS attribution_events_dashboard_changes ON attribution_events;
+CREATE TRIGGER attribution_events_dashboard_changes
+    AFTER INSERT OR DELETE OR UPDATE OF campaign_id, tenant_id, timestamp, attribution_data, conversion_data
+    ON attribution_events
+    FOR EACH ROW EXECUTE FUNCTION record_dashboard_attribution_change();
+
+-- Backfill from existing history (same statements as DashboardMaterializer.rebuild)
+DELETE FROM dashboard_attribution_changes;
+DELETE FROM dashboard_campaign_delivery;
+DELETE FROM dashboard_daily_revenue;
+
+-- One row per campaign, even when its events carry several tenant_ids
+INSERT INTO dashboard_campaign_delivery (campaign_id, tenant_id, podcast_id, impressions, conversions, revenue)
+SELECT
+    c.campaign_id,
+    c.tenant_id,
+    c.podcast_id,
+    COALESCE(SUM((ae.attribution_data->>'impressions')::numeric), 0),
+    COUNT(ae.conversion_data->>'conversion_value'),
+    COALESCE(SUM((ae.conversion_data->>'conversion_value')::numeric), 0)
+FROM attribution_events ae
+JOIN campaigns c ON c.campaign_id = ae.campaign_id
+GROUP BY c.campaign_id, c.tenant_id, c.podcast_id;
+
+INSERT INTO dashboard_daily_revenue (tenant_id, podcast_id, day, revenue, conversions)
+SELECT
+    ae.tenant_id,
+    c.podcast_id,
+    DATE(ae.timestamp),
+    SUM((ae.conversion_data->>'conversion_value')::numeric),
+    COUNT(*)
+FROM attribution_events ae
+JOIN campaigns c ON c.campaign_id = ae.campaign_id
+WHERE ae.tenant_id IS NOT NULL
+  AND ae.conversion_data->>'conversion_value' IS NOT NULL
+GROUP BY ae.tenant_id, c.podcast_id, DATE(ae.timestamp);
+
+COMMIT;
+
+ALTER TABLE dashboard_campaign_delivery ENABLE ROW LEVEL SECURITY;
+ALTER TABLE dashboard_daily_revenue ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY tenant_isolation_dashboard_campaign_delivery ON dashboard_campaign_delivery
+    USING (tenant_id = current_setting('app.current_tenant', TRUE)::UUID);
+
+CREATE POLICY tenant_isolation_dashboard_daily_revenue ON dashboard_daily_revenue
+    USING (tenant_id = current_setting('app.current_tenant', TRUE)::UUID);
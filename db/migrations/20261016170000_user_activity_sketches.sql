@@ -0,0 +1,16 @@
+-- Migration: user_activity_sketches
+-- Created: Fri Oct 16 17:00:00 UTC 2026
+
+-- HyperLogLog sketches of the distinct users seen per UTC day and event
+-- type, maintained as events are flushed (src/analytics/user_activity_rollup.py).
+-- event_type '*' holds the users seen for any event type that day.
+-- Active-user and funnel counts merge these sketches instead of scanning
+-- events.
+CREATE TABLE IF NOT EXISTS user_activity_sketches (
+    day DATE NOT NULL,
+    event_type VARCHAR(255) NOT NULL,
+    precision SMALLINT NOT NULL,
+    registers BYTEA NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, event_type)
+);
@@ -44,7 +44,7 @@ CREATE TABLE IF NOT EXISTS shared_reports (
     expires_at TIMESTAMP WITH TIME ZONE,
     view_count INTEGER DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    FOREIGN KEY (report_id) REFERENCES reports(id)
+    FOREIGN KEY (report_id) REFERENCES reports(report_id)
 );
 
 CREATE INDEX IF NOT EXISTS idx_shared_reports_token ON shared_reports(share_token);
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+User Activity Backfill
+
+Builds the daily distinct-user sketches (user_activity_sketches) from the
+events table for days before the rollup was deployed. Safe to re-run:
+sketch updates are idempotent.
+
+Usage: python scripts/backfill_user_activity.py [days]  (default: 90)
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics.user_activity_rollup import UserActivityRollup
+from src.database import PostgresConnection
+from src.config.settings import get_settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Main entry point"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    settings = get_settings()
+    
+    postgres = PostgresConnection(
+        host=settings.database.postgres_host,
+        port=settings.database.postgres_port,
+        database=settings.database.postgres_database,
+        user=settings.database.postgres_user,
+        password=settings.database.postgres_password
+    )
+    
+    try:
+        await postgres.initialize()
+        end_day = datetime.now(timezone.utc).date()
+        start_day = end_day - timedelta(days=days - 1)
+        logger.info(f"Backfilling user activity sketches from {start_day} to {end_day}")
+        
+        updated = await UserActivityRollup(postgres).backfill(start_day, end_day)
+        logger.info(f"✓ Updated {updated} daily sketches")
+    finally:
+        await postgres.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
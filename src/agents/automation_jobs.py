@@ -139,21 +139,9 @@ class AutomationJobs:
                     WHERE tenant_id = $1::uuid;
                 """
                 podcasts = await self.postgres_conn.fetch(query, tenant_id)
-                
-                recalculated = 0
-                for pod_row in podcasts:
-                    result = await engine.calculate_match_score(
-                        advertiser_id=advertiser_id,
-                        podcast_id=str(pod_row['podcast_id']),
-                        tenant_id=tenant_id
-                    )
-                    recalculated += 1
-                
-                return {
-                    'status': 'completed',
-                    'advertiser_id': advertiser_id,
-                    'matches_recalculated': recalculated
-                }
+                advertiser_ids = [advertiser_id]
+                podcast_ids = [str(row['podcast_id']) for row in podcasts]
+                scope = {'advertiser_id': advertiser_id}
             
             elif podcast_id:
                 # Recalculate for one podcast
@@ -162,45 +150,35 @@ class AutomationJobs:
                     WHERE tenant_id = $1::uuid;
                 """
                 advertisers = await self.postgres_conn.fetch(query, tenant_id)
-                
-                recalculated = 0
-                for adv_row in advertisers:
-                    result = await engine.calculate_match_score(
-                        advertiser_id=str(adv_row['advertiser_id']),
-                        podcast_id=podcast_id,
-                        tenant_id=tenant_id
-                    )
-                    recalculated += 1
-                
-                return {
-                    'status': 'completed',
-                    'podcast_id': podcast_id,
-                    'matches_recalculated': recalculated
-                }
+                advertiser_ids = [str(row['advertiser_id']) for row in advertisers]
+                podcast_ids = [podcast_id]
+                scope = {'podcast_id': podcast_id}
             
             else:
                 # Recalculate all matches (expensive - should be scheduled)
-                query = """
-                    SELECT DISTINCT c.sponsor_id as advertiser_id, p.podcast_id
-                    FROM campaigns c
-                    CROSS JOIN podcasts p
-                    WHERE c.tenant_id = $1::uuid AND p.tenant_id = $1::uuid;
-                """
-                pairs = await self.postgres_conn.fetch(query, tenant_id)
+                advertisers = await self.postgres_conn.fetch("""
+                    SELECT DISTINCT sponsor_id as advertiser_id FROM campaigns
+                    WHERE tenant_id = $1::uuid;
+                """, tenant_id)
+                podcasts = await self.postgres_conn.fetch("""
+                    SELECT podcast_id FROM podcasts
+                    WHERE tenant_id = $1::uuid;
+                """, tenant_id)
+                advertiser_ids = [str(row['advertiser_id']) for row in advertisers]
+                podcast_ids = [str(row['podcast_id']) for row in podcasts]
+                scope = {}
                 
-                recalculated = 0
-                for pair in pairs:
-                    result = await engine.calculate_match_score(
-                        advertiser_id=str(pair['advertiser_id']),
-                        podcast_id=str(pair['podcast_id']),
-                        tenant_id=tenant_id
-                    )
-                    recalculated += 1
+            # Score the advertiser x podcast matrix and upsert it in bulk
+            recalculated = 0
+            if advertiser_ids and podcast_ids:
+                _, match_ids = await engine.recalculate_matches(advertiser_ids, podcast_ids, tenant_id)
+                recalculated = len(match_ids)
                 
-                return {
-                    'status': 'completed',
-                    'matches_recalculated': recalculated
-                }
+            return {
+                'status': 'completed',
+                **scope,
+                'matches_recalculated': recalculated
+            }
         
         except Exception as e:
             logger.error(f"Matchmaking recalculation failed: {e}", exc_info=True)
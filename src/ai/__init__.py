@@ -4,7 +4,7 @@ AI-Powered Features Module
 Provides AI-powered insights, predictions, and recommendations.
 """
 
-from src.ai.framework import AIFramework, AIProvider
+from src.ai.framework import AIFramework, AIProvider, AIOperation, AIRequest, AIResultCache
 from src.ai.content_analyzer import ContentAnalyzer
 from src.ai.predictive_engine import PredictiveEngine
 from src.ai.recommendations import RecommendationEngine
@@ -13,6 +13,9 @@ from src.ai.anomaly_detection import AnomalyDetector
 __all__ = [
     "AIFramework",
     "AIProvider",
+    "AIOperation",
+    "AIRequest",
+    "AIResultCache",
     "ContentAnalyzer",
     "PredictiveEngine",
     "RecommendationEngine",
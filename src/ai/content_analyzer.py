@@ -9,7 +9,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from src.ai.framework import AIFramework
+from src.ai.framework import AIFramework, AIOperation, AIRequest
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
 from src.database import PostgresConnection
@@ -54,15 +54,15 @@ class ContentAnalyzer:
             - keywords: List of keywords
             - sponsor_mentions: Sponsor mentions detected
         """
-        # Generate summary
-        summary_prompt = f"Summarize the following podcast episode transcript in 2-3 sentences:\n\n{transcript_text[:2000]}"
-        summary = await self.ai.generate_text(summary_prompt)
-        
-        # Analyze sentiment
-        sentiment = await self.ai.analyze_sentiment(transcript_text[:2000])
-        
-        # Extract topics
-        topics = await self.ai.extract_topics(transcript_text[:2000])
+        # Summary, sentiment and topics are independent: send them together
+        # (cached results for this transcript are reused)
+        excerpt = transcript_text[:2000]
+        summary_prompt = f"Summarize the following podcast episode transcript in 2-3 sentences:\n\n{excerpt}"
+        summary, sentiment, topics = await self.ai.run_many([
+            AIRequest(AIOperation.GENERATE_TEXT, summary_prompt),
+            AIRequest(AIOperation.ANALYZE_SENTIMENT, excerpt),
+            AIRequest(AIOperation.EXTRACT_TOPICS, excerpt),
+        ])
         
         # Extract keywords (simplified - in production, use more sophisticated extraction)
         keywords = topics[:10]  # Use top topics as keywords
@@ -2,10 +2,21 @@
 AI Framework
 
 Provides abstraction layer for multiple AI providers (OpenAI, Anthropic, etc.)
+
+Results are cached by (provider, model, operation, hash of normalized input)
+in a local LRU backed by Redis with a TTL, so re-analysing the same content
+does not call the provider again. Several operations on the same content
+can be sent together with run_many.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
 from enum import Enum
 from abc import ABC, abstractmethod
 from src.utils.circuit_breaker import (
@@ -15,6 +26,10 @@ from src.utils.circuit_breaker import (
     get_circuit_breaker
 )
 
+if TYPE_CHECKING:
+    from src.database import RedisConnection
+    from src.telemetry.metrics import MetricsCollector
+
 logger = logging.getLogger(__name__)
 
 # Circuit breakers for AI providers
@@ -47,9 +62,26 @@ class AIProvider(Enum):
     GOOGLE = "google"
 
 
+class AIOperation(Enum):
+    """Operations supported by every provider"""
+    GENERATE_TEXT = "generate_text"
+    ANALYZE_SENTIMENT = "analyze_sentiment"
+    EXTRACT_TOPICS = "extract_topics"
+
+
+@dataclass
+class AIRequest:
+    """One provider operation on one input"""
+    operation: AIOperation
+    input: str
+    options: Dict[str, Any] = field(default_factory=dict)  # generate_text kwargs
+
+
 class AIProviderInterface(ABC):
     """Abstract interface for AI providers"""
     
+    model: str = "default"
+    
     @abstractmethod
     async def generate_text(self, prompt: str, **kwargs) -> str:
         """Generate text from prompt"""
@@ -64,6 +96,106 @@ class AIProviderInterface(ABC):
     async def extract_topics(self, text: str) -> List[str]:
         """Extract topics from text"""
         pass
+    
+    async def run_batch(self, requests: List[AIRequest]) -> List[Any]:
+        """
+        Run several operations, returning results in request order
+        
+        The default runs each operation concurrently; providers whose API can
+        answer several operations in one request override this to do so.
+        """
+        return await asyncio.gather(*[self.run(request) for request in requests])
+    
+    async def run(self, request: AIRequest) -> Any:
+        """Run a single operation"""
+        if request.operation == AIOperation.GENERATE_TEXT:
+            return await self.generate_text(request.input, **request.options)
+        if request.operation == AIOperation.ANALYZE_SENTIMENT:
+            return await self.analyze_sentiment(request.input)
+        return await self.extract_topics(request.input)
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return " ".join(text.split())
+
+
+class AIResultCache:
+    """
+    Content-addressed cache of provider results
+    
+    Entries live in a local LRU and, when a Redis connection is given, in
+    Redis so they survive restarts and are shared between processes. Both
+    tiers expire entries after ``ttl_seconds``. Redis errors are logged and
+    treated as misses.
+    """
+    
+    def __init__(
+        self,
+        redis_conn: Optional["RedisConnection"] = None,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        ttl_seconds: int = 30 * 24 * 3600,
+        max_local_entries: int = 10000,
+        key_prefix: str = "ai:result"
+    ):
+        self.redis = redis_conn
+        self.metrics = metrics_collector
+        self.ttl_seconds = ttl_seconds
+        self.max_local_entries = max_local_entries
+        self.key_prefix = key_prefix
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def key(self, provider: AIProvider, model: str, request: AIRequest) -> str:
+        digest = hashlib.sha256(json.dumps(
+            {"input": normalize_input(request.input), "options": request.options},
+            sort_keys=True,
+            default=str
+        ).encode()).hexdigest()
+        return f"{self.key_prefix}:{provider.value}:{model}:{request.operation.value}:{digest}"
+    
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value)"""
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return True, value
+            del self._local[key]
+        
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"AI result cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._set_local(key, value)
+                return True, value
+        
+        return False, None
+    
+    async def set(self, key: str, value: Any):
+        self._set_local(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(value), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"AI result cache write failed: {e}")
+    
+    def _set_local(self, key: str, value: Any):
+        self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+    
+    def record(self, operation: AIOperation, hit: bool):
+        if self.metrics:
+            self.metrics.increment_counter(
+                "ai_cache_hits_total" if hit else "ai_cache_misses_total",
+                tags={"operation": operation.value}
+            )
 
 
 class OpenAIProvider(AIProviderInterface):
@@ -122,15 +254,23 @@ class AIFramework:
     AI Framework
     
     Provides unified interface for multiple AI providers with fallback support.
+    Provider calls go through the result cache (if configured) and the
+    provider's circuit breaker. With ``batch_requests`` enabled, cache
+    misses from one run_many call are sent to the provider as one batch.
     """
     
     def __init__(
         self,
         primary_provider: AIProvider = AIProvider.OPENAI,
-        api_keys: Optional[Dict[AIProvider, str]] = None
+        api_keys: Optional[Dict[AIProvider, str]] = None,
+        providers: Optional[Dict[AIProvider, AIProviderInterface]] = None,
+        cache: Optional[AIResultCache] = None,
+        batch_requests: bool = True
     ):
         self.primary_provider = primary_provider
-        self.providers: Dict[AIProvider, AIProviderInterface] = {}
+        self.providers: Dict[AIProvider, AIProviderInterface] = dict(providers or {})
+        self.cache = cache
+        self.batch_requests = batch_requests
         
         api_keys = api_keys or {}
         
@@ -154,34 +294,71 @@ class AIFramework:
     
     async def generate_text(self, prompt: str, provider: Optional[AIProvider] = None, **kwargs) -> str:
         """Generate text using specified or primary provider with circuit breaker"""
-        provider = provider or self.primary_provider
-        
-        if provider not in self.providers:
-            raise ValueError(f"Provider {provider} not available")
-        
-        # Get circuit breaker for provider
-        breaker = _ai_circuit_breakers.get(provider.value)
-        if breaker:
-            async def _call_provider():
-                return await self.providers[provider].generate_text(prompt, **kwargs)
-            return await breaker.call(_call_provider)
-        else:
-            return await self.providers[provider].generate_text(prompt, **kwargs)
+        return await self.run(AIRequest(AIOperation.GENERATE_TEXT, prompt, kwargs), provider)
     
     async def analyze_sentiment(self, text: str, provider: Optional[AIProvider] = None) -> Dict[str, Any]:
         """Analyze sentiment"""
-        provider = provider or self.primary_provider
-        
-        if provider not in self.providers:
-            raise ValueError(f"Provider {provider} not available")
-        
-        return await self.providers[provider].analyze_sentiment(text)
+        return await self.run(AIRequest(AIOperation.ANALYZE_SENTIMENT, text), provider)
     
     async def extract_topics(self, text: str, provider: Optional[AIProvider] = None) -> List[str]:
         """Extract topics"""
+        return await self.run(AIRequest(AIOperation.EXTRACT_TOPICS, text), provider)
+    
+    async def run(self, request: AIRequest, provider: Optional[AIProvider] = None) -> Any:
+        """Run one operation"""
+        return (await self.run_many([request], provider))[0]
+    
+    async def run_many(self, requests: List[AIRequest], provider: Optional[AIProvider] = None) -> List[Any]:
+        """
+        Run several independent operations, returning results in request order
+        
+        Cached results are returned without a provider call; the remaining
+        requests are sent as one provider batch, or concurrently when
+        batching is disabled.
+        """
         provider = provider or self.primary_provider
         
         if provider not in self.providers:
             raise ValueError(f"Provider {provider} not available")
         
-        return await self.providers[provider].extract_topics(text)
+        ai_provider = self.providers[provider]
+        results: List[Any] = [None] * len(requests)
+        keys: List[Optional[str]] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        
+        if self.cache:
+            keys = [self.cache.key(provider, ai_provider.model, request) for request in requests]
+            lookups = await asyncio.gather(*[self.cache.get(key) for key in keys])
+            pending = []
+            for i, (hit, value) in enumerate(lookups):
+                self.cache.record(requests[i].operation, hit)
+                if hit:
+                    results[i] = value
+                else:
+                    pending.append(i)
+        
+        if not pending:
+            return results
+        
+        misses = [requests[i] for i in pending]
+        if self.batch_requests and len(misses) > 1:
+            values = await self._call(provider, ai_provider.run_batch, misses)
+        else:
+            values = await asyncio.gather(*[
+                self._call(provider, ai_provider.run, request)
+                for request in misses
+            ])
+        
+        for i, value in zip(pending, values):
+            results[i] = value
+        if self.cache:
+            await asyncio.gather(*[self.cache.set(keys[i], results[i]) for i in pending])
+        
+        return results
+    
+    async def _call(self, provider: AIProvider, func, *args):
+        """Call a provider coroutine function through the provider's circuit breaker"""
+        breaker = _ai_circuit_breakers.get(provider.value)
+        if breaker:
+            return await breaker.call(func, *args)
+        return await func(*args)
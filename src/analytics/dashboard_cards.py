@@ -0,0 +1,92 @@
+"""
+Dashboard Cards
+
+Composition of dashboard pages from independent cards. Each card is a
+coroutine that loads and shapes its own data, so a page loads all of its
+cards concurrently and takes as long as its slowest card rather than the
+sum of them.
+
+A card that fails or exceeds its timeout is reported with its fallback
+value and status instead of failing the page.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.telemetry.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DashboardCard:
+    """One independently loaded dashboard card"""
+    name: str
+    load: Callable[[], Awaitable[Any]]
+    fallback: Any = None  # Returned in place of the data when the card fails
+    timeout_seconds: Optional[float] = None  # None uses the page default
+
+
+@dataclass
+class CardResult:
+    """Outcome of loading one card"""
+    name: str
+    data: Any
+    status: str  # "ok", "timeout" or "error"
+    latency_ms: float
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+async def load_card(
+    card: DashboardCard,
+    timeout_seconds: float,
+    metrics_collector: Optional[MetricsCollector] = None,
+    page: str = ""
+) -> CardResult:
+    """Load one card, turning errors and timeouts into its fallback"""
+    started = time.perf_counter()
+    try:
+        data = await asyncio.wait_for(card.load(), timeout=card.timeout_seconds or timeout_seconds)
+        status = "ok"
+    except asyncio.TimeoutError:
+        logger.warning(f"Dashboard card {page}/{card.name} timed out")
+        data, status = card.fallback, "timeout"
+    except Exception as e:
+        logger.error(f"Dashboard card {page}/{card.name} failed: {e}", exc_info=True)
+        data, status = card.fallback, "error"
+    
+    latency_ms = (time.perf_counter() - started) * 1000
+    if metrics_collector:
+        metrics_collector.record_histogram(
+            "dashboard_card_latency_ms",
+            latency_ms,
+            tags={"page": page, "card": card.name, "status": status}
+        )
+    return CardResult(name=card.name, data=data, status=status, latency_ms=latency_ms)
+
+
+async def load_cards(
+    cards: List[DashboardCard],
+    timeout_seconds: float = 2.0,
+    metrics_collector: Optional[MetricsCollector] = None,
+    page: str = ""
+) -> Dict[str, CardResult]:
+    """Load all cards of a page concurrently, keyed by card name"""
+    results = await asyncio.gather(*[
+        load_card(card, timeout_seconds, metrics_collector, page) for card in cards
+    ])
+    return {result.name: result for result in results}
+
+
+def server_timing(results: Dict[str, CardResult]) -> str:
+    """Per-card latencies as a Server-Timing header value"""
+    return ", ".join(
+        f'{result.name};dur={result.latency_ms:.1f};desc="{result.status}"'
+        for result in results.values()
+    )
@@ -0,0 +1,183 @@
+"""
+Dashboard Materializer
+
+Keeps the attribution-derived dashboard tables (campaign delivery and daily
+sponsor revenue) current, so dashboard endpoints read a few keyed rows
+instead of aggregating the whole attribution_events history per page view.
+
+A trigger on attribution_events writes each insert, update and delete to
+dashboard_attribution_changes as signed deltas (see the
+dashboard_materialization migration). Each refresh deletes a batch of
+changelog rows and adds their deltas to the summary tables in one
+statement. Changelog rows become visible only when their transaction
+commits, so there is no time-based high-water mark for long transactions
+to fall behind, and updated or deleted events are reflected.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from src.database import PostgresConnection
+from src.telemetry.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+
+# $1 = batch size. SKIP LOCKED lets concurrent refreshes drain disjoint batches.
+APPLY_CHANGES_QUERY = """
+WITH drained AS (
+    DELETE FROM dashboard_attribution_changes
+    WHERE change_id IN (
+        SELECT change_id
+        FROM dashboard_attribution_changes
+        ORDER BY change_id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING campaign_id, tenant_id, day, impressions, conversion_value, sign
+), changes AS (
+    SELECT d.*, c.tenant_id AS campaign_tenant_id, c.podcast_id
+    FROM drained d
+    JOIN campaigns c ON c.campaign_id = d.campaign_id
+), delivery AS (
+    INSERT INTO dashboard_campaign_delivery (campaign_id, tenant_id, podcast_id, impressions, conversions, revenue)
+    SELECT campaign_id, campaign_tenant_id, podcast_id, SUM(sign * impressions),
+           COALESCE(SUM(sign) FILTER (WHERE conversion_value IS NOT NULL), 0),
+           COALESCE(SUM(sign * conversion_value), 0)
+    FROM changes
+    GROUP BY campaign_id, campaign_tenant_id, podcast_id
+    ON CONFLICT (campaign_id) DO UPDATE SET
+        tenant_id = EXCLUDED.tenant_id,
+        podcast_id = EXCLUDED.podcast_id,
+        impressions = dashboard_campaign_delivery.impressions + EXCLUDED.impressions,
+        conversions = dashboard_campaign_delivery.conversions + EXCLUDED.conversions,
+        revenue = dashboard_campaign_delivery.revenue + EXCLUDED.revenue,
+        updated_at = NOW()
+    RETURNING 1
+), revenue AS (
+    INSERT INTO dashboard_daily_revenue (tenant_id, podcast_id, day, revenue, conversions)
+    SELECT tenant_id, podcast_id, day, SUM(sign * conversion_value), SUM(sign)
+    FROM changes
+    WHERE tenant_id IS NOT NULL AND conversion_value IS NOT NULL
+    GROUP BY tenant_id, podcast_id, day
+    ON CONFLICT (tenant_id, day, podcast_id) DO UPDATE SET
+        revenue = dashboard_daily_revenue.revenue + EXCLUDED.revenue,
+        conversions = dashboard_daily_revenue.conversions + EXCLUDED.conversions,
+        updated_at = NOW()
+    RETURNING 1
+)
+SELECT
+    (SELECT COUNT(*) FROM drained) AS changes,
+    (SELECT COUNT(*) FROM delivery) AS campaigns,
+    (SELECT COUNT(*) FROM revenue) AS revenue_days
+"""
+
+# Recomputes both tables from the full history; run in one transaction.
+# The share lock waits for in-flight attribution writes and blocks new ones,
+# so every event is counted either here or in a later changelog row.
+REBUILD_QUERIES = (
+    "LOCK TABLE attribution_events IN SHARE MODE",
+    "DELETE FROM dashboard_attribution_changes",
+    "DELETE FROM dashboard_campaign_delivery",
+    "DELETE FROM dashboard_daily_revenue",
+    """
+    INSERT INTO dashboard_campaign_delivery (campaign_id, tenant_id, podcast_id, impressions, conversions, revenue)
+    SELECT
+        c.campaign_id,
+        c.tenant_id,
+        c.podcast_id,
+        COALESCE(SUM((ae.attribution_data->>'impressions')::numeric), 0),
+        COUNT(ae.conversion_data->>'conversion_value'),
+        COALESCE(SUM((ae.conversion_data->>'conversion_value')::numeric), 0)
+    FROM attribution_events ae
+    JOIN campaigns c ON c.campaign_id = ae.campaign_id
+    GROUP BY c.campaign_id, c.tenant_id, c.podcast_id
+    """,
+    """
+    INSERT INTO dashboard_daily_revenue (tenant_id, podcast_id, day, revenue, conversions)
+    SELECT
+        ae.tenant_id,
+        c.podcast_id,
+        DATE(ae.timestamp),
+        SUM((ae.conversion_data->>'conversion_value')::numeric),
+        COUNT(*)
+    FROM attribution_events ae
+    JOIN campaigns c ON c.campaign_id = ae.campaign_id
+    WHERE ae.tenant_id IS NOT NULL
+      AND ae.conversion_data->>'conversion_value' IS NOT NULL
+    GROUP BY ae.tenant_id, c.podcast_id, DATE(ae.timestamp)
+    """,
+)
+
+
+class DashboardMaterializer:
+    """
+    Incremental maintenance of dashboard summary tables
+    
+    Safe to run in every API process: changelog rows being drained are
+    row-locked and skipped by concurrent refreshes, so each change is
+    applied exactly once.
+    """
+    
+    def __init__(
+        self,
+        postgres_conn: PostgresConnection,
+        metrics_collector: Optional[MetricsCollector] = None,
+        refresh_interval: float = 5.0,
+        batch_size: int = 10000
+    ):
+        self.postgres = postgres_conn
+        self.metrics = metrics_collector
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start the periodic refresh"""
+        self._refresh_task = asyncio.create_task(self._periodic_refresh())
+    
+    async def stop(self):
+        """Stop the periodic refresh"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def refresh(self) -> int:
+        """Drain the attribution changelog in batches; returns the number of changes applied"""
+        started = time.monotonic()
+        applied = 0
+        while True:
+            # Each batch is one statement, so its deletes and upserts commit together
+            result = await self.postgres.fetchrow(APPLY_CHANGES_QUERY, self.batch_size)
+            changes = result["changes"] if result else 0
+            applied += changes
+            if changes < self.batch_size:
+                break
+        
+        if self.metrics:
+            self.metrics.increment_counter("dashboard_materialized_events_total", value=applied)
+            self.metrics.record_histogram("dashboard_materialize_duration_seconds", time.monotonic() - started)
+        return applied
+    
+    async def rebuild(self):
+        """Recompute the summary tables from the full event history"""
+        async with self.postgres.acquire() as conn:
+            async with conn.transaction():
+                for query in REBUILD_QUERIES:
+                    await conn.execute(query)
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Dashboard materialization failed: {e}")
+                if self.metrics:
+                    self.metrics.increment_counter("dashboard_materialize_errors_total")
@@ -0,0 +1,73 @@
+"""
+HyperLogLog
+
+Fixed-size distinct-count sketch. Sketches of the same precision merge by
+taking the register-wise maximum, so the sketch of a date range is the
+merge of its daily sketches, and adding a value twice (e.g. when an event
+batch is replayed) does not change the count.
+
+Standard error is about 1.04 / sqrt(2 ** precision): 1.6% at the default
+precision of 12, with 4 KiB of registers. Small counts fall back to linear
+counting and are close to exact.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """HyperLogLog with 64-bit hashes and one byte per register"""
+    
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is not None and len(registers) != self.size:
+            raise ValueError(f"Expected {self.size} registers for precision {precision}, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+    
+    def add(self, value: str):
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def update(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+    
+    def merge(self, other: "HyperLogLog"):
+        """Fold another sketch into this one (union)"""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HyperLogLog sketches of precision {other.precision} and {self.precision}"
+            )
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / math.fsum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+    
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        return cls(precision, data)
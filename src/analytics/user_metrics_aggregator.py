@@ -2,18 +2,32 @@
 User Metrics Aggregator
 
 Aggregates user activity metrics (DAU/WAU/MAU, activation, retention) from events.
+
+Distinct-user counts come from the daily sketches kept by
+UserActivityRollup, so they cost one sketch per day in the window instead
+of a scan of the events table.
 """
 
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, Optional, Tuple
 from dataclasses import dataclass
 
+from src.analytics.user_activity_rollup import UserActivityRollup, utc_day
 from src.database import PostgresConnection
 
 logger = logging.getLogger(__name__)
 
 
+# Events that count as a user getting first value from the product
+ACTIVATION_EVENTS = [
+    'report_generated',
+    'campaign_launched',
+    'attribution_setup_completed',
+    'first_value_delivered',
+]
+
+
 @dataclass
 class UserMetrics:
     """User metrics data structure"""
@@ -32,34 +46,54 @@ class UserMetricsAggregator:
     Aggregates user activity metrics from events table.
     """
     
-    def __init__(self, postgres_conn: PostgresConnection):
+    def __init__(self, postgres_conn: PostgresConnection, rollup: Optional[UserActivityRollup] = None):
         self.postgres_conn = postgres_conn
+        self.rollup = rollup or UserActivityRollup(postgres_conn)
     
-    async def get_dau(self, date: Optional[datetime] = None) -> int:
+    async def count_users(
+        self,
+        days: int,
+        date: Optional[datetime] = None,
+        event_types: Optional[Iterable[str]] = None
+    ) -> int:
         """
-        Get Daily Active Users
+        Distinct users active over a window of days
         
         Args:
-            date: Date to calculate DAU for (defaults to today)
+            days: Number of UTC days in the window, ending with the day of ``date``
+            date: Last day of the window (defaults to today)
+            event_types: Only count users with one of these event types
+                (defaults to any event)
+        """
+        end_day = utc_day(date or datetime.now(timezone.utc))
+        return await self.rollup.distinct_users(end_day - timedelta(days=days - 1), end_day, event_types)
+    
+    @staticmethod
+    def day_bounds(days: int, date: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        Timestamp bounds of the window count_users uses
         
         Returns:
-            Number of unique users active in last 24 hours
+            Start of the first UTC day and end (exclusive) of the last one,
+            for ``days`` days ending with the day of ``date`` (defaults to today)
+        """
+        end_day = utc_day(date or datetime.now(timezone.utc))
+        return (
+            datetime.combine(end_day - timedelta(days=days - 1), time.min, tzinfo=timezone.utc),
+            datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        )
+    
+    async def get_dau(self, date: Optional[datetime] = None) -> int:
         """
-        if date is None:
-            date = datetime.now(timezone.utc)
+        Get Daily Active Users
         
-        start_time = date - timedelta(days=1)
+        Args:
+            date: Date to calculate DAU for (defaults to today)
         
-        query = """
-            SELECT COUNT(DISTINCT user_id) as dau
-            FROM events
-            WHERE timestamp >= $1
-              AND timestamp < $2
-              AND user_id IS NOT NULL
+        Returns:
+            Number of unique users active on that day (UTC)
         """
-        
-        row = await self.postgres_conn.fetch_one(query, start_time, date)
-        return row["dau"] or 0 if row else 0
+        return await self.count_users(1, date)
     
     async def get_wau(self, date: Optional[datetime] = None) -> int:
         """
@@ -69,23 +103,9 @@ class UserMetricsAggregator:
             date: Date to calculate WAU for (defaults to today)
         
         Returns:
-            Number of unique users active in last 7 days
-        """
-        if date is None:
-            date = datetime.now(timezone.utc)
-        
-        start_time = date - timedelta(days=7)
-        
-        query = """
-            SELECT COUNT(DISTINCT user_id) as wau
-            FROM events
-            WHERE timestamp >= $1
-              AND timestamp < $2
-              AND user_id IS NOT NULL
+            Number of unique users active in the 7 days ending that day (UTC)
         """
-        
-        row = await self.postgres_conn.fetch_one(query, start_time, date)
-        return row["wau"] or 0 if row else 0
+        return await self.count_users(7, date)
     
     async def get_mau(self, date: Optional[datetime] = None) -> int:
         """
@@ -95,23 +115,9 @@ class UserMetricsAggregator:
             date: Date to calculate MAU for (defaults to today)
         
         Returns:
-            Number of unique users active in last 30 days
+            Number of unique users active in the 30 days ending that day (UTC)
         """
-        if date is None:
-            date = datetime.now(timezone.utc)
-        
-        start_time = date - timedelta(days=30)
-        
-        query = """
-            SELECT COUNT(DISTINCT user_id) as mau
-            FROM events
-            WHERE timestamp >= $1
-              AND timestamp < $2
-              AND user_id IS NOT NULL
-        """
-        
-        row = await self.postgres_conn.fetch_one(query, start_time, date)
-        return row["mau"] or 0 if row else 0
+        return await self.count_users(30, date)
     
     async def get_activation_rate(
         self,
@@ -172,7 +178,7 @@ class UserMetricsAggregator:
                 )
         """ % days
         
-        row = await self.postgres_conn.fetch_one(query, start_date, end_date)
+        row = await self.postgres_conn.fetchrow(query, start_date, end_date)
         
         if not row or row["total_signups"] == 0:
             return 0.0
@@ -185,7 +191,8 @@ class UserMetricsAggregator:
     async def get_retention_rate(
         self,
         day: int = 7,
-        lookback_days: int = 60
+        lookback_days: int = 60,
+        end_date: Optional[datetime] = None
     ) -> float:
         """
         Get retention rate for specific day (Day 7 by default)
@@ -193,11 +200,12 @@ class UserMetricsAggregator:
         Args:
             day: Day to calculate retention for (default: 7)
             lookback_days: How far back to look for activations (default: 60)
+            end_date: End (exclusive) of the activation window (defaults to now)
         
         Returns:
             Retention rate as percentage (0-100)
         """
-        end_date = datetime.now(timezone.utc)
+        end_date = end_date or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=lookback_days)
         
         query = """
@@ -229,7 +237,7 @@ class UserMetricsAggregator:
             LEFT JOIN returns r ON a.user_id = r.user_id
         """ % (day, day + 1)
         
-        row = await self.postgres_conn.fetch_one(query, start_date, end_date)
+        row = await self.postgres_conn.fetchrow(query, start_date, end_date)
         
         if not row or row["total_activated"] == 0:
             return 0.0
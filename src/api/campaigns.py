@@ -100,6 +100,13 @@ def get_campaign_service(
     )
 
 
+async def _invalidate_campaign_cache(request: Optional[Request], campaign_id: str):
+    """Drop cached responses tagged with this campaign"""
+    cache_manager = getattr(request.app.state, 'cache_manager', None) if request else None
+    if cache_manager:
+        await cache_manager.invalidate_tags(f"campaign:{campaign_id}")
+
+
 # API Endpoints
 @router.post("/campaigns", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
 async def create_campaign(
@@ -350,6 +357,8 @@ async def update_campaign(
             detail="Campaign not found or update failed"
         )
     
+    await _invalidate_campaign_cache(request, campaign_id)
+    
     # Log event
     await event_logger.log_event(
         event_type='campaign.updated',
@@ -404,6 +413,8 @@ async def delete_campaign(
         campaign_id=campaign_id
     )
     
+    await _invalidate_campaign_cache(request, campaign_id)
+    
     # Log event
     await event_logger.log_event(
         event_type='campaign.deleted',
@@ -541,18 +552,13 @@ async def get_campaign_analytics(
             postgres_conn=postgres_conn
         )
     
-    # Check cache first
-    from src.cache.cache_manager import CacheManager
+    # Analytics are cached for a minute (and served stale for another while
+    # refreshing); concurrent misses for the same campaign share one load
     cache_manager = getattr(request.app.state, 'cache_manager', None) if request else None
     cache_key = f"campaign:analytics:{campaign_id}"
     
-    if cache_manager:
-        cached_result = await cache_manager.get(cache_key)
-        if cached_result is not None:
-            return cached_result
-    
-    # Get campaign performance from analytics store
-    try:
+    async def load_analytics():
+        # Get campaign performance from analytics store
         performance = await analytics_store.calculate_campaign_performance(
             campaign_id=campaign_id,
             podcast_id=str(campaign['podcast_id']),
@@ -578,13 +584,21 @@ async def get_campaign_analytics(
             "attribution_events": performance.attribution_events
         }
         
-        # Cache result (1 minute TTL for analytics)
-        if cache_manager:
-            await cache_manager.set(cache_key, result, ttl_seconds=60)
-        
         return result
+    
+    try:
+        if cache_manager:
+            return await cache_manager.get_or_load(
+                cache_key,
+                load_analytics,
+                ttl_seconds=60,
+                tags=[f"campaign:{campaign_id}"],
+                stale_seconds=60
+            )
+        return await load_analytics()
     except Exception as e:
-        # Fallback to basic query if analytics store fails
+        # Fallback to basic query if analytics store fails; the degraded
+        # response is not cached so full analytics return once the store recovers
         import logging
         logger = logging.getLogger(__name__)
         logger.warning(f"Analytics store query failed: {e}, falling back to basic query")
@@ -7,11 +7,12 @@ Dashboard data endpoints for Creator, Advertiser/Agency, and Ops personas.
 import os
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi import Request
+from fastapi import Request, Response
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta, timezone
 
+from src.analytics.dashboard_cards import CardResult, DashboardCard, load_cards, server_timing
 from src.tenants.tenant_isolation import get_current_tenant
 from src.database import PostgresConnection
 from src.telemetry.metrics import MetricsCollector
@@ -27,6 +28,7 @@ class CreatorDashboardResponse(BaseModel):
     pacing_vs_flight: Dict[str, Any]
     sponsor_revenue: Dict[str, Any]
     makegoods_pending: List[Dict[str, Any]]
+    cards: Dict[str, Dict[str, Any]] = {}  # Per-card status and latency_ms
 
 
 class AdvertiserDashboardResponse(BaseModel):
@@ -34,6 +36,7 @@ class AdvertiserDashboardResponse(BaseModel):
     audience_fit_summary: Dict[str, Any]
     projected_cpm: Dict[str, Any]
     inventory_calendar: List[Dict[str, Any]]
+    cards: Dict[str, Dict[str, Any]] = {}  # Per-card status and latency_ms
 
 
 class OpsDashboardResponse(BaseModel):
@@ -41,6 +44,7 @@ class OpsDashboardResponse(BaseModel):
     pipeline_forecast: Dict[str, Any]
     win_loss: Dict[str, Any]
     etl_health: Dict[str, Any]
+    cards: Dict[str, Dict[str, Any]] = {}  # Per-card status and latency_ms
 
 
 def get_postgres_conn(request: Request) -> PostgresConnection:
@@ -48,31 +52,70 @@ def get_postgres_conn(request: Request) -> PostgresConnection:
     return request.app.state.postgres_conn
 
 
+def get_metrics_collector(request: Request) -> Optional[MetricsCollector]:
+    """Get metrics collector, if one is configured"""
+    return getattr(request.app.state, "metrics_collector", None)
+
+
 def check_feature_flag() -> bool:
     """DELTA:20251113_064143 Check if dashboard cards are enabled"""
     return os.getenv("ENABLE_NEW_DASHBOARD_CARDS", "false").lower() == "true"
 
 
+async def compose_dashboard(
+    page: str,
+    cards: List[DashboardCard],
+    response: Optional[Response],
+    metrics: Optional[MetricsCollector]
+) -> Dict[str, CardResult]:
+    """
+    Load a page's cards concurrently
+    
+    Each card runs its queries on its own pooled connection (the read
+    replica when configured). Slow or failing cards come back with their
+    fallback; the page only fails if every card does.
+    """
+    timeout = float(os.getenv("DASHBOARD_CARD_TIMEOUT_SECONDS", "2"))
+    results = await load_cards(cards, timeout_seconds=timeout, metrics_collector=metrics, page=page)
+    if response is not None:
+        response.headers["Server-Timing"] = server_timing(results)
+    if not any(result.ok for result in results.values()):
+        raise HTTPException(status_code=500, detail="Dashboard failed: no card could be loaded")
+    return results
+
+
+def card_status(results: Dict[str, CardResult]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {"status": result.status, "latency_ms": round(result.latency_ms, 1)}
+        for name, result in results.items()
+    }
+
+
 @router.get("/creator", response_model=CreatorDashboardResponse)
 async def get_creator_dashboard(
     request: Request = None,
+    response: Response = None,
     tenant_id: str = Depends(get_current_tenant),
     postgres_conn: PostgresConnection = Depends(get_postgres_conn),
+    metrics: Optional[MetricsCollector] = Depends(get_metrics_collector),
     podcast_id: Optional[str] = Query(None)
 ):
     """DELTA:20251113_064143 Get creator dashboard data"""
     if not check_feature_flag():
         raise HTTPException(status_code=403, detail="Dashboard cards are disabled")
     
-    try:
-        # 1. Pacing vs Flight
+    # Delivery and revenue come from the materialized dashboard tables
+    # (see src/analytics/dashboard_materializer.py), not attribution_events
+        
+    async def load_pacing() -> Dict[str, Any]:
+        """1. Pacing vs Flight"""
         pacing_query = """
             SELECT 
                 io.io_id,
                 io.flight_start,
                 io.flight_end,
                 io.booked_impressions,
-                COALESCE(SUM(ae.attribution_data->>'impressions')::numeric, 0) as actual_impressions,
+                COALESCE(d.impressions, 0) as actual_impressions,
                 CASE 
                     WHEN io.flight_end > NOW() THEN 
                         (EXTRACT(EPOCH FROM (NOW() - io.flight_start)) / 
@@ -80,20 +123,19 @@ async def get_creator_dashboard(
                     ELSE 100
                 END as flight_progress_pct
             FROM io_bookings io
-            LEFT JOIN attribution_events ae ON ae.campaign_id = io.campaign_id
+            LEFT JOIN dashboard_campaign_delivery d ON d.campaign_id = io.campaign_id
             WHERE io.tenant_id = $1::uuid
               AND ($2::uuid IS NULL OR io.campaign_id IN (
                   SELECT campaign_id FROM campaigns WHERE podcast_id = $2::uuid
               ))
               AND io.status IN ('scheduled', 'active')
-            GROUP BY io.io_id, io.flight_start, io.flight_end, io.booked_impressions
             ORDER BY io.flight_start DESC
             LIMIT 10;
         """
         
-        pacing_rows = await postgres_conn.fetch(pacing_query, tenant_id, podcast_id)
+        pacing_rows = await postgres_conn.fetch(pacing_query, tenant_id, podcast_id, use_read_replica=True)
         
-        pacing_data = {
+        return {
             'ios': [
                 {
                     'io_id': str(row['io_id']),
@@ -118,24 +160,23 @@ async def get_creator_dashboard(
             }
         }
         
-        # 2. Sponsor Revenue (sum of attributed revenue)
+    async def load_revenue() -> Dict[str, Any]:
+        """2. Sponsor Revenue (sum of attributed revenue)"""
         revenue_query = """
             SELECT 
-                DATE(ae.timestamp) as day,
-                SUM((ae.conversion_data->>'conversion_value')::numeric) as revenue
-            FROM attribution_events ae
-            JOIN campaigns c ON c.campaign_id = ae.campaign_id
-            WHERE ae.tenant_id = $1::uuid
-              AND ($2::uuid IS NULL OR c.podcast_id = $2::uuid)
-              AND ae.timestamp >= NOW() - INTERVAL '30 days'
-              AND ae.conversion_data->>'conversion_value' IS NOT NULL
-            GROUP BY DATE(ae.timestamp)
+                day,
+                SUM(revenue) as revenue
+            FROM dashboard_daily_revenue
+            WHERE tenant_id = $1::uuid
+              AND ($2::uuid IS NULL OR podcast_id = $2::uuid)
+              AND day >= (NOW() - INTERVAL '30 days')::date
+            GROUP BY day
             ORDER BY day DESC;
         """
         
-        revenue_rows = await postgres_conn.fetch(revenue_query, tenant_id, podcast_id)
+        revenue_rows = await postgres_conn.fetch(revenue_query, tenant_id, podcast_id, use_read_replica=True)
         
-        revenue_data = {
+        return {
             'daily': [
                 {
                     'day': row['day'].isoformat(),
@@ -147,31 +188,31 @@ async def get_creator_dashboard(
             'trend': 'up' if len(revenue_rows) > 1 and revenue_rows[0]['revenue'] > revenue_rows[-1]['revenue'] else 'down'
         }
         
-        # 3. Makegoods Pending
+    async def load_makegoods() -> List[Dict[str, Any]]:
+        """3. Makegoods Pending"""
         makegoods_query = """
             SELECT 
                 io.io_id,
                 io.campaign_id,
                 io.flight_end,
                 io.booked_impressions,
-                COALESCE(SUM(ae.attribution_data->>'impressions')::numeric, 0) as actual_impressions,
-                (io.booked_impressions - COALESCE(SUM(ae.attribution_data->>'impressions')::numeric, 0)) as shortfall
+                COALESCE(d.impressions, 0) as actual_impressions,
+                (io.booked_impressions - COALESCE(d.impressions, 0)) as shortfall
             FROM io_bookings io
-            LEFT JOIN attribution_events ae ON ae.campaign_id = io.campaign_id
+            LEFT JOIN dashboard_campaign_delivery d ON d.campaign_id = io.campaign_id
             WHERE io.tenant_id = $1::uuid
               AND ($2::uuid IS NULL OR io.campaign_id IN (
                   SELECT campaign_id FROM campaigns WHERE podcast_id = $2::uuid
               ))
               AND io.status IN ('completed', 'active')
               AND io.flight_end < NOW()
-            GROUP BY io.io_id, io.campaign_id, io.flight_end, io.booked_impressions
-            HAVING (io.booked_impressions - COALESCE(SUM(ae.attribution_data->>'impressions')::numeric, 0)) > 0
+              AND io.booked_impressions - COALESCE(d.impressions, 0) > 0
             ORDER BY shortfall DESC;
         """
         
-        makegoods_rows = await postgres_conn.fetch(makegoods_query, tenant_id, podcast_id)
+        makegoods_rows = await postgres_conn.fetch(makegoods_query, tenant_id, podcast_id, use_read_replica=True)
         
-        makegoods_data = [
+        return [
             {
                 'io_id': str(row['io_id']),
                 'campaign_id': str(row['campaign_id']),
@@ -183,30 +224,35 @@ async def get_creator_dashboard(
             for row in makegoods_rows
         ]
         
-        return CreatorDashboardResponse(
-            pacing_vs_flight=pacing_data,
-            sponsor_revenue=revenue_data,
-            makegoods_pending=makegoods_data
-        )
+    cards = await compose_dashboard("creator", [
+        DashboardCard("pacing_vs_flight", load_pacing, fallback={}),
+        DashboardCard("sponsor_revenue", load_revenue, fallback={}),
+        DashboardCard("makegoods_pending", load_makegoods, fallback=[]),
+    ], response, metrics)
     
-    except Exception as e:
-        logger.error(f"Creator dashboard failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Dashboard failed: {str(e)}")
+    return CreatorDashboardResponse(
+        pacing_vs_flight=cards["pacing_vs_flight"].data,
+        sponsor_revenue=cards["sponsor_revenue"].data,
+        makegoods_pending=cards["makegoods_pending"].data,
+        cards=card_status(cards)
+    )
 
 
 @router.get("/advertiser", response_model=AdvertiserDashboardResponse)
 async def get_advertiser_dashboard(
     request: Request = None,
+    response: Response = None,
     tenant_id: str = Depends(get_current_tenant),
     postgres_conn: PostgresConnection = Depends(get_postgres_conn),
+    metrics: Optional[MetricsCollector] = Depends(get_metrics_collector),
     advertiser_id: Optional[str] = Query(None)
 ):
     """DELTA:20251113_064143 Get advertiser dashboard data"""
     if not check_feature_flag():
         raise HTTPException(status_code=403, detail="Dashboard cards are disabled")
     
-    try:
-        # 1. Audience Fit Summary (from matches table)
+    async def load_fit() -> Dict[str, Any]:
+        """1. Audience Fit Summary (from matches table)"""
         fit_query = """
             SELECT 
                 m.podcast_id,
@@ -222,9 +268,9 @@ async def get_advertiser_dashboard(
             LIMIT 10;
         """
         
-        fit_rows = await postgres_conn.fetch(fit_query, tenant_id, advertiser_id)
+        fit_rows = await postgres_conn.fetch(fit_query, tenant_id, advertiser_id, use_read_replica=True)
         
-        fit_data = {
+        return {
             'matches': [
                 {
                     'podcast_id': str(row['podcast_id']),
@@ -239,7 +285,8 @@ async def get_advertiser_dashboard(
             'top_score': float(fit_rows[0]['score']) if fit_rows else 0
         }
         
-        # 2. Projected CPM (from historical data)
+    async def load_cpm() -> Dict[str, Any]:
+        """2. Projected CPM (from historical data)"""
         cpm_query = """
             SELECT 
                 AVG(io.booked_cpm_cents) as avg_cpm_cents,
@@ -252,15 +299,16 @@ async def get_advertiser_dashboard(
               AND io.booked_cpm_cents IS NOT NULL;
         """
         
-        cpm_row = await postgres_conn.fetchrow(cpm_query, tenant_id, advertiser_id)
+        cpm_row = await postgres_conn.fetchrow(cpm_query, tenant_id, advertiser_id, use_read_replica=True)
         
-        cpm_data = {
+        return {
             'avg_cpm_cents': float(cpm_row['avg_cpm_cents'] or 0) if cpm_row else 0,
             'effective_cpm_cents': float(cpm_row['effective_cpm_cents'] or 0) if cpm_row else 0,
             'projected_cpm_cents': float(cpm_row['avg_cpm_cents'] or 0) if cpm_row else 0  # Use historical avg
         }
         
-        # 3. Inventory Calendar (episodes with available ad slots)
+    async def load_calendar() -> List[Dict[str, Any]]:
+        """3. Inventory Calendar (episodes with available ad slots)"""
         calendar_query = """
             SELECT 
                 e.episode_id,
@@ -279,9 +327,9 @@ async def get_advertiser_dashboard(
             LIMIT 50;
         """
         
-        calendar_rows = await postgres_conn.fetch(calendar_query, tenant_id)
+        calendar_rows = await postgres_conn.fetch(calendar_query, tenant_id, use_read_replica=True)
         
-        calendar_data = [
+        return [
             {
                 'episode_id': str(row['episode_id']),
                 'episode_title': row['title'],
@@ -292,29 +340,34 @@ async def get_advertiser_dashboard(
             for row in calendar_rows
         ]
         
-        return AdvertiserDashboardResponse(
-            audience_fit_summary=fit_data,
-            projected_cpm=cpm_data,
-            inventory_calendar=calendar_data
-        )
+    cards = await compose_dashboard("advertiser", [
+        DashboardCard("audience_fit_summary", load_fit, fallback={}),
+        DashboardCard("projected_cpm", load_cpm, fallback={}),
+        DashboardCard("inventory_calendar", load_calendar, fallback=[]),
+    ], response, metrics)
     
-    except Exception as e:
-        logger.error(f"Advertiser dashboard failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Dashboard failed: {str(e)}")
+    return AdvertiserDashboardResponse(
+        audience_fit_summary=cards["audience_fit_summary"].data,
+        projected_cpm=cards["projected_cpm"].data,
+        inventory_calendar=cards["inventory_calendar"].data,
+        cards=card_status(cards)
+    )
 
 
 @router.get("/ops", response_model=OpsDashboardResponse)
 async def get_ops_dashboard(
     request: Request = None,
+    response: Response = None,
     tenant_id: str = Depends(get_current_tenant),
-    postgres_conn: PostgresConnection = Depends(get_postgres_conn)
+    postgres_conn: PostgresConnection = Depends(get_postgres_conn),
+    metrics: Optional[MetricsCollector] = Depends(get_metrics_collector)
 ):
     """DELTA:20251113_064143 Get ops dashboard data"""
     if not check_feature_flag():
         raise HTTPException(status_code=403, detail="Dashboard cards are disabled")
     
-    try:
-        # 1. Pipeline Forecast (deal stages distribution)
+    async def load_pipeline() -> Dict[str, Any]:
+        """1. Pipeline Forecast (deal stages distribution)"""
         pipeline_query = """
             SELECT 
                 COALESCE(stage, 'lead') as stage,
@@ -336,9 +389,9 @@ async def get_ops_dashboard(
                 END;
         """
         
-        pipeline_rows = await postgres_conn.fetch(pipeline_query, tenant_id)
+        pipeline_rows = await postgres_conn.fetch(pipeline_query, tenant_id, use_read_replica=True)
         
-        pipeline_data = {
+        return {
             'stages': [
                 {
                     'stage': row['stage'],
@@ -351,7 +404,8 @@ async def get_ops_dashboard(
             'total_pipeline_value': sum(float(row['total_value'] or 0) for row in pipeline_rows)
         }
         
-        # 2. Win/Loss
+    async def load_winloss() -> Dict[str, Any]:
+        """2. Win/Loss"""
         winloss_query = """
             SELECT 
                 CASE 
@@ -367,20 +421,21 @@ async def get_ops_dashboard(
             GROUP BY outcome;
         """
         
-        winloss_rows = await postgres_conn.fetch(winloss_query, tenant_id)
+        winloss_rows = await postgres_conn.fetch(winloss_query, tenant_id, use_read_replica=True)
         
         won_count = next((r['count'] for r in winloss_rows if r['outcome'] == 'won'), 0)
         lost_count = next((r['count'] for r in winloss_rows if r['outcome'] == 'lost'), 0)
         total_closed = won_count + lost_count
         
-        winloss_data = {
+        return {
             'won': won_count,
             'lost': lost_count,
             'win_rate': (won_count / total_closed * 100) if total_closed > 0 else 0,
             'total_closed': total_closed
         }
         
-        # 3. ETL Health (last ingestions)
+    async def load_etl() -> Dict[str, Any]:
+        """3. ETL Health (last ingestions)"""
         etl_query = """
             SELECT 
                 import_id,
@@ -398,9 +453,9 @@ async def get_ops_dashboard(
             LIMIT 10;
         """
         
-        etl_rows = await postgres_conn.fetch(etl_query, tenant_id)
+        etl_rows = await postgres_conn.fetch(etl_query, tenant_id, use_read_replica=True)
         
-        etl_data = {
+        return {
             'recent_imports': [
                 {
                     'import_id': str(row['import_id']),
@@ -419,12 +474,15 @@ async def get_ops_dashboard(
             'last_import': etl_rows[0]['started_at'].isoformat() if etl_rows else None
         }
         
-        return OpsDashboardResponse(
-            pipeline_forecast=pipeline_data,
-            win_loss=winloss_data,
-            etl_health=etl_data
-        )
+    cards = await compose_dashboard("ops", [
+        DashboardCard("pipeline_forecast", load_pipeline, fallback={}),
+        DashboardCard("win_loss", load_winloss, fallback={}),
+        DashboardCard("etl_health", load_etl, fallback={}),
+    ], response, metrics)
     
-    except Exception as e:
-        logger.error(f"Ops dashboard failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Dashboard failed: {str(e)}")
+    return OpsDashboardResponse(
+        pipeline_forecast=cards["pipeline_forecast"].data,
+        win_loss=cards["win_loss"].data,
+        etl_health=cards["etl_health"].data,
+        cards=card_status(cards)
+    )
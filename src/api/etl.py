@@ -29,6 +29,7 @@ class ImportStatusResponse(BaseModel):
     records_imported: int
     records_failed: int
     error_message: Optional[str] = None
+    rows_processed: Optional[int] = None
 
 
 class ImportHistoryResponse(BaseModel):
@@ -83,10 +84,6 @@ async def upload_csv(
     import_id = None
     
     try:
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        
         # Track import start
         import_id = await importer.track_import(
             tenant_id=tenant_id,
@@ -97,12 +94,9 @@ async def upload_csv(
             records_failed=0
         )
         
-        # Parse and validate CSV
-        rows = await importer.parse_csv(csv_content)
-        
-        # Import to database
-        result = await importer.import_to_listener_metrics(
-            rows=rows,
+        # Stream, validate and bulk load the file (progress is recorded on the import)
+        result = await importer.import_stream(
+            stream=file,
             tenant_id=tenant_id,
             import_id=import_id
         )
@@ -212,7 +206,8 @@ async def get_import_status(
         )
     
     query = """
-        SELECT import_id, status, records_imported, records_failed, error_message
+        SELECT import_id, status, records_imported, records_failed, error_message,
+               (metadata->>'rows_processed')::int AS rows_processed
         FROM etl_imports
         WHERE import_id = $1::uuid AND tenant_id = $2::uuid;
     """
@@ -230,7 +225,8 @@ async def get_import_status(
         status=row['status'],
         records_imported=row['records_imported'],
         records_failed=row['records_failed'],
-        error_message=row['error_message']
+        error_message=row['error_message'],
+        rows_processed=row['rows_processed']
     )
 
 
@@ -130,30 +130,15 @@ async def recalculate_match(
                 WHERE tenant_id = $1::uuid;
             """
             podcasts = await engine.postgres_conn.fetch(query, tenant_id)
+            if not podcasts:
+                raise HTTPException(status_code=404, detail="No podcasts found")
             
-            matches = []
-            for podcast_row in podcasts:
-                pod_id = str(podcast_row['podcast_id'])
-                result = await engine.calculate_match_score(
-                    advertiser_id=advertiser_id,
-                    podcast_id=pod_id,
-                    tenant_id=tenant_id
-                )
-                
-                match_id = await engine.save_match(
-                    advertiser_id=advertiser_id,
-                    podcast_id=pod_id,
-                    tenant_id=tenant_id,
-                    score=result['score'],
-                    rationale=result['rationale'],
-                    signals=result['signals']
-                )
-                
-                matches.append({
-                    'match_id': match_id,
-                    'podcast_id': pod_id,
-                    'score': result['score']
-                })
+            # Score and upsert the whole 1 x N matrix at once
+            matrix, match_ids = await engine.recalculate_matches(
+                advertiser_ids=[advertiser_id],
+                podcast_ids=[str(row['podcast_id']) for row in podcasts],
+                tenant_id=tenant_id
+            )
             
             # Emit event
             await request.app.state.event_logger.log_event(
@@ -161,29 +146,21 @@ async def recalculate_match(
                 user_id=None,
                 properties={
                     'advertiser_id': advertiser_id,
-                    'matches_count': len(matches)
+                    'matches_count': len(match_ids)
                 }
             )
             
             # Return first match (or could return list)
-            if matches:
-                first_match = matches[0]
-                # Get full details
-                full_result = await engine.calculate_match_score(
-                    advertiser_id=advertiser_id,
-                    podcast_id=first_match['podcast_id'],
-                    tenant_id=tenant_id
-                )
-                return MatchResponse(
-                    match_id=first_match['match_id'],
-                    advertiser_id=advertiser_id,
-                    podcast_id=first_match['podcast_id'],
-                    score=full_result['score'],
-                    rationale=full_result['rationale'],
-                    signals=full_result['signals']
-                )
-            else:
-                raise HTTPException(status_code=404, detail="No podcasts found")
+            first_result = matrix.pair(0, 0)
+            first_podcast_id = matrix.podcast_ids[0]
+            return MatchResponse(
+                match_id=match_ids[(advertiser_id, first_podcast_id)],
+                advertiser_id=advertiser_id,
+                podcast_id=first_podcast_id,
+                score=first_result['score'],
+                rationale=first_result['rationale'],
+                signals=first_result['signals']
+            )
         
         elif podcast_id:
             # Recalc all matches for podcast
@@ -193,30 +170,15 @@ async def recalculate_match(
                 WHERE tenant_id = $1::uuid;
             """
             advertisers = await engine.postgres_conn.fetch(query, tenant_id)
+            if not advertisers:
+                raise HTTPException(status_code=404, detail="No advertisers found")
             
-            matches = []
-            for advertiser_row in advertisers:
-                adv_id = str(advertiser_row['sponsor_id'])
-                result = await engine.calculate_match_score(
-                    advertiser_id=adv_id,
-                    podcast_id=podcast_id,
-                    tenant_id=tenant_id
-                )
-                
-                match_id = await engine.save_match(
-                    advertiser_id=adv_id,
-                    podcast_id=podcast_id,
-                    tenant_id=tenant_id,
-                    score=result['score'],
-                    rationale=result['rationale'],
-                    signals=result['signals']
-                )
-                
-                matches.append({
-                    'match_id': match_id,
-                    'advertiser_id': adv_id,
-                    'score': result['score']
-                })
+            # Score and upsert the whole N x 1 matrix at once
+            matrix, match_ids = await engine.recalculate_matches(
+                advertiser_ids=[str(row['sponsor_id']) for row in advertisers],
+                podcast_ids=[podcast_id],
+                tenant_id=tenant_id
+            )
             
             # Emit event
             await request.app.state.event_logger.log_event(
@@ -224,29 +186,24 @@ async def recalculate_match(
                 user_id=None,
                 properties={
                     'podcast_id': podcast_id,
-                    'matches_count': len(matches)
+                    'matches_count': len(match_ids)
                 }
             )
             
             # Return first match
-            if matches:
-                first_match = matches[0]
-                full_result = await engine.calculate_match_score(
-                    advertiser_id=first_match['advertiser_id'],
-                    podcast_id=podcast_id,
-                    tenant_id=tenant_id
-                )
-                return MatchResponse(
-                    match_id=first_match['match_id'],
-                    advertiser_id=first_match['advertiser_id'],
-                    podcast_id=podcast_id,
-                    score=full_result['score'],
-                    rationale=full_result['rationale'],
-                    signals=full_result['signals']
-                )
-            else:
-                raise HTTPException(status_code=404, detail="No advertisers found")
+            first_result = matrix.pair(0, 0)
+            first_advertiser_id = matrix.advertiser_ids[0]
+            return MatchResponse(
+                match_id=match_ids[(first_advertiser_id, podcast_id)],
+                advertiser_id=first_advertiser_id,
+                podcast_id=podcast_id,
+                score=first_result['score'],
+                rationale=first_result['rationale'],
+                signals=first_result['signals']
+            )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Matchmaking recalculation failed: {e}", exc_info=True)
         raise HTTPException(
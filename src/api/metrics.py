@@ -5,13 +5,13 @@ Provides endpoints for user metrics, growth metrics, and business metrics.
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
 from src.database import PostgresConnection
-from src.analytics.user_metrics_aggregator import UserMetricsAggregator
+from src.analytics.user_metrics_aggregator import ACTIVATION_EVENTS, UserMetricsAggregator
 from src.business.analytics import BusinessAnalytics, MetricPeriod
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
@@ -260,42 +260,20 @@ async def get_funnel_metrics(
 ):
     """Get funnel metrics (visitors → signups → activated → retained → paying)"""
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        # Every step covers the same whole UTC days, ending today
+        today = datetime.now(timezone.utc)
+        aggregator = UserMetricsAggregator(postgres_conn)
+        start_date, end_date = aggregator.day_bounds(days, today)
         
         # Note: Visitors would come from frontend analytics (Google Analytics, PostHog, etc.)
         # For now, we'll use signups as proxy
         
-        # Signups
-        signups_query = """
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM events
-            WHERE event_type = 'onboarding_started'
-              AND timestamp >= $1
-              AND timestamp < $2
-        """
-        signups_row = await postgres_conn.fetch_one(signups_query, start_date, end_date)
-        signups = signups_row["count"] or 0 if signups_row else 0
-        
-        # Activated
-        activated_query = """
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM events
-            WHERE event_type IN (
-                'report_generated',
-                'campaign_launched',
-                'attribution_setup_completed',
-                'first_value_delivered'
-            )
-            AND timestamp >= $1
-            AND timestamp < $2
-        """
-        activated_row = await postgres_conn.fetch_one(activated_query, start_date, end_date)
-        activated = activated_row["count"] or 0 if activated_row else 0
+        # Signups and activated users come from the daily user sketches
+        signups = await aggregator.count_users(days, today, event_types=['onboarding_started'])
+        activated = await aggregator.count_users(days, today, event_types=ACTIVATION_EVENTS)
         
         # Retained (Day 7)
-        aggregator = UserMetricsAggregator(postgres_conn)
-        day_7_retention_rate = await aggregator.get_retention_rate(day=7, lookback_days=days)
+        day_7_retention_rate = await aggregator.get_retention_rate(day=7, lookback_days=days, end_date=end_date)
         retained_day_7 = int(activated * (day_7_retention_rate / 100))
         
         # Paying (users with subscription_tier != FREE)
@@ -306,7 +284,7 @@ async def get_funnel_metrics(
               AND created_at >= $1
               AND created_at < $2
         """
-        paying_row = await postgres_conn.fetch_one(paying_query, start_date, end_date)
+        paying_row = await postgres_conn.fetchrow(paying_query, start_date, end_date)
         paying = paying_row["count"] or 0 if paying_row else 0
         
         # Visitors (placeholder - would come from frontend analytics)
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 
 from src.database import PostgresConnection
 from src.api.auth import get_current_user
+from src.telemetry.apm import get_apm
 
 router = APIRouter()
 
@@ -77,12 +78,13 @@ async def get_monitoring_metrics(
         
         error_rate = error_requests / total_requests if total_requests > 0 else 0.0
         
-        # Response times (would come from metrics store)
-        # For now, use placeholder values
-        avg_response_time = 150.0  # Would calculate from actual metrics
-        p50_response_time = 120.0
-        p95_response_time = 300.0
-        p99_response_time = 500.0
+        # Response times from the in-process APM sketches (seconds -> ms)
+        apm = get_apm()
+        transaction_stats = (apm.get_stats().get("transaction") if apm else None) or {}
+        avg_response_time = transaction_stats.get("avg", 0.0) * 1000
+        p50_response_time = transaction_stats.get("p50", 0.0) * 1000
+        p95_response_time = transaction_stats.get("p95", 0.0) * 1000
+        p99_response_time = transaction_stats.get("p99", 0.0) * 1000
         
         # Requests per minute
         minutes = (datetime.utcnow() - start_time).total_seconds() / 60
@@ -143,7 +143,7 @@ async def list_podcasts(
     if cache_manager:
         cached_result = await cache_manager.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return [PodcastResponse(**row) for row in cached_result]
     
     # Cache miss - query database
     query = """
@@ -161,7 +161,7 @@ async def list_podcasts(
     
     # Cache result
     if cache_manager:
-        await cache_manager.set(cache_key, podcasts, ttl_seconds=300)  # 5 minutes
+        await cache_manager.set(cache_key, [row.model_dump() for row in podcasts], ttl_seconds=300)  # 5 minutes
     
     return podcasts
 
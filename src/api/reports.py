@@ -6,7 +6,7 @@ Provides endpoints for report generation and management.
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 
@@ -15,6 +15,7 @@ from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
 from src.api.auth import get_current_user
 from src.reporting.report_generator import ReportGenerator, ReportType, ReportFormat
+from src.reporting.batch_reports import BatchReportScheduler, BatchReportJob, BatchPackage, normalize_campaign_ids
 
 router = APIRouter()
 
@@ -45,6 +46,48 @@ class ReportResponse(BaseModel):
     includes_attribution: bool
 
 
+class BatchReportRequest(BaseModel):
+    campaign_ids: List[str]
+    report_type: str = "sponsor_report"
+    format: str = "pdf"
+    template_id: Optional[str] = None
+    package: str = "zip"  # zip or files
+
+
+class BatchReportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    format: str
+    package: str
+    total_count: int
+    completed_count: int
+    failed_count: int
+    progress: float
+    artifact_url: Optional[str]
+    artifacts: Dict[str, str]
+    errors: Dict[str, str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+
+def _batch_job_response(job: BatchReportJob) -> BatchReportJobResponse:
+    return BatchReportJobResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        format=job.format.value,
+        package=job.package.value,
+        total_count=job.total_count,
+        completed_count=job.completed_count,
+        failed_count=job.failed_count,
+        progress=job.progress,
+        artifact_url=job.artifact_url,
+        artifacts=job.artifacts,
+        errors=job.errors,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
 def get_postgres_conn(request: Request) -> PostgresConnection:
     """Get PostgreSQL connection from app state"""
     return request.app.state.postgres_conn
@@ -60,21 +103,21 @@ def get_event_logger(request: Request) -> EventLogger:
     return request.app.state.event_logger
 
 
-def get_report_generator(
-    metrics: MetricsCollector = Depends(get_metrics_collector),
-    event_logger: EventLogger = Depends(get_event_logger)
-) -> ReportGenerator:
-    """Get report generator instance"""
-    return ReportGenerator(
-        metrics_collector=metrics,
-        event_logger=event_logger
-    )
+def get_report_generator(request: Request) -> ReportGenerator:
+    """Get shared report generator (section cache and render pool) from app state"""
+    return request.app.state.report_generator
+
+
+def get_batch_report_scheduler(request: Request) -> BatchReportScheduler:
+    """Get batch report scheduler from app state"""
+    return request.app.state.batch_report_scheduler
 
 
 # API Endpoints
 @router.post("/reports/generate", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def generate_report(
     report_data: ReportGenerateRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user),
     postgres_conn: PostgresConnection = Depends(get_postgres_conn),
     report_generator: ReportGenerator = Depends(get_report_generator),
@@ -137,34 +180,8 @@ async def generate_report(
         end_date=report_data.end_date,
         postgres_conn=postgres_conn,
         analytics_store=analytics_store,
-        roi_calculator=roi_calculator
-    )
-    
-    # Store report metadata in database
-    query = """
-        INSERT INTO reports (
-            report_id, campaign_id, user_id, report_type, format,
-            template_id, generated_at, file_size_bytes, file_url,
-            includes_roi, includes_attribution, metadata
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-        RETURNING report_id
-    """
-    
-    await postgres_conn.execute(
-        query,
-        report.report_id,
-        report.campaign_id,
-        current_user['user_id'],
-        report.report_type.value,
-        report.format.value,
-        report.template_id,
-        report.generated_at,
-        report.file_size_bytes,
-        report.file_url,
-        report.includes_roi,
-        report.includes_attribution,
-        report.metadata
+        roi_calculator=roi_calculator,
+        user_id=current_user['user_id']
     )
     
     await event_logger.log_event(
@@ -207,6 +224,131 @@ async def generate_report(
     )
 
 
+@router.post("/reports/batch", response_model=BatchReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_batch_report(
+    batch_data: BatchReportRequest,
+    current_user: dict = Depends(get_current_user),
+    postgres_conn: PostgresConnection = Depends(get_postgres_conn),
+    scheduler: BatchReportScheduler = Depends(get_batch_report_scheduler),
+    event_logger: EventLogger = Depends(get_event_logger)
+):
+    """Generate one report template for many campaigns in the background"""
+    if not batch_data.campaign_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one campaign is required"
+        )
+    
+    try:
+        report_type = ReportType(batch_data.report_type)
+        report_format = ReportFormat(batch_data.format)
+        package = BatchPackage(batch_data.package)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid report type, format or package: {str(e)}"
+        )
+    
+    try:
+        campaign_ids = normalize_campaign_ids(batch_data.campaign_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Verify all campaigns belong to user in one query
+    owned = await postgres_conn.fetch(
+        """
+        SELECT c.campaign_id FROM campaigns c
+        JOIN podcasts p ON c.podcast_id = p.podcast_id
+        WHERE c.campaign_id = ANY($1::uuid[]) AND p.user_id = $2
+        """,
+        campaign_ids,
+        current_user['user_id']
+    )
+    missing = set(campaign_ids) - {str(row['campaign_id']) for row in owned}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campaigns not found: {', '.join(sorted(missing))}"
+        )
+    
+    try:
+        job = await scheduler.submit(
+            campaign_ids=campaign_ids,
+            template_id=batch_data.template_id,
+            report_type=report_type,
+            format=report_format,
+            package=package,
+            user_id=current_user['user_id']
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    await event_logger.log_event(
+        event_type='report.batch_started',
+        user_id=str(current_user['user_id']),
+        properties={
+            'job_id': job.job_id,
+            'campaign_count': job.total_count,
+            'format': job.format.value,
+            'package': job.package.value
+        }
+    )
+    
+    return _batch_job_response(job)
+
+
+@router.get("/reports/batch/{job_id}", response_model=BatchReportJobResponse)
+async def get_batch_report(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    scheduler: BatchReportScheduler = Depends(get_batch_report_scheduler)
+):
+    """Get batch report job progress and artifacts"""
+    job = await scheduler.get_job(job_id, user_id=current_user['user_id'])
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch report job not found"
+        )
+    
+    return _batch_job_response(job)
+
+
+@router.get("/reports/batch/{job_id}/download")
+async def download_batch_report(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    scheduler: BatchReportScheduler = Depends(get_batch_report_scheduler)
+):
+    """Download the zip artifact of a finished batch report job"""
+    job = await scheduler.get_job(job_id, user_id=current_user['user_id'])
+    
+    if not job or not job.artifact_url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch report archive not available"
+        )
+    
+    import os
+    file_path = os.path.join(scheduler.generator.reports_dir, os.path.basename(job.artifact_url))
+    
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch report archive not found on server"
+        )
+    
+    from fastapi.responses import FileResponse
+    return FileResponse(file_path, media_type="application/zip", filename=os.path.basename(file_path))
+
+
 @router.get("/reports/{report_id}/download")
 async def download_report(
     report_id: str,
@@ -130,7 +130,7 @@ async def list_sponsors(
     if cache_manager:
         cached_result = await cache_manager.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return [SponsorResponse(**row) for row in cached_result]
     
     # Cache miss - query database
     query = """
@@ -147,7 +147,7 @@ async def list_sponsors(
     
     # Cache result
     if cache_manager:
-        await cache_manager.set(cache_key, sponsors, ttl_seconds=300)  # 5 minutes
+        await cache_manager.set(cache_key, [row.model_dump() for row in sponsors], ttl_seconds=300)  # 5 minutes
     
     return sponsors
 
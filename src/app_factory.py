@@ -149,5 +149,7 @@ async def lifespan(app: FastAPI):
         await services["timescale_conn"].close()
     if "redis_conn" in services:
         await services["redis_conn"].close()
+    if "cache_redis_conn" in services:
+        await services["cache_redis_conn"].close()
     if "event_logger" in services:
         await services["event_logger"].cleanup()
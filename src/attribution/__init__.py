@@ -6,11 +6,12 @@ Provides multiple attribution models, validation, and analytics.
 
 from src.attribution.attribution_engine import (
     AttributionEngine,
-    AttributionModel,
+    AttributionModelType,
     AttributionResult,
     AttributionPath
 )
 from src.attribution.models import (
+    AttributionModel,
     FirstTouchModel,
     LastTouchModel,
     LinearModel,
@@ -19,10 +20,12 @@ from src.attribution.models import (
 )
 from src.attribution.attribution_validator import AttributionValidator
 from src.attribution.analytics import AttributionAnalytics
+from src.attribution.batch_engine import AttributionBatch, BatchAttributionEngine
 
 __all__ = [
     "AttributionEngine",
     "AttributionModel",
+    "AttributionModelType",
     "AttributionResult",
     "AttributionPath",
     "FirstTouchModel",
@@ -32,4 +35,6 @@ __all__ = [
     "PositionBasedModel",
     "AttributionValidator",
     "AttributionAnalytics",
+    "AttributionBatch",
+    "BatchAttributionEngine",
 ]
@@ -6,24 +6,23 @@ Provides multiple attribution models and attribution calculation.
 
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from dataclasses import dataclass, field
 from enum import Enum
-from uuid import uuid4
+from uuid import UUID, uuid5
 
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
 from src.database import PostgresConnection
-from src.attribution.models import (
-    FirstTouchModel,
-    LastTouchModel,
-    LinearModel,
-    TimeDecayModel,
-    PositionBasedModel
-)
+
+if TYPE_CHECKING:
+    from src.attribution.batch_engine import PathCredits
 
 logger = logging.getLogger(__name__)
 
+# Namespace for deterministic attribution path ids
+PATH_ID_NAMESPACE = UUID("6c1f0d9e-3b7a-5c2e-9f41-8a2d7e6b5c30")
+
 
 class AttributionModelType(Enum):
     """Attribution model types"""
@@ -96,6 +95,16 @@ class AttributionEngine:
         self.events = event_logger
         self.postgres = postgres_conn
         
+        # Model implementations import the dataclasses above, so load them lazily
+        from src.attribution.models import (
+            FirstTouchModel,
+            LastTouchModel,
+            LinearModel,
+            TimeDecayModel,
+            PositionBasedModel
+        )
+        from src.attribution.batch_engine import BatchAttributionEngine, NUMPY_AVAILABLE
+        
         # Initialize model instances
         self.models = {
             AttributionModelType.FIRST_TOUCH: FirstTouchModel(),
@@ -104,6 +113,13 @@ class AttributionEngine:
             AttributionModelType.TIME_DECAY: TimeDecayModel(),
             AttributionModelType.POSITION_BASED: PositionBasedModel()
         }
+        
+        # Vectorized engine for all models (per-path models are the fallback)
+        self.batch_engine = None
+        if NUMPY_AVAILABLE:
+            self.batch_engine = BatchAttributionEngine(
+                half_life_days=self.models[AttributionModelType.TIME_DECAY].half_life_days
+            )
     
     async def calculate_attribution(
         self,
@@ -126,73 +142,367 @@ class AttributionEngine:
         Returns:
             AttributionResult with calculated attribution
         """
+        results = await self.compare_models(
+            campaign_id, tenant_id, [model_type], start_date, end_date
+        )
+        return results[model_type]
+    
+    async def compare_models(
+        self,
+        campaign_id: str,
+        tenant_id: str,
+        model_types: Optional[List[AttributionModelType]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[AttributionModelType, AttributionResult]:
+        """
+        Compare multiple attribution models
+        
+        Paths are loaded once and every requested model runs over the same
+        in-memory representation; paths and all results are then written in
+        a single transaction.
+        
+        Returns:
+            Dictionary mapping model type to attribution result
+        """
+        if model_types is None:
+            model_types = list(AttributionModelType)
+        
         # Get attribution paths for campaign
         paths = await self._get_attribution_paths(
             campaign_id, tenant_id, start_date, end_date
         )
         
         if not paths:
-            return AttributionResult(
-                campaign_id=campaign_id,
-                model_type=model_type,
-                total_conversions=0,
-                total_conversion_value=0.0,
-                attributed_conversions=0,
-                attributed_conversion_value=0.0,
-                touchpoint_credits={},
-                confidence_score=0.0
-            )
-        
-        # Get model
-        model = self.models.get(model_type)
-        if not model:
-            raise ValueError(f"Unknown attribution model: {model_type}")
-        
-        # Calculate attribution
-        result = model.calculate(paths)
+            return {
+                model_type: AttributionResult(
+                    campaign_id=campaign_id,
+                    model_type=model_type,
+                    total_conversions=0,
+                    total_conversion_value=0.0,
+                    attributed_conversions=0,
+                    attributed_conversion_value=0.0,
+                    touchpoint_credits={},
+                    confidence_score=0.0
+                )
+                for model_type in model_types
+            }
         
-        # Store attribution paths if not already stored
-        await self._store_attribution_paths(tenant_id, campaign_id, paths)
+        # Calculate attribution for all models in one pass
+        results = self._calculate_models(paths, model_types)
         
-        # Store attribution result
-        await self._store_attribution_result(tenant_id, campaign_id, model_type, result)
+        # Store attribution paths and results together
+        async with self.postgres.acquire() as conn:
+            async with conn.transaction():
+                await self._store_attribution_paths(tenant_id, campaign_id, paths, conn)
+                await self._store_attribution_results(tenant_id, campaign_id, results, conn)
         
         # Record telemetry
-        self.metrics.increment_counter(
-            "attribution_calculated",
-            tags={
-                "campaign_id": campaign_id,
-                "model_type": model_type.value,
-                "tenant_id": tenant_id
-            }
-        )
+        for model_type in results:
+            self.metrics.increment_counter(
+                "attribution_calculated",
+                tags={
+                    "campaign_id": campaign_id,
+                    "model_type": model_type.value,
+                    "tenant_id": tenant_id
+                }
+            )
         
-        return result
+        return results
     
-    async def compare_models(
+    async def calculate_incremental(
         self,
         campaign_id: str,
         tenant_id: str,
-        model_types: Optional[List[AttributionModelType]] = None,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        model_types: Optional[List[AttributionModelType]] = None
     ) -> Dict[AttributionModelType, AttributionResult]:
         """
-        Compare multiple attribution models
+        Incrementally update attribution for a campaign
+        
+        Only paths queued in attribution_path_changes (by a trigger on
+        attribution_events inserts, updates and deletes) since the last run
+        are recomputed. Their previous per-path credits
+        (attribution_path_credits) are subtracted from the campaign totals
+        (attribution_state) and the new credits added, so the cost scales
+        with the number of changed events rather than the campaign's history.
+        The first run for a campaign/model has no state and therefore
+        processes every path. Models that already have state are updated
+        alongside the requested ones, since the drained changes are shared.
         
         Returns:
-            Dictionary mapping model type to attribution result
+            Dictionary mapping model type to the merged attribution result
         """
         if model_types is None:
             model_types = list(AttributionModelType)
+        for model_type in model_types:
+            if model_type not in self.models:
+                raise ValueError(f"Unknown attribution model: {model_type}")
+        
+        async with self.postgres.acquire() as conn:
+            async with conn.transaction():
+                # Serialize incremental runs per campaign so merges can't interleave
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", f"attribution:{campaign_id}")
+                
+                state_rows = await conn.fetch(
+                    "SELECT * FROM attribution_state WHERE campaign_id = $1 AND tenant_id = $2",
+                    campaign_id, tenant_id
+                )
+                states = {AttributionModelType(row["model_type"]): dict(row) for row in state_rows}
+                requested = model_types
+                # Every model with state is updated, since the drained changes are gone afterwards
+                model_types = list(dict.fromkeys([*requested, *states]))
+                
+                # Claim the paths touched since the last run. A trigger on attribution_events
+                # records them when the writing transaction commits, so long transactions,
+                # updates and deletes are all seen; later commits stay queued for the next run.
+                drained = await conn.fetch(
+                    """
+                    DELETE FROM attribution_path_changes
+                    WHERE change_id IN (
+                        SELECT change_id FROM attribution_path_changes
+                        WHERE campaign_id = $1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING path_key
+                    """,
+                    campaign_id
+                )
+                
+                # A model without state needs every path; recomputing them all is also safe for the rest
+                full_run = any(model_type not in states for model_type in model_types)
+                touched_keys = None if full_run else sorted({row["path_key"] for row in drained})
+                rows = await conn.fetch(
+                    """
+                    SELECT
+                        event_id, timestamp, campaign_id, episode_id, attribution_method,
+                        user_id, session_id, device_id, conversion_data, metadata
+                    FROM attribution_events
+                    WHERE campaign_id = $1 AND tenant_id = $2
+                      AND ($3::text[] IS NULL OR COALESCE(NULLIF(user_id, ''), NULLIF(session_id, ''),
+                                                          NULLIF(device_id, ''), event_id::text) = ANY($3::text[]))
+                    ORDER BY timestamp ASC
+                    """,
+                    campaign_id, tenant_id, touched_keys
+                )
+                changed_paths = self._build_attribution_paths(campaign_id, rows)
+                converted = {
+                    path_key: path for path_key, path in changed_paths.items()
+                    if path.conversion_at is not None
+                }
+                
+                previous_rows = await conn.fetch(
+                    """
+                    SELECT * FROM attribution_path_credits
+                    WHERE campaign_id = $1 AND tenant_id = $2 AND model_type = ANY($3::text[])
+                      AND ($4::text[] IS NULL OR path_key = ANY($4::text[]))
+                    """,
+                    campaign_id, tenant_id, [model_type.value for model_type in model_types], touched_keys
+                )
+                previous: Dict[AttributionModelType, List[Dict[str, Any]]] = {}
+                for row in previous_rows:
+                    previous.setdefault(AttributionModelType(row["model_type"]), []).append(dict(row))
+                
+                path_credits = self._calculate_path_credits(list(converted.values()), model_types)
+                
+                results = {}
+                for model_type in model_types:
+                    state = self._merge_path_credits(
+                        states.get(model_type),
+                        previous.get(model_type, []),
+                        list(converted.values()),
+                        path_credits[model_type]
+                    )
+                    results[model_type] = AttributionResult(
+                        campaign_id=campaign_id,
+                        model_type=model_type,
+                        total_conversions=state["total_conversions"],
+                        total_conversion_value=state["total_conversion_value"],
+                        attributed_conversions=state["attributed_conversions"],
+                        attributed_conversion_value=state["attributed_conversion_value"],
+                        touchpoint_credits=state["touchpoint_credits"],
+                        confidence_score=self._confidence_from_counts(
+                            state["total_conversions"], state["multi_touch_paths"], state["user_id_paths"]
+                        ),
+                        metadata={"incremental": True, "changed_paths": len(changed_paths)}
+                    )
+                    
+                    await conn.executemany(
+                        """
+                        INSERT INTO attribution_path_credits (
+                            tenant_id, campaign_id, model_type, path_key, conversion_value,
+                            attributed, touchpoint_count, has_user_id, touchpoint_credits, updated_at
+                        )
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, NOW())
+                        ON CONFLICT (campaign_id, model_type, path_key) DO UPDATE SET
+                            conversion_value = EXCLUDED.conversion_value,
+                            attributed = EXCLUDED.attributed,
+                            touchpoint_count = EXCLUDED.touchpoint_count,
+                            has_user_id = EXCLUDED.has_user_id,
+                            touchpoint_credits = EXCLUDED.touchpoint_credits,
+                            updated_at = NOW()
+                        """,
+                        [
+                            (
+                                tenant_id, campaign_id, model_type.value, path_key,
+                                path.conversion_value or 0.0, credit.attributed, len(path.touchpoints),
+                                bool(path.user_id), credit.touchpoint_credits
+                            )
+                            for (path_key, path), credit in zip(converted.items(), path_credits[model_type])
+                        ]
+                    )
+                    await conn.execute(
+                        """
+                        INSERT INTO attribution_state (
+                            tenant_id, campaign_id, model_type,
+                            total_conversions, total_conversion_value,
+                            attributed_conversions, attributed_conversion_value,
+                            multi_touch_paths, user_id_paths, touchpoint_credits, updated_at
+                        )
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW())
+                        ON CONFLICT (campaign_id, model_type) DO UPDATE SET
+                            total_conversions = EXCLUDED.total_conversions,
+                            total_conversion_value = EXCLUDED.total_conversion_value,
+                            attributed_conversions = EXCLUDED.attributed_conversions,
+                            attributed_conversion_value = EXCLUDED.attributed_conversion_value,
+                            multi_touch_paths = EXCLUDED.multi_touch_paths,
+                            user_id_paths = EXCLUDED.user_id_paths,
+                            touchpoint_credits = EXCLUDED.touchpoint_credits,
+                            updated_at = NOW()
+                        """,
+                        tenant_id, campaign_id, model_type.value,
+                        state["total_conversions"], state["total_conversion_value"],
+                        state["attributed_conversions"], state["attributed_conversion_value"],
+                        state["multi_touch_paths"], state["user_id_paths"], state["touchpoint_credits"]
+                    )
+                
+                # Paths that lost their conversion (or all of their events) no longer contribute
+                stale_keys = sorted({row["path_key"] for row in previous_rows} - set(converted))
+                if stale_keys:
+                    await conn.execute(
+                        """
+                        DELETE FROM attribution_path_credits
+                        WHERE campaign_id = $1 AND tenant_id = $2
+                          AND model_type = ANY($3::text[]) AND path_key = ANY($4::text[])
+                        """,
+                        campaign_id, tenant_id, [model_type.value for model_type in model_types], stale_keys
+                    )
+                
+                if converted:
+                    await self._store_attribution_paths(tenant_id, campaign_id, list(converted.values()), conn)
+                await self._store_attribution_results(tenant_id, campaign_id, results, conn)
+        
+        self.metrics.increment_counter(
+            "attribution_incremental_paths",
+            value=len(changed_paths),
+            tags={"tenant_id": tenant_id}
+        )
+        
+        return {model_type: results[model_type] for model_type in requested}
+    
+    def _calculate_path_credits(
+        self,
+        paths: List[AttributionPath],
+        model_types: List[AttributionModelType]
+    ) -> Dict[AttributionModelType, List["PathCredits"]]:
+        """Per-path credits for each model, vectorized when NumPy is available"""
+        from src.attribution.batch_engine import AttributionBatch, PathCredits
+        
+        if self.batch_engine is not None:
+            return self.batch_engine.calculate_path_credits(AttributionBatch.from_paths(paths), model_types)
         
         results = {}
         for model_type in model_types:
-            result = await self.calculate_attribution(
-                campaign_id, tenant_id, model_type, start_date, end_date
-            )
-            results[model_type] = result
+            model = self.models[model_type]
+            results[model_type] = []
+            for path in paths:
+                result = model.calculate([path])
+                results[model_type].append(PathCredits(
+                    touchpoint_credits=result.touchpoint_credits,
+                    attributed=result.attributed_conversions > 0
+                ))
+        return results
+    
+    def _merge_path_credits(
+        self,
+        state: Optional[Dict[str, Any]],
+        previous: List[Dict[str, Any]],
+        paths: List[AttributionPath],
+        path_credits: List["PathCredits"]
+    ) -> Dict[str, Any]:
+        """Replace the previous per-path contributions in a campaign state with new ones"""
+        state = state or {}
+        merged = {
+            "total_conversions": state.get("total_conversions") or 0,
+            "total_conversion_value": float(state.get("total_conversion_value") or 0.0),
+            "attributed_conversions": state.get("attributed_conversions") or 0,
+            "attributed_conversion_value": float(state.get("attributed_conversion_value") or 0.0),
+            "multi_touch_paths": state.get("multi_touch_paths") or 0,
+            "user_id_paths": state.get("user_id_paths") or 0,
+        }
+        credits: Dict[str, float] = dict(state.get("touchpoint_credits") or {})
+        removed = set()
+        
+        for row in previous:
+            conversion_value = float(row["conversion_value"] or 0.0)
+            merged["total_conversions"] -= 1
+            merged["total_conversion_value"] -= conversion_value
+            if row["attributed"]:
+                merged["attributed_conversions"] -= 1
+                merged["attributed_conversion_value"] -= conversion_value
+            merged["multi_touch_paths"] -= 1 if row["touchpoint_count"] > 1 else 0
+            merged["user_id_paths"] -= 1 if row["has_user_id"] else 0
+            for touchpoint_id, credit in (row["touchpoint_credits"] or {}).items():
+                credits[touchpoint_id] = credits.get(touchpoint_id, 0.0) - credit
+                removed.add(touchpoint_id)
+        
+        for path, credit in zip(paths, path_credits):
+            conversion_value = path.conversion_value or 0.0
+            merged["total_conversions"] += 1
+            merged["total_conversion_value"] += conversion_value
+            if credit.attributed:
+                merged["attributed_conversions"] += 1
+                merged["attributed_conversion_value"] += conversion_value
+            merged["multi_touch_paths"] += 1 if len(path.touchpoints) > 1 else 0
+            merged["user_id_paths"] += 1 if path.user_id else 0
+            for touchpoint_id, value in credit.touchpoint_credits.items():
+                credits[touchpoint_id] = credits.get(touchpoint_id, 0.0) + value
+                removed.discard(touchpoint_id)
         
+        # Touchpoints that no longer receive credit from any path
+        for touchpoint_id in removed:
+            if abs(credits.get(touchpoint_id, 0.0)) < 1e-9:
+                credits.pop(touchpoint_id, None)
+        
+        merged["touchpoint_credits"] = credits
+        return merged
+    
+    @staticmethod
+    def _confidence_from_counts(total_paths: int, multi_touch_paths: int, user_id_paths: int) -> float:
+        """Same formula as AttributionModel._calculate_confidence_score, from stored counts"""
+        if total_paths <= 0:
+            return 0.0
+        confidence = 0.5 + (multi_touch_paths / total_paths) * 0.3 + (user_id_paths / total_paths) * 0.2
+        return min(confidence, 1.0)
+    
+    def _calculate_models(
+        self,
+        paths: List[AttributionPath],
+        model_types: List[AttributionModelType]
+    ) -> Dict[AttributionModelType, AttributionResult]:
+        """Run the given models over the paths, vectorized when NumPy is available"""
+        for model_type in model_types:
+            if model_type not in self.models:
+                raise ValueError(f"Unknown attribution model: {model_type}")
+        
+        if self.batch_engine is not None:
+            from src.attribution.batch_engine import AttributionBatch
+            return self.batch_engine.calculate(AttributionBatch.from_paths(paths), model_types)
+        
+        results = {}
+        for model_type in model_types:
+            result = self.models[model_type].calculate(paths)
+            result.model_type = model_type
+            results[model_type] = result
         return results
     
     async def _get_attribution_paths(
@@ -223,8 +533,13 @@ class AttributionEngine:
         query += " ORDER BY timestamp ASC"
         
         rows = await self.postgres.fetch(query, *params)
+        paths = self._build_attribution_paths(campaign_id, rows)
         
-        # Group events by user/session/device to build paths
+        # Filter to only paths with conversions
+        return [path for path in paths.values() if path.conversion_at is not None]
+    
+    def _build_attribution_paths(self, campaign_id: str, rows: list) -> Dict[str, AttributionPath]:
+        """Group timestamp-ordered events by user/session/device into paths keyed by path key"""
         paths_dict: Dict[str, AttributionPath] = {}
         
         for row in rows:
@@ -233,7 +548,8 @@ class AttributionEngine:
             
             if path_key not in paths_dict:
                 paths_dict[path_key] = AttributionPath(
-                    path_id=str(uuid4()),
+                    # Stable per (campaign, path key) so re-runs update the same path
+                    path_id=str(uuid5(PATH_ID_NAMESPACE, f"{campaign_id}:{path_key}")),
                     user_id=row["user_id"],
                     session_id=row["session_id"],
                     device_id=row["device_id"],
@@ -265,47 +581,57 @@ class AttributionEngine:
             
             path.touchpoints.append(touchpoint)
         
-        # Filter to only paths with conversions
-        return [path for path in paths_dict.values() if path.conversion_at is not None]
+        return paths_dict
     
     async def _store_attribution_paths(
         self,
         tenant_id: str,
         campaign_id: str,
-        paths: List[AttributionPath]
+        paths: List[AttributionPath],
+        conn
     ):
         """Store attribution paths in database"""
-        for path in paths:
-            await self.postgres.execute(
-                """
-                INSERT INTO attribution_paths (
-                    path_id, tenant_id, campaign_id, user_id, session_id, device_id,
-                    conversion_id, touchpoints, conversion_value, conversion_type,
-                    first_touch_at, last_touch_at, conversion_at, metadata
-                )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                ON CONFLICT (path_id) DO NOTHING
-                """,
-                path.path_id, tenant_id, campaign_id, path.user_id, path.session_id,
-                path.device_id, None,  # conversion_id
-                [{"touchpoint_id": tp.touchpoint_id, "timestamp": tp.timestamp.isoformat(),
-                  "channel": tp.channel, "campaign_id": tp.campaign_id} for tp in path.touchpoints],
-                path.conversion_value, path.conversion_type,
-                path.touchpoints[0].timestamp if path.touchpoints else None,
-                path.touchpoints[-1].timestamp if path.touchpoints else None,
-                path.conversion_at, {}
+        await conn.executemany(
+            """
+            INSERT INTO attribution_paths (
+                path_id, tenant_id, campaign_id, user_id, session_id, device_id,
+                conversion_id, touchpoints, conversion_value, conversion_type,
+                first_touch_at, last_touch_at, conversion_at, metadata
             )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+            ON CONFLICT (path_id) DO UPDATE SET
+                touchpoints = EXCLUDED.touchpoints,
+                conversion_value = EXCLUDED.conversion_value,
+                conversion_type = EXCLUDED.conversion_type,
+                first_touch_at = EXCLUDED.first_touch_at,
+                last_touch_at = EXCLUDED.last_touch_at,
+                conversion_at = EXCLUDED.conversion_at
+            """,
+            [
+                (
+                    path.path_id, tenant_id, campaign_id, path.user_id, path.session_id,
+                    path.device_id, None,  # conversion_id
+                    [{"touchpoint_id": tp.touchpoint_id, "timestamp": tp.timestamp.isoformat(),
+                      "channel": tp.channel, "campaign_id": tp.campaign_id} for tp in path.touchpoints],
+                    path.conversion_value, path.conversion_type,
+                    path.touchpoints[0].timestamp if path.touchpoints else None,
+                    path.touchpoints[-1].timestamp if path.touchpoints else None,
+                    path.conversion_at, {}
+                )
+                for path in paths
+            ]
+        )
     
-    async def _store_attribution_result(
+    async def _store_attribution_results(
         self,
         tenant_id: str,
         campaign_id: str,
-        model_type: AttributionModelType,
-        result: AttributionResult
+        results: Dict[AttributionModelType, AttributionResult],
+        conn
     ):
-        """Store attribution result"""
-        # Store in attribution_analytics table
-        await self.postgres.execute(
+        """Store attribution results (one attribution_analytics row per model)"""
+        today = datetime.now(timezone.utc).date()
+        await conn.executemany(
             """
             INSERT INTO attribution_analytics (
                 analytics_id, tenant_id, campaign_id, model_id, date,
@@ -313,7 +639,12 @@ class AttributionEngine:
             )
             VALUES (gen_random_uuid(), $1, $2, NULL, $3, $4, $5, $6)
             """,
-            tenant_id, campaign_id, datetime.now(timezone.utc).date(),
-            "attributed_conversions", result.attributed_conversions,
-            {"model_type": model_type.value, "touchpoint_credits": result.touchpoint_credits}
+            [
+                (
+                    tenant_id, campaign_id, today,
+                    "attributed_conversions", result.attributed_conversions,
+                    {"model_type": model_type.value, "touchpoint_credits": result.touchpoint_credits}
+                )
+                for model_type, result in results.items()
+            ]
         )
@@ -0,0 +1,349 @@
+"""
+Batch Attribution Engine
+
+Columnar, vectorized attribution over a whole campaign. Touchpoints are
+loaded into flat NumPy arrays (CSR-style path offsets) and credits for every
+attribution model are computed in a single pass, instead of walking each
+AttributionPath in Python.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from src.attribution.attribution_engine import (
+    AttributionModelType,
+    AttributionPath,
+    AttributionResult,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not available - batch attribution disabled, falling back to per-path models")
+
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class AttributionBatch:
+    """
+    Columnar representation of a campaign's conversion paths
+    
+    Touchpoints of path ``i`` live at ``path_offsets[i]:path_offsets[i + 1]``
+    in every per-touchpoint array, in chronological order.
+    """
+    campaign_id: str
+    path_offsets: "np.ndarray"  # int64, n_paths + 1
+    timestamps: "np.ndarray"  # float64 epoch seconds, per touchpoint
+    touchpoint_codes: "np.ndarray"  # int64 index into touchpoint_ids, per touchpoint
+    touchpoint_ids: List[str]  # unique touchpoint ids
+    conversion_values: "np.ndarray"  # float64, per path
+    conversion_times: "np.ndarray"  # float64 epoch seconds (NaN if unknown), per path
+    has_user_id: "np.ndarray"  # bool, per path
+    
+    @property
+    def num_paths(self) -> int:
+        return len(self.path_offsets) - 1
+    
+    @property
+    def num_touchpoints(self) -> int:
+        return len(self.timestamps)
+    
+    @classmethod
+    def from_paths(cls, paths: Sequence[AttributionPath]) -> "AttributionBatch":
+        """
+        Build a batch from AttributionPath objects
+        
+        Args:
+            paths: Attribution paths with chronologically ordered touchpoints
+        
+        Returns:
+            AttributionBatch
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for batch attribution")
+        
+        num_paths = len(paths)
+        lengths = np.fromiter((len(path.touchpoints) for path in paths), dtype=np.int64, count=num_paths)
+        path_offsets = np.zeros(num_paths + 1, dtype=np.int64)
+        np.cumsum(lengths, out=path_offsets[1:])
+        num_touchpoints = int(path_offsets[-1])
+        
+        timestamps = np.empty(num_touchpoints, dtype=np.float64)
+        touchpoint_codes = np.empty(num_touchpoints, dtype=np.int64)
+        code_by_id: Dict[str, int] = {}
+        
+        i = 0
+        for path in paths:
+            for touchpoint in path.touchpoints:
+                timestamps[i] = _to_epoch(touchpoint.timestamp)
+                touchpoint_codes[i] = code_by_id.setdefault(touchpoint.touchpoint_id, len(code_by_id))
+                i += 1
+        
+        conversion_values = np.fromiter(
+            (path.conversion_value or 0.0 for path in paths), dtype=np.float64, count=num_paths
+        )
+        conversion_times = np.fromiter(
+            (_to_epoch(path.conversion_at) if path.conversion_at else np.nan for path in paths),
+            dtype=np.float64,
+            count=num_paths
+        )
+        has_user_id = np.fromiter((bool(path.user_id) for path in paths), dtype=bool, count=num_paths)
+        
+        campaign_id = paths[0].touchpoints[0].campaign_id if paths and paths[0].touchpoints else ""
+        
+        return cls(
+            campaign_id=campaign_id,
+            path_offsets=path_offsets,
+            timestamps=timestamps,
+            touchpoint_codes=touchpoint_codes,
+            touchpoint_ids=list(code_by_id),
+            conversion_values=conversion_values,
+            conversion_times=conversion_times,
+            has_user_id=has_user_id
+        )
+
+
+@dataclass
+class PathCredits:
+    """Credits assigned by one model to the touchpoints of a single path"""
+    touchpoint_credits: Dict[str, float]
+    attributed: bool
+
+
+class BatchAttributionEngine:
+    """
+    Vectorized attribution for all models
+    
+    Produces the same credits as the per-path models in
+    ``src.attribution.models`` but computes them from an AttributionBatch
+    with array operations, so cost is dominated by a handful of O(touchpoints)
+    NumPy passes regardless of how many models are requested.
+    """
+    
+    FIRST_TOUCH_WEIGHT = 0.4
+    LAST_TOUCH_WEIGHT = 0.4
+    MIDDLE_TOUCH_WEIGHT = 0.2
+    
+    def __init__(self, half_life_days: float = 7.0):
+        """
+        Initialize batch engine
+        
+        Args:
+            half_life_days: Time-decay half-life in days (default: 7 days)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for batch attribution")
+        self.half_life_days = half_life_days
+        self.decay_rate = float(np.log(2.0)) / half_life_days
+    
+    def calculate(
+        self,
+        batch: AttributionBatch,
+        model_types: Optional[List[AttributionModelType]] = None
+    ) -> Dict[AttributionModelType, AttributionResult]:
+        """
+        Calculate attribution for every requested model in one pass
+        
+        Args:
+            batch: Columnar attribution paths
+            model_types: Models to calculate (default: all)
+        
+        Returns:
+            Dictionary mapping model type to attribution result
+        """
+        if model_types is None:
+            model_types = list(AttributionModelType)
+        
+        if batch.num_paths == 0:
+            return {model_type: self._empty_result(batch, model_type) for model_type in model_types}
+        
+        lengths, path_index, position, touch_lengths = self._layout(batch)
+        
+        # Shared per-path aggregates
+        has_touchpoints = lengths > 0
+        total_conversions = batch.num_paths
+        total_conversion_value = float(batch.conversion_values.sum())
+        confidence_score = self._calculate_confidence_score(batch, lengths)
+        
+        results: Dict[AttributionModelType, AttributionResult] = {}
+        for model_type in model_types:
+            weights, attributed = self._model_weights(model_type, batch, path_index, position, touch_lengths)
+            if attributed is None:
+                attributed = has_touchpoints
+            
+            credited = np.bincount(batch.touchpoint_codes, weights=weights, minlength=len(batch.touchpoint_ids)) > 0
+            credits = np.bincount(
+                batch.touchpoint_codes,
+                weights=weights * batch.conversion_values[path_index],
+                minlength=len(batch.touchpoint_ids)
+            )
+            
+            touchpoint_ids = batch.touchpoint_ids
+            touchpoint_credits = {
+                touchpoint_ids[code]: credit
+                for code, credit in zip(np.flatnonzero(credited).tolist(), credits[credited].tolist())
+            }
+            
+            results[model_type] = AttributionResult(
+                campaign_id=batch.campaign_id,
+                model_type=model_type,
+                total_conversions=total_conversions,
+                total_conversion_value=total_conversion_value,
+                attributed_conversions=int(attributed.sum()),
+                attributed_conversion_value=float(batch.conversion_values[attributed].sum()),
+                touchpoint_credits=touchpoint_credits,
+                confidence_score=confidence_score
+            )
+        
+        return results
+    
+    def calculate_path_credits(
+        self,
+        batch: AttributionBatch,
+        model_types: Optional[List[AttributionModelType]] = None
+    ) -> Dict[AttributionModelType, List[PathCredits]]:
+        """
+        Calculate per-path credits (used to merge incremental runs)
+        
+        Args:
+            batch: Columnar attribution paths
+            model_types: Models to calculate (default: all)
+        
+        Returns:
+            Dictionary mapping model type to one PathCredits per batch path
+        """
+        if model_types is None:
+            model_types = list(AttributionModelType)
+        
+        if batch.num_paths == 0:
+            return {model_type: [] for model_type in model_types}
+        
+        lengths, path_index, position, touch_lengths = self._layout(batch)
+        starts = batch.path_offsets[:-1].tolist()
+        ends = batch.path_offsets[1:].tolist()
+        codes = batch.touchpoint_codes.tolist()
+        touchpoint_ids = batch.touchpoint_ids
+        
+        results: Dict[AttributionModelType, List[PathCredits]] = {}
+        for model_type in model_types:
+            weights, attributed = self._model_weights(model_type, batch, path_index, position, touch_lengths)
+            if attributed is None:
+                attributed = lengths > 0
+            credits = (weights * batch.conversion_values[path_index]).tolist()
+            weights = weights.tolist()
+            
+            path_credits = []
+            for i, is_attributed in enumerate(attributed.tolist()):
+                touchpoint_credits: Dict[str, float] = {}
+                if is_attributed:
+                    for j in range(starts[i], ends[i]):
+                        if weights[j] > 0:
+                            touchpoint_id = touchpoint_ids[codes[j]]
+                            touchpoint_credits[touchpoint_id] = touchpoint_credits.get(touchpoint_id, 0.0) + credits[j]
+                path_credits.append(PathCredits(touchpoint_credits=touchpoint_credits, attributed=is_attributed))
+            results[model_type] = path_credits
+        
+        return results
+    
+    def _layout(self, batch: AttributionBatch):
+        """Per-touchpoint path index, position within path and path length"""
+        lengths = np.diff(batch.path_offsets)
+        path_index = np.repeat(np.arange(batch.num_paths, dtype=np.int64), lengths)
+        position = np.arange(batch.num_touchpoints, dtype=np.int64) - batch.path_offsets[path_index]
+        return lengths, path_index, position, lengths[path_index]
+    
+    def _model_weights(
+        self,
+        model_type: AttributionModelType,
+        batch: AttributionBatch,
+        path_index: "np.ndarray",
+        position: "np.ndarray",
+        touch_lengths: "np.ndarray"
+    ):
+        """
+        Per-touchpoint credit share for a model
+        
+        Returns:
+            Tuple of (weights, attributed path mask or None for "any touchpoint")
+        """
+        if model_type == AttributionModelType.FIRST_TOUCH:
+            return (position == 0).astype(np.float64), None
+        
+        if model_type == AttributionModelType.LAST_TOUCH:
+            return (position == touch_lengths - 1).astype(np.float64), None
+        
+        if model_type == AttributionModelType.LINEAR:
+            return 1.0 / touch_lengths, None
+        
+        if model_type == AttributionModelType.POSITION_BASED:
+            weights = np.zeros(batch.num_touchpoints, dtype=np.float64)
+            weights[position == 0] += self.FIRST_TOUCH_WEIGHT
+            weights[position == touch_lengths - 1] += self.LAST_TOUCH_WEIGHT
+            middle = (position > 0) & (position < touch_lengths - 1)
+            weights[middle] = self.MIDDLE_TOUCH_WEIGHT / (touch_lengths[middle] - 2)
+            # Single touchpoint gets 100%
+            weights[touch_lengths == 1] = 1.0
+            return weights, None
+        
+        if model_type == AttributionModelType.TIME_DECAY:
+            return self._time_decay_weights(batch, path_index)
+        
+        raise ValueError(f"Unknown attribution model: {model_type}")
+    
+    def _time_decay_weights(self, batch: AttributionBatch, path_index: "np.ndarray"):
+        """Normalized exponential-decay weights (paths without a conversion time get none)"""
+        lengths = np.diff(batch.path_offsets)
+        attributed = (lengths > 0) & ~np.isnan(batch.conversion_times)
+        
+        days_since = (batch.conversion_times[path_index] - batch.timestamps) / SECONDS_PER_DAY
+        days_since = np.maximum(np.nan_to_num(days_since, nan=0.0), 0.0)
+        
+        # Decay relative to each path's most recent touchpoint so long paths
+        # don't underflow to zero; normalization cancels the shift.
+        last_index = batch.path_offsets[1:][lengths > 0] - 1
+        reference = np.zeros(batch.num_paths, dtype=np.float64)
+        reference[lengths > 0] = days_since[last_index]
+        raw = np.exp(-self.decay_rate * (days_since - reference[path_index]))
+        
+        totals = np.bincount(path_index, weights=raw, minlength=batch.num_paths)
+        weights = np.where(attributed[path_index], raw / np.where(totals > 0, totals, 1.0)[path_index], 0.0)
+        return weights, attributed
+    
+    def _calculate_confidence_score(self, batch: AttributionBatch, lengths: "np.ndarray") -> float:
+        """Confidence score, matching AttributionModel._calculate_confidence_score"""
+        total_paths = batch.num_paths
+        if total_paths == 0:
+            return 0.0
+        
+        multi_touch_ratio = float((lengths > 1).sum()) / total_paths
+        user_id_ratio = float(batch.has_user_id.sum()) / total_paths
+        
+        confidence = 0.5 + multi_touch_ratio * 0.3 + user_id_ratio * 0.2
+        return min(confidence, 1.0)
+    
+    def _empty_result(self, batch: AttributionBatch, model_type: AttributionModelType) -> AttributionResult:
+        return AttributionResult(
+            campaign_id=batch.campaign_id,
+            model_type=model_type,
+            total_conversions=0,
+            total_conversion_value=0.0,
+            attributed_conversions=0,
+            attributed_conversion_value=0.0,
+            touchpoint_credits={},
+            confidence_score=0.0
+        )
+
+
+def _to_epoch(value: datetime) -> float:
+    """Convert a datetime to epoch seconds (naive datetimes are treated as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -63,6 +63,15 @@ class PositionBasedModel(AttributionModel):
             first_touchpoint = path.touchpoints[0]
             last_touchpoint = path.touchpoints[-1]
             
+            if num_touchpoints == 1:
+                # Single touchpoint gets 100%
+                if first_touchpoint.touchpoint_id not in touchpoint_credits:
+                    touchpoint_credits[first_touchpoint.touchpoint_id] = 0.0
+                touchpoint_credits[first_touchpoint.touchpoint_id] += conversion_value
+                attributed_conversions += 1
+                attributed_conversion_value += conversion_value
+                continue
+            
             # First touchpoint gets 40%
             first_credit = conversion_value * self.FIRST_TOUCH_WEIGHT
             if first_touchpoint.touchpoint_id not in touchpoint_credits:
@@ -84,11 +93,6 @@ class PositionBasedModel(AttributionModel):
                     if touchpoint.touchpoint_id not in touchpoint_credits:
                         touchpoint_credits[touchpoint.touchpoint_id] = 0.0
                     touchpoint_credits[touchpoint.touchpoint_id] += middle_credit_per_touchpoint
-            elif num_touchpoints == 1:
-                # Single touchpoint gets 100%
-                if first_touchpoint.touchpoint_id not in touchpoint_credits:
-                    touchpoint_credits[first_touchpoint.touchpoint_id] = 0.0
-                touchpoint_credits[first_touchpoint.touchpoint_id] += conversion_value
             
             attributed_conversions += 1
             attributed_conversion_value += conversion_value
@@ -1,21 +1,18 @@
 """
-Advanced Caching Module
+Caching Module
 """
 
-from src.cache.advanced_cache import (
-    MultiLayerCache,
-    CacheLayer,
-    InMemoryCacheLayer,
-    RedisCacheLayer,
-    CacheWarmer,
-    cached
-)
+from src.cache.cache_manager import CacheManager
+from src.cache.codecs import CacheCodec, CacheSerializer, JSONCodec, MsgPackCodec, get_codec
+from src.cache.local_cache import CacheEntry, LocalCache
 
 __all__ = [
-    'MultiLayerCache',
-    'CacheLayer',
-    'InMemoryCacheLayer',
-    'RedisCacheLayer',
-    'CacheWarmer',
-    'cached'
+    'CacheManager',
+    'CacheCodec',
+    'CacheSerializer',
+    'JSONCodec',
+    'MsgPackCodec',
+    'get_codec',
+    'CacheEntry',
+    'LocalCache'
 ]
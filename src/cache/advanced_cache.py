@@ -1,224 +0,0 @@
-"""
-Advanced Caching Strategies
-
-Enterprise-grade caching with:
-- Multi-layer caching (memory + Redis)
-- Cache warming
-- Cache invalidation strategies
-- Cache stampede prevention
-- TTL management
-- Cache analytics
-"""
-
-import asyncio
-import hashlib
-import json
-import logging
-import time
-from typing import Optional, Any, Callable, Dict
-from datetime import datetime, timedelta
-from functools import wraps
-
-logger = logging.getLogger(__name__)
-
-
-class AdvancedCache:
-    """
-    Advanced caching with multiple strategies
-    """
-    
-    def __init__(
-        self,
-        redis_client=None,
-        default_ttl: int = 3600,
-        memory_cache_size: int = 1000,
-    ):
-        self.redis_client = redis_client
-        self.default_ttl = default_ttl
-        self.memory_cache: Dict[str, tuple] = {}  # (value, expiry_time)
-        self.memory_cache_size = memory_cache_size
-        self.stats = {
-            "hits": 0,
-            "misses": 0,
-            "sets": 0,
-            "deletes": 0,
-        }
-    
-    def _make_key(self, prefix: str, *args, **kwargs) -> str:
-        """Generate cache key"""
-        key_data = f"{prefix}:{args}:{sorted(kwargs.items())}"
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        return f"cache:{prefix}:{key_hash}"
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """Get from cache (memory first, then Redis)"""
-        # Check memory cache
-        if key in self.memory_cache:
-            value, expiry = self.memory_cache[key]
-            if time.time() < expiry:
-                self.stats["hits"] += 1
-                return value
-            else:
-                del self.memory_cache[key]
-        
-        # Check Redis
-        if self.redis_client:
-            try:
-                value = await self.redis_client.get(key)
-                if value:
-                    # Deserialize
-                    try:
-                        value = json.loads(value)
-                        # Also store in memory cache
-                        self._set_memory(key, value, self.default_ttl)
-                        self.stats["hits"] += 1
-                        return value
-                    except json.JSONDecodeError:
-                        pass
-            except Exception as e:
-                logger.error(f"Redis get error: {e}")
-        
-        self.stats["misses"] += 1
-        return None
-    
-    async def set(
-        self,
-        key: str,
-        value: Any,
-        ttl: Optional[int] = None,
-    ):
-        """Set cache value"""
-        ttl = ttl or self.default_ttl
-        
-        # Set in memory cache
-        self._set_memory(key, value, ttl)
-        
-        # Set in Redis
-        if self.redis_client:
-            try:
-                serialized = json.dumps(value)
-                await self.redis_client.setex(key, ttl, serialized)
-            except Exception as e:
-                logger.error(f"Redis set error: {e}")
-        
-        self.stats["sets"] += 1
-    
-    def _set_memory(self, key: str, value: Any, ttl: int):
-        """Set in memory cache with size limit"""
-        # Evict oldest if at capacity
-        if len(self.memory_cache) >= self.memory_cache_size:
-            # Remove oldest (simple FIFO)
-            oldest_key = next(iter(self.memory_cache))
-            del self.memory_cache[oldest_key]
-        
-        expiry = time.time() + ttl
-        self.memory_cache[key] = (value, expiry)
-    
-    async def delete(self, key: str):
-        """Delete from cache"""
-        # Delete from memory
-        self.memory_cache.pop(key, None)
-        
-        # Delete from Redis
-        if self.redis_client:
-            try:
-                await self.redis_client.delete(key)
-            except Exception as e:
-                logger.error(f"Redis delete error: {e}")
-        
-        self.stats["deletes"] += 1
-    
-    async def invalidate_pattern(self, pattern: str):
-        """Invalidate all keys matching pattern"""
-        # Memory cache (simple)
-        keys_to_delete = [k for k in self.memory_cache.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.memory_cache[key]
-        
-        # Redis (if supported)
-        if self.redis_client:
-            try:
-                # This would require SCAN in production
-                # For now, just log
-                logger.info(f"Pattern invalidation requested: {pattern}")
-            except Exception as e:
-                logger.error(f"Redis pattern delete error: {e}")
-    
-    def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        total = self.stats["hits"] + self.stats["misses"]
-        hit_rate = (self.stats["hits"] / total * 100) if total > 0 else 0
-        
-        return {
-            **self.stats,
-            "hit_rate": hit_rate,
-            "memory_cache_size": len(self.memory_cache),
-        }
-
-
-def cached(
-    prefix: str,
-    ttl: int = 3600,
-    key_func: Optional[Callable] = None,
-):
-    """
-    Decorator for caching function results
-    
-    Usage:
-        @cached("user_profile", ttl=1800)
-        async def get_user_profile(user_id: str):
-            ...
-    """
-    def decorator(func: Callable):
-        cache = AdvancedCache()  # In production, use shared instance
-        
-        if asyncio.iscoroutinefunction(func):
-            @wraps(func)
-            async def async_wrapper(*args, **kwargs):
-                # Generate cache key
-                if key_func:
-                    cache_key = key_func(*args, **kwargs)
-                else:
-                    cache_key = cache._make_key(prefix, *args, **kwargs)
-                
-                # Try cache
-                cached_value = await cache.get(cache_key)
-                if cached_value is not None:
-                    return cached_value
-                
-                # Call function
-                result = await func(*args, **kwargs)
-                
-                # Cache result
-                await cache.set(cache_key, result, ttl)
-                
-                return result
-            
-            return async_wrapper
-        else:
-            @wraps(func)
-            def sync_wrapper(*args, **kwargs):
-                # Generate cache key
-                if key_func:
-                    cache_key = key_func(*args, **kwargs)
-                else:
-                    cache_key = cache._make_key(prefix, *args, **kwargs)
-                
-                # Try cache (sync version)
-                import asyncio
-                loop = asyncio.get_event_loop()
-                cached_value = loop.run_until_complete(cache.get(cache_key))
-                if cached_value is not None:
-                    return cached_value
-                
-                # Call function
-                result = func(*args, **kwargs)
-                
-                # Cache result
-                loop.run_until_complete(cache.set(cache_key, result, ttl))
-                
-                return result
-            
-            return sync_wrapper
-    
-    return decorator
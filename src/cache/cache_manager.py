@@ -1,113 +1,394 @@
 """
 Cache Manager
 
-Provides caching layer for frequently accessed data.
-Uses Redis if available, falls back to in-memory cache.
+Two-tier cache for frequently accessed data:
+- L1: in-process LRU with TinyLFU admission, bounded in bytes
+- L2: Redis, shared by all API processes (optional)
+
+``get_or_load`` coalesces concurrent misses for a key into one load
+(in-process, plus a short Redis lock across processes) and serves stale
+values while a single background refresh runs. Invalidation is by tag:
+every entry records the version of each tag it was written under, and
+bumping a tag's version makes those entries misses without scanning keys.
+Tag versions in Redis start from a microsecond timestamp, so a version key
+that was evicted is re-created past every version written before it and
+entries under the lost version become misses instead of being served again.
+
+Values in Redis are encoded by a CacheSerializer (see src.cache.codecs), so
+the Redis client must be created with ``decode_responses=False``.
 """
 
-import logging
-import json
-from typing import Optional, Any, Dict
-from datetime import timedelta
+import asyncio
 import hashlib
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from src.cache.codecs import CacheSerializer
+from src.cache.local_cache import CacheEntry, LocalCache
 
 logger = logging.getLogger(__name__)
 
+# KEYS[1] = lock key; ARGV[1] = token. Only the lock's owner may release it.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1] = tag version key; ARGV[1] = initial version if the key is missing
+BUMP_TAG_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCR', KEYS[1])
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return tonumber(ARGV[1])
+"""
+
 
 class CacheManager:
     """
     Cache Manager
     
     Provides caching with TTL support.
-    Uses Redis if available, otherwise falls back to in-memory cache.
+    Uses Redis if available, otherwise the local tier alone.
     """
     
-    def __init__(self, redis_client=None):
+    def __init__(
+        self,
+        redis_client=None,
+        metrics_collector=None,
+        max_local_bytes: int = 64 * 1024 * 1024,
+        default_ttl_seconds: int = 300,
+        namespace: str = "cache",
+        tag_version_ttl_seconds: float = 1.0,
+        lock_timeout_seconds: float = 10.0,
+        lock_wait_seconds: float = 2.0,
+        redis_retry_seconds: float = 30.0,
+        serializer: Optional[CacheSerializer] = None
+    ):
         self.redis = redis_client
-        self._memory_cache: Dict[str, tuple[Any, float]] = {}
-        self._use_redis = redis_client is not None
+        self._release_lock_script = redis_client.register_script(RELEASE_LOCK_SCRIPT) if redis_client is not None else None
+        self._bump_tag_script = redis_client.register_script(BUMP_TAG_SCRIPT) if redis_client is not None else None
+        self.metrics = metrics_collector
+        self.local = LocalCache(max_bytes=max_local_bytes)
+        self.serializer = serializer or CacheSerializer(metrics_collector=metrics_collector)
+        self.default_ttl_seconds = default_ttl_seconds
+        self.namespace = namespace
+        # How long a tag version read from Redis is trusted before re-reading,
+        # i.e. how late another process may observe an invalidation
+        self.tag_version_ttl_seconds = tag_version_ttl_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.lock_wait_seconds = lock_wait_seconds
+        self.redis_retry_seconds = redis_retry_seconds
+        self._redis_retry_at = 0.0
+        self._tag_versions: Dict[str, Tuple[int, float]] = {}  # tag -> (version, fetched_at)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "coalesced": 0}
     
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        if self._use_redis:
+        """Get value from cache (stale values included until they expire)"""
+        entry = await self._lookup(key)
+        if entry is None:
+            self._record("misses")
+            return None
+        return entry.value
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[int] = None,
+        tags: Iterable[str] = (),
+        stale_seconds: int = 0
+    ):
+        """Set value in cache with TTL, optionally tagged for invalidation"""
+        tags = list(tags)
+        await self._store(key, value, ttl_seconds, await self._current_versions(tags), stale_seconds)
+    
+    async def delete(self, key: str):
+        """Delete key from cache"""
+        self.local.delete(key)
+        if self._redis_available():
             try:
-                value = await self.redis.get(key)
-                if value:
-                    return json.loads(value)
+                await self.redis.delete(self._data_key(key))
             except Exception as e:
-                logger.warning(f"Redis get failed, falling back to memory: {e}")
-                self._use_redis = False
+                self._redis_failed("delete", e)
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int] = None,
+        tags: Iterable[str] = (),
+        stale_seconds: int = 0
+    ) -> Any:
+        """
+        Get value from cache, loading it on a miss
         
-        # Fallback to memory cache
-        if key in self._memory_cache:
-            value, expiry = self._memory_cache[key]
-            import time
-            if time.time() < expiry:
-                return value
-            else:
-                del self._memory_cache[key]
+        Concurrent misses share one ``loader`` call. Within ``stale_seconds``
+        after expiry the old value is returned immediately while one
+        background load refreshes it. ``None`` results are not cached.
+        """
+        tags = list(tags)
+        entry = await self._lookup(key)
+        if entry is not None:
+            if entry.is_fresh():
+                return entry.value
+            self._record("stale_hits")
+            self._start_load(key, loader, ttl_seconds, tags, stale_seconds)
+            return entry.value
         
-        return None
+        self._record("misses")
+        return await asyncio.shield(self._start_load(key, loader, ttl_seconds, tags, stale_seconds))
     
-    async def set(self, key: str, value: Any, ttl_seconds: int = 300):
-        """Set value in cache with TTL"""
-        if self._use_redis:
-            try:
-                await self.redis.setex(key, ttl_seconds, json.dumps(value))
-                return
-            except Exception as e:
-                logger.warning(f"Redis set failed, falling back to memory: {e}")
-                self._use_redis = False
+    async def invalidate_tags(self, *tags: str):
+        """Invalidate every entry written under any of the tags"""
+        for tag in tags:
+            version = self._tag_versions.get(tag, (0, 0.0))[0] + 1
+            if self._redis_available():
+                try:
+                    version = await self._bump_tag_script(keys=[self._tag_key(tag)], args=[self._new_tag_version()])
+                except Exception as e:
+                    self._redis_failed("invalidate", e)
+            self._tag_versions[tag] = (int(version), time.monotonic())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        total = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": (hits / total * 100) if total > 0 else 0,
+            "local_entries": len(self.local),
+            "local_bytes": self.local.size_bytes,
+            "local_evictions": self.local.evictions,
+            "local_rejections": self.local.rejections,
+            "codecs": self.serializer.get_stats(),
+        }
+    
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int],
+        tags: list,
+        stale_seconds: int
+    ) -> asyncio.Task:
+        """Single-flight: the in-flight load for key, started if there is none"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self._record("coalesced")
+            return task
         
-        # Fallback to memory cache
-        import time
-        expiry = time.time() + ttl_seconds
-        self._memory_cache[key] = (value, expiry)
+        task = asyncio.ensure_future(self._load(key, loader, ttl_seconds, tags, stale_seconds))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._load_finished(key, done))
+        return task
+    
+    def _load_finished(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache load failed for {key}: {task.exception()}")
+    
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int],
+        tags: list,
+        stale_seconds: int
+    ) -> Any:
+        # Versions are read before loading, so an invalidation during the load wins
+        versions = await self._current_versions(tags)
+        lock_token = await self._acquire_lock(key)
+        if lock_token is None:
+            # Another process is loading this key; wait for it to publish
+            entry = await self._wait_for_peer(key)
+            if entry is not None:
+                return entry.value
         
-        # Clean up expired entries periodically
-        if len(self._memory_cache) > 1000:
-            self._cleanup_expired()
+        try:
+            self._record("loads")
+            value = await loader()
+            if value is not None:
+                await self._store(key, value, ttl_seconds, versions, stale_seconds)
+            return value
+        finally:
+            if lock_token:
+                await self._release_lock(key, lock_token)
     
-    async def delete(self, key: str):
-        """Delete key from cache"""
-        if self._use_redis:
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        """Entry from L1, else L2 (promoted into L1), if its tags are still current"""
+        entry = self.local.get(key)
+        tier = "l1_hits"
+        if entry is None:
+            entry = await self._get_remote(key)
+            tier = "l2_hits"
+            if entry is not None:
+                self.local.set(key, entry)
+        if entry is None:
+            return None
+        
+        if entry.tags and await self._current_versions(entry.tags) != entry.tags:
+            self.local.delete(key)
+            return None
+        
+        self._record(tier)
+        return entry
+    
+    async def _store(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[int],
+        tags: Dict[str, int],
+        stale_seconds: int
+    ):
+        ttl = ttl_seconds or self.default_ttl_seconds
+        now = time.time()
+        try:
+            payload, size = self.serializer.encode({"v": value, "f": now + ttl, "s": now + ttl + stale_seconds, "t": tags})
+        except (TypeError, ValueError) as e:
+            # An uncacheable value must not fail the request that produced it
+            logger.warning(f"Not caching {key}: {e}")
+            if self.metrics:
+                self.metrics.increment_counter("cache_encode_errors_total", tags={"type": type(value).__name__})
+            return
+        self.local.set(key, CacheEntry(
+            value=value,
+            size=size,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_seconds,
+            tags=tags
+        ))
+        
+        if self._redis_available():
             try:
-                await self.redis.delete(key)
-                return
+                await self.redis.set(self._data_key(key), payload, ex=int(ttl + stale_seconds))
             except Exception as e:
-                logger.warning(f"Redis delete failed: {e}")
+                self._redis_failed("set", e)
+    
+    async def _get_remote(self, key: str) -> Optional[CacheEntry]:
+        if not self._redis_available():
+            return None
+        try:
+            payload = await self.redis.get(self._data_key(key))
+        except Exception as e:
+            self._redis_failed("get", e)
+            return None
+        if not payload:
+            return None
         
-        if key in self._memory_cache:
-            del self._memory_cache[key]
+        try:
+            envelope = self.serializer.loads(payload)
+            entry = CacheEntry(
+                value=envelope["v"],
+                size=len(payload),
+                fresh_until=envelope["f"],
+                stale_until=envelope["s"],
+                tags=envelope.get("t") or {}
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            return None
+        return None if entry.is_expired() else entry
     
-    async def invalidate_pattern(self, pattern: str):
-        """Invalidate all keys matching pattern"""
-        if self._use_redis:
+    async def _current_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Current version of each tag (0 if never invalidated and Redis is not used)"""
+        tags = list(tags)
+        if not tags:
+            return {}
+        
+        now = time.monotonic()
+        stale = [
+            tag for tag in tags
+            if tag not in self._tag_versions or now - self._tag_versions[tag][1] >= self.tag_version_ttl_seconds
+        ]
+        if stale and self._redis_available():
             try:
-                keys = await self.redis.keys(pattern)
-                if keys:
-                    await self.redis.delete(*keys)
-                return
+                values = await self.redis.mget([self._tag_key(tag) for tag in stale])
+                for tag, value in zip(stale, values):
+                    if value is None:
+                        value = await self._init_tag_version(tag)
+                    self._tag_versions[tag] = (int(value), now)
             except Exception as e:
-                logger.warning(f"Redis pattern invalidation failed: {e}")
+                self._redis_failed("tag versions", e)
         
-        # Fallback: delete matching keys from memory
-        import re
-        regex = re.compile(pattern.replace('*', '.*'))
-        keys_to_delete = [k for k in self._memory_cache.keys() if regex.match(k)]
-        for key in keys_to_delete:
-            del self._memory_cache[key]
-    
-    def _cleanup_expired(self):
-        """Remove expired entries from memory cache"""
-        import time
-        now = time.time()
-        expired_keys = [
-            key for key, (_, expiry) in self._memory_cache.items()
-            if now >= expiry
-        ]
-        for key in expired_keys:
-            del self._memory_cache[key]
+        return {tag: self._tag_versions.get(tag, (0, 0.0))[0] for tag in tags}
+    
+    async def _init_tag_version(self, tag: str) -> int:
+        """Create a missing (never set, or evicted) tag version key; its version after creation"""
+        version = self._new_tag_version()
+        if await self.redis.set(self._tag_key(tag), version, nx=True):
+            return version
+        # Created concurrently by another process
+        return int(await self.redis.get(self._tag_key(tag)) or version)
+    
+    @staticmethod
+    def _new_tag_version() -> int:
+        return time.time_ns() // 1000
+    
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Cross-process load lock; a token if acquired (or Redis is unavailable), else None"""
+        token = uuid.uuid4().hex
+        if not self._redis_available():
+            return token
+        try:
+            acquired = await self.redis.set(
+                self._lock_key(key), token, nx=True, px=int(self.lock_timeout_seconds * 1000)
+            )
+        except Exception as e:
+            self._redis_failed("lock", e)
+            return token
+        return token if acquired else None
+    
+    async def _release_lock(self, key: str, token: str):
+        if not self._redis_available():
+            return
+        try:
+            # Compare-and-delete: if the load outlived the lock, a peer may own it now.
+            # The lock also expires on its own if this process dies mid-load
+            await self._release_lock_script(keys=[self._lock_key(key)], args=[token])
+        except Exception as e:
+            self._redis_failed("unlock", e)
+    
+    async def _wait_for_peer(self, key: str) -> Optional[CacheEntry]:
+        """Poll L2 while another process loads key; None if it does not finish in time"""
+        deadline = time.monotonic() + self.lock_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._get_remote(key)
+            if entry is not None and entry.is_fresh():
+                self.local.set(key, entry)
+                return entry
+        return None
+    
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_retry_at
+    
+    def _redis_failed(self, operation: str, error: Exception):
+        logger.warning(f"Redis cache {operation} failed, using local cache for {self.redis_retry_seconds}s: {error}")
+        self._redis_retry_at = time.monotonic() + self.redis_retry_seconds
+        if self.metrics:
+            self.metrics.increment_counter("cache_backend_errors_total", tags={"operation": operation})
+    
+    def _record(self, stat: str):
+        self.stats[stat] += 1
+        if self.metrics:
+            self.metrics.increment_counter("cache_requests_total", tags={"result": stat})
+    
+    def _data_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+    
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:lock:{key}"
     
     @staticmethod
     def make_cache_key(*parts: str, prefix: str = "") -> str:
@@ -0,0 +1,272 @@
+"""
+Cache Codecs
+
+Serialization for cached values stored outside the process (the Redis
+tier). MessagePack is the default when installed; typed JSON is the
+fallback. Both round-trip datetimes, dates, Decimals, UUIDs, timedeltas and
+sets instead of silently turning them into strings.
+
+Every payload starts with a one-byte header naming its codec and whether it
+is zlib-compressed, so entries written with another codec (e.g. during a
+rolling deploy) are still readable.
+"""
+
+import json
+import logging
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logger.warning("msgpack not available - cache values will be encoded as JSON")
+
+
+COMPRESSED_FLAG = 0x01
+
+
+class CacheCodec:
+    """Encodes values to bytes and back; ``codec_id`` goes in the payload header"""
+    
+    name = "base"
+    codec_id = 0
+    
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+    
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JSONCodec(CacheCodec):
+    """JSON with tagged objects for types JSON cannot represent"""
+    
+    name = "json"
+    codec_id = 1
+    TYPE_KEY = "__cache_type__"
+    
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=self._default, separators=(",", ":")).encode()
+    
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=self._object_hook)
+    
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return {self.TYPE_KEY: "datetime", "value": obj.isoformat()}
+        if isinstance(obj, date):
+            return {self.TYPE_KEY: "date", "value": obj.isoformat()}
+        if isinstance(obj, Decimal):
+            return {self.TYPE_KEY: "decimal", "value": str(obj)}
+        if isinstance(obj, UUID):
+            return {self.TYPE_KEY: "uuid", "value": str(obj)}
+        if isinstance(obj, timedelta):
+            return {self.TYPE_KEY: "timedelta", "value": obj.total_seconds()}
+        if isinstance(obj, (set, frozenset)):
+            return {self.TYPE_KEY: "set", "value": list(obj)}
+        if isinstance(obj, Enum):
+            return obj.value
+        raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+    
+    def _object_hook(self, obj: Dict[str, Any]) -> Any:
+        kind = obj.get(self.TYPE_KEY)
+        if kind is None or len(obj) != 2:
+            return obj
+        value = obj["value"]
+        if kind == "datetime":
+            return datetime.fromisoformat(value)
+        if kind == "date":
+            return date.fromisoformat(value)
+        if kind == "decimal":
+            return Decimal(value)
+        if kind == "uuid":
+            return UUID(value)
+        if kind == "timedelta":
+            return timedelta(seconds=value)
+        if kind == "set":
+            return set(value)
+        return obj
+
+
+class MsgPackCodec(CacheCodec):
+    """MessagePack with extension types for common domain types"""
+    
+    name = "msgpack"
+    codec_id = 2
+    
+    EXT_DATETIME = 1
+    EXT_DATE = 2
+    EXT_DECIMAL = 3
+    EXT_UUID = 4
+    EXT_TIMEDELTA = 5
+    EXT_SET = 6
+    
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+    
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+    
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+    
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return msgpack.ExtType(self.EXT_DATETIME, obj.isoformat().encode())
+        if isinstance(obj, date):
+            return msgpack.ExtType(self.EXT_DATE, obj.isoformat().encode())
+        if isinstance(obj, Decimal):
+            return msgpack.ExtType(self.EXT_DECIMAL, str(obj).encode())
+        if isinstance(obj, UUID):
+            return msgpack.ExtType(self.EXT_UUID, obj.bytes)
+        if isinstance(obj, timedelta):
+            return msgpack.ExtType(self.EXT_TIMEDELTA, msgpack.packb(obj.total_seconds()))
+        if isinstance(obj, (set, frozenset)):
+            return msgpack.ExtType(self.EXT_SET, self.encode(list(obj)))
+        if isinstance(obj, Enum):
+            return obj.value
+        raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+    
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == self.EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == self.EXT_DATE:
+            return date.fromisoformat(data.decode())
+        if code == self.EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == self.EXT_UUID:
+            return UUID(bytes=data)
+        if code == self.EXT_TIMEDELTA:
+            return timedelta(seconds=msgpack.unpackb(data))
+        if code == self.EXT_SET:
+            return set(self.decode(data))
+        return msgpack.ExtType(code, data)
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, MsgPackCodec)}
+
+
+def get_codec(name: Optional[str] = None) -> CacheCodec:
+    """Codec by name; msgpack when installed, else JSON, if no name is given"""
+    if name is None:
+        name = "msgpack" if MSGPACK_AVAILABLE else "json"
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec: {name}")
+    return CODECS[name]()
+
+
+class CacheSerializer:
+    """
+    Frames codec output with a header byte and compresses large payloads
+    
+    Keeps per-codec counts, byte totals (before and after compression) and
+    encode/decode time; see ``get_stats``.
+    """
+    
+    def __init__(
+        self,
+        codec: Optional[CacheCodec] = None,
+        compress_threshold_bytes: Optional[int] = 1024,
+        compression_level: int = 3,
+        metrics_collector=None
+    ):
+        self.codec = codec or get_codec()
+        # None disables compression
+        self.compress_threshold_bytes = compress_threshold_bytes
+        self.compression_level = compression_level
+        self.metrics = metrics_collector
+        self._decoders: Dict[int, CacheCodec] = {self.codec.codec_id: self.codec}
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """Payload for value, and the encoded size before compression"""
+        started = time.perf_counter()
+        body = self.codec.encode(value)
+        raw_size = len(body)
+        flags = 0
+        if self.compress_threshold_bytes is not None and raw_size >= self.compress_threshold_bytes:
+            compressed = zlib.compress(body, self.compression_level)
+            if len(compressed) < raw_size:
+                body = compressed
+                flags |= COMPRESSED_FLAG
+        payload = bytes([(self.codec.codec_id << 4) | flags]) + body
+        
+        stats = self._codec_stats(self.codec.name)
+        stats["encoded"] += 1
+        stats["compressed"] += bool(flags & COMPRESSED_FLAG)
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += len(payload)
+        stats["encode_seconds"] += time.perf_counter() - started
+        if self.metrics:
+            self.metrics.record_histogram("cache_payload_bytes", len(payload), tags={"codec": self.codec.name})
+        return payload, raw_size
+    
+    def dumps(self, value: Any) -> bytes:
+        return self.encode(value)[0]
+    
+    def loads(self, payload: bytes) -> Any:
+        """Decode a payload written by any known codec"""
+        if isinstance(payload, str):
+            raise ValueError("Cache payload is text; the Redis client must not decode responses")
+        if not payload:
+            raise ValueError("Empty cache payload")
+        
+        started = time.perf_counter()
+        header = payload[0]
+        codec = self._decoder(header >> 4)
+        body = payload[1:]
+        if header & COMPRESSED_FLAG:
+            try:
+                body = zlib.decompress(body)
+            except zlib.error as e:
+                raise ValueError(f"Corrupt compressed cache payload: {e}") from e
+        value = codec.decode(body)
+        
+        stats = self._codec_stats(codec.name)
+        stats["decoded"] += 1
+        stats["decode_seconds"] += time.perf_counter() - started
+        return value
+    
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-codec counts, bytes and timings, with compression ratio"""
+        return {
+            name: {
+                **stats,
+                "compression_ratio": stats["stored_bytes"] / stats["raw_bytes"] if stats["raw_bytes"] else 1.0,
+            }
+            for name, stats in self._stats.items()
+        }
+    
+    def _decoder(self, codec_id: int) -> CacheCodec:
+        codec = self._decoders.get(codec_id)
+        if codec is None:
+            for codec_class in CODECS.values():
+                if codec_class.codec_id == codec_id:
+                    try:
+                        codec = codec_class()
+                    except RuntimeError as e:
+                        raise ValueError(f"Cannot decode {codec_class.name} cache payload: {e}") from e
+                    break
+            else:
+                raise ValueError(f"Unknown cache codec id: {codec_id}")
+            self._decoders[codec_id] = codec
+        return codec
+    
+    def _codec_stats(self, name: str) -> Dict[str, float]:
+        if name not in self._stats:
+            self._stats[name] = {
+                "encoded": 0, "decoded": 0, "compressed": 0,
+                "raw_bytes": 0, "stored_bytes": 0,
+                "encode_seconds": 0.0, "decode_seconds": 0.0,
+            }
+        return self._stats[name]
@@ -0,0 +1,147 @@
+"""
+Local Cache
+
+In-process (L1) cache tier: LRU eviction bounded by total entry size in
+bytes, with TinyLFU admission so a burst of one-off keys cannot flush the
+hot working set.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with its freshness window and the tag versions it was written under"""
+    value: Any
+    size: int
+    fresh_until: float  # Wall-clock time; served as fresh before this
+    stale_until: float  # Served as stale (and refreshed) until this, then dropped
+    tags: Dict[str, int] = field(default_factory=dict)
+    
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+    
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.stale_until
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency (TinyLFU)
+    
+    Four rows of small saturating counters; all counters are halved every
+    ``sample_size`` increments so old popularity fades.
+    """
+    
+    ROWS = 4
+    MAX_COUNT = 15
+    
+    def __init__(self, width: int = 16384):
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self._mask = self.width - 1
+        self._table = [bytearray(self.width) for _ in range(self.ROWS)]
+        self._sample_size = 10 * self.width
+        self._additions = 0
+    
+    def _slots(self, key: str) -> Iterator[int]:
+        for row in range(self.ROWS):
+            yield hash((row, key)) & self._mask
+    
+    def increment(self, key: str):
+        for row, slot in zip(self._table, self._slots(key)):
+            if row[slot] < self.MAX_COUNT:
+                row[slot] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+    
+    def frequency(self, key: str) -> int:
+        return min(row[slot] for row, slot in zip(self._table, self._slots(key)))
+    
+    def _age(self):
+        for row in self._table:
+            for slot in range(self.width):
+                row[slot] >>= 1
+        self._additions //= 2
+
+
+class LocalCache:
+    """
+    Size-bounded LRU with TinyLFU admission
+    
+    When a new key needs room, it is only admitted if it has been requested
+    more often than every entry it would evict; otherwise the cache keeps
+    its current contents. Replacing an existing key is always admitted.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, expected_entries: int = 10000):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._sketch = FrequencySketch(expected_entries)
+        self.size_bytes = 0
+        self.evictions = 0
+        self.rejections = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry for key (fresh or stale), or None if absent or expired"""
+        self._sketch.increment(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def set(self, key: str, entry: CacheEntry) -> bool:
+        """Store entry; returns False if admission rejected it"""
+        if entry.size > self.max_bytes:
+            self.rejections += 1
+            return False
+        
+        replacing = self.delete(key)
+        if not replacing:
+            self._sketch.increment(key)
+        
+        victims = []
+        needed = self.size_bytes + entry.size - self.max_bytes
+        if needed > 0:
+            frequency = self._sketch.frequency(key)
+            now = time.time()
+            for victim_key, victim in self._entries.items():
+                if needed <= 0:
+                    break
+                if not replacing and not victim.is_expired(now) and self._sketch.frequency(victim_key) >= frequency:
+                    self.rejections += 1
+                    return False
+                victims.append(victim_key)
+                needed -= victim.size
+        
+        for victim_key in victims:
+            self.delete(victim_key)
+            self.evictions += 1
+        
+        self._entries[key] = entry
+        self.size_bytes += entry.size
+        return True
+    
+    def delete(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= entry.size
+        return True
+    
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
@@ -6,11 +6,35 @@ Handles PostgreSQL database connections with connection pooling.
 
 import logging
 import asyncpg
+from contextvars import ContextVar, Token
 from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
+# Tenant whose RLS context is applied to connections acquired in this context
+_current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+def set_current_tenant(tenant_id: Optional[str]) -> Token:
+    """
+    Set the tenant for RLS on connections acquired in the current context
+    
+    Returns:
+        Token for reset_current_tenant
+    """
+    return _current_tenant.set(tenant_id)
+
+
+def reset_current_tenant(token: Token):
+    """Restore the tenant that was current before set_current_tenant"""
+    _current_tenant.reset(token)
+
+
+def get_current_tenant_id() -> Optional[str]:
+    """Tenant applied to connections acquired in the current context"""
+    return _current_tenant.get()
+
 
 class PostgresConnection:
     """
@@ -97,6 +121,11 @@ class PostgresConnection:
         
         Args:
             use_read_replica: If True and read replica is configured, use read replica pool
+        
+        If a tenant is set for the current context (see set_current_tenant),
+        ``app.current_tenant`` is set on the acquired connection so RLS
+        policies apply to the queries run on it. The pool resets session
+        settings when the connection is released.
         """
         if not self.pool:
             await self.initialize()
@@ -107,6 +136,12 @@ class PostgresConnection:
             pool = self.read_replica_pool
         
         async with pool.acquire() as connection:
+            tenant_id = _current_tenant.get()
+            if tenant_id:
+                await connection.execute(
+                    "SELECT set_config('app.current_tenant', $1, false)",
+                    tenant_id
+                )
             yield connection
     
     async def execute(self, query: str, *args) -> str:
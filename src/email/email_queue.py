@@ -2,11 +2,20 @@
 Email Queue System
 
 Handles asynchronous email sending with queue management, retries, and error handling.
+
+Any number of worker processes can drain the same queue: each batch is
+claimed by setting a lease (leased_by / leased_until) in a single
+UPDATE ... FOR UPDATE SKIP LOCKED statement, so no two workers claim the
+same email, and leases left behind by a crashed worker expire and are
+reclaimed.
 """
 
 import asyncio
 import logging
-from typing import Dict, Optional, List
+import os
+import socket
+import time
+from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
@@ -59,6 +68,11 @@ class EmailQueue:
     - Retry logic
     - Priority handling
     - Batch processing
+    
+    ``workers`` loops each claim a batch, send it and record all outcomes
+    with one bulk UPDATE, so claiming and recording overlap with other
+    batches being sent. Sends across all workers share a limit of
+    ``send_concurrency``. A worker only sleeps when the queue is empty.
     """
     
     def __init__(
@@ -67,8 +81,12 @@ class EmailQueue:
         email_service: EmailService,
         metrics_collector: Optional[MetricsCollector] = None,
         event_logger: Optional[EventLogger] = None,
-        batch_size: int = 10,
-        processing_interval: int = 5
+        batch_size: int = 100,
+        processing_interval: int = 5,
+        workers: int = 4,
+        send_concurrency: int = 50,
+        lease_seconds: int = 300,
+        metrics_interval: int = 15
     ):
         self.postgres_conn = postgres_conn
         self.email_service = email_service
@@ -76,8 +94,17 @@ class EmailQueue:
         self.events = event_logger
         self.batch_size = batch_size
         self.processing_interval = processing_interval
+        self.workers = workers
+        self.send_concurrency = send_concurrency
+        self.lease_seconds = lease_seconds
+        self.metrics_interval = metrics_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
         self._running = False
-        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+        self._send_semaphore = asyncio.Semaphore(send_concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._processed_since = time.monotonic()
+        self._processed_count = 0
     
     async def initialize_queue_table(self):
         """Initialize email queue table if it doesn't exist"""
@@ -96,11 +123,18 @@ class EmailQueue:
                 created_at TIMESTAMP NOT NULL DEFAULT NOW(),
                 processed_at TIMESTAMP,
                 error_message TEXT,
-                scheduled_at TIMESTAMP NOT NULL DEFAULT NOW()
+                scheduled_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                leased_by VARCHAR(255),
+                leased_until TIMESTAMP
             );
             
+            ALTER TABLE email_queue ADD COLUMN IF NOT EXISTS leased_by VARCHAR(255);
+            ALTER TABLE email_queue ADD COLUMN IF NOT EXISTS leased_until TIMESTAMP;
+            
             CREATE INDEX IF NOT EXISTS idx_email_queue_status ON email_queue(status, scheduled_at);
             CREATE INDEX IF NOT EXISTS idx_email_queue_priority ON email_queue(priority DESC, created_at);
+            CREATE INDEX IF NOT EXISTS idx_email_queue_lease ON email_queue(leased_until)
+                WHERE status = 'processing';
         """
         await self.postgres_conn.execute(query)
     
@@ -152,143 +186,214 @@ class EmailQueue:
         return result
     
     async def process_queue(self):
-        """Process emails from queue"""
+        """Worker loop: claim, send and record batches until stopped"""
         while self._running:
             try:
-                # Get pending emails ordered by priority and creation time
-                query = """
-                    SELECT email_id, to_email, template, context, subject, body,
-                           retry_count, max_retries, status
-                    FROM email_queue
-                    WHERE status IN ('pending', 'retrying')
-                      AND scheduled_at <= NOW()
-                    ORDER BY priority DESC, created_at ASC
-                    LIMIT $1
-                    FOR UPDATE SKIP LOCKED
-                """
-                
-                emails = await self.postgres_conn.fetch(query, self.batch_size)
-                
-                if not emails:
-                    await asyncio.sleep(self.processing_interval)
+                processed = await self.process_batch()
+                if processed:
                     continue
+            except Exception as e:
+                logger.error(f"Error processing email queue: {str(e)}")
+            await self._sleep(self.processing_interval)
                 
-                for email_row in emails:
-                    await self._process_email(email_row)
+    async def process_batch(self) -> int:
+        """
+        Claim, send and record one batch
                 
-                await asyncio.sleep(self.processing_interval)
+        Returns:
+            Number of emails processed
+        """
+        emails = await self._claim_batch()
+        if not emails:
+            return 0
                 
-            except Exception as e:
-                logger.error(f"Error processing email queue: {str(e)}")
-                await asyncio.sleep(self.processing_interval)
+        start_time = time.monotonic()
+        outcomes = await asyncio.gather(*(self._send(email_row) for email_row in emails))
+        await self._record_outcomes(list(zip(emails, outcomes)))
     
-    async def _process_email(self, email_row: dict):
-        """Process a single email"""
-        email_id = email_row['email_id']
+        self._processed_count += len(emails)
+        if self.metrics:
+            self.metrics.record_histogram("email_queue_batch_size", len(emails), buckets=[1, 10, 50, 100, 250, 500, 1000])
+            self.metrics.record_histogram("email_queue_batch_duration_ms", (time.monotonic() - start_time) * 1000)
+        return len(emails)
         
-        try:
-            # Update status to processing
-            await self.postgres_conn.execute(
-                "UPDATE email_queue SET status = $1 WHERE email_id = $2",
-                EmailStatus.PROCESSING.value,
-                email_id
-            )
+    async def _claim_batch(self) -> List[Any]:
+        """
+        Lease the next batch of due emails to this worker
             
-            # Send email
-            template = EmailTemplate(email_row['template'])
-            success = await self.email_service.send_email(
-                to_email=email_row['to_email'],
-                template=template,
-                context=email_row['context'],
-                subject=email_row.get('subject'),
-                body=email_row.get('body')
-            )
+        Rows locked by another claim are skipped; rows whose lease has
+        expired (worker died mid-batch) are due again.
+        """
+        query = """
+            UPDATE email_queue q
+            SET status = $1,
+                leased_by = $2,
+                leased_until = NOW() + make_interval(secs => $3)
+            FROM (
+                SELECT email_id
+                FROM email_queue
+                WHERE (status IN ('pending', 'retrying') AND scheduled_at <= NOW())
+                   OR (status = 'processing' AND leased_until < NOW())
+                ORDER BY priority DESC, created_at ASC
+                LIMIT $4
+                FOR UPDATE SKIP LOCKED
+            ) claimed
+            WHERE q.email_id = claimed.email_id
+            RETURNING q.email_id, q.to_email, q.template, q.context, q.subject, q.body,
+                      q.retry_count, q.max_retries
+        """
+        return await self.postgres_conn.fetch(
+            query,
+            EmailStatus.PROCESSING.value,
+            self.worker_id,
+            self.lease_seconds,
+            self.batch_size
+        )
+    
+    async def _send(self, email_row) -> Optional[str]:
+        """
+        Send one email
             
-            if success:
-                # Mark as sent
-                await self.postgres_conn.execute(
-                    """
-                    UPDATE email_queue 
-                    SET status = $1, processed_at = NOW()
-                    WHERE email_id = $2
-                    """,
-                    EmailStatus.SENT.value,
-                    email_id
+        Returns:
+            None on success, otherwise the error message
+        """
+        async with self._send_semaphore:
+            try:
+                success = await self.email_service.send_email(
+                    to_email=email_row['to_email'],
+                    template=EmailTemplate(email_row['template']),
+                    context=email_row['context'],
+                    subject=email_row.get('subject'),
+                    body=email_row.get('body')
                 )
+                return None if success else "Email send failed"
+            except Exception as e:
+                logger.error(f"Error processing email {email_row['email_id']}: {str(e)}")
+                return str(e)
                 
+    def _failure_outcome(self, email_row, error_message: str) -> Tuple[EmailStatus, int, Optional[datetime]]:
+        """Status, retry count and next attempt for a failed send"""
+        retry_count = email_row['retry_count'] + 1
+        
+        if retry_count < email_row['max_retries']:
+            # Retry with exponential backoff
+            retry_delay = min(300, 60 * (2 ** retry_count))  # Max 5 minutes
+            scheduled_at = datetime.utcnow() + timedelta(seconds=retry_delay)
+            return EmailStatus.RETRYING, retry_count, scheduled_at
+        return EmailStatus.FAILED, retry_count, None
+    
+    async def _record_outcomes(self, results: List[Tuple[Any, Optional[str]]]):
+        """Write every outcome of a batch with one UPDATE and release the lease"""
+        email_ids, statuses, retry_counts, errors, scheduled = [], [], [], [], []
+        for email_row, error_message in results:
+            template = email_row['template']
+            if error_message is None:
+                status, retry_count, scheduled_at = EmailStatus.SENT, email_row['retry_count'], None
                 if self.metrics:
                     self.metrics.increment_counter(
                         "emails_sent_total",
-                        tags={"template": template.value, "status": "success"}
+                        tags={"template": template, "status": "success"}
                     )
             else:
-                # Handle failure
-                await self._handle_failure(email_id, email_row, "Email send failed")
-                
-        except Exception as e:
-            logger.error(f"Error processing email {email_id}: {str(e)}")
-            await self._handle_failure(email_id, email_row, str(e))
-    
-    async def _handle_failure(self, email_id: str, email_row: dict, error_message: str):
-        """Handle email sending failure"""
-        retry_count = email_row['retry_count'] + 1
-        max_retries = email_row['max_retries']
+                status, retry_count, scheduled_at = self._failure_outcome(email_row, error_message)
+                if self.metrics and status == EmailStatus.RETRYING:
+                    self.metrics.increment_counter(
+                        "emails_retry_total",
+                        tags={"template": template, "retry_count": str(retry_count)}
+                    )
+                elif self.metrics:
+                    self.metrics.increment_counter(
+                        "emails_failed_total",
+                        tags={"template": template}
+                    )
+            email_ids.append(email_row['email_id'])
+            statuses.append(status.value)
+            retry_counts.append(retry_count)
+            errors.append(error_message)
+            scheduled.append(scheduled_at)
         
-        if retry_count < max_retries:
-            # Retry with exponential backoff
-            retry_delay = min(300, 60 * (2 ** retry_count))  # Max 5 minutes
-            scheduled_at = datetime.utcnow() + timedelta(seconds=retry_delay)
+        # Only rows still leased to this worker are updated: if the lease
+        # expired and another worker reclaimed an email, its outcome wins
+        await self.postgres_conn.execute(
+            """
+            UPDATE email_queue q
+            SET status = r.status,
+                retry_count = r.retry_count,
+                error_message = COALESCE(r.error_message, q.error_message),
+                scheduled_at = COALESCE(r.scheduled_at, q.scheduled_at),
+                processed_at = CASE WHEN r.status IN ('sent', 'failed') THEN NOW() ELSE q.processed_at END,
+                leased_by = NULL,
+                leased_until = NULL
+            FROM unnest($1::uuid[], $2::text[], $3::int[], $4::text[], $5::timestamp[])
+                AS r(email_id, status, retry_count, error_message, scheduled_at)
+            WHERE q.email_id = r.email_id
+              AND q.leased_by = $6
+            """,
+            email_ids,
+            statuses,
+            retry_counts,
+            errors,
+            scheduled,
+            self.worker_id
+        )
+        
+    async def record_queue_metrics(self) -> Dict[str, float]:
+        """Publish queue depth, age of the oldest due email and throughput"""
+        row = await self.postgres_conn.fetchrow(
+            """
+            SELECT COUNT(*) AS depth,
+                   COALESCE(EXTRACT(EPOCH FROM NOW() - MIN(created_at)), 0) AS oldest_age_seconds
+            FROM email_queue
+            WHERE status IN ('pending', 'retrying')
+              AND scheduled_at <= NOW()
+            """
+        )
+        now = time.monotonic()
+        elapsed = max(now - self._processed_since, 1e-6)
+        stats = {
+            "depth": row['depth'] or 0,
+            "oldest_age_seconds": float(row['oldest_age_seconds'] or 0),
+            "throughput_per_second": self._processed_count / elapsed,
+        }
+        self._processed_since, self._processed_count = now, 0
             
-            await self.postgres_conn.execute(
-                """
-                UPDATE email_queue 
-                SET status = $1, retry_count = $2, error_message = $3,
-                    scheduled_at = $4
-                WHERE email_id = $5
-                """,
-                EmailStatus.RETRYING.value,
-                retry_count,
-                error_message,
-                scheduled_at,
-                email_id
-            )
+        if self.metrics:
+            self.metrics.record_gauge("email_queue_depth", stats["depth"])
+            self.metrics.record_gauge("email_queue_oldest_age_seconds", stats["oldest_age_seconds"])
+            self.metrics.record_gauge("email_queue_throughput_per_second", stats["throughput_per_second"])
+        return stats
             
-            if self.metrics:
-                self.metrics.increment_counter(
-                    "emails_retry_total",
-                    tags={"template": email_row['template'], "retry_count": str(retry_count)}
-                )
-        else:
-            # Mark as failed
-            await self.postgres_conn.execute(
-                """
-                UPDATE email_queue 
-                SET status = $1, processed_at = NOW(), error_message = $2
-                WHERE email_id = $3
-                """,
-                EmailStatus.FAILED.value,
-                error_message,
-                email_id
-            )
+    async def _metrics_loop(self):
+        while self._running:
+            try:
+                await self.record_queue_metrics()
+            except Exception as e:
+                logger.warning(f"Failed to record email queue metrics: {str(e)}")
+            await self._sleep(self.metrics_interval)
             
-            if self.metrics:
-                self.metrics.increment_counter(
-                    "emails_failed_total",
-                    tags={"template": email_row['template']}
-                )
+    async def _sleep(self, seconds: float):
+        """Sleep, waking early when the queue is stopped"""
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
     
     async def start(self):
         """Start queue processor"""
         await self.initialize_queue_table()
         self._running = True
-        self._task = asyncio.create_task(self.process_queue())
-        logger.info("Email queue processor started")
+        self._stopped.clear()
+        self._tasks = [asyncio.create_task(self.process_queue()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._metrics_loop()))
+        logger.info(f"Email queue processor started ({self.workers} workers, id {self.worker_id})")
     
     async def stop(self):
-        """Stop queue processor"""
+        """Stop queue processor (workers finish their current batch)"""
         self._running = False
-        if self._task:
-            await self._task
+        self._stopped.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
         logger.info("Email queue processor stopped")
     
     async def get_queue_stats(self) -> Dict:
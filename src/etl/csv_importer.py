@@ -5,12 +5,16 @@ Handles CSV file parsing, validation, and import into listener_metrics table.
 """
 
 import logging
+import codecs
 import csv
 import io
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+import re
+from decimal import Decimal
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
 from pydantic import BaseModel, Field, validator
 from uuid import UUID
+import numpy as np
 
 from src.database import PostgresConnection
 from src.telemetry.metrics import MetricsCollector
@@ -18,6 +22,70 @@ from src.telemetry.events import EventLogger
 
 logger = logging.getLogger(__name__)
 
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_INT64_MAX = int(np.iinfo(np.int64).max)
+_UUID_RE = re.compile(r'^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$')
+
+
+def _parse_column(values, convert, dtype, empty=None):
+    """
+    Convert a column of strings to a NumPy array
+    
+    Tries a single vectorized cast first and only falls back to converting
+    cell by cell (to locate the bad cells) when that fails.
+    
+    Returns:
+        Tuple of (array, boolean mask of cells that failed to parse)
+    """
+    bad = np.zeros(len(values), dtype=bool)
+    if empty is not None:
+        cells = [v if v else empty for v in values]
+    else:
+        cells = list(values)
+    try:
+        return np.array(cells, dtype=dtype), bad
+    except (ValueError, TypeError):
+        pass
+    parsed = []
+    fallback = empty if empty is not None else np.datetime64('NaT')
+    for i, v in enumerate(cells):
+        try:
+            parsed.append(convert(v) if v is not empty else v)
+        except (ValueError, TypeError):
+            bad[i] = True
+            parsed.append(fallback)
+    return np.array(parsed, dtype=dtype), bad
+
+
+def _parse_integers(values, present):
+    """
+    Convert the present cells of an integer column to exact int64 values
+    
+    The float64 parse used for validation loses precision above 2**53, so
+    integer columns are converted again from the strings. Cells that do not
+    parse (already flagged by validation) become 0.
+    
+    Returns:
+        Tuple of (int64 array, boolean mask of values above the int64 range)
+    """
+    too_large = np.zeros(len(values), dtype=bool)
+    cells = [v if p else '0' for v, p in zip(values, present)]
+    try:
+        return np.array(cells, dtype=np.int64), too_large
+    except (ValueError, TypeError, OverflowError):
+        pass
+    parsed = np.zeros(len(cells), dtype=np.int64)
+    for i, v in enumerate(cells):
+        try:
+            number = int(Decimal(v))
+        except (ArithmeticError, ValueError):
+            continue
+        if number > _INT64_MAX:
+            too_large[i] = True
+        elif number >= 0:
+            parsed[i] = number
+    return parsed, too_large
+
 
 class MetricsDailyRow(BaseModel):
     """DELTA:20251113_064143 CSV row schema for metrics_daily"""
@@ -55,8 +123,19 @@ class CSVImporter:
     DELTA:20251113_064143 CSV Importer
     
     Parses and validates CSV files, then imports into listener_metrics table.
+    Uploads are streamed in chunks, validated column-wise, bulk loaded into a
+    staging table with COPY and merged with set-based SQL.
     """
     
+    EXPECTED_HEADERS = ['day', 'episode_id', 'source', 'downloads', 'listeners',
+                        'completion_rate', 'ctr', 'conversions', 'revenue_cents']
+    INTEGER_COLUMNS = {'downloads', 'listeners', 'conversions', 'revenue_cents'}
+    STAGING_TABLE = 'etl_listener_metrics_staging'
+    STAGING_COLUMNS = EXPECTED_HEADERS + ['row_num']
+    CHUNK_ROWS = 50000
+    READ_SIZE = 1024 * 1024
+    MAX_REPORTED_ERRORS = 100
+    
     def __init__(
         self,
         postgres_conn: PostgresConnection,
@@ -87,13 +166,7 @@ class CSVImporter:
         reader = csv.DictReader(io.StringIO(csv_content))
         
         # Validate header
-        expected_headers = ['day', 'episode_id', 'source', 'downloads', 'listeners', 
-                          'completion_rate', 'ctr', 'conversions', 'revenue_cents']
-        if reader.fieldnames != expected_headers:
-            raise ValueError(
-                f"Invalid CSV header. Expected: {expected_headers}, "
-                f"Got: {reader.fieldnames}"
-            )
+        self._check_header(reader.fieldnames)
         
         # Validate and parse rows
         for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
@@ -129,6 +202,9 @@ class CSVImporter:
         """
         Import validated rows into listener_metrics table
         
+        Rows are bulk loaded into a staging table with COPY and merged in
+        one set-based statement (see import_stream for large files).
+        
         Args:
             rows: List of validated MetricsDailyRow objects
             tenant_id: Tenant ID for multi-tenant isolation
@@ -137,91 +213,321 @@ class CSVImporter:
         Returns:
             Dict with 'imported' and 'failed' counts
         """
-        imported = 0
-        failed = 0
+        records = [
+            (
+                datetime.strptime(row.day, '%Y-%m-%d').date(),
+                UUID(row.episode_id),
+                row.source,
+                row.downloads,
+                row.listeners,
+                row.completion_rate,
+                row.ctr,
+                row.conversions,
+                row.revenue_cents,
+                row_num,
+            )
+            for row_num, row in enumerate(rows, start=2)
+        ]
         
-        for row in rows:
+        async with self.postgres_conn.acquire() as conn:
+            await self._create_staging_table(conn)
             try:
-                # Convert day string to timestamp (start of day UTC)
-                day_dt = datetime.strptime(row.day, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-                
-                # Insert into listener_metrics (hypertable)
-                # Using upsert logic: if (day, episode_id, source) exists, update; else insert
-                query = """
-                    INSERT INTO listener_metrics (
-                        timestamp, podcast_id, episode_id, tenant_id,
-                        metric_type, value, platform, metadata
-                    )
-                    SELECT 
-                        $1::timestamptz,
-                        (SELECT podcast_id FROM episodes WHERE episode_id = $2::uuid),
-                        $2::uuid,
-                        $3::uuid,
-                        'daily_aggregate',
-                        COALESCE($4, 0)::numeric, -- downloads as primary value
-                        $5,
-                        jsonb_build_object(
-                            'import_id', $6,
-                            'listeners', $7,
-                            'completion_rate', $8,
-                            'ctr', $9,
-                            'conversions', $10,
-                            'revenue_cents', $11
-                        )
-                    ON CONFLICT DO NOTHING
-                    RETURNING 1;
-                """
+                await self._copy_to_staging(conn, records)
+                return await self._merge_staging(conn, tenant_id, import_id)
+            finally:
+                await conn.execute(f"DROP TABLE IF EXISTS {self.STAGING_TABLE}")
+    
+    async def import_stream(
+        self,
+        stream: Any,
+        tenant_id: str,
+        import_id: str,
+        chunk_rows: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Stream a CSV upload into listener_metrics
+        
+        The file is read in chunks, each chunk is validated column-wise and
+        COPYed into a per-connection staging table, and progress is written
+        to the etl_imports record. Nothing reaches listener_metrics until the
+        whole file has validated; then the staging table is merged in one
+        transaction.
+        
+        Args:
+            stream: Object with an async ``read(size)`` method (e.g. UploadFile)
+            tenant_id: Tenant ID for multi-tenant isolation
+            import_id: Import ID for tracking
+            chunk_rows: Rows per validation/COPY batch
+            
+        Returns:
+            Dict with 'imported' and 'failed' counts
+            
+        Raises:
+            ValueError: If the header is invalid or any rows fail validation
+        """
+        chunk_rows = chunk_rows or self.CHUNK_ROWS
+        errors: List[str] = []
+        rows_processed = 0
+        
+        async with self.postgres_conn.acquire() as conn:
+            await self._create_staging_table(conn)
+            try:
+                async for first_row_num, raw_rows in self._iter_csv_chunks(stream, chunk_rows):
+                    records, chunk_errors = self.validate_chunk(raw_rows, first_row_num)
+                    errors.extend(chunk_errors)
+                    if not errors:
+                        # Once any row is invalid the import will fail; keep
+                        # validating (to report every error) but stop loading
+                        await self._copy_to_staging(conn, records)
+                    rows_processed += len(raw_rows)
+                    await self.update_import_progress(import_id, rows_processed, len(errors))
                 
-                # Note: listener_metrics doesn't have unique constraint on (timestamp, episode_id, source)
-                # So we use DO NOTHING to avoid duplicates, or we could use a more sophisticated upsert
-                # For now, we'll insert and let the application handle deduplication
+                if errors:
+                    shown = errors[:self.MAX_REPORTED_ERRORS]
+                    if len(errors) > len(shown):
+                        shown.append(f"... and {len(errors) - len(shown)} more")
+                    raise ValueError("CSV validation errors:\n" + "\n".join(shown))
                 
-                # Simplified insert (without conflict handling for now)
-                query = """
+                return await self._merge_staging(conn, tenant_id, import_id)
+            finally:
+                await conn.execute(f"DROP TABLE IF EXISTS {self.STAGING_TABLE}")
+    
+    def validate_chunk(
+        self,
+        raw_rows: List[List[str]],
+        first_row_num: int = 2
+    ) -> Tuple[List[tuple], List[str]]:
+        """
+        Validate a batch of raw CSV rows column by column
+        
+        Applies the same rules as MetricsDailyRow, but parses and range
+        checks whole columns with NumPy instead of building a model per row.
+        
+        Args:
+            raw_rows: Rows of string cells (without the header)
+            first_row_num: File line number of the first row (header is row 1)
+            
+        Returns:
+            Tuple of (staging records for valid rows, error messages)
+        """
+        width = len(self.EXPECTED_HEADERS)
+        row_errors: Dict[int, List[str]] = {}
+        
+        for i, row in enumerate(raw_rows):
+            if len(row) != width:
+                row_errors.setdefault(i, []).append(f"expected {width} fields, got {len(row)}")
+        shaped = [row if len(row) == width else [''] * width for row in raw_rows]
+        columns = list(zip(*shaped)) if shaped else [()] * width
+        
+        def flag(mask, message):
+            for i in np.flatnonzero(mask):
+                row_errors.setdefault(int(i), []).append(message)
+        
+        days, episode_ids, sources = columns[0], columns[1], columns[2]
+        day_values, bad_days = _parse_column(days, lambda v: np.datetime64(v, 'D'), 'datetime64[D]')
+        flag(bad_days | np.array([not _DATE_RE.match(v) for v in days], dtype=bool), 'day must be in YYYY-MM-DD format')
+        flag(np.array([not _UUID_RE.match(v) for v in episode_ids], dtype=bool), 'episode_id must be a valid UUID')
+        flag(np.array([not v for v in sources], dtype=bool), 'source is required')
+        
+        numeric = {}
+        for index, name in enumerate(self.EXPECTED_HEADERS[3:], start=3):
+            values, bad = _parse_column(columns[index], float, np.float64, empty=np.nan)
+            # A literal "nan" or "inf" parses as a float but is not a value
+            empty = np.array([not v for v in columns[index]], dtype=bool)
+            flag(bad | (~empty & ~np.isfinite(values)), f"{name} must be a number")
+            present = ~empty & np.isfinite(values)
+            values = np.where(present, values, 0.0)
+            if name in self.INTEGER_COLUMNS:
+                flag(present & ((values < 0) | (np.mod(values, 1) != 0)), f"{name} must be a non-negative integer")
+                values, too_large = _parse_integers(columns[index], present)
+                flag(too_large, f"{name} must be at most {_INT64_MAX}")
+            else:
+                flag(present & ((values < 0) | (values > 1)), f"{name} must be between 0 and 1")
+            numeric[name] = (values, present)
+        
+        errors = [
+            f"Row {first_row_num + i}: {'; '.join(messages)}"
+            for i, messages in sorted(row_errors.items())
+        ]
+        if row_errors:
+            valid = np.ones(len(raw_rows), dtype=bool)
+            valid[list(row_errors)] = False
+        else:
+            valid = slice(None)
+        
+        # Convert surviving columns to Python types for the binary COPY codec
+        cells = [
+            np.asarray(day_values)[valid].astype(object).tolist(),
+            [UUID(v) for v in np.asarray(episode_ids, dtype=object)[valid]],
+            np.asarray(sources, dtype=object)[valid].tolist(),
+        ]
+        for name in self.EXPECTED_HEADERS[3:]:
+            values, present = numeric[name]
+            values, present = values[valid], present[valid]
+            converted = values.tolist()
+            cells.append([v if p else None for v, p in zip(converted, present.tolist())])
+        cells.append((np.arange(len(raw_rows)) + first_row_num)[valid].tolist())
+        
+        return list(zip(*cells)), errors
+    
+    async def update_import_progress(
+        self,
+        import_id: str,
+        rows_processed: int,
+        records_failed: int
+    ):
+        """Record streaming progress on the import-tracking record"""
+        query = """
+            UPDATE etl_imports
+            SET records_failed = $2,
+                metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object('rows_processed', $3::int)
+            WHERE import_id = $1::uuid;
+        """
+        
+        await self.postgres_conn.execute(query, import_id, records_failed, rows_processed)
+    
+    async def _iter_csv_chunks(self, stream: Any, chunk_rows: int):
+        """
+        Read an upload incrementally and yield (first_row_num, rows) batches
+        
+        Bytes are decoded incrementally and only complete records are handed
+        to the csv module, so a chunk boundary never splits a multi-byte
+        character or a quoted field.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        pending = ''
+        header_checked = False
+        batch: List[List[str]] = []
+        next_row_num = 2
+        eof = False
+        
+        while not eof:
+            data = await stream.read(self.READ_SIZE)
+            eof = not data
+            pending += decoder.decode(data or b'', final=eof)
+            
+            if eof:
+                complete, pending = pending, ''
+            else:
+                cut = pending.rfind('\n') + 1
+                # Wait for more data if the cut falls inside a quoted field
+                if cut == 0 or pending.count('"', 0, cut) % 2:
+                    continue
+                complete, pending = pending[:cut], pending[cut:]
+            
+            for row in csv.reader(io.StringIO(complete)):
+                if not header_checked:
+                    self._check_header(row)
+                    header_checked = True
+                    continue
+                if not row:
+                    continue
+                batch.append(row)
+                if len(batch) >= chunk_rows:
+                    yield next_row_num, batch
+                    next_row_num += len(batch)
+                    batch = []
+        
+        if not header_checked:
+            raise ValueError("CSV file is empty")
+        if batch:
+            yield next_row_num, batch
+    
+    def _check_header(self, header: List[str]):
+        """Raise ValueError unless the header matches the expected columns"""
+        if header != self.EXPECTED_HEADERS:
+            raise ValueError(
+                f"Invalid CSV header. Expected: {self.EXPECTED_HEADERS}, "
+                f"Got: {header}"
+            )
+    
+    async def _create_staging_table(self, conn):
+        """Create the per-connection staging table"""
+        await conn.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {self.STAGING_TABLE} (
+                day DATE NOT NULL,
+                episode_id UUID NOT NULL,
+                source TEXT NOT NULL,
+                downloads BIGINT,
+                listeners BIGINT,
+                completion_rate DOUBLE PRECISION,
+                ctr DOUBLE PRECISION,
+                conversions BIGINT,
+                revenue_cents BIGINT,
+                row_num INTEGER NOT NULL
+            );
+            TRUNCATE {self.STAGING_TABLE};
+        """)
+    
+    async def _copy_to_staging(self, conn, records: List[tuple]):
+        """Bulk load staging records with COPY"""
+        if not records:
+            return
+        await conn.copy_records_to_table(
+            self.STAGING_TABLE,
+            records=records,
+            columns=self.STAGING_COLUMNS
+        )
+    
+    async def _merge_staging(self, conn, tenant_id: str, import_id: str) -> Dict[str, int]:
+        """
+        Merge the staging table into listener_metrics
+        
+        Existing daily aggregates for the same (day, episode, source) are
+        replaced, so re-uploading a file does not double count. When a file
+        repeats a key the last row wins. Rows whose episode does not exist
+        are counted as failed.
+        """
+        async with conn.transaction():
+            await conn.execute(f"""
+                DELETE FROM listener_metrics lm
+                USING (SELECT DISTINCT day, episode_id, source FROM {self.STAGING_TABLE}) s
+                WHERE lm.tenant_id = $1::uuid
+                  AND lm.metric_type = 'daily_aggregate'
+                  AND lm.episode_id = s.episode_id
+                  AND lm.platform = s.source
+                  AND lm.timestamp = (s.day::timestamp AT TIME ZONE 'UTC');
+            """, tenant_id)
+            
+            row = await conn.fetchrow(f"""
+                WITH latest AS (
+                    SELECT DISTINCT ON (day, episode_id, source) *
+                    FROM {self.STAGING_TABLE}
+                    ORDER BY day, episode_id, source, row_num DESC
+                ),
+                inserted AS (
                     INSERT INTO listener_metrics (
-                        timestamp, episode_id, tenant_id,
+                        timestamp, podcast_id, episode_id, tenant_id,
                         metric_type, value, platform, metadata
                     )
-                    VALUES (
-                        $1::timestamptz,
-                        $2::uuid,
-                        $3::uuid,
+                    SELECT
+                        s.day::timestamp AT TIME ZONE 'UTC',
+                        e.podcast_id,
+                        s.episode_id,
+                        $1::uuid,
                         'daily_aggregate',
-                        COALESCE($4, 0)::numeric,
-                        $5,
+                        COALESCE(s.downloads, 0)::numeric,
+                        s.source,
                         jsonb_build_object(
-                            'import_id', $6,
-                            'listeners', $7,
-                            'completion_rate', $8,
-                            'ctr', $9,
-                            'conversions', $10,
-                            'revenue_cents', $11,
-                            'source', $5
+                            'import_id', $2::text,
+                            'listeners', s.listeners,
+                            'completion_rate', s.completion_rate,
+                            'ctr', s.ctr,
+                            'conversions', s.conversions,
+                            'revenue_cents', s.revenue_cents,
+                            'source', s.source
                         )
-                    );
-                """
-                
-                await self.postgres_conn.execute(
-                    query,
-                    day_dt,
-                    row.episode_id,
-                    tenant_id,
-                    row.downloads,
-                    row.source,
-                    import_id,
-                    row.listeners,
-                    row.completion_rate,
-                    row.ctr,
-                    row.conversions,
-                    row.revenue_cents
+                    FROM latest s
+                    JOIN episodes e ON e.episode_id = s.episode_id
+                    RETURNING 1
                 )
-                
-                imported += 1
-            except Exception as e:
-                logger.error(f"Failed to import row {row.day}/{row.episode_id}: {e}")
-                failed += 1
+                SELECT
+                    (SELECT COUNT(*) FROM inserted) AS imported,
+                    (SELECT COUNT(*) FROM latest) AS total;
+            """, tenant_id, import_id)
         
-        return {'imported': imported, 'failed': failed}
+        imported = row['imported']
+        return {'imported': imported, 'failed': row['total'] - imported}
     
     async def track_import(
         self,
@@ -0,0 +1,110 @@
+"""
+Feed Poll State
+
+Per-feed HTTP validators and incremental-parse markers persisted between
+polls, so unchanged feeds can be skipped without downloading or parsing:
+- etag / last_modified: sent as If-None-Match / If-Modified-Since
+- content_hash: skips parsing when a server ignores conditional requests
+- last_seen_guid: newest entry (by publish date) already ingested
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.database import PostgresConnection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedState:
+    """Conditional-GET and incremental-parse state for one feed"""
+    feed_url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    last_seen_guid: Optional[str] = None
+    feed_info: Dict[str, Any] = field(default_factory=dict)  # Channel-level metadata from the last parse
+
+
+class FeedStateStore(ABC):
+    """Storage for FeedState"""
+    
+    @abstractmethod
+    async def get(self, feed_url: str) -> Optional[FeedState]:
+        pass
+    
+    @abstractmethod
+    async def save(self, state: FeedState):
+        pass
+
+
+class InMemoryFeedStateStore(FeedStateStore):
+    """Process-local store (default; state is lost on restart)"""
+    
+    def __init__(self):
+        self._states: Dict[str, FeedState] = {}
+    
+    async def get(self, feed_url: str) -> Optional[FeedState]:
+        return self._states.get(feed_url)
+    
+    async def save(self, state: FeedState):
+        self._states[state.feed_url] = state
+
+
+class PostgresFeedStateStore(FeedStateStore):
+    """Store backed by the feed_poll_state table"""
+    
+    def __init__(self, postgres_conn: "PostgresConnection"):
+        self.postgres = postgres_conn
+    
+    async def get(self, feed_url: str) -> Optional[FeedState]:
+        row = await self.postgres.fetchrow(
+            """
+            SELECT feed_url, etag, last_modified, content_hash, last_seen_guid, feed_info
+            FROM feed_poll_state
+            WHERE feed_url = $1
+            """,
+            feed_url
+        )
+        if not row:
+            return None
+        feed_info = row["feed_info"]
+        if isinstance(feed_info, str):
+            feed_info = json.loads(feed_info)
+        return FeedState(
+            feed_url=row["feed_url"],
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            content_hash=row["content_hash"],
+            last_seen_guid=row["last_seen_guid"],
+            feed_info=feed_info or {}
+        )
+    
+    async def save(self, state: FeedState):
+        data = asdict(state)
+        await self.postgres.execute(
+            """
+            INSERT INTO feed_poll_state (
+                feed_url, etag, last_modified, content_hash, last_seen_guid, feed_info, updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6::jsonb, NOW())
+            ON CONFLICT (feed_url) DO UPDATE SET
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                content_hash = EXCLUDED.content_hash,
+                last_seen_guid = EXCLUDED.last_seen_guid,
+                feed_info = EXCLUDED.feed_info,
+                updated_at = NOW()
+            """,
+            data["feed_url"],
+            data["etag"],
+            data["last_modified"],
+            data["content_hash"],
+            data["last_seen_guid"],
+            json.dumps(data["feed_info"], default=str)
+        )
@@ -7,10 +7,14 @@ ingestion latency, feed errors, and poll success rates.
 """
 
 import asyncio
+import hashlib
+import heapq
 import logging
+import random
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import feedparser
 import aiohttp
@@ -18,6 +22,7 @@ from urllib.parse import urlparse
 
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
+from src.ingestion.feed_state import FeedState, FeedStateStore, InMemoryFeedStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +62,8 @@ class FeedMetadata:
     language: str
     last_build_date: Optional[datetime]
     episodes: List[EpisodeMetadata]
+    not_modified: bool = False  # True when the feed was unchanged since the last poll
+    pending_state: Optional[FeedState] = None  # Poll state to save once the episodes are stored
 
 
 class RSSIngestService:
@@ -64,7 +71,7 @@ class RSSIngestService:
     RSS Feed Ingestion Service
     
     Handles:
-    - RSS feed polling (every 15 minutes)
+    - RSS feed polling (every 15 minutes, conditional and incremental)
     - Episode metadata extraction
     - Feed validation & normalization
     - Telemetry capture
@@ -74,11 +81,20 @@ class RSSIngestService:
         self,
         metrics_collector: MetricsCollector,
         event_logger: EventLogger,
-        poll_interval: int = 900  # 15 minutes
+        poll_interval: int = 900,  # 15 minutes
+        state_store: Optional[FeedStateStore] = None,
+        max_concurrency: int = 100,
+        per_host_concurrency: int = 4
     ):
         self.metrics = metrics_collector
         self.events = event_logger
         self.poll_interval = poll_interval
+        self.state_store = state_store or InMemoryFeedStateStore()
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}  # Polls holding or waiting on each host semaphore
         self.session: Optional[aiohttp.ClientSession] = None
         
     async def initialize(self):
@@ -95,45 +111,82 @@ class RSSIngestService:
         """
         Poll RSS feed and extract metadata
         
+        Polls are incremental: the request is conditional on the stored
+        ETag/Last-Modified, an identical payload (by hash) is not re-parsed,
+        and only entries published after the last-seen entry are returned.
+        Unchanged feeds return cached channel metadata with no episodes and
+        ``not_modified=True``.
+        
+        The advanced validators are returned as ``pending_state`` rather
+        than saved; call ``save_feed_state`` once the episodes are stored,
+        so a failed store is retried on the next poll.
+        
         Args:
             feed_url: RSS feed URL
             podcast_id: Podcast identifier
             
         Returns:
-            FeedMetadata with episodes
+            FeedMetadata with new episodes
             
         Telemetry:
             - ingestion_latency: Time to fetch and parse feed
             - feed_errors: Feed parsing errors
             - poll_success_rate: Success rate of feed polls
+            - feed_poll_not_modified: Polls skipped by 304 or unchanged payload
         """
         start_time = datetime.now(timezone.utc)
         status = FeedStatus.SUCCESS
         error_message = None
+        error_type = None
         
         try:
-            # Fetch feed
-            feed_data = await self._fetch_feed(feed_url)
+            state = await self.state_store.get(feed_url) or FeedState(feed_url=feed_url)
             
-            # Parse feed
-            parsed_feed = feedparser.parse(feed_data)
+            # Fetch feed (conditional on stored validators)
+            status_code, feed_data, headers = await self._fetch_feed(feed_url, state)
             
-            # Validate feed
-            if parsed_feed.bozo:
-                status = FeedStatus.INVALID
-                error_message = str(parsed_feed.bozo_exception)
-                logger.warning(f"Invalid feed {feed_url}: {error_message}")
+            not_modified_reason = None
+            content_hash = None
+            if status_code == 304:
+                not_modified_reason = "http_304"
+            else:
+                content_hash = hashlib.sha256(feed_data).hexdigest()
+                if content_hash == state.content_hash and state.feed_info:
+                    not_modified_reason = "unchanged_hash"
             
-            # Extract metadata
-            feed_metadata = self._extract_feed_metadata(parsed_feed, feed_url)
+            if not_modified_reason:
+                feed_metadata = self._cached_feed_metadata(state)
+                self.metrics.increment_counter(
+                    "feed_poll_not_modified",
+                    tags={"reason": not_modified_reason}
+                )
+            else:
+                parsed_feed = feedparser.parse(feed_data)
+                
+                # Validate feed
+                if parsed_feed.bozo:
+                    status = FeedStatus.INVALID
+                    error_message = str(parsed_feed.bozo_exception)
+                    logger.warning(f"Invalid feed {feed_url}: {error_message}")
+                
+                # Extract metadata
+                feed_metadata = self._extract_feed_metadata(parsed_feed, feed_url)
+                newest = max(feed_metadata.episodes, key=lambda episode: episode.publish_date, default=None)
+                feed_metadata.episodes = self._episodes_after(feed_metadata.episodes, state.last_seen_guid)
+            
+                # Only advance validators once the payload parsed cleanly
+                if status == FeedStatus.SUCCESS:
+                    feed_metadata.pending_state = FeedState(
+                        feed_url=feed_url,
+                        etag=headers.get("ETag"),
+                        last_modified=headers.get("Last-Modified"),
+                        content_hash=content_hash,
+                        last_seen_guid=newest.guid if newest else state.last_seen_guid,
+                        feed_info=self._feed_info(feed_metadata)
+                    )
             
             # Log success
             latency_ms = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
-            self.metrics.record_histogram(
-                "ingestion_latency",
-                latency_ms,
-                tags={"podcast_id": podcast_id, "feed_url": feed_url}
-            )
             self.metrics.increment_counter(
                 "feed_poll_success",
                 tags={"podcast_id": podcast_id, "status": status.value}
@@ -147,6 +200,7 @@ class RSSIngestService:
                     "podcast_id": podcast_id,
                     "feed_url": feed_url,
                     "status": status.value,
+                    "not_modified": feed_metadata.not_modified,
                     "episode_count": len(feed_metadata.episodes),
                     "latency_ms": latency_ms
                 }
@@ -157,11 +211,13 @@ class RSSIngestService:
         except asyncio.TimeoutError:
             status = FeedStatus.TIMEOUT
             error_message = "Feed fetch timeout"
+            error_type = "TimeoutError"
             logger.error(f"Timeout fetching feed {feed_url}")
             
         except Exception as e:
             status = FeedStatus.ERROR
             error_message = str(e)
+            error_type = type(e).__name__
             logger.error(f"Error fetching feed {feed_url}: {e}")
             
         finally:
@@ -172,12 +228,12 @@ class RSSIngestService:
                 latency_ms,
                 tags={"podcast_id": podcast_id, "status": status.value}
             )
-            self.metrics.increment_counter(
-                "feed_poll_errors",
-                tags={"podcast_id": podcast_id, "error_type": type(e).__name__ if 'e' in locals() else "unknown"}
-            )
             
-            if status != FeedStatus.SUCCESS:
+            if error_type:
+                self.metrics.increment_counter(
+                    "feed_poll_errors",
+                    tags={"podcast_id": podcast_id, "error_type": error_type}
+                )
                 await self.events.log_event(
                     event_type="feed_poll_failed",
                     user_id=None,
@@ -189,20 +245,63 @@ class RSSIngestService:
                     }
                 )
                 
-        if status != FeedStatus.SUCCESS:
-            raise Exception(f"Failed to poll feed: {error_message}")
+        raise Exception(f"Failed to poll feed: {error_message}")
     
-    async def _fetch_feed(self, feed_url: str) -> str:
-        """Fetch RSS feed content"""
+    async def _fetch_feed(self, feed_url: str, state: Optional[FeedState] = None) -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        Fetch RSS feed content
+        
+        Returns:
+            Tuple of (HTTP status, raw body, response headers); the body is
+            empty for 304 Not Modified
+        """
         if not self.session:
             await self.initialize()
             
-        async with self.session.get(feed_url) as response:
+        request_headers = {}
+        if state and state.etag:
+            request_headers["If-None-Match"] = state.etag
+        if state and state.last_modified:
+            request_headers["If-Modified-Since"] = state.last_modified
+        
+        async with self.session.get(feed_url, headers=request_headers) as response:
+            if response.status == 304:
+                return 304, b"", dict(response.headers)
             response.raise_for_status()
-            return await response.text()
+            body = await response.read()
+            self.metrics.increment_counter("feed_bytes_downloaded", value=len(body), tags={})
+            return response.status, body, dict(response.headers)
+    
+    async def save_feed_state(self, feed_metadata: FeedMetadata):
+        """Persist the poll state returned by poll_feed (after its episodes are stored)"""
+        if feed_metadata.pending_state:
+            await self.state_store.save(feed_metadata.pending_state)
+            feed_metadata.pending_state = None
     
-    def _extract_feed_metadata(self, parsed_feed: feedparser.FeedParserDict, feed_url: str) -> FeedMetadata:
-        """Extract feed and episode metadata"""
+    @staticmethod
+    def _episodes_after(episodes: List[EpisodeMetadata], last_seen_guid: Optional[str]) -> List[EpisodeMetadata]:
+        """
+        Episodes published after the last-seen one, in feed order
+        
+        Feeds are not assumed to be sorted, so the last-seen episode is
+        found by GUID and compared by publish date. Episodes published in
+        the same second are kept (stores upsert by GUID); if the last-seen
+        episode is no longer in the feed, every episode is returned.
+        """
+        last_seen = next((episode for episode in episodes if episode.guid == last_seen_guid), None)
+        if last_seen is None:
+            return episodes
+        return [
+            episode for episode in episodes
+            if episode.guid != last_seen.guid and episode.publish_date >= last_seen.publish_date
+        ]
+    
+    def _extract_feed_metadata(
+        self,
+        parsed_feed: feedparser.FeedParserDict,
+        feed_url: str
+    ) -> FeedMetadata:
+        """Extract feed metadata and episodes"""
         feed_info = parsed_feed.feed
         
         # Extract feed metadata
@@ -235,6 +334,37 @@ class RSSIngestService:
             episodes=episodes
         )
     
+    @staticmethod
+    def _feed_info(feed_metadata: FeedMetadata) -> Dict[str, Any]:
+        """Channel-level fields cached in FeedState for not-modified polls"""
+        return {
+            "podcast_title": feed_metadata.podcast_title,
+            "podcast_description": feed_metadata.podcast_description,
+            "podcast_author": feed_metadata.podcast_author,
+            "podcast_image_url": feed_metadata.podcast_image_url,
+            "language": feed_metadata.language,
+            "last_build_date": (
+                feed_metadata.last_build_date.isoformat() if feed_metadata.last_build_date else None
+            ),
+        }
+    
+    @staticmethod
+    def _cached_feed_metadata(state: FeedState) -> FeedMetadata:
+        """FeedMetadata for an unchanged feed (no new episodes)"""
+        info = state.feed_info
+        last_build_date = info.get("last_build_date")
+        return FeedMetadata(
+            feed_url=state.feed_url,
+            podcast_title=info.get("podcast_title", "Unknown"),
+            podcast_description=info.get("podcast_description", ""),
+            podcast_author=info.get("podcast_author", "Unknown"),
+            podcast_image_url=info.get("podcast_image_url"),
+            language=info.get("language", "en"),
+            last_build_date=datetime.fromisoformat(last_build_date) if last_build_date else None,
+            episodes=[],
+            not_modified=True
+        )
+    
     def _extract_episode_metadata(self, entry: Dict[str, Any]) -> Optional[EpisodeMetadata]:
         """Extract episode metadata from feed entry"""
         try:
@@ -300,9 +430,34 @@ class RSSIngestService:
             logger.error(f"Error extracting episode metadata: {e}")
             return None
     
+    async def poll_feed_limited(self, feed_url: str, podcast_id: str) -> FeedMetadata:
+        """
+        Poll a feed once a per-host slot and a global slot are free
+        
+        The host slot is taken first so a slow host queues behind itself
+        without holding global slots other hosts could use. A host's
+        semaphore is dropped once no poll holds or waits on it, so the map
+        only covers hosts with polls in progress.
+        """
+        host = feed_host(feed_url)
+        host_semaphore = self._host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        
+        try:
+            async with host_semaphore:
+                async with self._semaphore:
+                    return await self.poll_feed(feed_url, podcast_id)
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
+    
     async def poll_all_feeds(self, feed_configs: List[Dict[str, str]]) -> Dict[str, FeedMetadata]:
         """
-        Poll multiple feeds concurrently
+        Poll multiple feeds concurrently (within the global and per-host limits)
         
         Args:
             feed_configs: List of dicts with 'feed_url' and 'podcast_id'
@@ -311,7 +466,7 @@ class RSSIngestService:
             Dict mapping podcast_id to FeedMetadata
         """
         tasks = [
-            self.poll_feed(config["feed_url"], config["podcast_id"])
+            self.poll_feed_limited(config["feed_url"], config["podcast_id"])
             for config in feed_configs
         ]
         
@@ -328,60 +483,86 @@ class RSSIngestService:
         return feed_metadata_map
 
 
+def feed_host(feed_url: str) -> str:
+    """Host a feed's per-host concurrency limit applies to"""
+    return urlparse(feed_url).netloc.lower()
+
+
+@dataclass
+class FeedSchedule:
+    """Polling schedule for one feed"""
+    feed_url: str
+    podcast_id: str
+    interval: float
+    next_due: float
+    publish_times: List[float] = field(default_factory=list)  # Recent publish timestamps, ascending
+    consecutive_failures: int = 0
+    in_flight: bool = False
+
+
 class FeedPollScheduler:
     """
     Background scheduler for RSS feed polling
     
-    Polls feeds every 15 minutes and processes updates
+    Each feed has its own due time instead of one global tick:
+    - Feeds are spread across their interval with jitter (no thundering herd)
+    - Intervals adapt to the feed's observed publish cadence, between
+      min_interval and max_interval; failures back off exponentially
+    - In-flight polls are capped at the ingest service's global and per-host
+      concurrency; a due feed whose host is saturated stays queued, so a
+      started poll never waits for a host slot
+    - Queue lag (time between a feed falling due and its poll starting) is
+      reported as feed_poll_queue_lag_seconds
     """
     
     def __init__(
         self,
         ingest_service: RSSIngestService,
         feed_storage: Any,  # FeedStorage interface
-        metrics_collector: MetricsCollector
+        metrics_collector: MetricsCollector,
+        min_interval: float = 300,
+        max_interval: float = 86400,
+        cadence_factor: float = 0.25,
+        jitter: float = 0.1,
+        refresh_interval: Optional[float] = None,
+        history_size: int = 10
     ):
         self.ingest_service = ingest_service
         self.feed_storage = feed_storage
         self.metrics = metrics_collector
         self.running = False
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cadence_factor = cadence_factor
+        self.jitter = jitter
+        self.refresh_interval = refresh_interval or ingest_service.poll_interval
+        self.history_size = history_size
+        self.schedules: Dict[str, FeedSchedule] = {}
+        self._queue: List[Tuple[float, str]] = []  # Heap of (next_due, podcast_id)
+        self._tasks: Set[asyncio.Task] = set()
+        self._host_in_flight: Dict[str, int] = {}
+        self._polls_succeeded = 0
+        self._polls_total = 0
+        self._max_lag = 0.0
         
     async def start(self):
         """Start polling scheduler"""
         self.running = True
         await self.ingest_service.initialize()
+        next_refresh = 0.0
         
         while self.running:
             try:
-                # Get all active feeds
-                feeds = await self.feed_storage.get_active_feeds()
+                now = time.time()
+                if now >= next_refresh:
+                    await self.refresh_feeds(now)
+                    next_refresh = now + self.refresh_interval
                 
-                # Poll all feeds
-                feed_configs = [
-                    {"feed_url": feed["feed_url"], "podcast_id": feed["podcast_id"]}
-                    for feed in feeds
-                ]
+                self.dispatch_due(now)
                 
-                if feed_configs:
-                    results = await self.ingest_service.poll_all_feeds(feed_configs)
-                    
-                    # Store results
-                    for podcast_id, feed_metadata in results.items():
-                        await self.feed_storage.store_feed_metadata(podcast_id, feed_metadata)
-                    
-                    # Record success rate
-                    success_count = len(results)
-                    total_count = len(feed_configs)
-                    success_rate = success_count / total_count if total_count > 0 else 0
-                    
-                    self.metrics.record_gauge(
-                        "feed_poll_success_rate",
-                        success_rate * 100,
-                        tags={}
-                    )
-                
-                # Wait for next poll interval
-                await asyncio.sleep(self.ingest_service.poll_interval)
+                # Sleep until the next feed is due (or the next refresh)
+                wake_at = min(self._queue[0][0] if self._queue else next_refresh, next_refresh)
+                await asyncio.sleep(min(max(wake_at - time.time(), 0.05), 1.0))
                 
             except Exception as e:
                 logger.error(f"Error in feed poll scheduler: {e}")
@@ -394,4 +575,160 @@ class FeedPollScheduler:
     async def stop(self):
         """Stop polling scheduler"""
         self.running = False
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
         await self.ingest_service.cleanup()
+    
+    async def refresh_feeds(self, now: Optional[float] = None):
+        """Sync schedules with the active feed list; new feeds get a random first due time"""
+        now = time.time() if now is None else now
+        feeds = await self.feed_storage.get_active_feeds()
+        active = {feed["podcast_id"]: feed["feed_url"] for feed in feeds}
+        
+        for podcast_id in list(self.schedules):
+            if podcast_id not in active:
+                del self.schedules[podcast_id]
+        
+        for podcast_id, feed_url in active.items():
+            schedule = self.schedules.get(podcast_id)
+            if schedule:
+                schedule.feed_url = feed_url
+                continue
+            interval = float(self.ingest_service.poll_interval)
+            schedule = FeedSchedule(
+                feed_url=feed_url,
+                podcast_id=podcast_id,
+                interval=interval,
+                next_due=now + random.uniform(0, interval)
+            )
+            self.schedules[podcast_id] = schedule
+            heapq.heappush(self._queue, (schedule.next_due, podcast_id))
+        
+        # Success rate over the previous refresh period
+        if self._polls_total:
+            self.metrics.record_gauge(
+                "feed_poll_success_rate",
+                self._polls_succeeded / self._polls_total * 100,
+                tags={}
+            )
+        self._polls_succeeded = self._polls_total = 0
+    
+    def dispatch_due(self, now: Optional[float] = None) -> int:
+        """
+        Start polls for due feeds, up to the global and per-host concurrency limits
+        
+        Feeds on a host that already has per_host_concurrency polls in
+        flight are put back on the queue with their original due time and
+        retried on a later dispatch.
+        
+        Returns:
+            Number of polls started
+        """
+        now = time.time() if now is None else now
+        started = 0
+        deferred: List[Tuple[float, str]] = []
+        
+        while self._queue and self._queue[0][0] <= now:
+            if len(self._tasks) >= self.ingest_service.max_concurrency:
+                break
+            due, podcast_id = heapq.heappop(self._queue)
+            schedule = self.schedules.get(podcast_id)
+            if not schedule or schedule.in_flight or schedule.next_due != due:
+                continue  # Removed or rescheduled since it was queued
+            host = feed_host(schedule.feed_url)
+            if self._host_in_flight.get(host, 0) >= self.ingest_service.per_host_concurrency:
+                deferred.append((due, podcast_id))
+                continue
+            
+            lag = now - due
+            self._max_lag = max(self._max_lag, lag)
+            self.metrics.record_histogram("feed_poll_queue_lag_seconds", lag, tags={})
+            
+            schedule.in_flight = True
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+            task = asyncio.create_task(self._poll(schedule, host))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        
+        for item in deferred:
+            heapq.heappush(self._queue, item)
+        
+        self.metrics.record_gauge("feed_poll_queue_depth", self.queue_depth(now), tags={})
+        return started
+    
+    def queue_depth(self, now: Optional[float] = None) -> int:
+        """Number of feeds that are due but not yet polling"""
+        now = time.time() if now is None else now
+        return sum(
+            1 for schedule in self.schedules.values()
+            if schedule.next_due <= now and not schedule.in_flight
+        )
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Scheduler health: feeds, due backlog, in-flight polls and worst lag seen"""
+        now = time.time()
+        return {
+            "feeds": len(self.schedules),
+            "due": self.queue_depth(now),
+            "in_flight": len(self._tasks),
+            "max_lag_seconds": self._max_lag,
+        }
+    
+    async def _poll(self, schedule: FeedSchedule, host: str):
+        """Poll one feed, store new episodes and schedule the next poll"""
+        self._polls_total += 1
+        try:
+            feed_metadata = await self.ingest_service.poll_feed_limited(
+                schedule.feed_url, schedule.podcast_id
+            )
+            if not feed_metadata.not_modified:
+                await self.feed_storage.store_feed_metadata(schedule.podcast_id, feed_metadata)
+                await self.ingest_service.save_feed_state(feed_metadata)
+            self._record_publishes(schedule, feed_metadata.episodes)
+            schedule.consecutive_failures = 0
+            self._polls_succeeded += 1
+        except Exception as e:
+            logger.error(f"Error polling feed for {schedule.podcast_id}: {e}")
+            schedule.consecutive_failures += 1
+        finally:
+            schedule.in_flight = False
+            remaining = self._host_in_flight.pop(host, 0) - 1
+            if remaining > 0:
+                self._host_in_flight[host] = remaining
+            if self.schedules.get(schedule.podcast_id) is schedule:
+                self._reschedule(schedule, time.time())
+    
+    def _record_publishes(self, schedule: FeedSchedule, episodes: List[EpisodeMetadata]):
+        if not episodes:
+            return
+        times = set(schedule.publish_times)
+        times.update(episode.publish_date.timestamp() for episode in episodes)
+        schedule.publish_times = sorted(times)[-self.history_size:]
+    
+    def compute_interval(self, schedule: FeedSchedule, now: float) -> float:
+        """
+        Poll interval from the feed's publish cadence
+        
+        The expected gap is the median gap between recent episodes; if the
+        feed has been quiet for longer than that, the time since the last
+        episode is used instead so dormant feeds slow down. The interval is
+        cadence_factor of that, clamped, and doubled per consecutive failure.
+        """
+        interval = float(self.ingest_service.poll_interval)
+        times = schedule.publish_times
+        if len(times) >= 2:
+            gaps = sorted(later - earlier for earlier, later in zip(times, times[1:]))
+            expected_gap = gaps[len(gaps) // 2]
+            interval = max(expected_gap, now - times[-1]) * self.cadence_factor
+        
+        if schedule.consecutive_failures:
+            interval *= 2 ** min(schedule.consecutive_failures, 10)
+        
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def _reschedule(self, schedule: FeedSchedule, now: float):
+        schedule.interval = self.compute_interval(schedule, now)
+        spread = schedule.interval * self.jitter
+        schedule.next_due = now + schedule.interval + random.uniform(-spread, spread)
+        heapq.heappush(self._queue, (schedule.next_due, schedule.podcast_id))
@@ -15,19 +15,25 @@ from fastapi import FastAPI
 from src.config import config
 from src.config.validation import load_and_validate_env
 from src.database import PostgresConnection, TimescaleConnection, RedisConnection
+from src.cache import CacheManager, CacheSerializer, get_codec
+from src.analytics.dashboard_materializer import DashboardMaterializer
+from src.analytics.user_activity_rollup import UserActivityRollup
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
+from src.telemetry.event_sinks import PostgresEventSink
 from src.telemetry.structured_logging import StructuredLogger, LogLevel
 from src.telemetry.tracing import setup_tracing
 from src.monitoring.health import HealthCheckService
-from src.tenants import TenantManager
+from src.tenants import TenantManager, TenantCacheInvalidator
+from src.monetization.usage_meter import UsageMeter
 from src.attribution import AttributionEngine
 from src.attribution.cross_platform import CrossPlatformAttribution
-from src.ai import AIFramework, ContentAnalyzer
+from src.ai import AIFramework, AIResultCache, ContentAnalyzer
 from src.ai.framework import AIProvider
 from src.cost import CostTracker
 from src.security.auth import OAuth2Provider, MFAProvider, APIKeyManager
 from src.security.authorization import RBACManager, ABACManager, PermissionEngine
+from src.security.rate_limiting import init_rate_limiter
 from src.backup import BackupManager, RestoreManager
 from src.disaster_recovery import FailoverManager, ReplicationManager
 from src.optimization import ABTestingFramework, ChurnPredictor, ChurnAnalyzer, OnboardingAnalyzer
@@ -46,6 +52,8 @@ from src.ai import PredictiveEngine
 from src.features.flags import FeatureFlagService
 from src.email.email_service import EmailService, EmailProvider
 from src.email.email_queue import EmailQueue
+from src.reporting.report_generator import ReportGenerator
+from src.reporting.batch_reports import BatchReportScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -109,14 +117,43 @@ async def lifespan(app: FastAPI):
         port=config.database.redis_port,
         password=config.database.redis_password
     )
+    # Cache payloads are binary (see src.cache.codecs), so the cache gets its own client
+    cache_redis_conn = RedisConnection(
+        host=config.database.redis_host,
+        port=config.database.redis_port,
+        password=config.database.redis_password,
+        decode_responses=False
+    )
     
     await postgres_conn.initialize()
     await timescale_conn.initialize()
     await redis_conn.initialize()
+    await cache_redis_conn.initialize()
     
     # Initialize services
     metrics_collector = MetricsCollector()
-    event_logger = EventLogger()
+    event_logger = EventLogger(
+        metrics_collector=metrics_collector,
+        postgres_conn=postgres_conn,
+        # Stored events also update the daily active-user sketches
+        sink=PostgresEventSink(postgres_conn, rollup=UserActivityRollup(postgres_conn)),
+        spill_directory=os.getenv("EVENT_SPILL_DIR")
+    )
+    
+    # Shared (Redis-backed) rate limiter used by the WAF and API rate limits
+    rate_limiter = init_rate_limiter(redis_conn.client, metrics_collector)
+    
+    # Shared two-tier (local + Redis) cache for API responses
+    cache_manager = CacheManager(
+        redis_client=cache_redis_conn.client,
+        metrics_collector=metrics_collector,
+        max_local_bytes=int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024))),
+        serializer=CacheSerializer(
+            codec=get_codec(os.getenv("CACHE_CODEC") or None),
+            compress_threshold_bytes=int(os.getenv("CACHE_COMPRESS_THRESHOLD_BYTES", "1024")),
+            metrics_collector=metrics_collector
+        )
+    )
     
     # Initialize health check service
     health_service = HealthCheckService(
@@ -141,6 +178,38 @@ async def lifespan(app: FastAPI):
         event_logger=event_logger,
         postgres_conn=postgres_conn
     )
+    tenant_cache_invalidator = TenantCacheInvalidator(postgres_conn, tenant_manager.cache)
+    await tenant_cache_invalidator.start()
+    
+    # Write-behind API usage metering (read by APIUsageMiddleware from app state)
+    usage_meter = UsageMeter(
+        postgres_conn=postgres_conn,
+        metrics_collector=metrics_collector,
+        journal_directory=os.getenv("USAGE_METER_JOURNAL_DIR")
+    )
+    await usage_meter.start()
+    
+    # Incrementally maintained dashboard summary tables (read by api/dashboard.py)
+    dashboard_materializer = DashboardMaterializer(
+        postgres_conn=postgres_conn,
+        metrics_collector=metrics_collector,
+        refresh_interval=float(os.getenv("DASHBOARD_REFRESH_INTERVAL_SECONDS", "5"))
+    )
+    await dashboard_materializer.start()
+    
+    # Report generator (shared section cache and render worker pool)
+    report_generator = ReportGenerator(
+        metrics_collector=metrics_collector,
+        event_logger=event_logger,
+        postgres_conn=postgres_conn,
+        render_workers=int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+    )
+    batch_report_scheduler = BatchReportScheduler(
+        report_generator=report_generator,
+        postgres_conn=postgres_conn,
+        timescale_conn=timescale_conn,
+        metrics_collector=metrics_collector
+    )
     
     # Initialize attribution engine
     attribution_engine = AttributionEngine(
@@ -158,7 +227,12 @@ async def lifespan(app: FastAPI):
     
     ai_framework = AIFramework(
         primary_provider=AIProvider.OPENAI if AIProvider.OPENAI in ai_api_keys else (list(ai_api_keys.keys())[0] if ai_api_keys else None),
-        api_keys=ai_api_keys
+        api_keys=ai_api_keys,
+        cache=AIResultCache(
+            redis_conn=redis_conn,
+            metrics_collector=metrics_collector,
+            ttl_seconds=int(os.getenv("AI_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+        )
     )
     
     content_analyzer = ContentAnalyzer(
@@ -398,7 +472,13 @@ async def lifespan(app: FastAPI):
     app.state.stripe_processor = stripe_processor
     app.state.timescale_conn = timescale_conn
     app.state.redis_conn = redis_conn
+    app.state.rate_limiter = rate_limiter
+    app.state.cache_manager = cache_manager
+    app.state.dashboard_materializer = dashboard_materializer
     app.state.tenant_manager = tenant_manager
+    app.state.usage_meter = usage_meter
+    app.state.report_generator = report_generator
+    app.state.batch_report_scheduler = batch_report_scheduler
     app.state.attribution_engine = attribution_engine
     app.state.cross_platform_attribution = cross_platform_attribution
     app.state.ai_framework = ai_framework
@@ -451,15 +531,23 @@ async def lifespan(app: FastAPI):
     structured_logger.info("Shutting down application...")
     
     await smart_scheduler.stop()
+    await tenant_cache_invalidator.stop()
+    await usage_meter.stop()
+    await dashboard_materializer.stop()
+    await batch_report_scheduler.stop()
+    report_generator.shutdown()
     
     # Stop email queue
     await email_queue.stop()
     
+    # Flush buffered events while the sink's database connection is still open
+    await event_logger.cleanup()
+    
     # Close connections
     await postgres_conn.close()
     await timescale_conn.close()
     await redis_conn.close()
-    await event_logger.cleanup()
+    await cache_redis_conn.close()
     
     structured_logger.info("Application shutdown complete")
 
@@ -89,11 +89,14 @@ async def metrics():
     """Prometheus metrics endpoint"""
     from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
     
-    # Convert internal metrics to Prometheus format
-    # In production, use prometheus_client directly
+    # prometheus_client registry plus the aggregated internal metrics
+    content = generate_latest()
+    metrics_collector = getattr(app.state, "metrics_collector", None)
+    if metrics_collector:
+        content += metrics_collector.render_prometheus().encode("utf-8")
     
     return Response(
-        content=generate_latest(),
+        content=content,
         media_type=CONTENT_TYPE_LATEST
     )
 
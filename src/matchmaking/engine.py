@@ -5,10 +5,15 @@ Computes advertiser-podcast match scores using geo/demo/topic overlaps,
 historical lift, inventory fit, and brand safety signals.
 """
 
+import itertools
+import json
 import logging
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from datetime import datetime, timezone
-from uuid import uuid4
+from uuid import UUID, uuid4
+
+import numpy as np
 
 from src.database import PostgresConnection
 from src.telemetry.metrics import MetricsCollector
@@ -21,9 +26,22 @@ class MatchmakingEngine:
     """
     DELTA:20251113_064143 Matchmaking Engine
     
-    Computes match scores (0-100) for advertiser-podcast pairs.
+    Computes match scores (0-100) for advertiser-podcast pairs. Scoring is
+    matrix based: signals for a whole set of advertisers and podcasts are
+    loaded with set-based queries and scored with NumPy.
     """
     
+    # Weights: geo=0.15, demo=0.20, topic=0.25, lift=0.20, inventory=0.15, brand_safety=0.05 (penalty)
+    WEIGHTS = {
+        'geo_overlap': 0.15,
+        'demographic_overlap': 0.20,
+        'topic_overlap': 0.25,
+        'historical_lift': 0.20,
+        'inventory_fit': 0.15,
+        'brand_safety': 0.05,
+    }
+    UPSERT_BATCH_SIZE = 10000
+    
     def __init__(
         self,
         postgres_conn: PostgresConnection,
@@ -46,176 +64,147 @@ class MatchmakingEngine:
         Returns:
             Dict with 'score' (0-100), 'rationale' (text), 'signals' (JSONB)
         """
-        signals = {}
-        rationale_parts = []
-        
-        # 1. Geo Overlap (if available)
-        geo_score = await self._calculate_geo_overlap(advertiser_id, podcast_id, tenant_id)
-        signals['geo_overlap'] = geo_score
-        if geo_score > 0:
-            rationale_parts.append(f"Geo overlap: {geo_score:.1%}")
+        matrix = await self.calculate_match_matrix([advertiser_id], [podcast_id], tenant_id)
+        return matrix.pair(0, 0)
         
-        # 2. Demographic Overlap (if available)
-        demo_score = await self._calculate_demo_overlap(advertiser_id, podcast_id, tenant_id)
-        signals['demographic_overlap'] = demo_score
-        if demo_score > 0:
-            rationale_parts.append(f"Demographic overlap: {demo_score:.1%}")
-        
-        # 3. Topic Overlap (if available)
-        topic_score = await self._calculate_topic_overlap(advertiser_id, podcast_id, tenant_id)
-        signals['topic_overlap'] = topic_score
-        if topic_score > 0:
-            rationale_parts.append(f"Topic overlap: {topic_score:.1%}")
+    async def calculate_match_matrix(
+        self,
+        advertiser_ids: List[str],
+        podcast_ids: List[str],
+        tenant_id: str
+    ) -> "MatchMatrix":
+        """
+        Score every advertiser x podcast pair at once
         
-        # 4. Historical Lift (if available)
-        lift_score = await self._calculate_historical_lift(advertiser_id, podcast_id, tenant_id)
-        signals['historical_lift'] = lift_score
-        if lift_score > 0:
-            rationale_parts.append(f"Historical lift: {lift_score:.1%}")
+        Signals are loaded with one query per signal family for the whole
+        set (not per pair) and combined into the score matrix with NumPy.
         
-        # 5. Inventory Fit
-        inventory_score = await self._calculate_inventory_fit(podcast_id, tenant_id)
-        signals['inventory_fit'] = inventory_score
-        if inventory_score > 0:
-            rationale_parts.append(f"Inventory fit: {inventory_score:.1%}")
+        Returns:
+            MatchMatrix with scores and signal matrices (advertisers x podcasts)
+        """
+        shape = (len(advertiser_ids), len(podcast_ids))
         
-        # 6. Brand Safety
-        brand_safety_score = await self._calculate_brand_safety(podcast_id, tenant_id)
-        signals['brand_safety'] = brand_safety_score
-        if brand_safety_score < 1.0:
-            rationale_parts.append(f"Brand safety: {brand_safety_score:.1%}")
+        # 1-3. Geo, demographic and topic overlap
+        # Placeholder: no targeting data yet, so every pair is neutral (0.5)
+        geo = np.full(shape, 0.5)
+        demo = np.full(shape, 0.5)
+        topic = np.full(shape, 0.5)
         
+        # 4. Historical lift (per pair)
+        lift = await self._load_historical_lift(advertiser_ids, podcast_ids, tenant_id)
+    
+        # 5-6. Inventory fit and brand safety (per podcast, broadcast across advertisers)
+        inventory, brand_safety = await self._load_podcast_signals(podcast_ids)
+        inventory = np.broadcast_to(inventory, shape)
+        brand_safety = np.broadcast_to(brand_safety, shape)
+    
         # Weighted sum (normalize to 0-100)
-        # Weights: geo=0.15, demo=0.20, topic=0.25, lift=0.20, inventory=0.15, brand_safety=0.05 (penalty)
-        weighted_score = (
-            geo_score * 0.15 +
-            demo_score * 0.20 +
-            topic_score * 0.25 +
-            lift_score * 0.20 +
-            inventory_score * 0.15 +
-            brand_safety_score * 0.05
+        weighted = (
+            geo * self.WEIGHTS['geo_overlap'] +
+            demo * self.WEIGHTS['demographic_overlap'] +
+            topic * self.WEIGHTS['topic_overlap'] +
+            lift * self.WEIGHTS['historical_lift'] +
+            inventory * self.WEIGHTS['inventory_fit'] +
+            brand_safety * self.WEIGHTS['brand_safety']
         ) * 100
-        
+    
         # Apply brand safety penalty (if < 1.0, reduce score)
-        if brand_safety_score < 1.0:
-            weighted_score *= brand_safety_score
-        
-        final_score = max(0, min(100, weighted_score))
-        
-        rationale = "; ".join(rationale_parts) if rationale_parts else "Insufficient data for scoring"
+        weighted = np.where(brand_safety < 1.0, weighted * brand_safety, weighted)
+        scores = np.round(np.clip(weighted, 0, 100), 2)
         
-        return {
-            'score': round(final_score, 2),
-            'rationale': rationale,
-            'signals': signals
-        }
-    
-    async def _calculate_geo_overlap(
-        self,
-        advertiser_id: str,
-        podcast_id: str,
-        tenant_id: str
-    ) -> float:
-        """Calculate geographic overlap (0-1)"""
-        # Placeholder: If advertiser/sponsor has target_geo metadata, compare with podcast listener geo
-        # For now, return 0.5 (neutral)
-        return 0.5
-    
-    async def _calculate_demo_overlap(
-        self,
-        advertiser_id: str,
-        podcast_id: str,
-        tenant_id: str
-    ) -> float:
-        """Calculate demographic overlap (0-1)"""
-        # Placeholder: Compare advertiser target demographics with podcast listener demographics
-        # For now, return 0.5 (neutral)
-        return 0.5
-    
-    async def _calculate_topic_overlap(
-        self,
-        advertiser_id: str,
-        podcast_id: str,
-        tenant_id: str
-    ) -> float:
-        """Calculate topic overlap (0-1)"""
-        # Placeholder: Compare advertiser industry/category with podcast categories
-        # For now, return 0.5 (neutral)
-        return 0.5
+        return MatchMatrix(
+            advertiser_ids=list(advertiser_ids),
+            podcast_ids=list(podcast_ids),
+            scores=scores,
+            signals={
+                'geo_overlap': geo,
+                'demographic_overlap': demo,
+                'topic_overlap': topic,
+                'historical_lift': lift,
+                'inventory_fit': inventory,
+                'brand_safety': brand_safety,
+            }
+        )
     
-    async def _calculate_historical_lift(
+    async def _load_historical_lift(
         self,
-        advertiser_id: str,
-        podcast_id: str,
+        advertiser_ids: List[str],
+        podcast_ids: List[str],
         tenant_id: str
-    ) -> float:
-        """Calculate historical lift (0-1)"""
-        # Check if advertiser has previous campaigns with this podcast
+    ) -> np.ndarray:
+        """Historical lift (0-1) for every pair: 0.7 with completed campaigns, else 0.3"""
+        lift = np.full((len(advertiser_ids), len(podcast_ids)), 0.3)
+        if not advertiser_ids or not podcast_ids:
+            return lift
+        
         query = """
-            SELECT COUNT(*) as campaign_count,
-                   AVG(attributed_conversions) as avg_conversions
+            SELECT c.sponsor_id, c.podcast_id, COUNT(*) as campaign_count
             FROM campaigns c
             JOIN attribution_events ae ON ae.campaign_id = c.campaign_id
-            WHERE c.sponsor_id = $1::uuid
-              AND c.podcast_id = $2::uuid
+            WHERE c.sponsor_id = ANY($1::uuid[])
+              AND c.podcast_id = ANY($2::uuid[])
               AND c.tenant_id = $3::uuid
-              AND c.status = 'completed';
+              AND c.status = 'completed'
+            GROUP BY c.sponsor_id, c.podcast_id;
         """
         
-        row = await self.postgres_conn.fetchrow(query, advertiser_id, podcast_id, tenant_id)
+        rows = await self.postgres_conn.fetch(query, advertiser_ids, podcast_ids, tenant_id)
         
-        if row and row['campaign_count'] > 0:
-            # Normalize: if avg_conversions > 0, return higher score
-            # For now, return 0.7 if historical data exists
-            return 0.7
+        advertiser_index = {str(advertiser_id): i for i, advertiser_id in enumerate(advertiser_ids)}
+        podcast_index = {str(podcast_id): j for j, podcast_id in enumerate(podcast_ids)}
+        for row in rows:
+            i = advertiser_index.get(str(row['sponsor_id']))
+            j = podcast_index.get(str(row['podcast_id']))
+            if i is not None and j is not None and row['campaign_count'] > 0:
+                lift[i, j] = 0.7
+        return lift
         
-        return 0.3  # No historical data
-    
-    async def _calculate_inventory_fit(
-        self,
-        podcast_id: str,
-        tenant_id: str
-    ) -> float:
-        """Calculate inventory fit (0-1) - availability of ad slots"""
-        # Check for available episodes with ad slots
-        query = """
-            SELECT COUNT(*) as episode_count
-            FROM episodes e
-            WHERE e.podcast_id = $1::uuid
-              AND e.publish_date > NOW() - INTERVAL '30 days'
-              AND (e.ad_slots IS NULL OR jsonb_array_length(e.ad_slots) < 3);
+    async def _load_podcast_signals(self, podcast_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
         """
+        Inventory fit and brand safety (0-1) for every podcast in one query
         
-        row = await self.postgres_conn.fetchrow(query, podcast_id)
-        
-        if row and row['episode_count'] > 0:
-            # Normalize: more episodes = better fit
-            return min(1.0, row['episode_count'] / 10.0)
-        
-        return 0.2  # Low inventory
+        Inventory fit counts recent episodes with fewer than 3 ad slots
+        (10+ episodes = 1.0, none = 0.2). Brand safety penalizes the share
+        of explicit episodes (1.0 when the podcast has no episodes).
+        """
+        inventory = np.full(len(podcast_ids), 0.2)
+        brand_safety = np.ones(len(podcast_ids))
+        if not podcast_ids:
+            return inventory, brand_safety
     
-    async def _calculate_brand_safety(
-        self,
-        podcast_id: str,
-        tenant_id: str
-    ) -> float:
-        """Calculate brand safety score (0-1) - explicit content check"""
-        # Check if podcast/episodes are marked explicit
         query = """
-            SELECT COUNT(*) FILTER (WHERE explicit = TRUE) as explicit_count,
+            SELECT podcast_id,
+                   COUNT(*) FILTER (
+                       WHERE publish_date > NOW() - INTERVAL '30 days'
+                         AND (ad_slots IS NULL OR jsonb_array_length(ad_slots) < 3)
+                   ) as episode_count,
+                   COUNT(*) FILTER (WHERE explicit = TRUE) as explicit_count,
                    COUNT(*) as total_episodes
             FROM episodes
-            WHERE podcast_id = $1::uuid;
+            WHERE podcast_id = ANY($1::uuid[])
+            GROUP BY podcast_id;
         """
         
-        row = await self.postgres_conn.fetchrow(query, podcast_id)
+        rows = await self.postgres_conn.fetch(query, podcast_ids)
+        if not rows:
+            return inventory, brand_safety
         
-        if row and row['total_episodes'] > 0:
-            explicit_ratio = row['explicit_count'] / row['total_episodes']
-            # Penalize explicit content
-            return max(0.0, 1.0 - explicit_ratio * 0.5)
+        podcast_index = {str(podcast_id): j for j, podcast_id in enumerate(podcast_ids)}
+        found = [(podcast_index.get(str(row['podcast_id'])), row) for row in rows]
+        found = [(j, row) for j, row in found if j is not None]
+        if not found:
+            return inventory, brand_safety
         
-        return 1.0  # No explicit content detected
+        index = np.array([j for j, _ in found])
+        episode_count = np.array([row['episode_count'] for _, row in found], dtype=float)
+        explicit_count = np.array([row['explicit_count'] for _, row in found], dtype=float)
+        total_episodes = np.array([row['total_episodes'] for _, row in found], dtype=float)
+        
+        inventory[index] = np.where(episode_count > 0, np.minimum(1.0, episode_count / 10.0), 0.2)
+        has_episodes = total_episodes > 0
+        explicit_ratio = np.divide(explicit_count, total_episodes, out=np.zeros_like(explicit_count), where=has_episodes)
+        brand_safety[index] = np.where(has_episodes, np.maximum(0.0, 1.0 - explicit_ratio * 0.5), 1.0)
+        return inventory, brand_safety
     
     async def save_match(
         self,
@@ -258,3 +247,144 @@ class MatchmakingEngine:
         )
         
         return str(result)
+    
+    async def save_matches(self, matrix: "MatchMatrix", tenant_id: str) -> Dict[Tuple[str, str], str]:
+        """
+        Upsert every pair of a match matrix
+        
+        Pairs are pulled from the matrix UPSERT_BATCH_SIZE at a time and each
+        chunk is written with ``executemany`` as soon as it is produced, so
+        only one chunk of rows is held in memory. All chunks run in one
+        transaction, and the match ids are read back with one query at the end.
+        
+        Returns:
+            Dict mapping (advertiser_id, podcast_id) to match_id
+        """
+        upsert_query = """
+            INSERT INTO matches (
+                match_id, tenant_id, advertiser_id, podcast_id,
+                score, rationale, signals, created_at, updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, NOW(), NOW())
+            ON CONFLICT (tenant_id, advertiser_id, podcast_id)
+            DO UPDATE SET
+                score = EXCLUDED.score,
+                rationale = EXCLUDED.rationale,
+                signals = EXCLUDED.signals,
+                updated_at = NOW()
+        """
+        match_ids_query = """
+            SELECT match_id, advertiser_id, podcast_id
+            FROM matches
+            WHERE tenant_id = $1
+              AND advertiser_id = ANY($2::uuid[])
+              AND podcast_id = ANY($3::uuid[])
+        """
+        
+        pairs = matrix.iter_pairs()
+        pair_count = 0
+        match_ids: Dict[Tuple[str, str], str] = {}
+        # Returned UUIDs are canonical; map them back to the ids the caller passed
+        advertiser_keys = {str(UUID(str(advertiser_id))): advertiser_id for advertiser_id in matrix.advertiser_ids}
+        podcast_keys = {str(UUID(str(podcast_id))): podcast_id for podcast_id in matrix.podcast_ids}
+        
+        async with self.postgres_conn.acquire() as conn:
+            async with conn.transaction():
+                while True:
+                    batch = list(itertools.islice(pairs, self.UPSERT_BATCH_SIZE))
+                    if not batch:
+                        break
+                    await conn.executemany(upsert_query, [
+                        (
+                            str(uuid4()), tenant_id, advertiser_id, podcast_id,
+                            result['score'], result['rationale'], json.dumps(result['signals'])
+                        )
+                        for advertiser_id, podcast_id, result in batch
+                    ])
+                    pair_count += len(batch)
+                
+                rows = await conn.fetch(
+                    match_ids_query, tenant_id, list(advertiser_keys), list(podcast_keys)
+                )
+                for row in rows:
+                    key = (advertiser_keys[str(row['advertiser_id'])], podcast_keys[str(row['podcast_id'])])
+                    match_ids[key] = str(row['match_id'])
+        
+        self.metrics_collector.increment_counter(
+            "matches_recalculated",
+            value=pair_count,
+            tags={"tenant_id": tenant_id}
+        )
+        return match_ids
+    
+    async def recalculate_matches(
+        self,
+        advertiser_ids: List[str],
+        podcast_ids: List[str],
+        tenant_id: str
+    ) -> Tuple["MatchMatrix", Dict[Tuple[str, str], str]]:
+        """
+        Score and persist a full advertiser x podcast matrix
+        
+        Returns:
+            Tuple of (MatchMatrix, match ids by (advertiser_id, podcast_id))
+        """
+        matrix = await self.calculate_match_matrix(advertiser_ids, podcast_ids, tenant_id)
+        match_ids = await self.save_matches(matrix, tenant_id)
+        return matrix, match_ids
+
+
+@dataclass
+class MatchMatrix:
+    """Scores and signals for advertisers (rows) x podcasts (columns)"""
+    advertiser_ids: List[str]
+    podcast_ids: List[str]
+    scores: np.ndarray
+    signals: Dict[str, np.ndarray]
+    
+    def pair(self, i: int, j: int) -> Dict[str, Any]:
+        """Result for one pair, in calculate_match_score format"""
+        signals = {name: float(values[i, j]) for name, values in self.signals.items()}
+        return {
+            'score': float(self.scores[i, j]),
+            'rationale': build_rationale(signals),
+            'signals': signals
+        }
+    
+    def iter_pairs(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (advertiser_id, podcast_id, result) for every pair"""
+        # Convert to Python floats once rather than per cell
+        scores = self.scores.tolist()
+        signals = {name: values.tolist() for name, values in self.signals.items()}
+        for i, advertiser_id in enumerate(self.advertiser_ids):
+            for j, podcast_id in enumerate(self.podcast_ids):
+                pair_signals = {name: values[i][j] for name, values in signals.items()}
+                yield advertiser_id, podcast_id, {
+                    'score': scores[i][j],
+                    'rationale': build_rationale(pair_signals),
+                    'signals': pair_signals
+                }
+
+
+RATIONALE_LABELS = [
+    ('geo_overlap', "Geo overlap"),
+    ('demographic_overlap', "Demographic overlap"),
+    ('topic_overlap', "Topic overlap"),
+    ('historical_lift', "Historical lift"),
+    ('inventory_fit', "Inventory fit"),
+    ('brand_safety', "Brand safety"),
+]
+
+
+def build_rationale(signals: Dict[str, float]) -> str:
+    """Human-readable rationale for a pair's signals"""
+    rationale_parts = []
+    for name, label in RATIONALE_LABELS:
+        value = signals[name]
+        if name == 'brand_safety':
+            if value < 1.0:
+                rationale_parts.append(f"{label}: {value:.1%}")
+        elif value > 0:
+            rationale_parts.append(f"{label}: {value:.1%}")
+    return "; ".join(rationale_parts) if rationale_parts else "Insufficient data for scoring"
+
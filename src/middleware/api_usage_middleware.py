@@ -2,10 +2,15 @@
 DELTA:20251113_064143 API Usage Middleware
 
 Middleware to track API calls for billing.
+
+Calls are counted by the application's UsageMeter (app.state.usage_meter),
+which aggregates them in memory and writes rollups in the background, so
+requests never wait on a metering write.
 """
 
 import time
 import logging
+from typing import Optional
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -13,6 +18,7 @@ from src.database import PostgresConnection
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
 from src.monetization.api_usage_tracker import APIUsageTracker
+from src.monetization.usage_meter import UsageMeter
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +26,19 @@ logger = logging.getLogger(__name__)
 class APIUsageMiddleware(BaseHTTPMiddleware):
     """DELTA:20251113_064143 API usage tracking middleware"""
     
-    def __init__(self, app, postgres_conn: PostgresConnection, metrics_collector: MetricsCollector, event_logger: EventLogger):
+    def __init__(
+        self,
+        app,
+        postgres_conn: PostgresConnection,
+        metrics_collector: MetricsCollector,
+        event_logger: EventLogger,
+        usage_meter: Optional[UsageMeter] = None
+    ):
         super().__init__(app)
         self.postgres_conn = postgres_conn
         self.metrics = metrics_collector
         self.events = event_logger
+        self.usage_meter = usage_meter
         self.tracker = APIUsageTracker(postgres_conn, metrics_collector, event_logger)
     
     async def dispatch(self, request: Request, call_next):
@@ -51,18 +65,7 @@ class APIUsageMiddleware(BaseHTTPMiddleware):
             # Calculate response time
             response_time_ms = int((time.time() - start_time) * 1000)
             
-            # Track API call (async, don't wait)
-            try:
-                await self.tracker.track_api_call(
-                    tenant_id=str(tenant_id),
-                    endpoint=request.url.path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    response_time_ms=response_time_ms,
-                    api_key_id=str(api_key_id) if api_key_id else None
-                )
-            except Exception as e:
-                logger.error(f"Failed to track API usage: {e}", exc_info=True)
+            await self._track(request, tenant_id, api_key_id, response.status_code, response_time_ms)
             
             return response
         
@@ -70,16 +73,34 @@ class APIUsageMiddleware(BaseHTTPMiddleware):
             # Track failed request
             response_time_ms = int((time.time() - start_time) * 1000)
             
-            try:
+            await self._track(request, tenant_id, api_key_id, 500, response_time_ms)
+            
+            raise
+    
+    async def _track(self, request: Request, tenant_id, api_key_id, status_code: int, response_time_ms: int):
+        """Count the call against the route template (bounded cardinality) rather than the raw path"""
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or request.url.path
+        usage_meter = self.usage_meter or getattr(request.app.state, "usage_meter", None)
+        
+        try:
+            if usage_meter is not None:
+                usage_meter.record(
+                    tenant_id=str(tenant_id),
+                    endpoint=endpoint,
+                    method=request.method,
+                    status_code=status_code,
+                    response_time_ms=response_time_ms,
+                    api_key_id=str(api_key_id) if api_key_id else None
+                )
+            else:
                 await self.tracker.track_api_call(
                     tenant_id=str(tenant_id),
-                    endpoint=request.url.path,
+                    endpoint=endpoint,
                     method=request.method,
-                    status_code=500,
+                    status_code=status_code,
                     response_time_ms=response_time_ms,
                     api_key_id=str(api_key_id) if api_key_id else None
                 )
-            except Exception as track_error:
-                logger.error(f"Failed to track API usage: {track_error}", exc_info=True)
-            
-            raise
+        except Exception as e:
+            logger.error(f"Failed to track API usage: {e}", exc_info=True)
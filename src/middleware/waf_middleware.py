@@ -6,10 +6,12 @@ Integrates WAF into FastAPI request pipeline.
 
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import ClientDisconnect
 from starlette.responses import Response
 import logging
+from typing import Optional, Tuple
 
-from src.security.waf import get_waf
+from src.security.waf import WAF, get_waf
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +30,26 @@ class WAFMiddleware(BaseHTTPMiddleware):
         # Get client IP
         client_ip = request.client.host if request.client else None
         
-        # Get request body (if available)
-        body = None
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body_bytes = await request.body()
-                body = body_bytes.decode("utf-8", errors="ignore")
-                # Re-create request body for downstream
-                async def receive():
-                    return {"type": "http.request", "body": body_bytes}
-                request._receive = receive
-            except Exception:
-                pass
-        
-        # Check request against WAF
-        allowed, rule_name, reason = waf.check_request(
+        # Check path and headers first so blocked requests never have their body read
+        allowed, rule_name, reason = await waf.check_request(
             method=request.method,
             path=str(request.url.path),
             headers=dict(request.headers),
-            body=body,
+            body=None,
             client_ip=client_ip,
         )
         
+        if allowed and waf.enabled and request.method in ["POST", "PUT", "PATCH"]:
+            try:
+                allowed, rule_name, reason = await self._inspect_body(request, waf, client_ip)
+            except ClientDisconnect:
+                # Never forward a partial body downstream
+                logger.info(
+                    "Client disconnected before the request body was read",
+                    extra={"path": request.url.path, "method": request.method, "client_ip": client_ip}
+                )
+                return Response(status_code=status.HTTP_400_BAD_REQUEST)
+        
         if not allowed:
             logger.warning(
                 f"WAF blocked request: {rule_name}",
@@ -70,3 +70,40 @@ class WAFMiddleware(BaseHTTPMiddleware):
         # Process request
         response = await call_next(request)
         return response
+    
+    async def _inspect_body(
+        self,
+        request: Request,
+        waf: WAF,
+        client_ip: Optional[str]
+    ) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Inspect the body as it streams in
+        
+        Reading stops at the first blocking match or once the size limit is
+        passed (an oversized Content-Length is rejected without reading at
+        all). An accepted body is replayed to downstream handlers.
+        
+        Raises:
+            ClientDisconnect: if the client goes away before the body is complete
+        """
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > waf.max_request_size:
+            return False, "request_too_large", f"Request exceeds {waf.max_request_size} bytes"
+        
+        inspector = waf.body_inspector(client_ip)
+        chunks = []
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            verdict = inspector.feed(chunk)
+            if verdict:
+                return False, verdict[0], verdict[1]
+        
+        body_bytes = b"".join(chunks)
+        # Re-create request body for downstream
+        async def receive():
+            return {"type": "http.request", "body": body_bytes}
+        request._receive = receive
+        return True, None, None
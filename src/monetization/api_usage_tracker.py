@@ -1,16 +1,22 @@
 """
 DELTA:20251113_064143 API Usage Tracker
 
-Tracks API calls for billing and rate limiting.
+Tracks API calls for billing and rate limiting. Usage is stored as
+per-minute rollups (see usage_meter); billing and rate-limit queries read
+api_usage_rollups rather than individual calls.
 """
 
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
+from uuid import uuid4
 
 from src.database import PostgresConnection
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
+from src.monetization.usage_meter import (
+    NO_API_KEY, UsageKey, UsageRollup, minute_bucket, status_class, write_rollups
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,23 +46,23 @@ class APIUsageTracker:
         response_time_ms: int,
         api_key_id: Optional[str] = None
     ):
-        """DELTA:20251113_064143 Track API call"""
-        # Calculate cost (only charge for successful calls)
-        cost_cents = 0
-        if status_code < 400:
-            cost_cents = int(self.API_PRICE_CENTS_PER_1K / 1000)  # Per call
-        
-        query = """
-            INSERT INTO api_usage (
-                tenant_id, api_key_id, endpoint, method, status_code, response_time_ms, cost_cents
-            )
-            VALUES ($1::uuid, $2::uuid, $3, $4, $5, $6, $7);
         """
+        DELTA:20251113_064143 Track API call
         
-        await self.postgres_conn.execute(
-            query,
-            tenant_id, api_key_id, endpoint, method, status_code, response_time_ms, cost_cents
+        Writes a single-call rollup immediately; request handling goes
+        through UsageMeter.record instead, which batches these writes.
+        """
+        key = UsageKey(
+            tenant_id=tenant_id,
+            api_key_id=api_key_id or NO_API_KEY,
+            endpoint=endpoint[:255],
+            method=method,
+            status_class=status_class(status_code),
+            bucket_start=minute_bucket()
         )
+        rollup = UsageRollup()
+        rollup.add(response_time_ms)
+        await write_rollups(self.postgres_conn, str(uuid4()), {key: rollup})
         
         # Record metrics
         self.metrics.increment_counter(
@@ -84,28 +90,26 @@ class APIUsageTracker:
         if start_date and end_date:
             query = """
                 SELECT 
-                    COUNT(*) as total_calls,
-                    COUNT(*) FILTER (WHERE status_code < 400) as successful_calls,
-                    COUNT(*) FILTER (WHERE status_code >= 400) as failed_calls,
-                    SUM(cost_cents) as total_cost_cents,
-                    AVG(response_time_ms) as avg_response_time_ms,
+                    SUM(call_count) as total_calls,
+                    SUM(call_count) FILTER (WHERE status_class NOT IN ('4xx', '5xx')) as successful_calls,
+                    SUM(call_count) FILTER (WHERE status_class IN ('4xx', '5xx')) as failed_calls,
+                    SUM(total_response_time_ms)::float / NULLIF(SUM(call_count), 0) as avg_response_time_ms,
                     COUNT(DISTINCT endpoint) as unique_endpoints
-                FROM api_usage
+                FROM api_usage_rollups
                 WHERE tenant_id = $1::uuid
-                  AND created_at >= $2
-                  AND created_at <= $3;
+                  AND bucket_start >= date_trunc('minute', $2::timestamptz)
+                  AND bucket_start <= $3;
             """
             row = await self.postgres_conn.fetchrow(query, tenant_id, start_date, end_date)
         else:
             query = """
                 SELECT 
-                    COUNT(*) as total_calls,
-                    COUNT(*) FILTER (WHERE status_code < 400) as successful_calls,
-                    COUNT(*) FILTER (WHERE status_code >= 400) as failed_calls,
-                    SUM(cost_cents) as total_cost_cents,
-                    AVG(response_time_ms) as avg_response_time_ms,
+                    SUM(call_count) as total_calls,
+                    SUM(call_count) FILTER (WHERE status_class NOT IN ('4xx', '5xx')) as successful_calls,
+                    SUM(call_count) FILTER (WHERE status_class IN ('4xx', '5xx')) as failed_calls,
+                    SUM(total_response_time_ms)::float / NULLIF(SUM(call_count), 0) as avg_response_time_ms,
                     COUNT(DISTINCT endpoint) as unique_endpoints
-                FROM api_usage
+                FROM api_usage_rollups
                 WHERE tenant_id = $1::uuid;
             """
             row = await self.postgres_conn.fetchrow(query, tenant_id)
@@ -120,11 +124,14 @@ class APIUsageTracker:
                 'unique_endpoints': 0
             }
         
+        # Only successful calls are billed
+        successful_calls = row['successful_calls'] or 0
+        
         return {
             'total_calls': row['total_calls'],
-            'successful_calls': row['successful_calls'] or 0,
+            'successful_calls': successful_calls,
             'failed_calls': row['failed_calls'] or 0,
-            'total_cost_cents': row['total_cost_cents'] or 0,
+            'total_cost_cents': successful_calls * self.API_PRICE_CENTS_PER_1K // 1000,
             'avg_response_time_ms': float(row['avg_response_time_ms'] or 0),
             'unique_endpoints': row['unique_endpoints'] or 0
         }
@@ -136,10 +143,10 @@ class APIUsageTracker:
     ) -> Dict[str, Any]:
         """DELTA:20251113_064143 Check if tenant has exceeded rate limit"""
         query = """
-            SELECT COUNT(*) as calls_last_hour
-            FROM api_usage
+            SELECT SUM(call_count) as calls_last_hour
+            FROM api_usage_rollups
             WHERE tenant_id = $1::uuid
-              AND created_at >= NOW() - INTERVAL '1 hour';
+              AND bucket_start >= date_trunc('minute', NOW() - INTERVAL '1 hour');
         """
         
         row = await self.postgres_conn.fetchrow(query, tenant_id)
@@ -0,0 +1,390 @@
+"""
+API Usage Meter
+
+Write-behind metering for API calls. Calls are aggregated in memory per
+(tenant, API key, endpoint template, method, status class, minute) and
+written to api_usage_rollups in bulk instead of one api_usage row per request:
+- record() is synchronous and never touches the database
+- pending rollups are flushed every flush_interval seconds, or sooner once
+  max_pending_keys distinct keys are buffered
+- every flush is a sealed batch with its own id; with a journal directory the
+  batch is written to disk before it is sent and removed once committed, and
+  batches left behind by a crash or an outage are replayed (the batch id
+  makes replays idempotent)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from src.database import PostgresConnection
+    from src.telemetry.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+# Stored for calls made without an API key (api_key_id is part of the primary key)
+NO_API_KEY = "00000000-0000-0000-0000-000000000000"
+
+UPSERT_ROLLUPS_QUERY = """
+    WITH batch AS (
+        INSERT INTO api_usage_flush_batches (batch_id)
+        VALUES ($1::uuid)
+        ON CONFLICT (batch_id) DO NOTHING
+        RETURNING batch_id
+    )
+    INSERT INTO api_usage_rollups (
+        tenant_id, api_key_id, endpoint, method, status_class, bucket_start,
+        call_count, total_response_time_ms, max_response_time_ms
+    )
+    SELECT r.tenant_id, r.api_key_id, r.endpoint, r.method, r.status_class, r.bucket_start,
+           r.call_count, r.total_response_time_ms, r.max_response_time_ms
+    FROM unnest(
+        $2::uuid[], $3::uuid[], $4::text[], $5::text[], $6::text[], $7::timestamptz[],
+        $8::bigint[], $9::bigint[], $10::int[]
+    ) AS r(
+        tenant_id, api_key_id, endpoint, method, status_class, bucket_start,
+        call_count, total_response_time_ms, max_response_time_ms
+    )
+    WHERE EXISTS (SELECT 1 FROM batch)
+    ON CONFLICT (tenant_id, bucket_start, api_key_id, endpoint, method, status_class) DO UPDATE SET
+        call_count = api_usage_rollups.call_count + EXCLUDED.call_count,
+        total_response_time_ms = api_usage_rollups.total_response_time_ms + EXCLUDED.total_response_time_ms,
+        max_response_time_ms = GREATEST(api_usage_rollups.max_response_time_ms, EXCLUDED.max_response_time_ms),
+        updated_at = NOW()
+"""
+
+
+class UsageKey(NamedTuple):
+    """Rollup dimensions"""
+    tenant_id: str
+    api_key_id: str
+    endpoint: str
+    method: str
+    status_class: str
+    bucket_start: datetime
+
+
+@dataclass
+class UsageRollup:
+    """Aggregated calls for one UsageKey"""
+    call_count: int = 0
+    total_response_time_ms: int = 0
+    max_response_time_ms: int = 0
+    
+    def add(self, response_time_ms: int, call_count: int = 1):
+        self.call_count += call_count
+        self.total_response_time_ms += response_time_ms * call_count
+        self.max_response_time_ms = max(self.max_response_time_ms, response_time_ms)
+    
+    def merge(self, other: "UsageRollup"):
+        self.call_count += other.call_count
+        self.total_response_time_ms += other.total_response_time_ms
+        self.max_response_time_ms = max(self.max_response_time_ms, other.max_response_time_ms)
+
+
+def status_class(status_code: int) -> str:
+    """Collapse a status code into its class, e.g. 404 -> '4xx'"""
+    return f"{status_code // 100}xx"
+
+
+def minute_bucket(timestamp: Optional[float] = None) -> datetime:
+    """Start of the UTC minute containing timestamp (default: now)"""
+    seconds = int(time.time() if timestamp is None else timestamp)
+    return datetime.fromtimestamp(seconds - seconds % 60, tz=timezone.utc)
+
+
+async def write_rollups(
+    postgres_conn: "PostgresConnection",
+    batch_id: str,
+    rollups: Dict[UsageKey, UsageRollup]
+):
+    """
+    Add a batch of rollups to api_usage_rollups in one statement
+    
+    The batch id is recorded in the same statement, so writing a batch that
+    was already applied is a no-op.
+    """
+    if not rollups:
+        return
+    keys = list(rollups)
+    values = [rollups[key] for key in keys]
+    await postgres_conn.execute(
+        UPSERT_ROLLUPS_QUERY,
+        batch_id,
+        [key.tenant_id for key in keys],
+        [key.api_key_id for key in keys],
+        [key.endpoint for key in keys],
+        [key.method for key in keys],
+        [key.status_class for key in keys],
+        [key.bucket_start for key in keys],
+        [value.call_count for value in values],
+        [value.total_response_time_ms for value in values],
+        [value.max_response_time_ms for value in values],
+    )
+
+
+class UsageJournal:
+    """
+    On-disk journal of sealed flush batches
+    
+    One JSON file per batch, named by batch id and written via rename so a
+    crash never leaves a partial batch behind.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def write(self, batch_id: str, rollups: Dict[UsageKey, UsageRollup]):
+        rows = [
+            [
+                key.tenant_id, key.api_key_id, key.endpoint, key.method, key.status_class,
+                key.bucket_start.isoformat(),
+                value.call_count, value.total_response_time_ms, value.max_response_time_ms
+            ]
+            for key, value in rollups.items()
+        ]
+        path = self._path(batch_id)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "rows": rows}, f)
+        os.replace(path + ".tmp", path)
+    
+    def remove(self, batch_id: str):
+        try:
+            os.remove(self._path(batch_id))
+        except FileNotFoundError:
+            # Already replayed (and removed) by another worker sharing the directory
+            pass
+    
+    def pending(self) -> List[Tuple[str, Dict[UsageKey, UsageRollup]]]:
+        """Journaled batches, oldest first"""
+        names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+        batches = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                continue
+            rollups = {}
+            for row in data["rows"]:
+                key = UsageKey(*row[:5], datetime.fromisoformat(row[5]))
+                rollups[key] = UsageRollup(*row[6:])
+            batches.append((data["batch_id"], rollups))
+        return batches
+    
+    def _path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.json")
+
+
+class UsageMeter:
+    """
+    Write-behind API usage meter
+    
+    Without a journal, a failed flush is folded back into the pending
+    rollups and retried on the next flush; with one, it stays on disk and is
+    replayed after the next successful flush. Either way delivery is
+    at-least-once: the only loss window is calls still pending in memory
+    when the process is killed (stop() flushes them on a clean shutdown).
+    """
+    
+    def __init__(
+        self,
+        postgres_conn: "PostgresConnection",
+        metrics_collector: Optional["MetricsCollector"] = None,
+        flush_interval: float = 10.0,
+        max_pending_keys: int = 5000,
+        max_buffered_keys: int = 200000,
+        journal_directory: Optional[str] = None,
+        batch_retention_days: int = 7
+    ):
+        self.postgres = postgres_conn
+        self.metrics = metrics_collector
+        self.flush_interval = flush_interval
+        self.max_pending_keys = max_pending_keys
+        self.max_buffered_keys = max_buffered_keys
+        self.journal = UsageJournal(journal_directory) if journal_directory else None
+        self.batch_retention_days = batch_retention_days
+        self.dropped_calls = 0
+        self._pending: Dict[UsageKey, UsageRollup] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Replay journaled batches and start the periodic flush"""
+        await self.replay_journal()
+        try:
+            await self.postgres.execute(
+                "DELETE FROM api_usage_flush_batches WHERE flushed_at < NOW() - make_interval(days => $1)",
+                self.batch_retention_days
+            )
+        except Exception as e:
+            logger.warning(f"Failed to prune API usage flush batches: {e}")
+        self._flush_task = asyncio.create_task(self._periodic_flush())
+    
+    async def stop(self):
+        """Stop the periodic flush and flush whatever is pending"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+    
+    def record(
+        self,
+        tenant_id: str,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: int,
+        api_key_id: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ):
+        """
+        Count one API call
+        
+        Args:
+            endpoint: Route template (not the raw path) to keep key cardinality bounded
+        """
+        key = UsageKey(
+            tenant_id=str(tenant_id),
+            api_key_id=str(api_key_id) if api_key_id else NO_API_KEY,
+            endpoint=endpoint[:255],
+            method=method,
+            status_class=status_class(status_code),
+            bucket_start=minute_bucket(timestamp)
+        )
+        rollup = self._pending.get(key)
+        if rollup is None:
+            if len(self._pending) >= self.max_buffered_keys:
+                self.dropped_calls += 1
+                if self.metrics:
+                    self.metrics.increment_counter("api_usage_meter_dropped_total")
+                return
+            rollup = self._pending[key] = UsageRollup()
+            if len(self._pending) >= self.max_pending_keys:
+                # The flush loop runs outside any request context (see start())
+                self._wake.set()
+        rollup.add(response_time_ms)
+        
+        if self.metrics:
+            self.metrics.increment_counter(
+                'api_calls_total',
+                tags={'endpoint': endpoint, 'method': method, 'status_code': str(status_code)}
+            )
+            self.metrics.record_histogram(
+                'api_response_time_ms',
+                value=response_time_ms,
+                tags={'endpoint': endpoint}
+            )
+    
+    @property
+    def pending_keys(self) -> int:
+        return len(self._pending)
+    
+    async def flush(self) -> int:
+        """
+        Seal the pending rollups into a batch and write it, then replay any
+        journaled batches left by earlier failures
+        
+        Returns:
+            Number of rollup rows written (including replayed batches)
+        """
+        async with self._flush_lock:
+            self._wake.clear()
+            written = await self._flush_pending()
+        if written < 0:
+            return 0
+        return written + await self.replay_journal()
+    
+    async def _flush_pending(self) -> int:
+        """Returns rows written, or -1 if the write failed"""
+        if not self._pending:
+            return 0
+        batch_id = str(uuid4())
+        rollups, self._pending = self._pending, {}
+        journaled = False
+        if self.journal:
+            try:
+                self.journal.write(batch_id, rollups)
+                journaled = True
+            except OSError as e:
+                logger.warning(f"Failed to journal API usage batch {batch_id}: {e}")
+        
+        start_time = time.time()
+        try:
+            await write_rollups(self.postgres, batch_id, rollups)
+        except Exception as e:
+            logger.error(f"Failed to flush API usage rollups: {e}")
+            if self.metrics:
+                self.metrics.increment_counter("api_usage_meter_flush_failures_total")
+            if not journaled:
+                self._merge_back(rollups)
+            return -1
+        
+        if journaled:
+            self.journal.remove(batch_id)
+        if self.metrics:
+            self.metrics.increment_counter("api_usage_meter_flushes_total")
+            self.metrics.increment_counter("api_usage_meter_rows_written_total", value=len(rollups))
+            self.metrics.record_histogram(
+                "api_usage_meter_flush_duration_ms",
+                (time.time() - start_time) * 1000
+            )
+        return len(rollups)
+    
+    async def replay_journal(self) -> int:
+        """
+        Write journaled batches (oldest first), stopping at the first failure
+        
+        Returns:
+            Number of rollup rows replayed
+        """
+        if not self.journal:
+            return 0
+        replayed = 0
+        async with self._flush_lock:
+            for batch_id, rollups in self.journal.pending():
+                try:
+                    await write_rollups(self.postgres, batch_id, rollups)
+                except Exception as e:
+                    logger.warning(f"Failed to replay API usage batch {batch_id}: {e}")
+                    break
+                self.journal.remove(batch_id)
+                replayed += len(rollups)
+        if replayed and self.metrics:
+            self.metrics.increment_counter("api_usage_meter_rows_replayed_total", value=replayed)
+        return replayed
+    
+    def _merge_back(self, rollups: Dict[UsageKey, UsageRollup]):
+        """Return an unsent batch to the pending rollups"""
+        for key, rollup in rollups.items():
+            existing = self._pending.get(key)
+            if existing is None:
+                self._pending[key] = rollup
+            else:
+                existing.merge(rollup)
+    
+    async def _periodic_flush(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"API usage meter flush error: {e}")
+            if self.metrics:
+                self.metrics.record_gauge("api_usage_meter_pending_keys", len(self._pending))
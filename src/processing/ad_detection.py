@@ -5,17 +5,22 @@ Detects advertisement slots in podcast episodes using:
 - Audio transcription analysis
 - ML heuristics (keyword detection, pattern matching)
 - Manual annotations
+
+Keywords and transition phrases are matched with one Aho–Corasick pass per
+transcript, and temporal windows are looked up through an interval index.
 """
 
 import logging
 import re
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
+from src.processing.keyword_matcher import AhoCorasick
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +68,115 @@ class TranscriptSegment:
     confidence: float = 1.0
 
 
+@dataclass
+class KeywordHit:
+    """Keyword or transition phrase found in a segment (offsets within the segment text)"""
+    segment_index: int
+    start: int
+    end: int
+    term: str
+    is_phrase: bool
+
+
+@dataclass
+class TranscriptScan:
+    """Result of one matcher pass over a transcript"""
+    hits: List[KeywordHit]
+    segment_keywords: List[List[str]]  # Distinct keywords per segment, in keyword order
+    segment_phrases: List[List[str]]  # Distinct transition phrases per segment, in phrase order
+
+
+class AdKeywordMatcher:
+    """
+    Compiled ad keywords and transition phrases
+    
+    Matching is on lowercased text and, like ``in``, finds terms inside
+    longer words. Segments are joined with a separator no term contains, so
+    a single pass covers the whole transcript without matches crossing
+    segment boundaries.
+    """
+    
+    SEPARATOR = "\x00"
+    
+    def __init__(self, keywords: Sequence[str], phrases: Sequence[str]):
+        self.keywords = self._normalize(keywords)
+        self.phrases = self._normalize(phrases)
+        self._automaton = AhoCorasick(self.keywords + self.phrases)
+    
+    @classmethod
+    def _normalize(cls, terms: Sequence[str]) -> List[str]:
+        return list(dict.fromkeys(
+            term.lower() for term in terms
+            if term and cls.SEPARATOR not in term
+        ))
+    
+    def scan(self, segments: List[TranscriptSegment]) -> TranscriptScan:
+        """Find every keyword and phrase in all segments in one pass"""
+        lowered = [segment.text.lower() for segment in segments]
+        offsets = []
+        position = 0
+        for text in lowered:
+            offsets.append(position)
+            position += len(text) + 1
+        
+        keyword_count = len(self.keywords)
+        keyword_ids: List[Set[int]] = [set() for _ in segments]
+        phrase_ids: List[Set[int]] = [set() for _ in segments]
+        hits = []
+        
+        for start, end, pattern_id in self._automaton.finditer(self.SEPARATOR.join(lowered)):
+            index = bisect_right(offsets, start) - 1
+            is_phrase = pattern_id >= keyword_count
+            if is_phrase:
+                phrase_ids[index].add(pattern_id - keyword_count)
+            else:
+                keyword_ids[index].add(pattern_id)
+            hits.append(KeywordHit(
+                segment_index=index,
+                start=start - offsets[index],
+                end=end - offsets[index],
+                term=self._automaton.patterns[pattern_id],
+                is_phrase=is_phrase
+            ))
+        
+        return TranscriptScan(
+            hits=hits,
+            segment_keywords=[[self.keywords[i] for i in sorted(ids)] for ids in keyword_ids],
+            segment_phrases=[[self.phrases[i] for i in sorted(ids)] for ids in phrase_ids]
+        )
+    
+    def keywords_in(self, scan: TranscriptScan, segment_indices: List[int]) -> List[str]:
+        """Distinct keywords across several scanned segments, in keyword order"""
+        found = {kw for i in segment_indices for kw in scan.segment_keywords[i]}
+        return [kw for kw in self.keywords if kw in found]
+    
+    def has_phrase(self, text: str) -> bool:
+        """Whether text contains any transition phrase"""
+        keyword_count = len(self.keywords)
+        return any(pattern_id >= keyword_count for _, _, pattern_id in self._automaton.finditer(text.lower()))
+
+
+class SegmentIndex:
+    """
+    Interval index over transcript segments
+    
+    Keeps segment start and end times sorted so the segments starting or
+    ending inside a time window are found with binary search.
+    """
+    
+    def __init__(self, segments: List[TranscriptSegment]):
+        self._by_start = sorted(range(len(segments)), key=lambda i: segments[i].start_time)
+        self._starts = [segments[i].start_time for i in self._by_start]
+        self._by_end = sorted(range(len(segments)), key=lambda i: segments[i].end_time)
+        self._ends = [segments[i].end_time for i in self._by_end]
+    
+    def overlapping(self, start_time: float, end_time: float) -> List[int]:
+        """Indices of segments that start or end within [start_time, end_time], in transcript order"""
+        indices = set(self._by_start[bisect_left(self._starts, start_time):bisect_right(self._starts, end_time)])
+        indices.update(self._by_end[bisect_left(self._ends, start_time):bisect_right(self._ends, end_time)])
+        return sorted(indices)
+
+
 class AdDetectionEngine:
     """
     Ad Slot Detection Engine
@@ -95,12 +209,30 @@ class AdDetectionEngine:
     ):
         self.metrics = metrics_collector
         self.events = event_logger
+        self.matcher = AdKeywordMatcher(self.AD_KEYWORDS, self.TRANSITION_PHRASES)
+        self._tenant_matchers: Dict[str, AdKeywordMatcher] = {}
+    
+    def set_tenant_keywords(self, tenant_id: str, keywords: List[str]):
+        """Compile a tenant's custom keywords (in addition to AD_KEYWORDS) once for reuse"""
+        if keywords:
+            self._tenant_matchers[tenant_id] = AdKeywordMatcher(
+                self.AD_KEYWORDS + list(keywords), self.TRANSITION_PHRASES
+            )
+        else:
+            self._tenant_matchers.pop(tenant_id, None)
+    
+    def get_matcher(self, tenant_id: Optional[str] = None) -> AdKeywordMatcher:
+        """Matcher for a tenant's keywords (the default matcher without custom keywords)"""
+        if tenant_id is None:
+            return self.matcher
+        return self._tenant_matchers.get(tenant_id, self.matcher)
         
     async def detect_ads_from_transcript(
         self,
         episode_id: str,
         transcript_segments: List[TranscriptSegment],
-        episode_duration_seconds: float
+        episode_duration_seconds: float,
+        tenant_id: Optional[str] = None
     ) -> List[AdSlot]:
         """
         Detect ad slots from transcript segments
@@ -109,29 +241,12 @@ class AdDetectionEngine:
             episode_id: Episode identifier
             transcript_segments: List of transcript segments with timing
             episode_duration_seconds: Total episode duration
+            tenant_id: Tenant whose custom keywords apply, if any
             
         Returns:
             List of detected ad slots
         """
-        ad_slots = []
-        
-        # Method 1: Keyword-based detection
-        keyword_slots = await self._detect_by_keywords(transcript_segments)
-        ad_slots.extend(keyword_slots)
-        
-        # Method 2: Pattern-based detection (transition phrases)
-        pattern_slots = await self._detect_by_patterns(transcript_segments, episode_duration_seconds)
-        ad_slots.extend(pattern_slots)
-        
-        # Method 3: Temporal pattern detection
-        temporal_slots = await self._detect_temporal_patterns(transcript_segments, episode_duration_seconds)
-        ad_slots.extend(temporal_slots)
-        
-        # Merge overlapping slots
-        merged_slots = self._merge_overlapping_slots(ad_slots)
-        
-        # Calculate confidence scores
-        scored_slots = [self._calculate_confidence(slot, transcript_segments) for slot in merged_slots]
+        scored_slots = self.detect_slots(transcript_segments, episode_duration_seconds, self.get_matcher(tenant_id))
         
         # Record telemetry
         self.metrics.increment_counter(
@@ -157,18 +272,54 @@ class AdDetectionEngine:
         
         return scored_slots
     
-    async def _detect_by_keywords(
+    def detect_slots(
+        self,
+        transcript_segments: List[TranscriptSegment],
+        episode_duration_seconds: float,
+        matcher: Optional[AdKeywordMatcher] = None
+    ) -> List[AdSlot]:
+        """
+        Detect and score ad slots without telemetry
+        
+        Pure CPU work, safe to run in a worker process (see
+        src.processing.batch_ad_detection).
+        """
+        ad_slots = []
+        matcher = matcher or self.matcher
+        scan = matcher.scan(transcript_segments)
+        
+        # Method 1: Keyword-based detection
+        keyword_slots = self._detect_by_keywords(transcript_segments, scan)
+        ad_slots.extend(keyword_slots)
+        
+        # Method 2: Pattern-based detection (transition phrases)
+        pattern_slots = self._detect_by_patterns(transcript_segments, episode_duration_seconds, scan)
+        ad_slots.extend(pattern_slots)
+        
+        # Method 3: Temporal pattern detection
+        temporal_slots = self._detect_temporal_patterns(
+            transcript_segments, episode_duration_seconds, scan, matcher
+        )
+        ad_slots.extend(temporal_slots)
+        
+        # Merge overlapping slots
+        merged_slots = self._merge_overlapping_slots(ad_slots)
+        
+        # Calculate confidence scores
+        return [self._calculate_confidence(slot, transcript_segments, matcher) for slot in merged_slots]
+    
+    def _detect_by_keywords(
         self,
-        segments: List[TranscriptSegment]
+        segments: List[TranscriptSegment],
+        scan: Optional[TranscriptScan] = None
     ) -> List[AdSlot]:
         """Detect ads by keyword matching"""
         ad_slots = []
+        scan = scan or self.matcher.scan(segments)
         
-        for segment in segments:
-            text_lower = segment.text.lower()
-            
+        for i, segment in enumerate(segments):
             # Count keyword matches
-            keyword_matches = [kw for kw in self.AD_KEYWORDS if kw in text_lower]
+            keyword_matches = scan.segment_keywords[i]
             
             if len(keyword_matches) >= 2:  # At least 2 keywords
                 # Determine ad type based on position
@@ -188,53 +339,56 @@ class AdDetectionEngine:
         
         return ad_slots
     
-    async def _detect_by_patterns(
+    def _detect_by_patterns(
         self,
         segments: List[TranscriptSegment],
-        episode_duration: float
+        episode_duration: float,
+        scan: Optional[TranscriptScan] = None
     ) -> List[AdSlot]:
         """Detect ads by transition phrase patterns"""
         ad_slots = []
+        scan = scan or self.matcher.scan(segments)
         
         for i, segment in enumerate(segments):
-            text_lower = segment.text.lower()
-            
             # Check for transition phrases
-            for phrase in self.TRANSITION_PHRASES:
-                if phrase in text_lower:
-                    # Look ahead for potential ad content
-                    if i + 1 < len(segments):
-                        next_segment = segments[i + 1]
-                        
-                        # Check if next segment contains ad keywords
-                        next_text_lower = next_segment.text.lower()
-                        keyword_count = sum(1 for kw in self.AD_KEYWORDS if kw in next_text_lower)
+            for phrase in scan.segment_phrases[i]:
+                # Look ahead for potential ad content
+                if i + 1 < len(segments):
+                    next_segment = segments[i + 1]
+                    
+                    # Check if next segment contains ad keywords
+                    keyword_count = len(scan.segment_keywords[i + 1])
+                    
+                    if keyword_count >= 1:
+                        # Create slot spanning transition + ad content
+                        ad_type = self._classify_ad_type(segment.start_time, next_segment.end_time)
                         
-                        if keyword_count >= 1:
-                            # Create slot spanning transition + ad content
-                            ad_type = self._classify_ad_type(segment.start_time, next_segment.end_time)
-                            
-                            slot = AdSlot(
-                                start_time_seconds=segment.start_time,
-                                end_time_seconds=next_segment.end_time,
-                                duration_seconds=next_segment.end_time - segment.start_time,
-                                ad_type=ad_type,
-                                detection_method=DetectionMethod.ML_HEURISTIC,
-                                confidence=0.75,
-                                transcript_segment=f"{segment.text} {next_segment.text}",
-                                keywords_detected=[phrase]
-                            )
-                            ad_slots.append(slot)
+                        slot = AdSlot(
+                            start_time_seconds=segment.start_time,
+                            end_time_seconds=next_segment.end_time,
+                            duration_seconds=next_segment.end_time - segment.start_time,
+                            ad_type=ad_type,
+                            detection_method=DetectionMethod.ML_HEURISTIC,
+                            confidence=0.75,
+                            transcript_segment=f"{segment.text} {next_segment.text}",
+                            keywords_detected=[phrase]
+                        )
+                        ad_slots.append(slot)
         
         return ad_slots
     
-    async def _detect_temporal_patterns(
+    def _detect_temporal_patterns(
         self,
         segments: List[TranscriptSegment],
-        episode_duration: float
+        episode_duration: float,
+        scan: Optional[TranscriptScan] = None,
+        matcher: Optional[AdKeywordMatcher] = None
     ) -> List[AdSlot]:
         """Detect ads based on temporal patterns (e.g., regular intervals)"""
         ad_slots = []
+        matcher = matcher or self.matcher
+        scan = scan or matcher.scan(segments)
+        index = SegmentIndex(segments)
         
         # Common ad placement patterns:
         # - Pre-roll: First 5% of episode
@@ -254,17 +408,14 @@ class AdDetectionEngine:
             end_time = episode_duration * end_ratio
             
             # Find segments in this time range
-            matching_segments = [
-                s for s in segments
-                if start_time <= s.start_time <= end_time or start_time <= s.end_time <= end_time
-            ]
+            matching_indices = index.overlapping(start_time, end_time)
+            matching_segments = [segments[i] for i in matching_indices]
             
             if matching_segments:
                 # Check if segments contain ad-like content
-                combined_text = " ".join(s.text.lower() for s in matching_segments)
-                keyword_count = sum(1 for kw in self.AD_KEYWORDS if kw in combined_text)
+                keywords = matcher.keywords_in(scan, matching_indices)
                 
-                if keyword_count >= 1:
+                if keywords:
                     actual_start = min(s.start_time for s in matching_segments)
                     actual_end = max(s.end_time for s in matching_segments)
                     
@@ -276,7 +427,7 @@ class AdDetectionEngine:
                         detection_method=DetectionMethod.ML_HEURISTIC,
                         confidence=0.6,  # Lower confidence for temporal-only detection
                         transcript_segment=" ".join(s.text for s in matching_segments),
-                        keywords_detected=[kw for kw in self.AD_KEYWORDS if kw in combined_text]
+                        keywords_detected=keywords
                     )
                     ad_slots.append(slot)
         
@@ -305,7 +456,8 @@ class AdDetectionEngine:
     def _calculate_confidence(
         self,
         slot: AdSlot,
-        segments: List[TranscriptSegment]
+        segments: List[TranscriptSegment],
+        matcher: Optional[AdKeywordMatcher] = None
     ) -> AdSlot:
         """Calculate confidence score for ad slot"""
         confidence_factors = []
@@ -331,9 +483,7 @@ class AdDetectionEngine:
         
         # Factor 4: Pattern matching (transition phrases)
         if slot.transcript_segment:
-            text_lower = slot.transcript_segment.lower()
-            transition_match = any(phrase in text_lower for phrase in self.TRANSITION_PHRASES)
-            if transition_match:
+            if (matcher or self.matcher).has_phrase(slot.transcript_segment):
                 confidence_factors.append(0.2)
         
         # Calculate final confidence (capped at 1.0)
@@ -0,0 +1,286 @@
+"""
+Batch Ad Detection
+
+Runs ad detection over many episodes (e.g. a network's back catalog) in a
+process pool so the CPU-bound matching never blocks the API's event loop.
+
+Episodes are grouped into small shards; each shard is one pool task, and
+its results are streamed back as soon as it finishes. Detected slots are
+written to ``episodes.ad_slots`` in bulk, and every written episode is
+checkpointed under the run id so an interrupted run resumes where it
+stopped.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+)
+
+from src.processing.ad_detection import AdDetectionEngine, AdKeywordMatcher, AdSlot, TranscriptSegment
+from src.telemetry.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+
+COMPLETED_EPISODES_QUERY = """
+SELECT episode_id FROM ad_detection_checkpoints WHERE run_id = $1
+"""
+
+# One statement per flush: update the episodes and checkpoint them together.
+# Only rows the UPDATE touched are checkpointed, so an episode missing from
+# the table is retried on resume instead of being marked done
+WRITE_SLOTS_QUERY = """
+WITH results AS (
+    SELECT * FROM unnest($2::uuid[], $3::text[], $4::int[]) AS r(episode_id, ad_slots, slot_count)
+), updated AS (
+    UPDATE episodes e
+    SET ad_slots = r.ad_slots::jsonb, updated_at = NOW()
+    FROM results r
+    WHERE e.episode_id = r.episode_id
+    RETURNING e.episode_id
+)
+INSERT INTO ad_detection_checkpoints (run_id, episode_id, slot_count)
+SELECT $1, u.episode_id, r.slot_count FROM updated u JOIN results r USING (episode_id)
+ON CONFLICT (run_id, episode_id) DO UPDATE
+SET slot_count = EXCLUDED.slot_count, completed_at = NOW()
+"""
+
+
+@dataclass
+class EpisodeTranscript:
+    """Batch detection input for one episode"""
+    episode_id: str
+    segments: List[TranscriptSegment]
+    duration_seconds: float
+
+
+@dataclass
+class EpisodeDetection:
+    """Batch detection result for one episode"""
+    episode_id: str
+    slots: List[AdSlot] = field(default_factory=list)
+    error: Optional[str] = None
+    
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def slot_to_record(slot: AdSlot) -> Dict[str, Any]:
+    """JSON-ready form of an ad slot, as stored in episodes.ad_slots"""
+    record = asdict(slot)
+    record["ad_type"] = slot.ad_type.value
+    record["detection_method"] = slot.detection_method.value
+    return record
+
+
+# Worker-side engines by custom keyword set, so each worker compiles a tenant's matcher once
+_worker_engines: Dict[Tuple[str, ...], AdDetectionEngine] = {}
+
+
+def _worker_engine(custom_keywords: Tuple[str, ...]) -> AdDetectionEngine:
+    engine = _worker_engines.get(custom_keywords)
+    if engine is None:
+        engine = AdDetectionEngine(metrics_collector=None, event_logger=None)
+        if custom_keywords:
+            engine.matcher = AdKeywordMatcher(
+                engine.AD_KEYWORDS + list(custom_keywords), engine.TRANSITION_PHRASES
+            )
+        _worker_engines[custom_keywords] = engine
+    return engine
+
+
+def detect_shard(
+    shard: Sequence[EpisodeTranscript],
+    custom_keywords: Tuple[str, ...] = ()
+) -> List[EpisodeDetection]:
+    """Detect ad slots for a shard of episodes (runs in a pool worker)"""
+    engine = _worker_engine(custom_keywords)
+    results = []
+    for episode in shard:
+        try:
+            slots = engine.detect_slots(episode.segments, episode.duration_seconds)
+            results.append(EpisodeDetection(episode_id=episode.episode_id, slots=slots))
+        except Exception as e:
+            results.append(EpisodeDetection(episode_id=episode.episode_id, error=str(e)))
+    return results
+
+
+async def _iterate(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class BatchAdDetector:
+    """
+    Catalog-scale ad detection
+    
+    ``detect`` accepts a lazy iterable of episodes, so a 20k-episode catalog
+    can be fed from a cursor: at most ``max_pending_shards`` shards are held
+    in memory and queued on the pool at once. Results are yielded in
+    completion order, not input order.
+    """
+    
+    def __init__(
+        self,
+        postgres_conn,
+        metrics_collector: Optional[MetricsCollector] = None,
+        workers: Optional[int] = None,
+        shard_size: int = 8,
+        max_pending_shards: Optional[int] = None,
+        write_batch_size: int = 200
+    ):
+        self.postgres = postgres_conn
+        self.metrics = metrics_collector
+        # workers=0 runs shards on the default thread pool (tests, tiny deployments)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.shard_size = max(1, shard_size)
+        self.max_pending_shards = max_pending_shards or max(2, self.workers * 2)
+        self.write_batch_size = max(1, write_batch_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def _executor(self) -> Optional[Executor]:
+        """Detection pool, created on first use"""
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    def shutdown(self):
+        """Stop the detection worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    async def completed_episodes(self, run_id: str) -> Set[str]:
+        """Episodes already written by an earlier attempt of this run"""
+        rows = await self.postgres.fetch(COMPLETED_EPISODES_QUERY, run_id)
+        return {str(row["episode_id"]) for row in rows}
+    
+    async def detect(
+        self,
+        run_id: str,
+        episodes: Union[Iterable[EpisodeTranscript], AsyncIterable[EpisodeTranscript]],
+        custom_keywords: Optional[List[str]] = None
+    ) -> AsyncIterator[EpisodeDetection]:
+        """
+        Detect ad slots for many episodes, yielding each result as it completes
+        
+        Args:
+            run_id: Checkpoint key; re-running with the same id skips episodes
+                that were already written
+            episodes: Episodes to process (a list, generator or async iterator)
+            custom_keywords: Tenant keywords added to the default ad keywords
+        
+        Failed episodes are yielded with ``error`` set and are not
+        checkpointed, so a resumed run retries them.
+        """
+        loop = asyncio.get_running_loop()
+        keywords = tuple(custom_keywords or ())
+        skip = await self.completed_episodes(run_id)
+        pending: Dict[asyncio.Future, List[EpisodeTranscript]] = {}
+        unwritten: List[EpisodeDetection] = []
+        shard: List[EpisodeTranscript] = []
+        started = time.monotonic()
+        
+        if skip:
+            logger.info(f"Resuming ad detection run {run_id}: {len(skip)} episodes already done")
+        
+        def submit():
+            future = loop.run_in_executor(self._executor(), detect_shard, list(shard), keywords)
+            pending[future] = list(shard)
+            shard.clear()
+        
+        async def next_completed() -> List[EpisodeDetection]:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results = []
+            for future in done:
+                results.extend(self._shard_results(future, pending.pop(future)))
+            return results
+        
+        try:
+            async for episode in _iterate(episodes):
+                if str(episode.episode_id) in skip:
+                    continue
+                shard.append(episode)
+                if len(shard) < self.shard_size:
+                    continue
+                submit()
+                
+                if len(pending) >= self.max_pending_shards:
+                    for result in await next_completed():
+                        await self._collect(run_id, result, unwritten)
+                        yield result
+            
+            if shard:
+                submit()
+            while pending:
+                for result in await next_completed():
+                    await self._collect(run_id, result, unwritten)
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+            if unwritten:
+                await self._write(run_id, unwritten)
+            if self.metrics:
+                self.metrics.record_histogram("ad_batch_detection_seconds", time.monotonic() - started)
+    
+    def _shard_results(self, future: asyncio.Future, shard: List[EpisodeTranscript]) -> List[EpisodeDetection]:
+        """Unpack a finished shard, turning a failed task into per-episode errors"""
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            # A crashed worker poisons the pool; start a fresh one for later shards
+            self._pool = None
+            error = f"Detection worker crashed: {e}"
+        except Exception as e:
+            error = str(e)
+        return [EpisodeDetection(episode_id=episode.episode_id, error=error) for episode in shard]
+    
+    async def _collect(self, run_id: str, result: EpisodeDetection, unwritten: List[EpisodeDetection]):
+        """Count a result and buffer it for writing, flushing the buffer when full"""
+        if self.metrics:
+            self.metrics.increment_counter(
+                "ad_batch_episodes_total",
+                tags={"status": "completed" if result.succeeded else "failed"}
+            )
+        if not result.succeeded:
+            logger.warning(f"Ad detection failed for episode {result.episode_id}: {result.error}")
+            return
+        unwritten.append(result)
+        if len(unwritten) >= self.write_batch_size:
+            batch = list(unwritten)
+            unwritten.clear()
+            await self._write(run_id, batch)
+    
+    async def _write(self, run_id: str, results: List[EpisodeDetection]):
+        """Store slots for many episodes and checkpoint them in one statement"""
+        await self.postgres.execute(
+            WRITE_SLOTS_QUERY,
+            run_id,
+            [result.episode_id for result in results],
+            [json.dumps([slot_to_record(slot) for slot in result.slots]) for result in results],
+            [len(result.slots) for result in results]
+        )
+        if self.metrics:
+            self.metrics.increment_counter(
+                "ad_batch_slots_written_total",
+                value=sum(len(result.slots) for result in results)
+            )
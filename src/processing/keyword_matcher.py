@@ -0,0 +1,73 @@
+"""
+Keyword Matcher
+
+Aho–Corasick automaton for finding many literal patterns in one pass over
+a text. Matches are reported with their offsets, including overlapping
+matches and matches nested inside longer patterns (e.g. "code" inside
+"promo code"), so results are the same as testing each pattern with ``in``.
+"""
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+class AhoCorasick:
+    """
+    Precompiled multi-pattern matcher
+    
+    Build once per pattern set (construction is linear in the total pattern
+    length); ``finditer`` is linear in the text length plus the number of
+    matches.
+    """
+    
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns: List[str] = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (pattern_id,)
+        
+        # Breadth-first: failure links point to the longest proper suffix that is also a prefix
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+    
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, pattern_id) for every match, ordered by end offset"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        patterns = self.patterns
+        state = 0
+        
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                end = index + 1
+                for pattern_id in out[state]:
+                    yield end - len(patterns[pattern_id]), end, pattern_id
+    
+    def search(self, text: str) -> List[int]:
+        """Distinct pattern ids found in text, in pattern order"""
+        return sorted({pattern_id for _, _, pattern_id in self.finditer(text)})
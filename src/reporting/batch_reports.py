@@ -0,0 +1,498 @@
+"""
+Batch Report Jobs
+
+Generates one template for many campaigns at once (e.g. agency month-end
+runs). Instead of one generate_report call per campaign:
+
+- campaigns, sponsors and podcasts are read in one query for the whole batch
+- attribution and listener figures are aggregated per campaign in one
+  set-based query each, then served to the section builders from memory
+- files are rendered concurrently across the ReportGenerator process pool
+- results are packaged as one zip or kept as per-campaign reports
+- job progress is persisted in report_jobs
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from src.telemetry.metrics import MetricsCollector
+from src.analytics.analytics_store import CampaignPerformance
+from src.reporting.report_generator import (
+    ReportGenerator,
+    ReportFormat,
+    ReportType,
+    Report,
+    SectionSources,
+    RENDERABLE_FORMATS,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_CAMPAIGNS_QUERY = """
+    SELECT c.*, s.name as sponsor_name, s.email as sponsor_email,
+           p.name as podcast_name,
+           (
+               SELECT COUNT(*) || ':' || COALESCE(MAX(ae.ingested_at)::TEXT, '')
+               FROM attribution_events ae
+               WHERE ae.campaign_id = c.campaign_id
+           ) as attribution_version
+    FROM campaigns c
+    LEFT JOIN sponsors s ON c.sponsor_id = s.sponsor_id
+    LEFT JOIN podcasts p ON c.podcast_id = p.podcast_id
+    WHERE c.campaign_id = ANY($1::uuid[])
+"""
+
+# All-time figures feed the attribution section; figures within the campaign
+# flight feed performance and ROI (matching ReportGenerator)
+BATCH_ATTRIBUTION_QUERY = """
+    SELECT ae.campaign_id,
+           COUNT(*) as attribution_events,
+           COUNT(*) FILTER (WHERE ae.conversion_type IS NOT NULL) as conversions,
+           COALESCE(SUM(ae.conversion_value) FILTER (WHERE ae.conversion_type IS NOT NULL), 0) as conversion_value,
+           COUNT(*) FILTER (WHERE ae.timestamp BETWEEN c.start_date AND c.end_date) as period_events,
+           COUNT(*) FILTER (
+               WHERE ae.timestamp BETWEEN c.start_date AND c.end_date AND ae.conversion_type IS NOT NULL
+           ) as period_conversions,
+           COALESCE(SUM(ae.conversion_value) FILTER (
+               WHERE ae.timestamp BETWEEN c.start_date AND c.end_date
+           ), 0) as period_conversion_value
+    FROM attribution_events ae
+    JOIN campaigns c ON c.campaign_id = ae.campaign_id
+    WHERE ae.campaign_id = ANY($1::uuid[])
+    GROUP BY ae.campaign_id
+"""
+
+# One row per campaign flight: (campaign_id, podcast_id, start, end)
+BATCH_LISTENER_QUERY = """
+    SELECT w.campaign_id,
+           COALESCE(SUM(m.value) FILTER (WHERE m.metric_type = 'downloads'), 0) as total_downloads,
+           COALESCE(SUM(m.value) FILTER (WHERE m.metric_type = 'streams'), 0) as total_streams,
+           COUNT(DISTINCT m.value) FILTER (WHERE m.metric_type = 'listeners') as total_listeners
+    FROM unnest($1::uuid[], $2::uuid[], $3::timestamptz[], $4::timestamptz[])
+         AS w(campaign_id, podcast_id, start_date, end_date)
+    JOIN listener_metrics m
+      ON m.podcast_id = w.podcast_id
+     AND m.timestamp >= w.start_date
+     AND m.timestamp <= w.end_date
+    WHERE m.metric_type IN ('downloads', 'streams', 'listeners')
+    GROUP BY w.campaign_id
+"""
+
+JOB_COLUMNS = """
+    job_id, user_id, template_id, report_type, format, package, status,
+    total_count, completed_count, failed_count, artifact_url, artifacts,
+    errors, created_at, finished_at
+"""
+
+
+class BatchJobStatus(Enum):
+    """Batch report job status"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BatchPackage(Enum):
+    """How batch output is delivered"""
+    ZIP = "zip"  # One archive with every campaign's file
+    FILES = "files"  # One saved report per campaign
+
+
+@dataclass
+class BatchReportJob:
+    """Batch report job and its progress"""
+    job_id: str
+    campaign_ids: List[str]
+    template_id: Optional[str]
+    report_type: ReportType
+    format: ReportFormat
+    package: BatchPackage
+    user_id: Optional[str] = None
+    status: BatchJobStatus = BatchJobStatus.QUEUED
+    completed_count: int = 0
+    failed_count: int = 0
+    artifact_url: Optional[str] = None
+    artifacts: Dict[str, str] = field(default_factory=dict)  # campaign_id -> file_url
+    errors: Dict[str, str] = field(default_factory=dict)  # campaign_id -> error
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    
+    @property
+    def total_count(self) -> int:
+        return len(self.campaign_ids)
+    
+    @property
+    def progress(self) -> float:
+        if not self.campaign_ids:
+            return 1.0
+        return (self.completed_count + self.failed_count) / self.total_count
+
+
+def normalize_campaign_ids(campaign_ids: List[str]) -> List[str]:
+    """
+    Canonical, de-duplicated campaign ids in submission order
+    
+    Ids are compared in their canonical UUID form, so the same campaign
+    spelled twice is only counted (and reported on) once.
+    
+    Raises:
+        ValueError: if an id is not a UUID
+    """
+    normalized = []
+    for campaign_id in campaign_ids:
+        try:
+            normalized.append(str(UUID(str(campaign_id))))
+        except ValueError:
+            raise ValueError(f"Invalid campaign id: {campaign_id}")
+    return list(dict.fromkeys(normalized))
+
+
+def package_zip(file_paths: List[str], zip_path: str) -> int:
+    """Zip rendered files (run in the render pool) and return the archive size"""
+    tmp_path = f"{zip_path}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for file_path in file_paths:
+                archive.write(file_path, arcname=os.path.basename(file_path))
+        os.replace(tmp_path, zip_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    for file_path in file_paths:
+        os.remove(file_path)
+    return os.path.getsize(zip_path)
+
+
+class BatchReportScheduler:
+    """
+    Batch Report Scheduler
+    
+    Runs batch jobs in the background on top of a shared ReportGenerator.
+    At most ``max_concurrency`` campaigns are built and rendered at a time;
+    progress is written to report_jobs at most every ``progress_interval``
+    seconds.
+    """
+    
+    def __init__(
+        self,
+        report_generator: ReportGenerator,
+        postgres_conn,
+        timescale_conn=None,
+        metrics_collector: Optional[MetricsCollector] = None,
+        max_concurrency: int = 8,
+        progress_interval: float = 1.0
+    ):
+        self.generator = report_generator
+        self.postgres = postgres_conn
+        self.timescale = timescale_conn
+        self.metrics = metrics_collector
+        self.max_concurrency = max_concurrency
+        self.progress_interval = progress_interval
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    async def submit(
+        self,
+        campaign_ids: List[str],
+        template_id: Optional[str] = None,
+        report_type: ReportType = ReportType.SPONSOR_REPORT,
+        format: ReportFormat = ReportFormat.PDF,
+        package: BatchPackage = BatchPackage.ZIP,
+        user_id: Optional[str] = None
+    ) -> BatchReportJob:
+        """
+        Create a batch job and start it in the background
+        
+        Raises:
+            ValueError: on an unsupported format or a campaign id that is not a UUID
+        """
+        if format not in RENDERABLE_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        job = BatchReportJob(
+            job_id=str(uuid4()),
+            campaign_ids=normalize_campaign_ids(campaign_ids),
+            template_id=template_id,
+            report_type=report_type,
+            format=format,
+            package=package,
+            user_id=user_id
+        )
+        await self.postgres.execute(
+            """
+            INSERT INTO report_jobs (
+                job_id, user_id, template_id, report_type, format, package,
+                status, campaign_ids, total_count, created_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8::uuid[], $9, $10)
+            """,
+            job.job_id,
+            user_id,
+            template_id,
+            report_type.value,
+            format.value,
+            package.value,
+            job.status.value,
+            job.campaign_ids,
+            job.total_count,
+            job.created_at
+        )
+        
+        task = asyncio.create_task(self.run(job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return job
+    
+    async def run(self, job: BatchReportJob) -> BatchReportJob:
+        """Run a batch job to completion"""
+        start_time = time.time()
+        job.status = BatchJobStatus.RUNNING
+        await self._save_progress(job)
+        
+        try:
+            job.campaign_ids = normalize_campaign_ids(job.campaign_ids)
+            template = self.generator.get_template(job.template_id, job.report_type)
+            campaigns, attribution, listeners = await self._fetch_batch_data(job.campaign_ids)
+            
+            for campaign_id in job.campaign_ids:
+                if campaign_id not in campaigns:
+                    job.errors[campaign_id] = "Campaign not found"
+                    job.failed_count += 1
+            
+            reports: List[Report] = []
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            last_saved = time.monotonic()
+            
+            async def generate(campaign_id: str):
+                nonlocal last_saved
+                async with semaphore:
+                    try:
+                        campaign_data = campaigns[campaign_id]
+                        data_version = f"{campaign_data.get('updated_at')}|{campaign_data.pop('attribution_version', None)}"
+                        report_data = await self.generator.build_report_data(
+                            campaign_id,
+                            template,
+                            campaign_data,
+                            data_version,
+                            self._sources(campaign_id, campaign_data, attribution, listeners)
+                        )
+                        report = await self.generator.render_report(
+                            campaign_id, template, job.report_type, job.format, report_data, data_version
+                        )
+                        reports.append(report)
+                        job.artifacts[campaign_id] = report.file_url
+                        job.completed_count += 1
+                    except Exception as e:
+                        logger.warning(f"Batch report {job.job_id} failed for campaign {campaign_id}: {e}")
+                        job.errors[campaign_id] = str(e)
+                        job.failed_count += 1
+                
+                if time.monotonic() - last_saved >= self.progress_interval:
+                    last_saved = time.monotonic()
+                    await self._save_progress(job)
+            
+            await asyncio.gather(*[generate(campaign_id) for campaign_id in campaigns])
+            
+            if job.package == BatchPackage.ZIP:
+                await self._package_zip(job, reports)
+            else:
+                await self.generator.save_reports(self.postgres, reports, job.user_id)
+            
+            job.status = BatchJobStatus.COMPLETED if reports or not job.campaign_ids else BatchJobStatus.FAILED
+        except asyncio.CancelledError:
+            job.status = BatchJobStatus.FAILED
+            job.errors["job"] = "Interrupted"
+            await self._finish(job)
+            raise
+        except Exception as e:
+            logger.error(f"Batch report job {job.job_id} failed: {e}", exc_info=True)
+            job.status = BatchJobStatus.FAILED
+            job.errors["job"] = str(e)
+        
+        await self._finish(job)
+        
+        if self.metrics:
+            self.metrics.record_histogram(
+                "report_batch_duration_seconds",
+                time.time() - start_time,
+                tags={"format": job.format.value, "package": job.package.value}
+            )
+            self.metrics.increment_counter(
+                "report_batch_campaigns_total",
+                value=job.completed_count,
+                tags={"status": "completed"}
+            )
+            self.metrics.increment_counter(
+                "report_batch_campaigns_total",
+                value=job.failed_count,
+                tags={"status": "failed"}
+            )
+        
+        return job
+    
+    async def _fetch_batch_data(
+        self,
+        campaign_ids: List[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        """Campaign rows, attribution aggregates and listener aggregates for the whole batch"""
+        campaign_rows, attribution_rows = await asyncio.gather(
+            self.postgres.fetch(BATCH_CAMPAIGNS_QUERY, campaign_ids),
+            self.postgres.fetch(BATCH_ATTRIBUTION_QUERY, campaign_ids)
+        )
+        campaigns = {str(row["campaign_id"]): dict(row) for row in campaign_rows}
+        attribution = {str(row["campaign_id"]): row for row in attribution_rows}
+        
+        listeners: Dict[str, Any] = {}
+        if self.timescale and campaigns:
+            flights = list(campaigns.values())
+            listener_rows = await self.timescale.fetch(
+                BATCH_LISTENER_QUERY,
+                [c["campaign_id"] for c in flights],
+                [c["podcast_id"] for c in flights],
+                [c["start_date"] for c in flights],
+                [c["end_date"] for c in flights]
+            )
+            listeners = {str(row["campaign_id"]): row for row in listener_rows}
+        
+        return campaigns, attribution, listeners
+    
+    @staticmethod
+    def _sources(
+        campaign_id: str,
+        campaign_data: Dict[str, Any],
+        attribution: Dict[str, Any],
+        listeners: Dict[str, Any]
+    ) -> SectionSources:
+        """Section sources answered from the batch aggregates"""
+        attribution_row = attribution.get(campaign_id) or {}
+        listener_row = listeners.get(campaign_id) or {}
+        
+        performance = CampaignPerformance(
+            campaign_id=campaign_id,
+            podcast_id=str(campaign_data.get("podcast_id", "")),
+            start_date=campaign_data.get("start_date"),
+            end_date=campaign_data.get("end_date"),
+            total_downloads=int(listener_row.get("total_downloads") or 0),
+            total_streams=int(listener_row.get("total_streams") or 0),
+            total_listeners=int(listener_row.get("total_listeners") or 0),
+            attribution_events=int(attribution_row.get("period_events") or 0),
+            conversions=int(attribution_row.get("period_conversions") or 0),
+            conversion_value=float(attribution_row.get("period_conversion_value") or 0)
+        )
+        events = int(attribution_row.get("attribution_events") or 0)
+        conversions = int(attribution_row.get("conversions") or 0)
+        attribution_summary = {
+            "attribution_events": events,
+            "conversions": conversions,
+            "conversion_rate": conversions / events if events else 0.0,
+            "conversion_value": float(attribution_row.get("conversion_value") or 0)
+        }
+        
+        async def load_performance() -> CampaignPerformance:
+            return performance
+        
+        async def load_attribution() -> Dict[str, Any]:
+            return attribution_summary
+        
+        return SectionSources(performance=load_performance, attribution=load_attribution)
+    
+    async def _package_zip(self, job: BatchReportJob, reports: List[Report]):
+        """Zip every rendered file into one artifact"""
+        if not reports:
+            return
+        file_paths = [
+            os.path.join(self.generator.reports_dir, os.path.basename(report.file_url))
+            for report in reports
+        ]
+        zip_name = f"batch_{job.job_id}.zip"
+        await self.generator.run_in_render_pool(
+            package_zip, file_paths, os.path.join(self.generator.reports_dir, zip_name)
+        )
+        job.artifact_url = f"/api/v1/reports/{zip_name}"
+        # Individual files were removed once archived
+        job.artifacts = {}
+    
+    async def _save_progress(self, job: BatchReportJob):
+        try:
+            await self.postgres.execute(
+                """
+                UPDATE report_jobs
+                SET status = $2, completed_count = $3, failed_count = $4, updated_at = NOW()
+                WHERE job_id = $1
+                """,
+                job.job_id,
+                job.status.value,
+                job.completed_count,
+                job.failed_count
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update batch report job progress: {e}")
+    
+    async def _finish(self, job: BatchReportJob):
+        job.finished_at = datetime.now(timezone.utc)
+        await self.postgres.execute(
+            """
+            UPDATE report_jobs
+            SET status = $2, completed_count = $3, failed_count = $4,
+                artifact_url = $5, artifacts = $6::jsonb, errors = $7::jsonb,
+                finished_at = $8, updated_at = NOW()
+            WHERE job_id = $1
+            """,
+            job.job_id,
+            job.status.value,
+            job.completed_count,
+            job.failed_count,
+            job.artifact_url,
+            json.dumps(job.artifacts),
+            json.dumps(job.errors),
+            job.finished_at
+        )
+    
+    async def get_job(self, job_id: str, user_id: Optional[str] = None) -> Optional[BatchReportJob]:
+        """Get a batch job and its progress"""
+        query = f"SELECT {JOB_COLUMNS}, campaign_ids FROM report_jobs WHERE job_id = $1"
+        params: List[Any] = [job_id]
+        if user_id:
+            query += " AND user_id = $2"
+            params.append(user_id)
+        
+        row = await self.postgres.fetchrow(query, *params)
+        if not row:
+            return None
+        
+        def load(value):
+            return json.loads(value) if isinstance(value, str) else (value or {})
+        
+        return BatchReportJob(
+            job_id=str(row["job_id"]),
+            campaign_ids=[str(c) for c in row["campaign_ids"]],
+            template_id=row["template_id"],
+            report_type=ReportType(row["report_type"]),
+            format=ReportFormat(row["format"]),
+            package=BatchPackage(row["package"]),
+            user_id=str(row["user_id"]) if row["user_id"] else None,
+            status=BatchJobStatus(row["status"]),
+            completed_count=row["completed_count"],
+            failed_count=row["failed_count"],
+            artifact_url=row["artifact_url"],
+            artifacts=load(row["artifacts"]),
+            errors=load(row["errors"]),
+            created_at=row["created_at"],
+            finished_at=row["finished_at"]
+        )
+    
+    async def stop(self):
+        """Cancel running jobs (they are marked failed)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -8,9 +8,18 @@ Handles report generation including:
 - ROI calculations
 """
 
+import asyncio
+import csv
+import json
 import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from uuid import uuid4
@@ -22,6 +31,27 @@ from src.analytics.analytics_store import CampaignPerformance
 
 logger = logging.getLogger(__name__)
 
+# Campaign row for the overview plus a cheap version of the data behind the
+# other sections (served by the (campaign_id, ingested_at) index)
+CAMPAIGN_REPORT_QUERY = """
+    SELECT c.*, s.name as sponsor_name, s.email as sponsor_email,
+           p.name as podcast_name,
+           (
+               SELECT COUNT(*) || ':' || COALESCE(MAX(ae.ingested_at)::TEXT, '')
+               FROM attribution_events ae
+               WHERE ae.campaign_id = c.campaign_id
+           ) as attribution_version
+    FROM campaigns c
+    LEFT JOIN sponsors s ON c.sponsor_id = s.sponsor_id
+    LEFT JOIN podcasts p ON c.podcast_id = p.podcast_id
+    WHERE c.campaign_id = $1
+"""
+
+REPORT_COLUMNS = """
+    report_id, campaign_id, template_id, report_type, format, generated_at,
+    file_size_bytes, file_url, includes_roi, includes_attribution, metadata
+"""
+
 
 class ReportType(Enum):
     """Report types"""
@@ -68,6 +98,198 @@ class Report:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Sections whose content depends on template flags
+SECTION_FLAGS: Dict[str, Callable[["ReportTemplate"], bool]] = {
+    "attribution": lambda template: template.include_attribution,
+    "roi": lambda template: template.include_roi,
+}
+
+
+@dataclass
+class SectionSources:
+    """
+    Loaders for the data behind report sections
+    
+    performance returns the campaign's CampaignPerformance and attribution a
+    summary dict (attribution_events, conversions, conversion_rate,
+    conversion_value). Either may be None when no analytics are available.
+    """
+    performance: Optional[Callable[[], Awaitable[CampaignPerformance]]] = None
+    attribution: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+
+
+def summarize_attribution(events: List[Any]) -> Dict[str, Any]:
+    """Attribution section figures from a campaign's attribution events"""
+    conversions = [e for e in events if e.conversion_type]
+    return {
+        "attribution_events": len(events),
+        "conversions": len(conversions),
+        "conversion_rate": len(conversions) / len(events) if events else 0.0,
+        "conversion_value": sum(e.conversion_value or 0 for e in conversions)
+    }
+
+
+def _write_csv(report_data: Dict[str, Any], file_path: str):
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Section', 'Metric', 'Value'])
+        
+        for section_name, section_data in report_data.get('sections', {}).items():
+            data = section_data.get('data', {})
+            for key, value in data.items():
+                writer.writerow([section_name, key, value])
+
+
+def _write_json(report_data: Dict[str, Any], file_path: str):
+    with open(file_path, 'w') as f:
+        json.dump(report_data, f, indent=2, default=str)
+
+
+def _write_excel(report_data: Dict[str, Any], file_path: str):
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    
+    # Write-only workbooks stream rows to disk instead of building the sheet in memory
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Campaign Report")
+    
+    for section_name, section_data in report_data.get('sections', {}).items():
+        # Section header
+        header = WriteOnlyCell(ws, value=section_name.title())
+        header.font = Font(bold=True)
+        ws.append([header])
+        
+        # Section data
+        for key, value in section_data.get('data', {}).items():
+            ws.append([str(key), str(value)])
+        
+        ws.append([])  # Spacing between sections
+    
+    wb.save(file_path)
+
+
+def _write_pdf(report_data: Dict[str, Any], file_path: str):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    
+    doc = SimpleDocTemplate(file_path, pagesize=letter)
+    story = []
+    styles = getSampleStyleSheet()
+    
+    # Title
+    story.append(Paragraph(f"Campaign Report: {report_data.get('campaign_id', 'Campaign')}", styles['Title']))
+    story.append(Spacer(1, 12))
+    
+    # Generate sections
+    for section_name, section_data in report_data.get('sections', {}).items():
+        story.append(Paragraph(f"<b>{section_name.title()}</b>", styles['Heading2']))
+        story.append(Spacer(1, 6))
+        
+        # Add section data as table
+        data = section_data.get('data', {})
+        if data:
+            table_data = [[str(k), str(v)] for k, v in data.items()]
+            table = Table(table_data)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(table)
+            story.append(Spacer(1, 12))
+    
+    doc.build(story)
+
+
+def _write_file(
+    writer: Callable[[Dict[str, Any], str], None],
+    report_data: Dict[str, Any],
+    file_path: str
+) -> Tuple[str, int]:
+    """Write to a temporary file and move it into place once complete"""
+    tmp_path = f"{file_path}.tmp"
+    try:
+        writer(report_data, tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return file_path, os.path.getsize(file_path)
+
+
+def render_report(format_value: str, report_data: Dict[str, Any], base_path: str) -> Tuple[str, int]:
+    """
+    Render report data to storage
+    
+    Runs in a worker process. base_path is the file path without extension;
+    returns the written file path (PDF falls back to JSON without reportlab,
+    Excel to CSV without openpyxl) and its size.
+    """
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    
+    if format_value == ReportFormat.PDF.value:
+        try:
+            return _write_file(_write_pdf, report_data, f"{base_path}.pdf")
+        except ImportError:
+            logger.warning("reportlab not available, generating simple report")
+            return _write_file(_write_json, report_data, f"{base_path}.json")
+    
+    if format_value == ReportFormat.EXCEL.value:
+        try:
+            return _write_file(_write_excel, report_data, f"{base_path}.xlsx")
+        except ImportError:
+            logger.warning("openpyxl not available, falling back to CSV")
+    
+    return _write_file(_write_csv, report_data, f"{base_path}.csv")
+
+
+RENDERABLE_FORMATS = (ReportFormat.PDF, ReportFormat.CSV, ReportFormat.EXCEL)
+
+
+class SectionCache:
+    """
+    LRU cache of generated report sections
+    
+    Keys are (campaign_id, section, data_version), so a change to the
+    campaign or its attribution events produces a new key rather than a
+    stale hit. Entries also expire after ``ttl_seconds`` to bound staleness
+    of listener metrics, which are not part of the data version.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Tuple[str, str, str], value: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class ReportGenerator:
     """
     Report Generator
@@ -77,17 +299,29 @@ class ReportGenerator:
     - PDF/CSV/Excel formats
     - ROI calculations
     - Automated scheduling
+    
+    Independent sections are fetched concurrently and cached by data
+    version. Files are rendered in a worker process pool straight to
+    REPORTS_STORAGE_PATH, and report metadata is stored in the reports table.
     """
     
     def __init__(
         self,
         metrics_collector: MetricsCollector,
-        event_logger: EventLogger
+        event_logger: EventLogger,
+        postgres_conn=None,
+        reports_dir: Optional[str] = None,
+        render_workers: int = 2,
+        section_cache_size: int = 1000,
+        section_cache_ttl_seconds: float = 300.0
     ):
         self.metrics = metrics_collector
         self.events = event_logger
-        # In production, this would connect to storage
-        self._reports: Dict[str, Report] = {}
+        self.postgres = postgres_conn
+        self.reports_dir = reports_dir or os.getenv("REPORTS_STORAGE_PATH", "/tmp/reports")
+        self.render_workers = render_workers
+        self.section_cache = SectionCache(section_cache_size, section_cache_ttl_seconds)
+        self._render_pool: Optional[ProcessPoolExecutor] = None
         self._templates: Dict[str, ReportTemplate] = {}
         self._initialize_default_templates()
         
@@ -129,17 +363,20 @@ class ReportGenerator:
         end_date: Optional[datetime] = None,
         postgres_conn=None,
         analytics_store=None,
-        roi_calculator=None
+        roi_calculator=None,
+        user_id: Optional[str] = None
     ) -> Report:
         """
         Generate a report for a campaign
         
         Args:
-            user_id: User generating the report
             campaign_id: Campaign ID
-            template_id: Template to use
+            report_type: Report type
             format: Output format
-            custom_sections: Optional custom sections to include
+            template_id: Template to use
+            postgres_conn: Connection for campaign data and report metadata
+                (defaults to the generator's connection)
+            user_id: User generating the report
             
         Returns:
             Generated report
@@ -149,54 +386,29 @@ class ReportGenerator:
             - report_generation_success: Success rate
             - pdf_size: Size of generated PDF
         """
-        import time
         start_time = time.time()
+        postgres_conn = postgres_conn or self.postgres
         
-        # Get template (use default if not provided)
-        template_id = template_id or "basic_sponsor"
-        template = self._templates.get(template_id)
-        if not template:
-            # Create default template if not found
-            template = ReportTemplate(
-                template_id=template_id,
-                name="Default Report",
-                report_type=report_type,
-                sections=["overview", "performance", "attribution", "roi"],
-                include_roi=include_roi,
-                include_attribution=include_attribution,
-                include_benchmarks=include_benchmarks
-            )
+        if format not in RENDERABLE_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        template = self.get_template(
+            template_id, report_type, include_roi, include_attribution, include_benchmarks
+        )
         
         # Generate report data with real data sources
-        report_data = await self._generate_report_data(
+        report_data, data_version = await self._generate_report_data(
             campaign_id, template, postgres_conn, analytics_store, roi_calculator
         )
         
-        # Generate file based on format
-        if format == ReportFormat.PDF:
-            file_url, file_size = await self._generate_pdf(report_data, template, campaign_id)
-        elif format == ReportFormat.CSV:
-            file_url, file_size = await self._generate_csv(report_data, template, campaign_id)
-        elif format == ReportFormat.EXCEL:
-            file_url, file_size = await self._generate_excel(report_data, template, campaign_id)
-        else:
-            raise ValueError(f"Unsupported format: {format}")
-        
-        # Create report record
-        report = Report(
-            report_id=str(uuid4()),
-            campaign_id=campaign_id,
-            template_id=template.template_id,
-            report_type=report_type,
-            format=format,
-            file_size_bytes=file_size,
-            file_url=file_url,
-            includes_roi=include_roi,
-            includes_attribution=include_attribution,
-            metadata={"sections": template.sections, "report_data": report_data}
+        report = await self.render_report(
+            campaign_id, template, report_type, format, report_data, data_version,
+            include_roi=include_roi,
+            include_attribution=include_attribution
         )
         
-        self._reports[report.report_id] = report
+        if postgres_conn:
+            await self._save_report(postgres_conn, report, user_id)
         
         # Record telemetry
         generation_time = time.time() - start_time
@@ -207,7 +419,7 @@ class ReportGenerator:
         )
         self.metrics.record_gauge(
             "report_file_size_bytes",
-            file_size,
+            report.file_size_bytes,
             tags={"format": format.value}
         )
         self.metrics.increment_counter(
@@ -217,6 +429,59 @@ class ReportGenerator:
         
         return report
     
+    def get_template(
+        self,
+        template_id: Optional[str],
+        report_type: ReportType,
+        include_roi: bool = True,
+        include_attribution: bool = True,
+        include_benchmarks: bool = False
+    ) -> ReportTemplate:
+        """Get template (use default if not provided)"""
+        template_id = template_id or "basic_sponsor"
+        template = self._templates.get(template_id)
+        if not template:
+            # Create default template if not found
+            template = ReportTemplate(
+                template_id=template_id,
+                name="Default Report",
+                report_type=report_type,
+                sections=["overview", "performance", "attribution", "roi"],
+                include_roi=include_roi,
+                include_attribution=include_attribution,
+                include_benchmarks=include_benchmarks
+            )
+        return template
+        
+    async def render_report(
+        self,
+        campaign_id: str,
+        template: ReportTemplate,
+        report_type: ReportType,
+        format: ReportFormat,
+        report_data: Dict[str, Any],
+        data_version: Optional[str],
+        include_roi: bool = True,
+        include_attribution: bool = True
+    ) -> Report:
+        """Render report data to storage and return the (unsaved) report record"""
+        report_id = str(uuid4())
+        base_name = f"{campaign_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{report_id[:8]}"
+        file_url, file_size = await self._render(format, report_data, base_name)
+        
+        return Report(
+            report_id=report_id,
+            campaign_id=campaign_id,
+            template_id=template.template_id,
+            report_type=report_type,
+            format=format,
+            file_size_bytes=file_size,
+            file_url=file_url,
+            includes_roi=include_roi,
+            includes_attribution=include_attribution,
+            metadata={"sections": template.sections, "data_version": data_version}
+        )
+        
     async def _generate_report_data(
         self,
         campaign_id: str,
@@ -224,42 +489,90 @@ class ReportGenerator:
         postgres_conn=None,
         analytics_store=None,
         roi_calculator=None
-    ) -> Dict[str, Any]:
-        """Generate report data from campaign and analytics"""
-        report_data = {
-            "campaign_id": campaign_id,
-            "template": template.name,
-            "sections": {},
-            "generated_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Fetch campaign data if postgres_conn available
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Generate report data from campaign and analytics, with its data version"""
+        # Fetch campaign data (and the version of the data behind it) if postgres_conn available
         campaign_data = None
+        data_version = None
         if postgres_conn:
             try:
-                campaign_row = await postgres_conn.fetchrow(
-                    """
-                    SELECT c.*, s.name as sponsor_name, s.email as sponsor_email,
-                           p.name as podcast_name
-                    FROM campaigns c
-                    LEFT JOIN sponsors s ON c.sponsor_id = s.sponsor_id
-                    LEFT JOIN podcasts p ON c.podcast_id = p.podcast_id
-                    WHERE c.campaign_id = $1
-                    """,
-                    campaign_id
-                )
+                campaign_row = await postgres_conn.fetchrow(CAMPAIGN_REPORT_QUERY, campaign_id)
                 if campaign_row:
                     campaign_data = dict(campaign_row)
+                    data_version = f"{campaign_data.get('updated_at')}|{campaign_data.pop('attribution_version', None)}"
             except Exception as e:
                 logger.warning(f"Failed to fetch campaign data: {e}")
         
-        # Generate each section with real data
-        for section in template.sections:
-            report_data["sections"][section] = await self._generate_section(
-                campaign_id, section, template, campaign_data, analytics_store, roi_calculator
-            )
+        sources = SectionSources()
+        if analytics_store:
+            # Performance and ROI both need campaign performance; compute it at most once
+            performance_task: Optional[asyncio.Future] = None
+            
+            def load_performance() -> Awaitable[CampaignPerformance]:
+                nonlocal performance_task
+                if performance_task is None:
+                    performance_task = asyncio.ensure_future(analytics_store.calculate_campaign_performance(
+                        campaign_id=campaign_id,
+                        podcast_id=str(campaign_data.get("podcast_id", "")),
+                        start_date=campaign_data.get("start_date", datetime.now(timezone.utc)),
+                        end_date=campaign_data.get("end_date", datetime.now(timezone.utc))
+                    ))
+                return performance_task
+            
+            async def load_attribution() -> Dict[str, Any]:
+                return summarize_attribution(await analytics_store.get_attribution_events(campaign_id))
         
-        return report_data
+            sources = SectionSources(performance=load_performance, attribution=load_attribution)
+        
+        report_data = await self.build_report_data(campaign_id, template, campaign_data, data_version, sources)
+        return report_data, data_version
+    
+    async def build_report_data(
+        self,
+        campaign_id: str,
+        template: ReportTemplate,
+        campaign_data: Optional[Dict[str, Any]],
+        data_version: Optional[str],
+        sources: SectionSources
+    ) -> Dict[str, Any]:
+        """Build report data from already fetched campaign data and section sources"""
+        # Sections are independent, so generate them concurrently
+        sections = await asyncio.gather(*[
+            self._cached_section(campaign_id, section, template, data_version, campaign_data, sources)
+            for section in template.sections
+        ])
+        return {
+            "campaign_id": campaign_id,
+            "template": template.name,
+            "sections": dict(zip(template.sections, sections)),
+            "generated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+    async def _cached_section(
+        self,
+        campaign_id: str,
+        section: str,
+        template: ReportTemplate,
+        data_version: Optional[str],
+        campaign_data: Optional[Dict[str, Any]],
+        sources: SectionSources
+    ) -> Dict[str, Any]:
+        """Generate a section, reusing a cached copy for the same data version"""
+        # Sections without a data version (no campaign row) or switched off by the template are not cached
+        cacheable = data_version is not None and SECTION_FLAGS.get(section, lambda t: True)(template)
+        key = (campaign_id, section, data_version)
+        if cacheable:
+            cached = self.section_cache.get(key)
+            if cached is not None:
+                self.metrics.increment_counter("report_section_cache_hits", tags={"section": section})
+                return cached
+            self.metrics.increment_counter("report_section_cache_misses", tags={"section": section})
+        
+        section_data, degraded = await self._generate_section(campaign_id, section, template, campaign_data, sources)
+        # Fallbacks from a failed source are not cached, so the next report retries it
+        if cacheable and not degraded:
+            self.section_cache.set(key, section_data)
+        return section_data
     
     async def _generate_section(
         self,
@@ -267,10 +580,11 @@ class ReportGenerator:
         section: str,
         template: ReportTemplate,
         campaign_data: Optional[Dict[str, Any]] = None,
-        analytics_store=None,
-        roi_calculator=None
-    ) -> Dict[str, Any]:
-        """Generate a report section with real data"""
+        sources: Optional[SectionSources] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Generate a report section with real data, and whether a data source failed"""
+        sources = sources or SectionSources()
+        degraded = False
         section_data = {
             "section": section,
             "data": {}
@@ -294,14 +608,9 @@ class ReportGenerator:
                 }
         
         elif section == "performance":
-            if analytics_store and campaign_data:
+            if sources.performance and campaign_data:
                 try:
-                    performance = await analytics_store.calculate_campaign_performance(
-                        campaign_id=campaign_id,
-                        podcast_id=str(campaign_data.get("podcast_id", "")),
-                        start_date=campaign_data.get("start_date", datetime.now(timezone.utc)),
-                        end_date=campaign_data.get("end_date", datetime.now(timezone.utc))
-                    )
+                    performance = await sources.performance()
                     section_data["data"] = {
                         "total_downloads": performance.total_downloads,
                         "total_streams": performance.total_streams,
@@ -311,6 +620,7 @@ class ReportGenerator:
                     }
                 except Exception as e:
                     logger.warning(f"Failed to fetch performance data: {e}")
+                    degraded = True
                     section_data["data"] = {
                         "total_downloads": 0,
                         "total_streams": 0,
@@ -324,18 +634,12 @@ class ReportGenerator:
                 }
         
         elif section == "attribution" and template.include_attribution:
-            if analytics_store:
+            if sources.attribution:
                 try:
-                    events = await analytics_store.get_attribution_events(campaign_id)
-                    conversions = [e for e in events if e.conversion_type]
-                    section_data["data"] = {
-                        "attribution_events": len(events),
-                        "conversions": len(conversions),
-                        "conversion_rate": len(conversions) / len(events) if events else 0.0,
-                        "conversion_value": sum(e.conversion_value or 0 for e in conversions)
-                    }
+                    section_data["data"] = await sources.attribution()
                 except Exception as e:
                     logger.warning(f"Failed to fetch attribution data: {e}")
+                    degraded = True
                     section_data["data"] = {
                         "attribution_events": 0,
                         "conversions": 0,
@@ -349,15 +653,10 @@ class ReportGenerator:
                 }
         
         elif section == "roi" and template.include_roi:
-            if campaign_data and analytics_store:
+            if campaign_data and sources.performance:
                 try:
                     campaign_cost = float(campaign_data.get("campaign_value", 0))
-                    performance = await analytics_store.calculate_campaign_performance(
-                        campaign_id=campaign_id,
-                        podcast_id=str(campaign_data.get("podcast_id", "")),
-                        start_date=campaign_data.get("start_date", datetime.now(timezone.utc)),
-                        end_date=campaign_data.get("end_date", datetime.now(timezone.utc))
-                    )
+                    performance = await sources.performance()
                     conversion_value = performance.conversion_value
                     
                     roi = ((conversion_value - campaign_cost) / campaign_cost * 100) if campaign_cost > 0 else 0.0
@@ -373,6 +672,7 @@ class ReportGenerator:
                     }
                 except Exception as e:
                     logger.warning(f"Failed to calculate ROI: {e}")
+                    degraded = True
                     section_data["data"] = {
                         "campaign_cost": campaign_data.get("campaign_value", 0) if campaign_data else 0,
                         "conversion_value": 0.0,
@@ -387,186 +687,173 @@ class ReportGenerator:
                     "roas": 0.0
                 }
         
-        return section_data
+        return section_data, degraded
     
-    async def _generate_pdf(
-        self,
-        report_data: Dict[str, Any],
-        template: ReportTemplate,
-        campaign_id: str
-    ) -> tuple[str, int]:
-        """Generate PDF report"""
-        try:
-            # Try to use reportlab if available
-            try:
-                from reportlab.lib.pagesizes import letter
-                from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-                from reportlab.lib.styles import getSampleStyleSheet
-                from reportlab.lib import colors
-                import io
-                
-                buffer = io.BytesIO()
-                doc = SimpleDocTemplate(buffer, pagesize=letter)
-                story = []
-                styles = getSampleStyleSheet()
-                
-                # Title
-                story.append(Paragraph(f"Campaign Report: {report_data.get('campaign_id', 'Campaign')}", styles['Title']))
-                story.append(Spacer(1, 12))
-                
-                # Generate sections
-                for section_name, section_data in report_data.get('sections', {}).items():
-                    story.append(Paragraph(f"<b>{section_name.title()}</b>", styles['Heading2']))
-                    story.append(Spacer(1, 6))
-                    
-                    # Add section data as table
-                    data = section_data.get('data', {})
-                    if data:
-                        table_data = [[str(k), str(v)] for k, v in data.items()]
-                        table = Table(table_data)
-                        table.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 12),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                        ]))
-                        story.append(table)
-                        story.append(Spacer(1, 12))
-                
-                doc.build(story)
-                pdf_bytes = buffer.getvalue()
-                buffer.close()
-                
-                # Store PDF (in production, would use S3 or similar)
-                import os
-                reports_dir = os.getenv("REPORTS_STORAGE_PATH", "/tmp/reports")
-                os.makedirs(reports_dir, exist_ok=True)
-                file_path = os.path.join(reports_dir, f"{campaign_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.pdf")
-                
-                with open(file_path, 'wb') as f:
-                    f.write(pdf_bytes)
-                
-                file_size = len(pdf_bytes)
-                file_url = f"/api/v1/reports/{os.path.basename(file_path)}"
-                
-                return file_url, file_size
-            except ImportError:
-                # Fallback: Generate simple text-based PDF or return JSON
-                logger.warning("reportlab not available, generating simple report")
-                import json
-                import os
-                
-                reports_dir = os.getenv("REPORTS_STORAGE_PATH", "/tmp/reports")
-                os.makedirs(reports_dir, exist_ok=True)
-                file_path = os.path.join(reports_dir, f"{campaign_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json")
-                
-                with open(file_path, 'w') as f:
-                    json.dump(report_data, f, indent=2, default=str)
-                
-                file_size = os.path.getsize(file_path)
-                file_url = f"/api/v1/reports/{os.path.basename(file_path)}"
-                
-                return file_url, file_size
-        except Exception as e:
-            logger.error(f"Failed to generate PDF: {e}", exc_info=True)
-            # Return placeholder
-            file_url = f"/reports/{campaign_id}.pdf"
-            file_size = 1024 * 50
-            return file_url, file_size
-    
-    async def _generate_csv(
-        self,
-        report_data: Dict[str, Any],
-        template: ReportTemplate,
-        campaign_id: str
-    ) -> tuple[str, int]:
-        """Generate CSV report"""
-        import csv
-        import os
-        
-        reports_dir = os.getenv("REPORTS_STORAGE_PATH", "/tmp/reports")
-        os.makedirs(reports_dir, exist_ok=True)
-        file_path = os.path.join(reports_dir, f"{campaign_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv")
-        
-        with open(file_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Section', 'Metric', 'Value'])
-            
-            for section_name, section_data in report_data.get('sections', {}).items():
-                data = section_data.get('data', {})
-                for key, value in data.items():
-                    writer.writerow([section_name, key, value])
-        
-        file_size = os.path.getsize(file_path)
-        file_url = f"/api/v1/reports/{os.path.basename(file_path)}"
-        
-        return file_url, file_size
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        """Render pool, created on first use (None renders on the default thread pool)"""
+        if self.render_workers <= 0:
+            return None
+        if self._render_pool is None:
+            self._render_pool = ProcessPoolExecutor(
+                max_workers=self.render_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._render_pool
     
-    async def _generate_excel(
+    async def _render(
         self,
+        format: ReportFormat,
         report_data: Dict[str, Any],
-        template: ReportTemplate,
-        campaign_id: str
-    ) -> tuple[str, int]:
-        """Generate Excel report"""
+        base_name: str
+    ) -> Tuple[str, int]:
+        """Render the report file off the event loop and return (file_url, file_size)"""
+        file_path, file_size = await self.run_in_render_pool(
+            render_report,
+            format.value,
+            report_data,
+            os.path.join(self.reports_dir, base_name)
+        )
+        return f"/api/v1/reports/{os.path.basename(file_path)}", file_size
+    
+    async def run_in_render_pool(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a picklable module-level function in the render pool"""
+        loop = asyncio.get_running_loop()
         try:
-            import openpyxl
-            from openpyxl.styles import Font, PatternFill
-            
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Campaign Report"
-            
-            row = 1
-            for section_name, section_data in report_data.get('sections', {}).items():
-                # Section header
-                ws.cell(row=row, column=1, value=section_name.title()).font = Font(bold=True)
-                row += 1
-                
-                # Section data
-                data = section_data.get('data', {})
-                for key, value in data.items():
-                    ws.cell(row=row, column=1, value=str(key))
-                    ws.cell(row=row, column=2, value=str(value))
-                    row += 1
-                
-                row += 1  # Spacing between sections
-            
-            import os
-            reports_dir = os.getenv("REPORTS_STORAGE_PATH", "/tmp/reports")
-            os.makedirs(reports_dir, exist_ok=True)
-            file_path = os.path.join(reports_dir, f"{campaign_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.xlsx")
-            
-            wb.save(file_path)
-            file_size = os.path.getsize(file_path)
-            file_url = f"/api/v1/reports/{os.path.basename(file_path)}"
-            
-            return file_url, file_size
-        except ImportError:
-            # Fallback to CSV if openpyxl not available
-            logger.warning("openpyxl not available, falling back to CSV")
-            return await self._generate_csv(report_data, template, campaign_id)
+            return await loop.run_in_executor(self._executor(), fn, *args)
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one for the next call
+            self._render_pool = None
+            raise
+    
+    def shutdown(self):
+        """Stop the render worker pool"""
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=True)
+            self._render_pool = None
+    
+    async def _save_report(self, postgres_conn, report: Report, user_id: Optional[str]):
+        """Persist report metadata"""
+        await postgres_conn.execute(
+            """
+            INSERT INTO reports (
+                report_id, campaign_id, user_id, report_type, format,
+                template_id, generated_at, file_size_bytes, file_url,
+                includes_roi, includes_attribution, metadata
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12::jsonb)
+            """,
+            report.report_id,
+            report.campaign_id,
+            user_id,
+            report.report_type.value,
+            report.format.value,
+            report.template_id,
+            report.generated_at,
+            report.file_size_bytes,
+            report.file_url,
+            report.includes_roi,
+            report.includes_attribution,
+            json.dumps(report.metadata, default=str)
+        )
+    
+    async def save_reports(self, postgres_conn, reports: List[Report], user_id: Optional[str]):
+        """Persist metadata for many reports in one statement"""
+        if not reports:
+            return
+        await postgres_conn.execute(
+            """
+            INSERT INTO reports (
+                report_id, campaign_id, user_id, report_type, format,
+                template_id, generated_at, file_size_bytes, file_url,
+                includes_roi, includes_attribution, metadata
+            )
+            SELECT r.report_id, r.campaign_id, $3, r.report_type, r.format,
+                   r.template_id, r.generated_at, r.file_size_bytes, r.file_url,
+                   r.includes_roi, r.includes_attribution, r.metadata::jsonb
+            FROM unnest(
+                $1::uuid[], $2::uuid[], $4::text[], $5::text[], $6::text[],
+                $7::timestamptz[], $8::bigint[], $9::text[], $10::boolean[],
+                $11::boolean[], $12::text[]
+            ) AS r(
+                report_id, campaign_id, report_type, format, template_id,
+                generated_at, file_size_bytes, file_url, includes_roi,
+                includes_attribution, metadata
+            )
+            """,
+            [r.report_id for r in reports],
+            [r.campaign_id for r in reports],
+            user_id,
+            [r.report_type.value for r in reports],
+            [r.format.value for r in reports],
+            [r.template_id for r in reports],
+            [r.generated_at for r in reports],
+            [r.file_size_bytes for r in reports],
+            [r.file_url for r in reports],
+            [r.includes_roi for r in reports],
+            [r.includes_attribution for r in reports],
+            [json.dumps(r.metadata, default=str) for r in reports]
+        )
+    
+    @staticmethod
+    def _row_to_report(row) -> Report:
+        metadata = row["metadata"]
+        return Report(
+            report_id=str(row["report_id"]),
+            campaign_id=str(row["campaign_id"]),
+            template_id=row["template_id"],
+            report_type=ReportType(row["report_type"]),
+            format=ReportFormat(row["format"]),
+            generated_at=row["generated_at"],
+            file_size_bytes=row["file_size_bytes"],
+            file_url=row["file_url"],
+            includes_roi=row["includes_roi"],
+            includes_attribution=row["includes_attribution"],
+            metadata=json.loads(metadata) if isinstance(metadata, str) else (metadata or {})
+        )
     
     async def get_report(self, report_id: str) -> Optional[Report]:
         """Get report by ID"""
-        return self._reports.get(report_id)
+        if not self.postgres:
+            return None
+        
+        row = await self.postgres.fetchrow(
+            f"SELECT {REPORT_COLUMNS} FROM reports WHERE report_id = $1",
+            report_id
+        )
+        return self._row_to_report(row) if row else None
     
     async def list_reports(
         self,
         campaign_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
     ) -> List[Report]:
         """List reports with optional filters"""
-        reports = list(self._reports.values())
+        if not self.postgres:
+            return []
         
+        conditions = []
+        params: List[Any] = []
         if campaign_id:
-            reports = [r for r in reports if r.campaign_id == campaign_id]
+            params.append(campaign_id)
+            conditions.append(f"campaign_id = ${len(params)}")
+        if user_id:
+            params.append(user_id)
+            conditions.append(f"user_id = ${len(params)}")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.extend([limit, offset])
         
-        return reports
+        rows = await self.postgres.fetch(
+            f"""
+            SELECT {REPORT_COLUMNS} FROM reports
+            {where}
+            ORDER BY generated_at DESC
+            LIMIT ${len(params) - 1} OFFSET ${len(params)}
+            """,
+            *params
+        )
+        return [self._row_to_report(row) for row in rows]
     
     async def calculate_roi(
         self,
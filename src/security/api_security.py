@@ -9,13 +9,13 @@ Provides:
 """
 
 import logging
-import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
 from collections import defaultdict
 
 from src.telemetry.metrics import MetricsCollector
+from src.security.rate_limiting import RateLimitService, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -41,13 +41,13 @@ class RateLimiter:
     """
     Rate Limiter
     
-    Implements token bucket algorithm for rate limiting.
+    Checks limits through the shared RateLimitService (GCRA; distributed
+    when the global limiter is backed by Redis).
     """
     
-    def __init__(self, metrics_collector: MetricsCollector):
+    def __init__(self, metrics_collector: MetricsCollector, rate_limiter: Optional[RateLimitService] = None):
         self.metrics = metrics_collector
-        # In production, would use Redis for distributed rate limiting
-        self._buckets: Dict[str, Dict[str, Any]] = {}
+        self.service = rate_limiter or get_rate_limiter() or RateLimitService(metrics_collector=metrics_collector)
     
     async def check_rate_limit(
         self,
@@ -58,49 +58,17 @@ class RateLimiter:
         """Check if request is within rate limit"""
         bucket_key = f"{key}:{limit}:{window_seconds}"
         
-        now = time.time()
-        bucket = self._buckets.get(bucket_key, {})
-        
-        # Initialize bucket if needed
-        if "tokens" not in bucket:
-            bucket = {
-                "tokens": limit,
-                "last_refill": now,
-                "limit": limit,
-                "window": window_seconds
-            }
-            self._buckets[bucket_key] = bucket
-        
-        # Refill tokens based on time elapsed
-        time_elapsed = now - bucket["last_refill"]
-        tokens_to_add = int((time_elapsed / window_seconds) * limit)
-        
-        if tokens_to_add > 0:
-            bucket["tokens"] = min(limit, bucket["tokens"] + tokens_to_add)
-            bucket["last_refill"] = now
-        
-        # Check if request is allowed
-        if bucket["tokens"] > 0:
-            bucket["tokens"] -= 1
-            allowed = True
-        else:
-            allowed = False
-        
-        # Calculate reset time
-        reset_at = datetime.fromtimestamp(
-            bucket["last_refill"] + window_seconds,
-            tz=timezone.utc
-        )
+        decision = await self.service.check(bucket_key, limit, window_seconds)
         
         result = RateLimitResult(
-            allowed=allowed,
-            remaining=bucket["tokens"],
-            reset_at=reset_at,
+            allowed=decision.allowed,
+            remaining=decision.remaining,
+            reset_at=datetime.now(timezone.utc) + timedelta(seconds=decision.reset_after),
             limit=limit
         )
         
         # Record telemetry
-        if not allowed:
+        if not decision.allowed:
             self.metrics.increment_counter(
                 "rate_limit_exceeded",
                 tags={"key": key}
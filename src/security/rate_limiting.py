@@ -0,0 +1,241 @@
+"""
+Rate Limiting
+
+Shared rate-limiting subsystem used by the WAF and API RateLimiter. Limits
+use the generic cell rate algorithm (GCRA): each key stores a single
+"theoretical arrival time", so a check is O(1) in time and memory and allows
+bursts of up to ``limit`` requests per ``window_seconds``.
+
+- LocalRateLimitStore: in-process store with LRU eviction
+- RedisRateLimitStore: atomic Lua script, shared by every pod
+- RateLimitService: Redis when available (falling back to the local store
+  while Redis is failing), with locally pre-leased tokens so most checks
+  for high limits do not need a Redis round trip
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.telemetry.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = bucket key; ARGV = emission interval (ms), window (ms), cost.
+# Uses the Redis server clock so all pods agree on time.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - window
+if allow_at > now then
+    return {0, math.floor((window - (tat - now)) / emission), math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, math.floor((window - (new_tat - now)) / emission), 0, math.ceil(new_tat - now)}
+"""
+
+# Absorbs float rounding when converting spare capacity into whole requests
+_EPSILON = 1e-9
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check (times in seconds from now)"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0  # Until the request would be allowed (0 when allowed)
+    reset_after: float = 0.0  # Until the full limit is available again
+
+
+class LocalRateLimitStore:
+    """
+    In-process GCRA store
+    
+    Keys are kept in LRU order and the least recently used are evicted past
+    ``max_keys``; an evicted key simply starts again with a full allowance.
+    """
+    
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._tats)
+    
+    def acquire(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: float,
+        cost: int = 1,
+        now: Optional[float] = None
+    ) -> RateLimitDecision:
+        now = time.monotonic() if now is None else now
+        emission = window_seconds / limit
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + emission * cost
+        allow_at = new_tat - window_seconds
+        
+        if allow_at > now + _EPSILON:
+            return RateLimitDecision(
+                allowed=False,
+                limit=limit,
+                remaining=max(0, int((window_seconds - (tat - now)) / emission + _EPSILON)),
+                retry_after=allow_at - now,
+                reset_after=tat - now
+            )
+        
+        self._tats[key] = new_tat
+        self._tats.move_to_end(key)
+        while len(self._tats) > self.max_keys:
+            self._tats.popitem(last=False)
+        return RateLimitDecision(
+            allowed=True,
+            limit=limit,
+            remaining=max(0, int((window_seconds - (new_tat - now)) / emission + _EPSILON)),
+            reset_after=new_tat - now
+        )
+
+
+class RedisRateLimitStore:
+    """GCRA store shared across processes through one atomic Redis script"""
+    
+    def __init__(self, client: Any, key_prefix: str = "ratelimit"):
+        self.client = client
+        self.key_prefix = key_prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+    
+    async def acquire(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: float,
+        cost: int = 1
+    ) -> RateLimitDecision:
+        window_ms = window_seconds * 1000
+        allowed, remaining, retry_ms, reset_ms = await self._script(
+            keys=[f"{self.key_prefix}:{key}"],
+            args=[window_ms / limit, window_ms, cost]
+        )
+        return RateLimitDecision(
+            allowed=bool(int(allowed)),
+            limit=limit,
+            remaining=max(0, int(remaining)),
+            retry_after=int(retry_ms) / 1000,
+            reset_after=int(reset_ms) / 1000
+        )
+
+
+class RateLimitService:
+    """
+    Rate limiter shared by all call sites
+    
+    For limits of at least ``10 * lease_size`` per window, a miss takes
+    ``lease_size`` tokens from Redis at once and serves the next requests
+    for that key from the local lease until it is used up or
+    ``lease_ttl_seconds`` passes (unused leased tokens are forfeited, so a
+    pod can only ever under-admit). Smaller limits are checked against Redis
+    on every request. When Redis errors, checks use the local store for
+    ``fallback_seconds`` before Redis is tried again.
+    """
+    
+    def __init__(
+        self,
+        redis_client: Any = None,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        key_prefix: str = "ratelimit",
+        lease_size: int = 10,
+        lease_ttl_seconds: float = 1.0,
+        max_local_keys: int = 100000,
+        fallback_seconds: float = 5.0
+    ):
+        self.metrics = metrics_collector
+        self.redis = RedisRateLimitStore(redis_client, key_prefix) if redis_client is not None else None
+        self.local = LocalRateLimitStore(max_local_keys)
+        self.lease_size = lease_size
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.max_local_keys = max_local_keys
+        self.fallback_seconds = fallback_seconds
+        # key -> (tokens left, expires at, remaining reported by Redis when leased)
+        self._leases: "OrderedDict[str, Tuple[int, float, int]]" = OrderedDict()
+        self._fallback_until = 0.0
+    
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: float,
+        cost: int = 1
+    ) -> RateLimitDecision:
+        """Consume cost tokens for key if allowed"""
+        now = time.monotonic()
+        if self.redis is None or now < self._fallback_until:
+            return self.local.acquire(key, limit, window_seconds, cost, now)
+        
+        leasing = cost == 1 and self.lease_size > 1 and limit >= self.lease_size * 10
+        if leasing:
+            lease = self._leases.get(key)
+            if lease and lease[0] > 0 and lease[1] > now:
+                tokens, expires_at, remaining = lease
+                self._leases[key] = (tokens - 1, expires_at, remaining)
+                return RateLimitDecision(allowed=True, limit=limit, remaining=remaining + tokens - 1)
+        
+        try:
+            if leasing:
+                decision = await self.redis.acquire(key, limit, window_seconds, self.lease_size)
+                if decision.allowed:
+                    self._store_lease(key, self.lease_size - 1, now, decision.remaining)
+                    decision.remaining += self.lease_size - 1
+                    return decision
+                # Not enough room for a whole lease; fall back to a single token
+            return await self.redis.acquire(key, limit, window_seconds, cost)
+        except Exception as e:
+            logger.warning(f"Redis rate limiting unavailable, using local limits: {e}")
+            self._fallback_until = now + self.fallback_seconds
+            if self.metrics:
+                self.metrics.increment_counter("rate_limit_backend_errors_total")
+            return self.local.acquire(key, limit, window_seconds, cost, now)
+    
+    def _store_lease(self, key: str, tokens: int, now: float, remaining: int):
+        self._leases[key] = (tokens, now + self.lease_ttl_seconds, remaining)
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.max_local_keys:
+            self._leases.popitem(last=False)
+
+
+# Global rate limiter instance
+_rate_limiter: Optional[RateLimitService] = None
+
+
+def init_rate_limiter(
+    redis_client: Any = None,
+    metrics_collector: Optional["MetricsCollector"] = None,
+    **kwargs
+) -> RateLimitService:
+    """Initialize the global rate limiter"""
+    global _rate_limiter
+    
+    _rate_limiter = RateLimitService(
+        redis_client=redis_client,
+        metrics_collector=metrics_collector,
+        **kwargs
+    )
+    
+    return _rate_limiter
+
+
+def get_rate_limiter() -> Optional[RateLimitService]:
+    """Get the global rate limiter instance"""
+    return _rate_limiter
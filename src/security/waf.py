@@ -8,15 +8,21 @@ Enterprise-grade WAF with:
 - Rate limiting per IP
 - Request size limits
 - Suspicious pattern detection
+
+Rules are compiled into a single alternation (CompiledRuleSet) so each
+request target is scanned once, and bodies are inspected chunk by chunk
+(BodyInspector) as they are received.
 """
 
+import codecs
 import re
 import logging
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Union, Iterator
 from datetime import datetime, timedelta
-from collections import defaultdict
 import hashlib
 
+from src.security.rate_limiting import RateLimitService, get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,12 +42,87 @@ class WAFRule:
         self.severity = severity
         self.action = action
         self.description = description
+        self.hits = 0
     
     def matches(self, text: str) -> bool:
         """Check if rule matches text"""
         return bool(self.pattern.search(text))
 
 
+class CompiledRuleSet:
+    """
+    WAF rules compiled into one regex
+    
+    Every rule becomes a named group of a single alternation, so a target is
+    scanned in one pass instead of once per rule. Blocking rules come first:
+    where a blocking and a logging rule match at the same position, the
+    blocking rule is reported.
+    """
+    
+    def __init__(self, rules: List[WAFRule]):
+        ordered = sorted(range(len(rules)), key=lambda i: rules[i].action != "block")
+        self.rules = rules
+        self._rules_by_group = {f"r{i}": rules[i] for i in ordered}
+        self.pattern = re.compile(
+            "|".join(f"(?P<r{i}>{rules[i].pattern.pattern})" for i in ordered),
+            re.IGNORECASE
+        )
+    
+    def scan(self, text: str, pos: int = 0) -> Iterator[Tuple[WAFRule, "re.Match"]]:
+        """Yield (rule, match) for non-overlapping matches from pos onwards"""
+        for match in self.pattern.finditer(text, pos):
+            yield self._rules_by_group[match.lastgroup], match
+    
+    def rules_at(self, text: str, pos: int) -> List[WAFRule]:
+        """All rules matching at pos (the alternation only reports the first)"""
+        return [rule for rule in self.rules if rule.pattern.match(text, pos)]
+
+
+class BodyInspector:
+    """
+    Incremental request body inspection
+    
+    Chunks are decoded and scanned as they arrive; ``feed`` returns a
+    verdict as soon as a blocking rule matches or the body exceeds the size
+    limit, so the rest of the body never has to be read. The last
+    ``overlap`` characters of each chunk are rescanned with the next one so
+    matches spanning a chunk boundary are still found.
+    """
+    
+    def __init__(self, waf: "WAF", client_ip: Optional[str] = None, overlap: int = 1024):
+        self.waf = waf
+        self.client_ip = client_ip
+        self.overlap = overlap
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._carry = ""
+        self._seen: set = set()
+    
+    def feed(self, chunk: Union[bytes, str]) -> Optional[Tuple[str, str]]:
+        """
+        Inspect the next chunk of the body
+        
+        Returns:
+            (rule_name, reason) if the request must be rejected, else None
+        """
+        if isinstance(chunk, str):
+            self.size += len(chunk) if chunk.isascii() else len(chunk.encode())
+            text = chunk
+        else:
+            self.size += len(chunk)
+            text = self._decoder.decode(chunk)
+        if self.size > self.waf.max_request_size:
+            return "request_too_large", f"Request exceeds {self.waf.max_request_size} bytes"
+        
+        window = self._carry + text
+        # Matches ending inside the carried-over text were already seen
+        rule = self.waf._scan(window, "body", self.client_ip, self._seen, min_end=len(self._carry) + 1)
+        self._carry = window[-self.overlap:] if self.overlap else ""
+        if rule is not None:
+            return rule.name, f"{rule.description} (in body)"
+        return None
+
+
 class WAF:
     """
     Web Application Firewall
@@ -61,6 +142,7 @@ class WAF:
         log_only: bool = False,
         max_request_size: int = 10 * 1024 * 1024,  # 10MB
         rate_limit_per_minute: int = 60,
+        rate_limiter: Optional[RateLimitService] = None,
     ):
         self.enabled = enabled
         self.block_on_match = block_on_match and not log_only
@@ -68,11 +150,12 @@ class WAF:
         self.max_request_size = max_request_size
         self.rate_limit_per_minute = rate_limit_per_minute
         
-        # Rate limiting tracking
-        self.request_counts: Dict[str, List[datetime]] = defaultdict(list)
+        # Rate limiting (shared across pods when the global limiter has Redis)
+        self.rate_limiter = rate_limiter or get_rate_limiter() or RateLimitService()
         
         # Initialize rules
         self.rules = self._initialize_rules()
+        self.matcher = CompiledRuleSet(self.rules)
         
         # Blocked IPs (in production, use Redis)
         self.blocked_ips: Dict[str, datetime] = {}
@@ -155,7 +238,7 @@ class WAF:
         
         return rules
     
-    def check_request(
+    async def check_request(
         self,
         method: str,
         path: str,
@@ -182,91 +265,92 @@ class WAF:
         
         # Rate limiting
         if client_ip:
-            if not self._check_rate_limit(client_ip):
+            if not await self._check_rate_limit(client_ip):
                 # Block IP for 15 minutes
                 self.blocked_ips[client_ip] = datetime.utcnow() + timedelta(minutes=15)
                 return False, "rate_limit", f"Rate limit exceeded for IP {client_ip}"
         
-        # Check request size
-        if body and len(body.encode()) > self.max_request_size:
-            return False, "request_too_large", f"Request exceeds {self.max_request_size} bytes"
-        
-        # Check path
-        for rule in self.rules:
-            if rule.matches(path):
-                if self.block_on_match and rule.action == "block":
-                    logger.warning(
-                        f"WAF blocked request: {rule.name}",
-                        extra={
-                            "rule": rule.name,
-                            "path": path,
-                            "method": method,
-                            "client_ip": client_ip,
-                            "severity": rule.severity,
-                        }
-                    )
-                    return False, rule.name, rule.description
-                else:
-                    logger.info(
-                        f"WAF detected: {rule.name}",
-                        extra={
-                            "rule": rule.name,
-                            "path": path,
-                            "method": method,
-                            "client_ip": client_ip,
-                        }
-                    )
+        # Check path (non-blocking detections are only logged for the path)
+        rule = self._scan(path, "path", client_ip, method=method)
+        if rule is not None:
+            return False, rule.name, rule.description
         
         # Check headers
         header_string = " ".join(f"{k}:{v}" for k, v in headers.items())
-        for rule in self.rules:
-            if rule.matches(header_string):
-                if self.block_on_match and rule.action == "block":
-                    logger.warning(
-                        f"WAF blocked request: {rule.name} in headers",
-                        extra={
-                            "rule": rule.name,
-                            "client_ip": client_ip,
-                            "severity": rule.severity,
-                        }
-                    )
-                    return False, rule.name, f"{rule.description} (in headers)"
+        rule = self._scan(header_string, "headers", client_ip)
+        if rule is not None:
+            return False, rule.name, f"{rule.description} (in headers)"
         
         # Check body
         if body:
-            for rule in self.rules:
-                if rule.matches(body):
-                    if self.block_on_match and rule.action == "block":
-                        logger.warning(
-                            f"WAF blocked request: {rule.name} in body",
-                            extra={
-                                "rule": rule.name,
-                                "client_ip": client_ip,
-                                "severity": rule.severity,
-                            }
-                        )
-                        return False, rule.name, f"{rule.description} (in body)"
+            verdict = self.body_inspector(client_ip).feed(body)
+            if verdict:
+                return False, verdict[0], verdict[1]
         
         return True, None, None
     
-    def _check_rate_limit(self, client_ip: str) -> bool:
-        """Check rate limit for IP"""
-        now = datetime.utcnow()
-        minute_ago = now - timedelta(minutes=1)
-        
-        # Clean old entries
-        self.request_counts[client_ip] = [
-            ts for ts in self.request_counts[client_ip]
-            if ts > minute_ago
-        ]
-        
-        # Check limit
-        if len(self.request_counts[client_ip]) >= self.rate_limit_per_minute:
-            return False
+    def body_inspector(self, client_ip: Optional[str] = None) -> BodyInspector:
+        """Create an inspector for a request body that is read in chunks"""
+        return BodyInspector(self, client_ip=client_ip)
+    
+    def _scan(
+        self,
+        text: str,
+        target: str,
+        client_ip: Optional[str],
+        seen: Optional[set] = None,
+        min_end: int = 0,
+        method: Optional[str] = None,
+    ) -> Optional[WAFRule]:
+        """
+        Scan one target in a single pass, counting each rule once per target
         
-        # Add current request
-        self.request_counts[client_ip].append(now)
-        return True
+        Returns:
+            The rule that blocks the request, if any
+        """
+        seen = set() if seen is None else seen
+        for rule, match in self.matcher.scan(text):
+            if match.end() < min_end:
+                continue
+            if self.block_on_match and rule.action == "block":
+                rule.hits += 1
+                logger.warning(
+                    f"WAF blocked request: {rule.name} in {target}",
+                    extra={
+                        "rule": rule.name,
+                        "path": text if target == "path" else None,
+                        "method": method,
+                        "client_ip": client_ip,
+                        "severity": rule.severity,
+                    }
+                )
+                return rule
+            # Not blocking: count every rule that matches at this position
+            for detected in self.matcher.rules_at(text, match.start()):
+                if id(detected) in seen:
+                    continue
+                seen.add(id(detected))
+                detected.hits += 1
+                if target == "path":
+                    logger.info(
+                        f"WAF detected: {detected.name}",
+                        extra={
+                            "rule": detected.name,
+                            "path": text,
+                            "method": method,
+                            "client_ip": client_ip,
+                        }
+                    )
+        return None
+    
+    async def _check_rate_limit(self, client_ip: str) -> bool:
+        """Check rate limit for IP"""
+        decision = await self.rate_limiter.check(
+            f"waf:{client_ip}",
+            limit=self.rate_limit_per_minute,
+            window_seconds=60
+        )
+        return decision.allowed
     
     def get_stats(self) -> Dict[str, any]:
         """Get WAF statistics"""
@@ -274,11 +358,16 @@ class WAF:
             "enabled": self.enabled,
             "rules_count": len(self.rules),
             "blocked_ips_count": len(self.blocked_ips),
-            "active_rate_limits": len([
-                ip for ip, timestamps in self.request_counts.items()
-                if len(timestamps) > 0
-            ]),
+            "active_rate_limits": len(self.rate_limiter.local),
+            "rule_hits": self.get_rule_hits(),
         }
+    
+    def get_rule_hits(self) -> Dict[str, int]:
+        """Hits per rule name (rules sharing a name are summed)"""
+        hits: Dict[str, int] = {}
+        for rule in self.rules:
+            hits[rule.name] = hits.get(rule.name, 0) + rule.hits
+        return hits
 
 
 # Global WAF instance
@@ -291,6 +380,7 @@ def init_waf(
     log_only: bool = False,
     max_request_size: int = 10 * 1024 * 1024,
     rate_limit_per_minute: int = 60,
+    rate_limiter: Optional[RateLimitService] = None,
 ) -> WAF:
     """Initialize global WAF"""
     global _waf
@@ -301,6 +391,7 @@ def init_waf(
         log_only=log_only,
         max_request_size=max_request_size,
         rate_limit_per_minute=rate_limit_per_minute,
+        rate_limiter=rate_limiter,
     )
     
     return _waf
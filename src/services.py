@@ -10,7 +10,9 @@ from typing import Dict, Any
 from src.config.settings import get_settings
 from src.database import PostgresConnection, TimescaleConnection, RedisConnection
 from src.telemetry.metrics import MetricsCollector
+from src.analytics.user_activity_rollup import UserActivityRollup
 from src.telemetry.events import EventLogger
+from src.telemetry.event_sinks import PostgresEventSink
 from src.cache.cache_manager import CacheManager
 
 
@@ -26,7 +28,6 @@ async def initialize_services() -> Dict[str, Any]:
     
     # Initialize telemetry
     metrics_collector = MetricsCollector()
-    event_logger = EventLogger()
     
     # Initialize database connections
     postgres_conn = PostgresConnection(
@@ -52,17 +53,32 @@ async def initialize_services() -> Dict[str, Any]:
         port=settings.database.redis_port,
         password=settings.database.redis_password
     )
+    # Cache payloads are binary (see src.cache.codecs), so the cache gets its own client
+    cache_redis_conn = RedisConnection(
+        host=settings.database.redis_host,
+        port=settings.database.redis_port,
+        password=settings.database.redis_password,
+        decode_responses=False
+    )
     
     # Initialize connections
     await postgres_conn.initialize()
     await timescale_conn.initialize()
     await redis_conn.initialize()
+    await cache_redis_conn.initialize()
     
     # Initialize event logger
+    event_logger = EventLogger(
+        metrics_collector=metrics_collector,
+        postgres_conn=postgres_conn,
+        # Stored events also update the daily active-user sketches
+        sink=PostgresEventSink(postgres_conn, rollup=UserActivityRollup(postgres_conn)),
+        spill_directory=os.getenv("EVENT_SPILL_DIR")
+    )
     await event_logger.initialize()
     
     # Initialize cache manager with Redis client
-    cache_manager = CacheManager(redis_client=redis_conn.client)
+    cache_manager = CacheManager(redis_client=cache_redis_conn.client, metrics_collector=metrics_collector)
     
     # Initialize other services (lazy imports to avoid circular dependencies)
     services = {
@@ -71,6 +87,7 @@ async def initialize_services() -> Dict[str, Any]:
         "postgres_conn": postgres_conn,
         "timescale_conn": timescale_conn,
         "redis_conn": redis_conn,
+        "cache_redis_conn": cache_redis_conn,
         "cache_manager": cache_manager,
     }
     
@@ -12,12 +12,14 @@ Enterprise-grade APM with:
 
 import time
 import logging
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Iterable, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 from functools import wraps
 import asyncio
 
+from src.telemetry.sketch import LogBucketSketch, WindowedSketch
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,14 +88,21 @@ class APM:
         slow_query_threshold: float = 1.0,  # seconds
         slow_request_threshold: float = 2.0,  # seconds
         sample_rate: float = 1.0,  # 100% sampling
+        window_seconds: float = 300.0,  # sub-window length
+        num_windows: int = 12,  # stats cover window_seconds * num_windows
+        max_series: int = 1000,  # distinct (metric, name) series kept
     ):
         self.enabled = enabled
         self.slow_query_threshold = slow_query_threshold
         self.slow_request_threshold = slow_request_threshold
         self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.num_windows = num_windows
+        self.max_series = max_series
         
-        # Metrics storage (in production, use Prometheus/StatsD)
-        self.metrics: Dict[str, list] = defaultdict(list)
+        # Per (metric name, transaction name) windowed sketches; memory is
+        # bounded by max_series * num_windows * sketch buckets
+        self.metrics: Dict[Tuple[str, str], WindowedSketch] = {}
     
     @contextmanager
     def transaction(self, name: str, transaction_type: str = "request"):
@@ -212,40 +221,85 @@ class APM:
     
     def _record_metric(self, metric_name: str, value: float, tags: Dict[str, Any]):
         """Record metric"""
-        if metric_name not in self.metrics:
-            self.metrics[metric_name] = []
-        
-        self.metrics[metric_name].append({
-            "value": value,
-            "tags": tags,
-            "timestamp": datetime.utcnow().isoformat(),
-        })
+        key = (metric_name, str(tags.get("name", metric_name)))
+        sketch = self.metrics.get(key)
+        if sketch is None:
+            if len(self.metrics) >= self.max_series:
+                # Unbounded names (e.g. paths with ids) share one series per metric
+                key = (metric_name, OVERFLOW_SERIES)
+                sketch = self.metrics.get(key)
+            if sketch is None:
+                sketch = WindowedSketch(self.window_seconds, self.num_windows)
+                self.metrics[key] = sketch
+        sketch.add(value)
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get APM statistics"""
-        stats = {}
+        """Get APM statistics per metric over the sliding window"""
+        merged: Dict[str, LogBucketSketch] = {}
+        for (metric_name, _), sketch in list(self.metrics.items()):
+            window = sketch.merged()
+            if metric_name in merged:
+                merged[metric_name].merge(window)
+            else:
+                merged[metric_name] = window
         
-        for metric_name, values in self.metrics.items():
-            if not values:
+        return {
+            metric_name: sketch.stats()
+            for metric_name, sketch in merged.items()
+            if sketch.count
+        }
+    
+    def get_transaction_stats(self) -> Dict[str, Any]:
+        """Get APM statistics per transaction name over the sliding window"""
+        stats = {}
+        for (metric_name, name), sketch in list(self.metrics.items()):
+            if metric_name != "transaction":
                 continue
-            
-            durations = [v["value"] for v in values]
-            stats[metric_name] = {
-                "count": len(durations),
-                "avg": sum(durations) / len(durations),
-                "min": min(durations),
-                "max": max(durations),
-                "p95": self._percentile(durations, 95),
-                "p99": self._percentile(durations, 99),
-            }
-        
+            window = sketch.merged()
+            if window.count:
+                stats[name] = window.stats()
         return stats
     
-    def _percentile(self, data: list, percentile: float) -> float:
-        """Calculate percentile"""
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Mergeable snapshot of all series
+        
+        Snapshots from several worker processes can be combined with
+        APM.stats_from_snapshots().
+        """
+        return {
+            "series": [
+                {"metric": metric_name, "name": name, "sketch": sketch.to_dict()}
+                for (metric_name, name), sketch in list(self.metrics.items())
+            ]
+        }
+    
+    @staticmethod
+    def stats_from_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine snapshots from several processes into per-metric and per-transaction stats"""
+        by_metric: Dict[str, list] = {}
+        by_transaction: Dict[str, list] = {}
+        for snapshot in snapshots:
+            for series in snapshot["series"]:
+                by_metric.setdefault(series["metric"], []).append(series["sketch"])
+                if series["metric"] == "transaction":
+                    by_transaction.setdefault(series["name"], []).append(series["sketch"])
+        
+        stats: Dict[str, Any] = {}
+        for metric_name, sketches in by_metric.items():
+            merged = WindowedSketch.merge_dicts(sketches)
+            if merged.count:
+                stats[metric_name] = merged.stats()
+        stats["transactions"] = {}
+        for name, sketches in by_transaction.items():
+            merged = WindowedSketch.merge_dicts(sketches)
+            if merged.count:
+                stats["transactions"][name] = merged.stats()
+        return stats
+
+
+# Series name used once max_series distinct names have been seen
+OVERFLOW_SERIES = "__other__"
 
 
 # Global APM instance
@@ -0,0 +1,158 @@
+"""
+Event Sinks
+
+Storage backends for EventLogger flushes:
+- PostgresEventSink: writes a whole batch in one set-based INSERT
+- FileSpill: append-only JSONL spill directory used while the database is
+  unavailable, replayed once writes succeed again
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional, TYPE_CHECKING
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from src.analytics.user_activity_rollup import UserActivityRollup
+    from src.database import PostgresConnection
+    from src.telemetry.events import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink(ABC):
+    """Destination for flushed event batches"""
+    
+    @abstractmethod
+    async def write(self, events: List["Event"]):
+        """
+        Write a batch of events
+        
+        Raises:
+            Exception: if the batch could not be stored (caller may spill it)
+        """
+        pass
+
+
+class PostgresEventSink(EventSink):
+    """
+    PostgreSQL event sink
+    
+    The batch is sent as column arrays and expanded server-side with
+    ``unnest``, so one round trip stores the whole batch. ``ON CONFLICT``
+    keeps replays of spilled batches idempotent.
+    
+    With a ``rollup``, each stored batch is also added to the daily
+    distinct-user sketches; if that fails the write fails, and the replayed
+    batch is counted once because sketch updates are idempotent too.
+    """
+    
+    INSERT_QUERY = """
+        INSERT INTO events (event_id, event_type, user_id, session_id, timestamp, properties, context)
+        SELECT e.event_id, e.event_type, e.user_id, e.session_id, e.timestamp,
+               e.properties::jsonb, e.context::jsonb
+        FROM unnest($1::uuid[], $2::text[], $3::text[], $4::text[], $5::timestamptz[], $6::text[], $7::text[])
+            AS e(event_id, event_type, user_id, session_id, timestamp, properties, context)
+        ON CONFLICT (event_id) DO NOTHING
+    """
+    
+    def __init__(self, postgres_conn: "PostgresConnection", rollup: Optional["UserActivityRollup"] = None):
+        self.postgres = postgres_conn
+        self.rollup = rollup
+    
+    async def write(self, events: List["Event"]):
+        if not events:
+            return
+        await self.postgres.execute(
+            self.INSERT_QUERY,
+            [event.event_id for event in events],
+            [event.event_type for event in events],
+            [event.user_id for event in events],
+            [event.session_id for event in events],
+            [event.timestamp for event in events],
+            [json.dumps(event.properties, default=str) for event in events],
+            [json.dumps(event.context, default=str) for event in events],
+        )
+        if self.rollup is not None:
+            await self.rollup.record(events)
+
+
+class FileSpill:
+    """
+    Spill-to-disk buffer
+    
+    Each failed batch is written to its own JSONL file; ``replay`` hands the
+    oldest file back to a sink and deletes it once stored. Total spill size
+    is capped so a long outage cannot fill the disk.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+    
+    async def spill(self, events: List["Event"]) -> bool:
+        """
+        Persist a batch to disk (file I/O runs in a worker thread)
+        
+        Returns:
+            False if the spill directory is full and the batch was not written
+        """
+        return await asyncio.to_thread(self._write_file, events)
+    
+    def _write_file(self, events: List["Event"]) -> bool:
+        if self.size_bytes() >= self.max_bytes:
+            return False
+        name = f"{time.time_ns():020d}-{uuid4().hex[:8]}.jsonl"
+        tmp_path = os.path.join(self.directory, name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(asdict(event), default=str) + "\n")
+        # Rename so replay never sees a partially written file
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        return True
+    
+    def pending_files(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+    
+    def size_bytes(self) -> int:
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+        )
+    
+    async def replay(self, sink: EventSink, max_files: int = 1) -> int:
+        """
+        Write up to max_files spilled batches to the sink (oldest first)
+        
+        Listing, reading and deleting files run in a worker thread.
+        
+        Returns:
+            Number of events replayed
+        """
+        replayed = 0
+        names = await asyncio.to_thread(self.pending_files)
+        for name in names[:max_files]:
+            path = os.path.join(self.directory, name)
+            events = await asyncio.to_thread(self._read_file, path)
+            await sink.write(events)
+            await asyncio.to_thread(os.remove, path)
+            replayed += len(events)
+        return replayed
+    
+    def _read_file(self, path: str) -> List["Event"]:
+        from src.telemetry.events import Event
+        
+        events = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                data = json.loads(line)
+                data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+                events.append(Event(**data))
+        return events
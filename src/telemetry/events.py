@@ -7,12 +7,20 @@ and support flow triggers. Integrates with marketing/analytics platforms.
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Dict, Optional, Any, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Any, List, TYPE_CHECKING
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+from uuid import uuid4
 import json
 
+from src.telemetry.event_sinks import EventSink, PostgresEventSink, FileSpill
+
+if TYPE_CHECKING:
+    from src.database import PostgresConnection
+    from src.telemetry.metrics import MetricsCollector
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +45,8 @@ class Event:
     properties: Dict[str, Any]
     page: Optional[str] = None
     feature: Optional[str] = None
+    event_id: str = field(default_factory=lambda: str(uuid4()))
+    context: Dict[str, Any] = field(default_factory=dict)
 
 
 class EventLogger:
@@ -45,14 +55,38 @@ class EventLogger:
     
     Logs user events for analytics, marketing, and product insights.
     Captures friction signals and triggers support flows.
+    
+    Buffered events are written in batches through an EventSink (PostgreSQL
+    by default). Producers are slowed down once the buffer passes
+    ``high_water_mark`` and events are dropped (and counted) beyond
+    ``max_buffer_size``. Batches that fail to store are spilled to
+    ``spill_directory`` when configured and replayed on later flushes.
     """
     
-    def __init__(self, batch_size: int = 100, flush_interval: int = 5):
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 5,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        postgres_conn: Optional["PostgresConnection"] = None,
+        sink: Optional[EventSink] = None,
+        high_water_mark: int = 5000,
+        max_buffer_size: int = 50000,
+        spill_directory: Optional[str] = None
+    ):
         self.events: List[Event] = []
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.metrics_collector = metrics_collector
+        self.postgres_conn = postgres_conn
+        self.sink = sink or (PostgresEventSink(postgres_conn) if postgres_conn is not None else None)
+        self.high_water_mark = high_water_mark
+        self.max_buffer_size = max_buffer_size
+        self.spill = FileSpill(spill_directory) if spill_directory else None
+        self.dropped_events = 0
         self._enabled = True
         self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
         
     async def initialize(self):
         """Initialize event logger"""
@@ -90,6 +124,10 @@ class EventLogger:
         """
         if not self._enabled:
             return
+        
+        if len(self.events) >= self.max_buffer_size:
+            self._record_dropped(1, "buffer_full")
+            return
             
         event = Event(
             event_type=event_type,
@@ -106,8 +144,10 @@ class EventLogger:
         # Check for friction signals
         await self._detect_friction(event)
         
-        # Flush if batch size reached
-        if len(self.events) >= self.batch_size:
+        # Backpressure: past the high-water mark the producer waits for a flush
+        if len(self.events) >= self.high_water_mark:
+            await self.flush()
+        elif len(self.events) >= self.batch_size and not self._flush_lock.locked():
             await self.flush()
     
     async def log_page_view(
@@ -267,51 +307,56 @@ class EventLogger:
     
     async def flush(self):
         """Flush events to storage/analytics platform"""
-        if not self.events:
+        async with self._flush_lock:
+            while self.events:
+                events_to_flush = self.events[:self.batch_size * 10]
+                del self.events[:len(events_to_flush)]
+                await self._write_batch(events_to_flush)
+    
+    async def _write_batch(self, events_to_flush: List[Event]):
+        """Write one batch through the sink, spilling or dropping it on failure"""
+        if self.sink is None:
+            logger.debug(f"No event sink configured; discarding {len(events_to_flush)} events")
             return
-            
-        events_to_flush = self.events.copy()
-        self.events.clear()
         
-        # Send to internal analytics store (PostgreSQL)
+        start = time.perf_counter()
         try:
-            # Import here to avoid circular dependencies
-            from src.database import PostgresConnection
-            from src.main import postgres_conn
-            
-            if postgres_conn:
-                for event in events_to_flush:
-                    try:
-                        await postgres_conn.execute(
-                            """
-                            INSERT INTO events (event_id, event_type, user_id, session_id, timestamp, properties, context)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7)
-                            ON CONFLICT (event_id) DO NOTHING
-                            """,
-                            event.event_id,
-                            event.event_type,
-                            event.user_id,
-                            event.session_id,
-                            event.timestamp,
-                            json.dumps(event.properties, default=str),
-                            json.dumps(event.context, default=str)
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to store event {event.event_id}: {e}")
+            await self.sink.write(events_to_flush)
         except Exception as e:
-            logger.warning(f"Failed to flush events to database: {e}")
-        
-        # In production, this would also send to:
-        # - PostHog/Mixpanel/Amplitude (via their SDKs)
-        # - Segment
-        # - Data warehouse
-        # For now, we store in PostgreSQL events table
+            logger.warning(f"Failed to flush {len(events_to_flush)} events: {e}")
+            if self.spill and await self.spill.spill(events_to_flush):
+                self._increment("events_spilled", len(events_to_flush))
+            else:
+                self._record_dropped(len(events_to_flush), "sink_error")
+            return
         
+        if self.metrics_collector:
+            self.metrics_collector.record_histogram(
+                "event_flush_latency_ms", (time.perf_counter() - start) * 1000
+            )
+        self._increment("events_flushed", len(events_to_flush))
         logger.info(f"Flushed {len(events_to_flush)} events to storage")
         
         # Also log for debugging
         for event in events_to_flush[:10]:  # Log first 10 to avoid spam
             logger.debug(f"Event: {event.event_type} - {json.dumps(asdict(event), default=str)}")
+        
+        # Storage is reachable again: drain one spilled batch per flush
+        if self.spill:
+            try:
+                replayed = await self.spill.replay(self.sink)
+                if replayed:
+                    self._increment("events_replayed", replayed)
+            except Exception as e:
+                logger.warning(f"Failed to replay spilled events: {e}")
+    
+    def _record_dropped(self, count: int, reason: str):
+        self.dropped_events += count
+        self._increment("events_dropped", count, {"reason": reason})
+    
+    def _increment(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
+        if self.metrics_collector:
+            self.metrics_collector.increment_counter(name, value=value, tags=tags)
     
     async def _periodic_flush(self):
         """Periodically flush events"""
@@ -5,9 +5,12 @@ Provides metrics collection interface for Prometheus-compatible metrics.
 Captures operational telemetry including latency, uptime, error rates, etc.
 """
 
+import math
+import re
 import time
-from typing import Dict, Optional, Any
-from dataclasses import dataclass
+from bisect import bisect_left
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import logging
 
@@ -22,14 +25,75 @@ class MetricType(Enum):
     SUMMARY = "summary"
 
 
-@dataclass
+# Latency-oriented default buckets (values are usually milliseconds)
+DEFAULT_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+# Maximum distinct tag combinations kept per metric name
+DEFAULT_MAX_SERIES_PER_METRIC = 1000
+
+# Tags applied to observations that exceed the cardinality cap
+OVERFLOW_TAGS = {"overflow": "true"}
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+@dataclass(slots=True)
 class Metric:
-    """Metric data structure"""
+    """
+    Aggregated metric series
+    
+    One instance per (name, tags) combination, updated in place:
+    counters hold a running sum, gauges the last value, and histograms and
+    summaries a fixed bucket array plus sum/count (``value`` is the sum).
+    """
     name: str
     value: float
     metric_type: MetricType
     tags: Dict[str, str]
     timestamp: float
+    count: int = 0
+    buckets: Tuple[float, ...] = ()
+    bucket_counts: List[int] = field(default_factory=list)
+    
+    def observe(self, value: float):
+        """Add an observation to a histogram/summary series"""
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.value += value
+        self.count += 1
+        self.timestamp = time.time()
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile from the bucket counts (linear interpolation within a bucket)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i >= len(self.buckets):
+                    # Overflow (+Inf) bucket: the best bound we have is its lower edge
+                    return lower
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1] if self.buckets else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot"""
+        snapshot: Dict[str, Any] = {
+            "name": self.name,
+            "type": self.metric_type.value,
+            "tags": self.tags,
+            "value": self.value,
+            "timestamp": self.timestamp,
+        }
+        if self.buckets:
+            snapshot["count"] = self.count
+            snapshot["buckets"] = dict(zip([*map(str, self.buckets), "+Inf"], self.bucket_counts))
+        return snapshot
 
 
 class MetricsCollector:
@@ -38,10 +102,24 @@ class MetricsCollector:
     
     Collects and records metrics for operational telemetry.
     Compatible with Prometheus metrics format.
+    
+    Every (name, tags) combination is a single aggregated series updated in
+    place, and each metric name is capped at ``max_series_per_metric`` tag
+    combinations; further combinations are folded into one overflow series,
+    so memory stays bounded no matter how many observations are recorded.
+    Updates take no locks: they are plain dictionary and attribute writes.
     """
     
-    def __init__(self):
-        self.metrics: Dict[str, list] = {}
+    def __init__(
+        self,
+        max_series_per_metric: int = DEFAULT_MAX_SERIES_PER_METRIC,
+        default_buckets: Optional[List[float]] = None
+    ):
+        self.metrics: Dict[str, Metric] = {}
+        self.max_series_per_metric = max_series_per_metric
+        self.default_buckets = tuple(sorted(default_buckets or DEFAULT_BUCKETS))
+        self._series_per_metric: Dict[str, int] = {}
+        self._overflowed: Dict[str, int] = {}
         self._enabled = True
         
     def increment_counter(
@@ -53,21 +131,10 @@ class MetricsCollector:
         """Increment a counter metric"""
         if not self._enabled:
             return
-            
-        tags = tags or {}
-        key = self._make_key(name, tags)
         
-        if key not in self.metrics:
-            self.metrics[key] = []
-            
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.COUNTER,
-            tags=tags,
-            timestamp=time.time()
-        )
-        self.metrics[key].append(metric)
+        series = self._get_series(name, MetricType.COUNTER, tags)
+        series.value += value
+        series.timestamp = time.time()
         
     def record_gauge(
         self,
@@ -78,21 +145,10 @@ class MetricsCollector:
         """Record a gauge metric"""
         if not self._enabled:
             return
-            
-        tags = tags or {}
-        key = self._make_key(name, tags)
         
-        if key not in self.metrics:
-            self.metrics[key] = []
-            
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.GAUGE,
-            tags=tags,
-            timestamp=time.time()
-        )
-        self.metrics[key].append(metric)
+        series = self._get_series(name, MetricType.GAUGE, tags)
+        series.value = value
+        series.timestamp = time.time()
         
     def record_histogram(
         self,
@@ -101,24 +157,11 @@ class MetricsCollector:
         tags: Optional[Dict[str, str]] = None,
         buckets: Optional[list] = None
     ):
-        """Record a histogram metric"""
+        """Record a histogram metric (buckets apply when the series is first created)"""
         if not self._enabled:
             return
-            
-        tags = tags or {}
-        key = self._make_key(name, tags)
         
-        if key not in self.metrics:
-            self.metrics[key] = []
-            
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.HISTOGRAM,
-            tags=tags,
-            timestamp=time.time()
-        )
-        self.metrics[key].append(metric)
+        self._get_series(name, MetricType.HISTOGRAM, tags, buckets).observe(value)
         
     def record_summary(
         self,
@@ -127,37 +170,105 @@ class MetricsCollector:
         tags: Optional[Dict[str, str]] = None,
         quantiles: Optional[list] = None
     ):
-        """Record a summary metric"""
+        """Record a summary metric (quantiles are estimated from buckets at export time)"""
         if not self._enabled:
             return
-            
+        
+        self._get_series(name, MetricType.SUMMARY, tags).observe(value)
+    
+    def _get_series(
+        self,
+        name: str,
+        metric_type: MetricType,
+        tags: Optional[Dict[str, str]],
+        buckets: Optional[list] = None
+    ) -> Metric:
+        """Find or create the aggregated series for name + tags"""
         tags = tags or {}
         key = self._make_key(name, tags)
+        series = self.metrics.get(key)
+        if series is not None:
+            return series
         
-        if key not in self.metrics:
-            self.metrics[key] = []
-            
-        metric = Metric(
+        if self._series_per_metric.get(name, 0) >= self.max_series_per_metric:
+            if name not in self._overflowed:
+                logger.warning(
+                    f"Metric {name} exceeded {self.max_series_per_metric} tag combinations; "
+                    "aggregating further combinations into an overflow series"
+                )
+            self._overflowed[name] = self._overflowed.get(name, 0) + 1
+            tags = OVERFLOW_TAGS
+            key = self._make_key(name, tags)
+            series = self.metrics.get(key)
+            if series is not None:
+                return series
+        else:
+            self._series_per_metric[name] = self._series_per_metric.get(name, 0) + 1
+        
+        series = Metric(
             name=name,
-            value=value,
-            metric_type=MetricType.SUMMARY,
-            tags=tags,
+            value=0.0,
+            metric_type=metric_type,
+            tags=dict(tags),
             timestamp=time.time()
         )
-        self.metrics[key].append(metric)
+        if metric_type in (MetricType.HISTOGRAM, MetricType.SUMMARY):
+            series.buckets = tuple(sorted(buckets)) if buckets else self.default_buckets
+            series.bucket_counts = [0] * (len(series.buckets) + 1)
+        self.metrics[key] = series
+        return series
         
     def _make_key(self, name: str, tags: Dict[str, str]) -> str:
         """Create a unique key for metric name + tags"""
         tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
         return f"{name}{{{tag_str}}}"
     
-    def get_metrics(self) -> Dict[str, list]:
-        """Get all collected metrics"""
-        return self.metrics.copy()
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get a snapshot of all aggregated series"""
+        return {key: series.to_dict() for key, series in list(self.metrics.items())}
+    
+    def get_overflow_counts(self) -> Dict[str, int]:
+        """Observations per metric that were folded into the overflow series"""
+        return dict(self._overflowed)
+    
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format (0.0.4)"""
+        by_name: Dict[str, List[Metric]] = {}
+        for series in list(self.metrics.values()):
+            by_name.setdefault(series.name, []).append(series)
+        
+        lines: List[str] = []
+        for name in sorted(by_name):
+            series_list = by_name[name]
+            metric_name = _INVALID_NAME_CHARS.sub("_", name)
+            metric_type = series_list[0].metric_type
+            lines.append(f"# TYPE {metric_name} {metric_type.value}")
+            
+            for series in series_list:
+                if metric_type in (MetricType.COUNTER, MetricType.GAUGE):
+                    lines.append(f"{metric_name}{_format_labels(series.tags)} {_format_value(series.value)}")
+                elif metric_type == MetricType.HISTOGRAM:
+                    cumulative = 0
+                    for bound, bucket_count in zip([*series.buckets, math.inf], series.bucket_counts):
+                        cumulative += bucket_count
+                        labels = _format_labels({**series.tags, "le": _format_value(bound)})
+                        lines.append(f"{metric_name}_bucket{labels} {cumulative}")
+                    lines.append(f"{metric_name}_sum{_format_labels(series.tags)} {_format_value(series.value)}")
+                    lines.append(f"{metric_name}_count{_format_labels(series.tags)} {series.count}")
+                else:
+                    for q in DEFAULT_QUANTILES:
+                        labels = _format_labels({**series.tags, "quantile": str(q)})
+                        lines.append(f"{metric_name}{labels} {_format_value(series.quantile(q))}")
+                    lines.append(f"{metric_name}_sum{_format_labels(series.tags)} {_format_value(series.value)}")
+                    lines.append(f"{metric_name}_count{_format_labels(series.tags)} {series.count}")
+        
+        return "\n".join(lines) + "\n" if lines else ""
     
     def clear_metrics(self):
         """Clear all metrics"""
         self.metrics.clear()
+        self._series_per_metric.clear()
+        self._overflowed.clear()
     
     def enable(self):
         """Enable metrics collection"""
@@ -168,6 +279,24 @@ class MetricsCollector:
         self._enabled = False
 
 
+def _format_labels(tags: Dict[str, str]) -> str:
+    if not tags:
+        return ""
+    parts = []
+    for key, value in sorted(tags.items()):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{_INVALID_NAME_CHARS.sub("_", key)}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value))
+
+
 class LatencyTracker:
     """Context manager for tracking latency"""
     
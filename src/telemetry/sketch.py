@@ -0,0 +1,199 @@
+"""
+Streaming Quantile Sketches
+
+Bounded-memory, mergeable distribution summaries for latency tracking:
+- LogBucketSketch: HDR/DDSketch-style logarithmic buckets with a fixed
+  relative error, O(buckets) quantile queries
+- WindowedSketch: ring of time-aligned sub-window sketches so stats cover a
+  sliding window and old data ages out
+"""
+
+import math
+import time
+from typing import Dict, Any, List, Optional, Iterable
+
+
+class LogBucketSketch:
+    """
+    Logarithmic-bucket quantile sketch
+    
+    Positive values are counted in buckets whose bounds grow geometrically by
+    ``gamma = (1 + relative_accuracy) / (1 - relative_accuracy)``, so any
+    quantile is returned within ``relative_accuracy`` of the true value.
+    Memory is bounded by ``max_buckets``; when exceeded the lowest buckets
+    are collapsed together (tail quantiles stay accurate).
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float, count: int = 1):
+        """Add an observation (values <= 0 are counted in the zero bucket)"""
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+            if len(self.bins) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def merge(self, other: "LogBucketSketch"):
+        """Merge another sketch with the same relative accuracy into this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, bin_count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + bin_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_buckets:
+            self._collapse()
+    
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0 <= q <= 1)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return min(self.min, 0.0)
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def _collapse(self):
+        """Fold the lowest buckets together until within max_buckets"""
+        indices = sorted(self.bins)
+        excess = len(indices) - self.max_buckets + 1
+        target = indices[excess]
+        folded = sum(self.bins.pop(index) for index in indices[:excess])
+        self.bins[target] += folded
+    
+    def stats(self) -> Dict[str, float]:
+        """Summary statistics (same keys APM has always reported, plus p50)"""
+        if self.count == 0:
+            return {"count": 0, "avg": 0.0, "min": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable snapshot (JSON-safe)"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(index): bin_count for index, bin_count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 2048) -> "LogBucketSketch":
+        """Rebuild a sketch from to_dict() output"""
+        sketch = cls(relative_accuracy=data["relative_accuracy"], max_buckets=max_buckets)
+        sketch.bins = {int(index): bin_count for index, bin_count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"] if data["min"] is not None else math.inf
+        sketch.max = data["max"] if data["max"] is not None else -math.inf
+        return sketch
+
+
+class WindowedSketch:
+    """
+    Sliding-window sketch
+    
+    Keeps ``num_windows`` sub-window sketches of ``window_seconds`` each,
+    aligned to the epoch so snapshots from different processes line up.
+    Queries merge the live sub-windows; expired ones are reused in place.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        num_windows: int = 12,
+        relative_accuracy: float = 0.01
+    ):
+        self.window_seconds = window_seconds
+        self.num_windows = num_windows
+        self.relative_accuracy = relative_accuracy
+        self._slots: List[Optional[LogBucketSketch]] = [None] * num_windows
+        self._slot_epochs: List[int] = [-1] * num_windows
+    
+    def add(self, value: float, now: Optional[float] = None):
+        """Record a value in the current sub-window"""
+        epoch = self._epoch(now)
+        slot = epoch % self.num_windows
+        if self._slot_epochs[slot] != epoch or self._slots[slot] is None:
+            self._slots[slot] = LogBucketSketch(self.relative_accuracy)
+            self._slot_epochs[slot] = epoch
+        self._slots[slot].add(value)
+    
+    def merged(self, now: Optional[float] = None) -> LogBucketSketch:
+        """Merge all sub-windows that are still inside the window"""
+        current = self._epoch(now)
+        result = LogBucketSketch(self.relative_accuracy)
+        for slot_epoch, sketch in zip(self._slot_epochs, self._slots):
+            if sketch is not None and current - slot_epoch < self.num_windows:
+                result.merge(sketch)
+        return result
+    
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Serializable snapshot of the live sub-windows"""
+        current = self._epoch(now)
+        return {
+            "window_seconds": self.window_seconds,
+            "num_windows": self.num_windows,
+            "windows": {
+                str(slot_epoch): sketch.to_dict()
+                for slot_epoch, sketch in zip(self._slot_epochs, self._slots)
+                if sketch is not None and current - slot_epoch < self.num_windows
+            },
+        }
+    
+    @staticmethod
+    def merge_dicts(snapshots: Iterable[Dict[str, Any]], now: Optional[float] = None) -> LogBucketSketch:
+        """Merge WindowedSketch snapshots (e.g. from several workers) into one sketch"""
+        result: Optional[LogBucketSketch] = None
+        for snapshot in snapshots:
+            current = int((time.time() if now is None else now) // snapshot["window_seconds"])
+            for slot_epoch, data in snapshot["windows"].items():
+                if current - int(slot_epoch) >= snapshot["num_windows"]:
+                    continue
+                sketch = LogBucketSketch.from_dict(data)
+                if result is None:
+                    result = sketch
+                else:
+                    result.merge(sketch)
+        return result or LogBucketSketch()
+    
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.window_seconds)
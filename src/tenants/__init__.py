@@ -5,6 +5,7 @@ Provides tenant isolation, management, and configuration.
 """
 
 from src.tenants.tenant_manager import TenantManager, Tenant, TenantQuota
+from src.tenants.tenant_cache import TenantCache, TenantCacheInvalidator
 from src.tenants.tenant_isolation import TenantIsolationMiddleware, get_current_tenant
 from src.tenants.tenant_config import TenantConfig
 
@@ -12,6 +13,8 @@ __all__ = [
     "TenantManager",
     "Tenant",
     "TenantQuota",
+    "TenantCache",
+    "TenantCacheInvalidator",
     "TenantIsolationMiddleware",
     "get_current_tenant",
     "TenantConfig",
@@ -0,0 +1,198 @@
+"""
+Tenant Resolution Cache
+
+In-process cache of tenant lookups used on every request by the tenant
+isolation middleware:
+- TenantCache: TTL entries keyed by tenant id and by slug (including short
+  negative entries for unknown tenants)
+- TenantCacheInvalidator: LISTEN/NOTIFY subscriber that evicts entries as
+  soon as a tenant row changes (see the tenants_notify_change trigger)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from src.database import PostgresConnection
+    from src.tenants.tenant_manager import Tenant
+
+logger = logging.getLogger(__name__)
+
+TENANT_CHANGE_CHANNEL = "tenant_changed"
+
+
+class TenantCache:
+    """
+    TTL cache of tenants by id and slug
+    
+    TTLs are short because they are only the fallback: changes normally
+    arrive through TenantCacheInvalidator. Misses (unknown tenants) are
+    cached for negative_ttl_seconds so bad ids cannot force a query per
+    request.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        negative_ttl_seconds: float = 5.0,
+        max_entries: int = 10000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._by_id: "OrderedDict[str, Tuple[float, Optional[Tenant]]]" = OrderedDict()
+        self._by_slug: "OrderedDict[str, Tuple[float, Optional[Tenant]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_by_id(self, tenant_id: str) -> Tuple[bool, Optional["Tenant"]]:
+        """
+        Returns:
+            Tuple of (found, tenant); tenant is None for a cached miss
+        """
+        return self._get(self._by_id, tenant_id)
+    
+    def get_by_slug(self, slug: str) -> Tuple[bool, Optional["Tenant"]]:
+        return self._get(self._by_slug, slug)
+    
+    def put(self, tenant: "Tenant"):
+        """Cache a tenant under both its id and slug"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        self._put(self._by_id, str(tenant.tenant_id), (expires_at, tenant))
+        self._put(self._by_slug, tenant.slug, (expires_at, tenant))
+    
+    def put_missing(self, tenant_id: Optional[str] = None, slug: Optional[str] = None):
+        """Cache that no tenant exists for an id or slug"""
+        expires_at = time.monotonic() + self.negative_ttl_seconds
+        if tenant_id:
+            self._put(self._by_id, tenant_id, (expires_at, None))
+        if slug:
+            self._put(self._by_slug, slug, (expires_at, None))
+    
+    def invalidate(self, tenant_id: Optional[str] = None, slug: Optional[str] = None):
+        """Evict a tenant by id and/or slug (both keys of a cached tenant are dropped)"""
+        for key, index in ((tenant_id, self._by_id), (slug, self._by_slug)):
+            if not key:
+                continue
+            entry = index.pop(key, None)
+            if entry and entry[1] is not None:
+                self._by_id.pop(str(entry[1].tenant_id), None)
+                self._by_slug.pop(entry[1].slug, None)
+    
+    def clear(self):
+        self._by_id.clear()
+        self._by_slug.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._by_id) + len(self._by_slug),
+        }
+    
+    def _get(self, index: OrderedDict, key: str) -> Tuple[bool, Optional["Tenant"]]:
+        entry = index.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del index[key]
+            self.misses += 1
+            return False, None
+        index.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+    
+    def _put(self, index: OrderedDict, key: str, entry: Tuple[float, Optional["Tenant"]]):
+        index[key] = entry
+        index.move_to_end(key)
+        while len(index) > self.max_entries:
+            index.popitem(last=False)
+
+
+class TenantCacheInvalidator:
+    """
+    Evicts TenantCache entries on tenant change notifications
+    
+    Holds one dedicated (non-pooled) connection that LISTENs on
+    TENANT_CHANGE_CHANNEL. If the connection drops, the whole cache is
+    cleared (notifications may have been missed) and the listener reconnects.
+    """
+    
+    def __init__(
+        self,
+        postgres_conn: "PostgresConnection",
+        cache: TenantCache,
+        channel: str = TENANT_CHANGE_CHANNEL,
+        reconnect_delay: float = 5.0
+    ):
+        self.postgres = postgres_conn
+        self.cache = cache
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._running = False
+    
+    async def start(self):
+        """Open the listener connection"""
+        self._running = True
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.warning(f"Tenant cache invalidation listener unavailable, relying on TTL: {e}")
+            self._schedule_reconnect()
+    
+    async def stop(self):
+        """Close the listener connection"""
+        self._running = False
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+    
+    async def _connect(self):
+        self._connection = await asyncpg.connect(
+            host=self.postgres.host,
+            port=self.postgres.port,
+            database=self.postgres.database,
+            user=self.postgres.user,
+            password=self.postgres.password
+        )
+        self._connection.add_termination_listener(self._on_terminated)
+        await self._connection.add_listener(self.channel, self._on_notification)
+        # Anything cached before we started listening may be stale
+        self.cache.clear()
+        logger.info(f"Listening for tenant changes on '{self.channel}'")
+    
+    def _on_notification(self, connection, pid, channel, payload):
+        """Payload is JSON {"tenant_id": ..., "slug": ...} from the tenants trigger"""
+        try:
+            data = json.loads(payload)
+            self.cache.invalidate(tenant_id=data.get("tenant_id"), slug=data.get("slug"))
+        except (ValueError, AttributeError):
+            # Unknown payload format: be safe and drop everything
+            self.cache.clear()
+    
+    def _on_terminated(self, connection):
+        logger.warning("Tenant cache invalidation listener disconnected")
+        self.cache.clear()
+        self._connection = None
+        self._schedule_reconnect()
+    
+    def _schedule_reconnect(self):
+        if self._running and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+    
+    async def _reconnect(self):
+        while self._running and self._connection is None:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.debug(f"Tenant cache listener reconnect failed: {e}")
@@ -10,6 +10,7 @@ from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.tenants.tenant_manager import TenantManager
+from src.database.postgres import set_current_tenant, reset_current_tenant
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,7 @@ async def get_current_tenant(request: Request) -> Optional[str]:
             try:
                 tenant_manager = getattr(request.app.state, "tenant_manager", None)
                 if tenant_manager:
-                    tenant = await tenant_manager.get_tenant_by_slug(subdomain)
+                    tenant = await tenant_manager.get_tenant_by_slug(subdomain, cached=True)
                     if tenant:
                         return str(tenant.tenant_id)
             except Exception as e:
@@ -82,9 +83,9 @@ class TenantIsolationMiddleware(BaseHTTPMiddleware):
                     detail="Tenant ID required"
                 )
         
-        # Verify tenant exists and is active
+        # Verify tenant exists and is active (cached; invalidated on tenant changes)
         if tenant_id:
-            tenant = await self.tenant_manager.get_tenant(tenant_id)
+            tenant = await self.tenant_manager.get_tenant(tenant_id, cached=True)
             if not tenant:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -100,15 +101,12 @@ class TenantIsolationMiddleware(BaseHTTPMiddleware):
             # Set tenant context in request state
             request.state.tenant_id = tenant_id
             
-            # Set tenant context in database connection
-            # This enables RLS policies
-            async with self.tenant_manager.postgres.acquire() as conn:
-                await conn.execute(
-                    "SELECT set_tenant_context($1)",
-                    tenant_id
-                )
-        
-        # Process request
-        response = await call_next(request)
+        # Set tenant context for database connections acquired while handling
+        # the request; enables RLS policies on the connection the queries use
+        token = set_current_tenant(tenant_id)
+        try:
+            response = await call_next(request)
+        finally:
+            reset_current_tenant(token)
         
         return response
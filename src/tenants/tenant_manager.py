@@ -14,6 +14,7 @@ from uuid import uuid4
 from src.telemetry.metrics import MetricsCollector
 from src.telemetry.events import EventLogger
 from src.database import PostgresConnection
+from src.tenants.tenant_cache import TenantCache
 
 logger = logging.getLogger(__name__)
 
@@ -77,11 +78,13 @@ class TenantManager:
         self,
         metrics_collector: MetricsCollector,
         event_logger: EventLogger,
-        postgres_conn: PostgresConnection
+        postgres_conn: PostgresConnection,
+        cache: Optional[TenantCache] = None
     ):
         self.metrics = metrics_collector
         self.events = event_logger
         self.postgres = postgres_conn
+        self.cache = cache or TenantCache()
     
     async def create_tenant(
         self,
@@ -112,6 +115,7 @@ class TenantManager:
         
         # Initialize default quotas based on tier
         await self._initialize_default_quotas(tenant_id, subscription_tier)
+        self.cache.invalidate(tenant_id=tenant_id, slug=slug)
         
         tenant = Tenant(
             tenant_id=tenant_id,
@@ -143,8 +147,25 @@ class TenantManager:
         
         return tenant
     
-    async def get_tenant(self, tenant_id: str) -> Optional[Tenant]:
-        """Get tenant by ID"""
+    async def get_tenant(self, tenant_id: str, cached: bool = False) -> Optional[Tenant]:
+        """
+        Get tenant by ID
+        
+        Args:
+            tenant_id: Tenant ID
+            cached: Serve from the tenant resolution cache (per-request lookups)
+        """
+        if cached:
+            found, tenant = self.cache.get_by_id(tenant_id)
+            if found:
+                return tenant
+            tenant = await self.get_tenant(tenant_id)
+            if tenant:
+                self.cache.put(tenant)
+            else:
+                self.cache.put_missing(tenant_id=tenant_id)
+            return tenant
+        
         row = await self.postgres.fetchrow(
             """
             SELECT tenant_id, name, slug, domain, subscription_tier, status, billing_email,
@@ -171,8 +192,25 @@ class TenantManager:
             metadata=row["metadata"] or {}
         )
     
-    async def get_tenant_by_slug(self, slug: str) -> Optional[Tenant]:
-        """Get tenant by slug"""
+    async def get_tenant_by_slug(self, slug: str, cached: bool = False) -> Optional[Tenant]:
+        """
+        Get tenant by slug
+        
+        Args:
+            slug: Tenant slug
+            cached: Serve from the tenant resolution cache (per-request lookups)
+        """
+        if cached:
+            found, tenant = self.cache.get_by_slug(slug)
+            if found:
+                return tenant
+            tenant = await self.get_tenant_by_slug(slug)
+            if tenant:
+                self.cache.put(tenant)
+            else:
+                self.cache.put_missing(slug=slug)
+            return tenant
+        
         row = await self.postgres.fetchrow(
             """
             SELECT tenant_id, name, slug, domain, subscription_tier, status, billing_email,
@@ -266,6 +304,7 @@ class TenantManager:
             """,
             *values
         )
+        self.cache.invalidate(tenant_id=tenant_id)
         
         # If subscription tier changed, update quotas
         if "subscription_tier" in updates:
@@ -293,6 +332,7 @@ class TenantManager:
             """,
             tenant_id
         )
+        self.cache.invalidate(tenant_id=tenant_id)
         
         # Log event
         await self.events.log_event(
@@ -1,7 +1,8 @@
 """
 Cache Decorators
 
-Provides decorators for caching function results with TTL support.
+Provides decorators for caching function results with TTL support, on top
+of the shared CacheManager (concurrent misses are coalesced into one call).
 """
 
 import functools
@@ -9,8 +10,7 @@ import inspect
 import hashlib
 import json
 import logging
-from typing import Callable, Optional, Any, TypeVar
-from datetime import timedelta
+from typing import Callable, Iterable, Optional, Any, TypeVar
 
 from src.cache.cache_manager import CacheManager
 
@@ -23,7 +23,9 @@ def cached(
     ttl_seconds: int = 300,
     key_prefix: str = "",
     cache_manager: Optional[CacheManager] = None,
-    key_func: Optional[Callable] = None
+    key_func: Optional[Callable] = None,
+    tags: Iterable[str] = (),
+    stale_seconds: int = 0
 ):
     """
     Decorator to cache function results.
@@ -33,9 +35,11 @@ def cached(
         key_prefix: Prefix for cache keys
         cache_manager: CacheManager instance (if None, will try to get from context)
         key_func: Custom function to generate cache key from args/kwargs
+        tags: Invalidation tags; "{name}" placeholders are filled from the call's arguments
+        stale_seconds: How long an expired result may still be served while it refreshes
     
     Usage:
-        @cached(ttl_seconds=600, key_prefix="podcast")
+        @cached(ttl_seconds=600, key_prefix="podcast", tags=["podcast:{podcast_id}"])
         async def get_podcast(podcast_id: str):
             ...
     """
@@ -62,23 +66,18 @@ def cached(
             else:
                 cache_key = _generate_cache_key(func, args, kwargs, key_prefix)
             
-            # Try to get from cache
-            cached_value = await cache.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache hit for {cache_key}")
-                return cached_value
-            
-            # Cache miss - execute function
-            logger.debug(f"Cache miss for {cache_key}")
-            if inspect.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
-                result = func(*args, **kwargs)
-            
-            # Store in cache
-            await cache.set(cache_key, result, ttl_seconds)
+            async def load():
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return func(*args, **kwargs)
             
-            return result
+            return await cache.get_or_load(
+                cache_key,
+                load,
+                ttl_seconds=ttl_seconds,
+                tags=_format_tags(func, tags, args, kwargs),
+                stale_seconds=stale_seconds
+            )
         
         return wrapper
     return decorator
@@ -112,19 +111,29 @@ def _generate_cache_key(
     return f"{func_name}:{key_hash}"
 
 
+def _format_tags(func: Callable, tags: Iterable[str], args: tuple, kwargs: dict) -> list:
+    """Fill "{name}" placeholders in tags from the call's bound arguments"""
+    tags = list(tags)
+    if not tags:
+        return tags
+    bound = inspect.signature(func).bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    return [tag.format(**bound.arguments) for tag in tags]
+
+
 def invalidate_cache(
-    pattern: str,
+    *tags: str,
     cache_manager: Optional[CacheManager] = None
 ):
     """
-    Decorator to invalidate cache entries after function execution.
+    Decorator to invalidate tagged cache entries after function execution.
     
     Args:
-        pattern: Cache key pattern to invalidate (supports wildcards)
+        tags: Tags to invalidate; "{name}" placeholders are filled from the call's arguments
         cache_manager: CacheManager instance
     
     Usage:
-        @invalidate_cache("podcast:*")
+        @invalidate_cache("podcast:{podcast_id}")
         async def update_podcast(podcast_id: str):
             ...
     """
@@ -143,8 +152,9 @@ def invalidate_cache(
                 cache = getattr(wrapper, '_cache_manager', None)
             
             if cache:
-                await cache.invalidate_pattern(pattern)
-                logger.debug(f"Invalidated cache pattern: {pattern}")
+                formatted = _format_tags(func, tags, args, kwargs)
+                await cache.invalidate_tags(*formatted)
+                logger.debug(f"Invalidated cache tags: {formatted}")
             
             return result
         
@@ -0,0 +1,174 @@
+"""
+Tests for AI result caching and request batching
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.ai.framework import (
+    AIFramework,
+    AIProvider,
+    AIProviderInterface,
+    AIOperation,
+    AIRequest,
+    AIResultCache,
+)
+from src.ai.content_analyzer import ContentAnalyzer
+
+
+class FakeProvider(AIProviderInterface):
+    """Local provider that counts requests"""
+    
+    model = "fake-1"
+    
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+    
+    async def generate_text(self, prompt, **kwargs):
+        self.calls.append(("generate_text", prompt))
+        return f"summary of {len(prompt)} chars"
+    
+    async def analyze_sentiment(self, text):
+        self.calls.append(("analyze_sentiment", text))
+        return {"sentiment": "positive", "score": 0.9}
+    
+    async def extract_topics(self, text):
+        self.calls.append(("extract_topics", text))
+        return ["tech", "startups"]
+    
+    async def run_batch(self, requests):
+        self.batches.append([r.operation for r in requests])
+        return await super().run_batch(requests)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+        return True
+
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+
+def make_framework(provider, cache=None, **kwargs):
+    return AIFramework(
+        primary_provider=AIProvider.GOOGLE,
+        providers={AIProvider.GOOGLE: provider},
+        cache=cache if cache is not None else AIResultCache(),
+        **kwargs
+    )
+
+
+class TestAIResultCache:
+    """Content-addressed cache"""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_call_is_served_from_cache(self, provider):
+        ai = make_framework(provider)
+        
+        first = await ai.extract_topics("Episode  about\nstartups")
+        second = await ai.extract_topics("Episode about startups")
+        
+        assert first == second == ["tech", "startups"]
+        assert len(provider.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_key_includes_operation_model_and_options(self, provider):
+        cache = AIResultCache()
+        request = AIRequest(AIOperation.GENERATE_TEXT, "hello", {"max_tokens": 10})
+        
+        key = cache.key(AIProvider.GOOGLE, "fake-1", request)
+        
+        assert key.startswith("ai:result:google:fake-1:generate_text:")
+        assert key != cache.key(AIProvider.GOOGLE, "fake-2", request)
+        assert key != cache.key(AIProvider.GOOGLE, "fake-1", AIRequest(AIOperation.GENERATE_TEXT, "hello"))
+        assert key != cache.key(AIProvider.GOOGLE, "fake-1", AIRequest(AIOperation.EXTRACT_TOPICS, "hello", {"max_tokens": 10}))
+    
+    @pytest.mark.asyncio
+    async def test_results_persist_in_redis_with_ttl(self, provider):
+        redis = FakeRedis()
+        await make_framework(provider, AIResultCache(redis, ttl_seconds=60)).analyze_sentiment("great show")
+        
+        # A new process with an empty local cache reads Redis
+        restarted = make_framework(provider, AIResultCache(redis, ttl_seconds=60))
+        assert await restarted.analyze_sentiment("great show") == {"sentiment": "positive", "score": 0.9}
+        
+        assert len(provider.calls) == 1
+        assert list(redis.ttls.values()) == [60]
+    
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_through_to_provider(self, provider):
+        redis = Mock()
+        redis.get = AsyncMock(side_effect=ConnectionError("down"))
+        redis.set = AsyncMock(side_effect=ConnectionError("down"))
+        ai = make_framework(provider, AIResultCache(redis))
+        
+        assert await ai.extract_topics("text") == ["tech", "startups"]
+
+
+class TestRunMany:
+    """Batching and concurrency"""
+    
+    @pytest.mark.asyncio
+    async def test_misses_are_sent_as_one_batch(self, provider):
+        ai = make_framework(provider)
+        await ai.analyze_sentiment("text")
+        
+        results = await ai.run_many([
+            AIRequest(AIOperation.GENERATE_TEXT, "prompt"),
+            AIRequest(AIOperation.ANALYZE_SENTIMENT, "text"),
+            AIRequest(AIOperation.EXTRACT_TOPICS, "text"),
+        ])
+        
+        assert results[1] == {"sentiment": "positive", "score": 0.9}
+        assert provider.batches == [[AIOperation.GENERATE_TEXT, AIOperation.EXTRACT_TOPICS]]
+    
+    @pytest.mark.asyncio
+    async def test_unbatched_requests_run_concurrently(self):
+        active = 0
+        peak = 0
+        
+        class SlowProvider(FakeProvider):
+            async def run(self, request):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return await super().run(request)
+        
+        provider = SlowProvider()
+        ai = make_framework(provider, batch_requests=False)
+        
+        await ai.run_many([
+            AIRequest(AIOperation.ANALYZE_SENTIMENT, "a"),
+            AIRequest(AIOperation.EXTRACT_TOPICS, "a"),
+        ])
+        
+        assert peak == 2
+        assert provider.batches == []
+    
+    @pytest.mark.asyncio
+    async def test_content_analyzer_reanalysis_hits_cache(self, provider):
+        postgres_conn = Mock()
+        postgres_conn.execute = AsyncMock()
+        analyzer = ContentAnalyzer(make_framework(provider), Mock(), Mock(), postgres_conn)
+        
+        first = await analyzer.analyze_transcript("t1", "e1", "word " * 1000)
+        second = await analyzer.analyze_transcript("t1", "e1", "word " * 1000)
+        
+        assert first["topics"] == second["topics"] == ["tech", "startups"]
+        assert len(provider.batches) == 1
+        assert len(provider.calls) == 3
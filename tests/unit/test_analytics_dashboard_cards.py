@@ -0,0 +1,70 @@
+"""
+Tests for concurrent dashboard card loading
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.analytics.dashboard_cards import DashboardCard, load_cards, server_timing
+
+
+def card(name, delay=0.0, value=None, error=None, **kwargs):
+    async def load():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value if value is not None else {"card": name}
+    return DashboardCard(name, load, **kwargs)
+
+
+class TestLoadCards:
+    """Composition of independent cards"""
+    
+    @pytest.mark.asyncio
+    async def test_cards_load_concurrently(self):
+        started = time.perf_counter()
+        
+        results = await load_cards([card("a", 0.1), card("b", 0.1), card("c", 0.1)])
+        
+        assert time.perf_counter() - started < 0.25
+        assert [result.data for result in results.values()] == [{"card": "a"}, {"card": "b"}, {"card": "c"}]
+        assert all(result.ok for result in results.values())
+    
+    @pytest.mark.asyncio
+    async def test_slow_card_returns_fallback(self):
+        results = await load_cards(
+            [card("fast"), card("slow", 1.0, fallback=[])],
+            timeout_seconds=0.05
+        )
+        
+        assert results["fast"].ok
+        assert results["slow"].status == "timeout"
+        assert results["slow"].data == []
+        assert results["slow"].latency_ms < 500
+    
+    @pytest.mark.asyncio
+    async def test_per_card_timeout_overrides_default(self):
+        results = await load_cards([card("slow", 0.1, timeout_seconds=1.0)], timeout_seconds=0.01)
+        
+        assert results["slow"].ok
+    
+    @pytest.mark.asyncio
+    async def test_failing_card_does_not_fail_page(self):
+        results = await load_cards([card("ok"), card("broken", error=RuntimeError("boom"), fallback={})])
+        
+        assert results["ok"].ok
+        assert results["broken"].status == "error"
+        assert results["broken"].data == {}
+    
+    @pytest.mark.asyncio
+    async def test_records_latency_per_card(self):
+        metrics = Mock()
+        
+        results = await load_cards([card("a"), card("b", error=ValueError())], metrics_collector=metrics, page="ops")
+        
+        tags = [call.kwargs["tags"] for call in metrics.record_histogram.call_args_list]
+        assert {"page": "ops", "card": "a", "status": "ok"} in tags
+        assert {"page": "ops", "card": "b", "status": "error"} in tags
+        assert server_timing(results).startswith('a;dur=')
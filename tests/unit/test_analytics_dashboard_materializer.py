@@ -0,0 +1,72 @@
+"""
+Tests for incremental dashboard materialization
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+from src.analytics.dashboard_materializer import DashboardMaterializer, APPLY_CHANGES_QUERY, REBUILD_QUERIES
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def conn():
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncContextManager())
+    return conn
+
+
+@pytest.fixture
+def postgres_conn(conn):
+    postgres = MagicMock()
+    postgres.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    postgres.fetchrow = AsyncMock(return_value={"changes": 12, "campaigns": 3, "revenue_days": 2})
+    return postgres
+
+
+class TestDashboardMaterializer:
+    """Changelog draining"""
+    
+    @pytest.mark.asyncio
+    async def test_drains_one_batch(self, postgres_conn):
+        metrics = Mock()
+        materializer = DashboardMaterializer(postgres_conn, metrics_collector=metrics, batch_size=100)
+        
+        assert await materializer.refresh() == 12
+        
+        postgres_conn.fetchrow.assert_awaited_once_with(APPLY_CHANGES_QUERY, 100)
+        metrics.increment_counter.assert_called_once_with("dashboard_materialized_events_total", value=12)
+    
+    @pytest.mark.asyncio
+    async def test_keeps_draining_full_batches(self, postgres_conn):
+        postgres_conn.fetchrow.side_effect = [{"changes": 10}, {"changes": 10}, {"changes": 3}]
+        
+        assert await DashboardMaterializer(postgres_conn, batch_size=10).refresh() == 23
+        
+        assert postgres_conn.fetchrow.await_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_runs_in_one_locked_transaction(self, postgres_conn, conn):
+        await DashboardMaterializer(postgres_conn).rebuild()
+        
+        conn.transaction.assert_called_once()
+        queries = [c.args[0] for c in conn.execute.await_args_list]
+        assert queries == list(REBUILD_QUERIES)
+        assert queries[0] == "LOCK TABLE attribution_events IN SHARE MODE"
+    
+    def test_apply_query_applies_signed_deltas_once_per_campaign(self):
+        assert "FOR UPDATE SKIP LOCKED" in APPLY_CHANGES_QUERY
+        assert "dashboard_campaign_delivery.impressions + EXCLUDED.impressions" in APPLY_CHANGES_QUERY
+        assert "SUM(sign * conversion_value)" in APPLY_CHANGES_QUERY
+        assert "GROUP BY campaign_id, campaign_tenant_id, podcast_id" in APPLY_CHANGES_QUERY
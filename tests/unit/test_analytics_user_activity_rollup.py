@@ -0,0 +1,165 @@
+"""
+Tests for HyperLogLog sketches and the daily user activity rollup
+"""
+
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from src.analytics.hyperloglog import HyperLogLog
+from src.analytics.user_activity_rollup import (
+    ANY_EVENT, INSERT_NEW_QUERY, LOCK_EXISTING_QUERY, UPDATE_EXISTING_QUERY, UserActivityRollup
+)
+from src.analytics.user_metrics_aggregator import UserMetricsAggregator
+from src.telemetry.events import Event
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+def sketch_of(values, precision=12):
+    sketch = HyperLogLog(precision)
+    sketch.update(values)
+    return sketch
+
+
+def event(event_type, user_id, timestamp):
+    return Event(event_type=event_type, user_id=user_id, session_id=None, timestamp=timestamp, properties={})
+
+
+class TestHyperLogLog:
+    """Distinct-count estimates"""
+    
+    def test_small_counts_are_near_exact(self):
+        assert sketch_of(f"user-{i}" for i in range(50)).count() == 50
+    
+    def test_large_count_within_error(self):
+        count = sketch_of(f"user-{i}" for i in range(100000)).count()
+        
+        assert abs(count - 100000) / 100000 < 0.05
+    
+    def test_duplicates_do_not_change_count(self):
+        sketch = sketch_of(f"user-{i}" for i in range(1000))
+        before = sketch.count()
+        
+        sketch.update(f"user-{i}" for i in range(1000))
+        
+        assert sketch.count() == before
+    
+    def test_merge_is_union(self):
+        merged = sketch_of(f"user-{i}" for i in range(0, 6000))
+        merged.merge(sketch_of(f"user-{i}" for i in range(4000, 10000)))
+        
+        assert abs(merged.count() - 10000) / 10000 < 0.05
+        assert merged.to_bytes() == sketch_of(f"user-{i}" for i in range(10000)).to_bytes()
+    
+    def test_round_trip_and_precision_checks(self):
+        sketch = sketch_of(["a", "b"])
+        
+        assert HyperLogLog.from_bytes(sketch.to_bytes()).count() == 2
+        with pytest.raises(ValueError):
+            sketch.merge(HyperLogLog(10))
+        with pytest.raises(ValueError):
+            HyperLogLog.from_bytes(b"\x00" * 10)
+
+
+@pytest.fixture
+def conn():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[])
+    conn.execute = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncContextManager())
+    return conn
+
+
+@pytest.fixture
+def postgres_conn(conn):
+    postgres = MagicMock()
+    postgres.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    postgres.fetch = AsyncMock(return_value=[])
+    return postgres
+
+
+DAY = date(2026, 10, 16)
+NOON = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class TestUserActivityRollup:
+    """Recording batches and merging daily sketches"""
+    
+    @pytest.mark.asyncio
+    async def test_record_inserts_per_day_and_type_sketches(self, postgres_conn, conn):
+        conn.fetch.return_value = [
+            {"day": DAY, "event_type": "login"},
+            {"day": DAY, "event_type": ANY_EVENT},
+            {"day": DAY + timedelta(days=1), "event_type": ANY_EVENT},
+            {"day": DAY + timedelta(days=1), "event_type": "signup"},
+        ]
+        rollup = UserActivityRollup(postgres_conn)
+        
+        updated = await rollup.record([
+            event("login", "u1", NOON),
+            event("login", "u2", NOON),
+            event("signup", "u3", NOON + timedelta(days=1)),
+            event("feed.polled", None, NOON),
+        ])
+        
+        assert updated == 4
+        query, days, types, precision, registers = conn.fetch.await_args.args
+        assert query == INSERT_NEW_QUERY
+        assert list(zip(days, types)) == sorted(zip(days, types))
+        login = HyperLogLog.from_bytes(registers[list(zip(days, types)).index((DAY, "login"))])
+        assert login.count() == 2
+        conn.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_record_merges_into_existing_sketches(self, postgres_conn, conn):
+        stored = sketch_of(["u1", "u9"])
+        conn.fetch.side_effect = [
+            [],
+            [{"day": DAY, "event_type": ANY_EVENT, "precision": 12, "registers": stored.to_bytes()},
+             {"day": DAY, "event_type": "login", "precision": 12, "registers": stored.to_bytes()}],
+        ]
+        
+        await UserActivityRollup(postgres_conn).record([event("login", "u1", NOON), event("login", "u2", NOON)])
+        
+        assert conn.fetch.await_args_list[1].args[0] == LOCK_EXISTING_QUERY
+        query, days, types, registers = conn.execute.await_args.args
+        assert query == UPDATE_EXISTING_QUERY
+        assert [HyperLogLog.from_bytes(r).count() for r in registers] == [3, 3]
+    
+    @pytest.mark.asyncio
+    async def test_distinct_users_merges_daily_sketches(self, postgres_conn):
+        postgres_conn.fetch.return_value = [
+            {"precision": 12, "registers": sketch_of(["u1", "u2"]).to_bytes()},
+            {"precision": 12, "registers": sketch_of(["u2", "u3"]).to_bytes()},
+        ]
+        
+        count = await UserActivityRollup(postgres_conn).distinct_users(DAY - timedelta(days=6), DAY)
+        
+        assert count == 3
+        assert postgres_conn.fetch.await_args.args[1:] == (DAY - timedelta(days=6), DAY, [ANY_EVENT])
+    
+    @pytest.mark.asyncio
+    async def test_aggregator_windows(self, postgres_conn):
+        aggregator = UserMetricsAggregator(postgres_conn)
+        
+        await aggregator.get_mau(NOON)
+        assert postgres_conn.fetch.await_args.args[1:3] == (DAY - timedelta(days=29), DAY)
+        
+        await aggregator.count_users(7, NOON, event_types=["onboarding_started"])
+        assert postgres_conn.fetch.await_args.args[1:] == (DAY - timedelta(days=6), DAY, ["onboarding_started"])
+    
+    def test_day_bounds_match_count_users_window(self):
+        start, end = UserMetricsAggregator.day_bounds(7, NOON)
+        
+        assert start == datetime.combine(DAY - timedelta(days=6), time.min, tzinfo=timezone.utc)
+        assert end == datetime.combine(DAY + timedelta(days=1), time.min, tzinfo=timezone.utc)
@@ -0,0 +1,272 @@
+"""
+Tests for vectorized batch attribution
+"""
+
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock
+from datetime import datetime, timezone, timedelta
+
+from src.attribution.attribution_engine import (
+    AttributionEngine,
+    AttributionModelType,
+    AttributionPath,
+    Touchpoint,
+)
+from src.attribution.batch_engine import AttributionBatch, BatchAttributionEngine
+from src.attribution.models import (
+    FirstTouchModel,
+    LastTouchModel,
+    LinearModel,
+    TimeDecayModel,
+    PositionBasedModel,
+)
+
+
+SCALAR_MODELS = {
+    AttributionModelType.FIRST_TOUCH: FirstTouchModel(),
+    AttributionModelType.LAST_TOUCH: LastTouchModel(),
+    AttributionModelType.LINEAR: LinearModel(),
+    AttributionModelType.TIME_DECAY: TimeDecayModel(),
+    AttributionModelType.POSITION_BASED: PositionBasedModel(),
+}
+
+
+def make_path(path_id, touch_days, value, user_id="user", shared=None):
+    """Build a path whose touchpoints happen `touch_days` days after 2024-01-01"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    touchpoints = [
+        Touchpoint(
+            touchpoint_id=(shared or {}).get(i, f"{path_id}-{i}"),
+            timestamp=start + timedelta(days=day),
+            channel="promo_code",
+            campaign_id="campaign-1",
+        )
+        for i, day in enumerate(touch_days)
+    ]
+    return AttributionPath(
+        path_id=path_id,
+        user_id=user_id,
+        session_id=None,
+        device_id=None,
+        touchpoints=touchpoints,
+        conversion_value=value,
+        conversion_type="purchase",
+        conversion_at=start + timedelta(days=touch_days[-1] + 1),
+    )
+
+
+@pytest.fixture
+def paths():
+    return [
+        make_path("a", [0], 100.0),
+        make_path("b", [0, 3], 50.0, user_id=None),
+        make_path("c", [0, 1, 2, 10], 80.0),
+        make_path("d", [2, 5, 9], 20.0, shared={0: "c-0"}),
+    ]
+
+
+class TestBatchAttributionEngine:
+    """Batch engine matches the per-path models"""
+    
+    @pytest.mark.parametrize("model_type", list(AttributionModelType))
+    def test_matches_scalar_model(self, paths, model_type):
+        batch_result = BatchAttributionEngine().calculate(AttributionBatch.from_paths(paths), [model_type])[model_type]
+        scalar_result = SCALAR_MODELS[model_type].calculate(paths)
+        
+        assert batch_result.model_type == model_type
+        assert batch_result.total_conversions == scalar_result.total_conversions
+        assert batch_result.attributed_conversions == scalar_result.attributed_conversions
+        assert batch_result.attributed_conversion_value == pytest.approx(scalar_result.attributed_conversion_value)
+        assert batch_result.confidence_score == pytest.approx(scalar_result.confidence_score)
+        assert set(batch_result.touchpoint_credits) == set(scalar_result.touchpoint_credits)
+        for touchpoint_id, credit in scalar_result.touchpoint_credits.items():
+            assert batch_result.touchpoint_credits[touchpoint_id] == pytest.approx(credit, rel=1e-4)
+    
+    def test_all_models_in_one_pass(self, paths):
+        results = BatchAttributionEngine().calculate(AttributionBatch.from_paths(paths))
+        
+        assert set(results) == set(AttributionModelType)
+        # Every model except 2-touch position-based distributes full value
+        assert sum(results[AttributionModelType.LINEAR].touchpoint_credits.values()) == pytest.approx(250.0)
+        assert sum(results[AttributionModelType.TIME_DECAY].touchpoint_credits.values()) == pytest.approx(250.0)
+    
+    def test_time_decay_long_paths_do_not_underflow(self):
+        path = make_path("old", [0, 2000, 4000], 10.0)
+        result = BatchAttributionEngine(half_life_days=1.0).calculate(
+            AttributionBatch.from_paths([path]), [AttributionModelType.TIME_DECAY]
+        )[AttributionModelType.TIME_DECAY]
+        
+        assert result.attributed_conversions == 1
+        assert sum(result.touchpoint_credits.values()) == pytest.approx(10.0)
+    
+    def test_empty_batch(self):
+        results = BatchAttributionEngine().calculate(AttributionBatch.from_paths([]))
+        
+        for result in results.values():
+            assert result.total_conversions == 0
+            assert result.touchpoint_credits == {}
+
+
+def make_row(event_id, user_id, day, conversion_value=None):
+    return {
+        "event_id": event_id,
+        "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=day),
+        "campaign_id": "campaign-1",
+        "episode_id": None,
+        "attribution_method": "promo_code",
+        "user_id": user_id,
+        "session_id": None,
+        "device_id": None,
+        "conversion_data": (
+            {"conversion_type": "purchase", "conversion_value": conversion_value}
+            if conversion_value is not None else None
+        ),
+        "metadata": None,
+    }
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def postgres_conn():
+    """Mock PostgresConnection whose acquire() yields a transactional connection"""
+    conn = MagicMock()
+    conn.executemany = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncContextManager())
+    
+    postgres = MagicMock()
+    postgres.fetch = AsyncMock(return_value=[
+        make_row("e1", "u1", 0),
+        make_row("e2", "u1", 1, conversion_value=40.0),
+        make_row("e3", "u2", 2, conversion_value=10.0),
+    ])
+    postgres.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    postgres.conn = conn
+    return postgres
+
+
+@pytest.mark.asyncio
+class TestCompareModels:
+    """compare_models loads and stores once for all models"""
+    
+    async def test_single_fetch_and_transaction(self, postgres_conn):
+        engine = AttributionEngine(
+            metrics_collector=Mock(),
+            event_logger=Mock(),
+            postgres_conn=postgres_conn
+        )
+        
+        results = await engine.compare_models("campaign-1", "tenant-1")
+        
+        assert set(results) == set(AttributionModelType)
+        assert results[AttributionModelType.FIRST_TOUCH].touchpoint_credits == {"e1": 40.0, "e3": 10.0}
+        postgres_conn.fetch.assert_awaited_once()
+        postgres_conn.conn.transaction.assert_called_once()
+        
+        paths_call, results_call = postgres_conn.conn.executemany.await_args_list
+        assert len(paths_call.args[1]) == 2
+        assert len(results_call.args[1]) == len(AttributionModelType)
+
+
+class TestIncrementalMerge:
+    """Merging per-path credits reproduces a full recalculation"""
+    
+    def _merge(self, engine, state, previous_paths, paths, model_type):
+        batch_engine = BatchAttributionEngine()
+        previous = []
+        if previous_paths:
+            old_credits = batch_engine.calculate_path_credits(AttributionBatch.from_paths(previous_paths), [model_type])
+            previous = [
+                {
+                    "conversion_value": path.conversion_value,
+                    "attributed": credit.attributed,
+                    "touchpoint_count": len(path.touchpoints),
+                    "has_user_id": bool(path.user_id),
+                    "touchpoint_credits": credit.touchpoint_credits,
+                }
+                for path, credit in zip(previous_paths, old_credits[model_type])
+            ]
+        new_credits = batch_engine.calculate_path_credits(AttributionBatch.from_paths(paths), [model_type])
+        return engine._merge_path_credits(state, previous, paths, new_credits[model_type])
+    
+    @pytest.mark.parametrize("model_type", list(AttributionModelType))
+    def test_merge_matches_full_run(self, postgres_conn, model_type):
+        engine = AttributionEngine(metrics_collector=Mock(), event_logger=Mock(), postgres_conn=postgres_conn)
+        first_run = [make_path("a", [0, 2], 30.0), make_path("b", [1], 12.0, user_id=None)]
+        # Path "a" gains a touchpoint and "c" is new
+        changed = [make_path("a", [0, 2, 4], 30.0), make_path("c", [3, 5], 8.0)]
+        
+        state = self._merge(engine, None, [], first_run, model_type)
+        state = self._merge(engine, state, [first_run[0]], changed, model_type)
+        
+        full = BatchAttributionEngine().calculate(
+            AttributionBatch.from_paths([changed[0], first_run[1], changed[1]]), [model_type]
+        )[model_type]
+        
+        assert state["total_conversions"] == full.total_conversions
+        assert state["attributed_conversion_value"] == pytest.approx(full.attributed_conversion_value)
+        assert engine._confidence_from_counts(
+            state["total_conversions"], state["multi_touch_paths"], state["user_id_paths"]
+        ) == pytest.approx(full.confidence_score)
+        assert set(state["touchpoint_credits"]) == set(full.touchpoint_credits)
+        for touchpoint_id, credit in full.touchpoint_credits.items():
+            assert state["touchpoint_credits"][touchpoint_id] == pytest.approx(credit)
+
+
+@pytest.mark.asyncio
+class TestCalculateIncremental:
+    """Incremental runs drain the path changelog"""
+    
+    def _state(self, model_type):
+        return {
+            "model_type": model_type.value, "total_conversions": 1, "total_conversion_value": 5.0,
+            "attributed_conversions": 1, "attributed_conversion_value": 5.0,
+            "multi_touch_paths": 0, "user_id_paths": 1, "touchpoint_credits": {"old": 5.0},
+        }
+    
+    async def test_recomputes_only_drained_paths(self, postgres_conn):
+        conn = postgres_conn.conn
+        conn.execute = AsyncMock()
+        conn.fetch = AsyncMock(side_effect=[
+            [self._state(model_type) for model_type in AttributionModelType],
+            [{"path_key": "u1"}, {"path_key": "gone"}, {"path_key": "u1"}],
+            [make_row("e1", "u1", 0), make_row("e2", "u1", 1, conversion_value=40.0)],
+            [{
+                "model_type": AttributionModelType.LAST_TOUCH.value, "path_key": "gone", "conversion_value": 5.0,
+                "attributed": True, "touchpoint_count": 1, "has_user_id": True, "touchpoint_credits": {"old": 5.0},
+            }],
+        ])
+        engine = AttributionEngine(metrics_collector=Mock(), event_logger=Mock(), postgres_conn=postgres_conn)
+        
+        results = await engine.calculate_incremental("campaign-1", "tenant-1", [AttributionModelType.LAST_TOUCH])
+        
+        drain_query = conn.fetch.await_args_list[1].args[0]
+        assert "DELETE FROM attribution_path_changes" in drain_query and "SKIP LOCKED" in drain_query
+        assert conn.fetch.await_args_list[2].args[-1] == ["gone", "u1"]
+        
+        last_touch = results[AttributionModelType.LAST_TOUCH]
+        assert list(results) == [AttributionModelType.LAST_TOUCH]
+        assert last_touch.total_conversions == 1
+        assert last_touch.touchpoint_credits == {"e2": 40.0}
+        delete_call = next(c for c in conn.execute.await_args_list if "DELETE FROM attribution_path_credits" in c.args[0])
+        assert delete_call.args[-1] == ["gone"]
+    
+    async def test_model_without_state_recomputes_every_path(self, postgres_conn):
+        conn = postgres_conn.conn
+        conn.execute = AsyncMock()
+        conn.fetch = AsyncMock(side_effect=[[], [{"path_key": "u1"}], [make_row("e1", "u1", 0, 10.0)], []])
+        engine = AttributionEngine(metrics_collector=Mock(), event_logger=Mock(), postgres_conn=postgres_conn)
+        
+        await engine.calculate_incremental("campaign-1", "tenant-1", [AttributionModelType.LINEAR])
+        
+        assert conn.fetch.await_args_list[2].args[-1] is None
+        assert conn.fetch.await_args_list[3].args[-1] is None
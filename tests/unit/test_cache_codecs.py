@@ -0,0 +1,93 @@
+"""
+Tests for cache value codecs
+"""
+
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from src.cache.codecs import CacheSerializer, JSONCodec, MsgPackCodec, COMPRESSED_FLAG
+
+
+SAMPLE = {
+    "campaign_id": uuid4(),
+    "revenue": Decimal("1234.56"),
+    "updated_at": datetime(2026, 10, 16, 12, 30, tzinfo=timezone.utc),
+    "day": date(2026, 10, 16),
+    "window": timedelta(hours=6),
+    "tags": {"a", "b"},
+    "series": [{"t": i, "v": i * 1.5} for i in range(3)],
+}
+
+
+def codecs():
+    yield JSONCodec()
+    try:
+        yield MsgPackCodec()
+    except RuntimeError:
+        pass
+
+
+class TestCodecs:
+    """Round trips for domain types"""
+    
+    @pytest.mark.parametrize("codec", list(codecs()), ids=lambda codec: codec.name)
+    def test_round_trips_domain_types(self, codec):
+        assert codec.decode(codec.encode(SAMPLE)) == SAMPLE
+    
+    def test_unknown_types_fail_loudly(self):
+        with pytest.raises(TypeError):
+            JSONCodec().encode({"value": object()})
+    
+    def test_msgpack_is_smaller_than_json(self):
+        pytest.importorskip("msgpack")
+        series = [{"timestamp": 1760600000 + i * 60, "value": i * 0.25} for i in range(500)]
+        
+        assert len(MsgPackCodec().encode(series)) < len(JSONCodec().encode(series))
+
+
+class TestCacheSerializer:
+    """Framing, compression and stats"""
+    
+    def test_large_payloads_are_compressed(self):
+        serializer = CacheSerializer(codec=JSONCodec(), compress_threshold_bytes=256)
+        value = {"series": [{"t": i, "v": 0.5} for i in range(200)]}
+        
+        payload, raw_size = serializer.encode(value)
+        
+        assert payload[0] & COMPRESSED_FLAG
+        assert len(payload) < raw_size
+        assert serializer.loads(payload) == value
+    
+    def test_small_payloads_are_not_compressed(self):
+        serializer = CacheSerializer(codec=JSONCodec(), compress_threshold_bytes=256)
+        
+        payload, _ = serializer.encode({"n": 1})
+        
+        assert not payload[0] & COMPRESSED_FLAG
+    
+    def test_reads_payloads_written_by_another_codec(self):
+        pytest.importorskip("msgpack")
+        payload = CacheSerializer(codec=MsgPackCodec()).dumps(SAMPLE)
+        
+        assert CacheSerializer(codec=JSONCodec()).loads(payload) == SAMPLE
+    
+    def test_unknown_codec_is_a_decode_error(self):
+        with pytest.raises(ValueError):
+            CacheSerializer(codec=JSONCodec()).loads(bytes([0xF0]) + b"data")
+    
+    def test_rejects_text_payloads(self):
+        with pytest.raises(ValueError):
+            CacheSerializer(codec=JSONCodec()).loads('{"v": 1}')
+    
+    def test_reports_per_codec_stats(self):
+        serializer = CacheSerializer(codec=JSONCodec(), compress_threshold_bytes=None)
+        
+        payload = serializer.dumps({"n": 1})
+        serializer.loads(payload)
+        
+        stats = serializer.get_stats()["json"]
+        assert stats["encoded"] == 1 and stats["decoded"] == 1
+        assert stats["stored_bytes"] == len(payload) == stats["raw_bytes"] + 1
+        assert stats["encode_seconds"] >= 0 and stats["compressed"] == 0
@@ -3,45 +3,42 @@ Tests for Cache Decorators
 """
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from src.utils.cache_decorators import cached
+from src.utils.cache_decorators import cached, invalidate_cache
 from src.cache.cache_manager import CacheManager
 
 
 @pytest.mark.asyncio
 async def test_cached_decorator_cache_hit():
     """Test cached decorator returns cached value"""
-    cache_manager = MagicMock(spec=CacheManager)
-    cache_manager.get = AsyncMock(return_value="cached_value")
-    cache_manager.set = AsyncMock()
+    cache_manager = CacheManager()
+    calls = []
     
-    @cached(ttl_seconds=300, cache_manager=cache_manager)
+    @cached(ttl_seconds=300, cache_manager=cache_manager, key_func=lambda arg1: f"test:{arg1}")
     async def test_func(arg1: str):
+        calls.append(arg1)
         return f"result_{arg1}"
     
+    await cache_manager.set("test:test", "cached_value")
     result = await test_func("test")
     
     assert result == "cached_value"
-    cache_manager.get.assert_called_once()
-    cache_manager.set.assert_not_called()
+    assert calls == []
 
 
 @pytest.mark.asyncio
 async def test_cached_decorator_cache_miss():
     """Test cached decorator executes function on cache miss"""
-    cache_manager = MagicMock(spec=CacheManager)
-    cache_manager.get = AsyncMock(return_value=None)
-    cache_manager.set = AsyncMock()
+    cache_manager = CacheManager()
+    calls = []
     
     @cached(ttl_seconds=300, cache_manager=cache_manager)
     async def test_func(arg1: str):
+        calls.append(arg1)
         return f"result_{arg1}"
     
-    result = await test_func("test")
-    
-    assert result == "result_test"
-    cache_manager.get.assert_called_once()
-    cache_manager.set.assert_called_once()
+    assert await test_func("test") == "result_test"
+    assert await test_func("test") == "result_test"
+    assert calls == ["test"]
 
 
 @pytest.mark.asyncio
@@ -53,3 +50,25 @@ async def test_cached_decorator_no_cache():
     
     result = await test_func("test")
     assert result == "result_test"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache_decorator_bumps_formatted_tags():
+    """Test invalidate_cache drops entries tagged from the call's arguments"""
+    cache_manager = CacheManager()
+    calls = []
+    
+    @cached(cache_manager=cache_manager, tags=["podcast:{podcast_id}"])
+    async def get_podcast(podcast_id: str):
+        calls.append(podcast_id)
+        return {"podcast_id": podcast_id}
+    
+    @invalidate_cache("podcast:{podcast_id}", cache_manager=cache_manager)
+    async def update_podcast(podcast_id: str):
+        return True
+    
+    await get_podcast("p1")
+    await update_podcast(podcast_id="p1")
+    await get_podcast("p1")
+    
+    assert calls == ["p1", "p1"]
@@ -0,0 +1,241 @@
+"""
+Tests for the two-tier cache manager
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.cache import CacheManager, CacheEntry, LocalCache
+from src.cache.cache_manager import BUMP_TAG_SCRIPT, RELEASE_LOCK_SCRIPT
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in for the commands the cache uses"""
+    
+    def __init__(self):
+        self.data = {}
+        self.error = None
+    
+    def _check(self):
+        if self.error:
+            raise self.error
+    
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+    
+    async def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+    
+    async def incr(self, key):
+        self._check()
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+    
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+    
+    def register_script(self, script):
+        async def run(keys, args):
+            self._check()
+            if script == RELEASE_LOCK_SCRIPT:
+                if self.data.get(keys[0]) != args[0]:
+                    return 0
+                return await self.delete(keys[0])
+            if script == BUMP_TAG_SCRIPT:
+                if keys[0] in self.data:
+                    return await self.incr(keys[0])
+                self.data[keys[0]] = int(args[0])
+                return self.data[keys[0]]
+            raise NotImplementedError(script)
+        return run
+
+
+def make_entry(size, ttl=60):
+    now = time.time()
+    return CacheEntry(value="x", size=size, fresh_until=now + ttl, stale_until=now + ttl)
+
+
+class TestLocalCache:
+    """LRU bounded in bytes with TinyLFU admission"""
+    
+    def test_evicts_least_recently_used_by_size(self):
+        cache = LocalCache(max_bytes=300)
+        for key in ("a", "b", "c"):
+            cache.set(key, make_entry(100))
+        cache.get("a")
+        cache.get("c")
+        # "d" has been requested more often than the LRU entry "b"
+        cache.get("d")
+        cache.get("d")
+        
+        assert cache.set("d", make_entry(100))
+        
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache and "d" in cache
+        assert cache.size_bytes == 300
+    
+    def test_rejects_rarely_used_key_over_hot_entries(self):
+        cache = LocalCache(max_bytes=200)
+        for key in ("a", "b"):
+            cache.set(key, make_entry(100))
+            for _ in range(5):
+                cache.get(key)
+        
+        assert not cache.set("one-off", make_entry(100))
+        assert "a" in cache and "b" in cache
+        assert cache.rejections == 1
+    
+    def test_expired_entries_are_dropped(self):
+        cache = LocalCache()
+        cache.set("a", make_entry(10, ttl=-1))
+        
+        assert cache.get("a") is None
+        assert cache.size_bytes == 0
+
+
+class TestCacheManager:
+    """Two tiers, single-flight, stale-while-revalidate and tags"""
+    
+    @pytest.mark.asyncio
+    async def test_l2_hit_is_promoted_to_l1(self):
+        redis = FakeRedis()
+        writer = CacheManager(redis_client=redis)
+        reader = CacheManager(redis_client=redis)
+        
+        await writer.set("k", {"n": 1})
+        
+        assert await reader.get("k") == {"n": 1}
+        assert await reader.get("k") == {"n": 1}
+        assert reader.stats["l2_hits"] == 1 and reader.stats["l1_hits"] == 1
+        assert writer.serializer.loads(redis.data["cache:k"])["v"] == {"n": 1}
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        cache = CacheManager(redis_client=FakeRedis())
+        calls = 0
+        
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+        
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(20)))
+        
+        assert results == ["value"] * 20
+        assert calls == 1
+        assert cache.stats["coalesced"] == 19
+    
+    @pytest.mark.asyncio
+    async def test_waits_for_load_in_another_process(self):
+        redis = FakeRedis()
+        cache = CacheManager(redis_client=redis, lock_wait_seconds=1.0)
+        redis.data["cache:lock:k"] = "peer"
+        
+        async def peer_publishes():
+            await asyncio.sleep(0.06)
+            await CacheManager(redis_client=redis).set("k", "from-peer")
+        
+        async def loader():
+            raise AssertionError("should use the peer's value")
+        
+        result, _ = await asyncio.gather(cache.get_or_load("k", loader), peer_publishes())
+        
+        assert result == "from-peer"
+    
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        cache = CacheManager()
+        await cache.set("k", "old", ttl_seconds=60, stale_seconds=60)
+        cache.local.get("k").fresh_until = time.time() - 1
+        refreshed = asyncio.Event()
+        
+        async def loader():
+            refreshed.set()
+            return "new"
+        
+        assert await cache.get_or_load("k", loader, stale_seconds=60) == "old"
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await asyncio.sleep(0)
+        assert await cache.get("k") == "new"
+    
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_across_processes(self):
+        redis = FakeRedis()
+        first = CacheManager(redis_client=redis, tag_version_ttl_seconds=0)
+        second = CacheManager(redis_client=redis, tag_version_ttl_seconds=0)
+        await first.set("a", 1, tags=["campaign:1"])
+        await first.set("b", 2, tags=["campaign:2"])
+        assert await second.get("a") == 1
+        
+        await first.invalidate_tags("campaign:1")
+        
+        assert await first.get("a") is None
+        assert await second.get("a") is None
+        assert await second.get("b") == 2
+    
+    @pytest.mark.asyncio
+    async def test_evicted_tag_version_does_not_revive_entries(self):
+        redis = FakeRedis()
+        cache = CacheManager(redis_client=redis, tag_version_ttl_seconds=0)
+        await cache.set("a", 1, tags=["campaign:1"])
+        await cache.invalidate_tags("campaign:1")
+        await cache.set("b", 2, tags=["campaign:1"])
+        
+        del redis.data["cache:tag:campaign:1"]
+        
+        assert await cache.get("b") is None
+        await cache.invalidate_tags("campaign:1")
+        assert await cache.get("a") is None
+        assert await cache.get("b") is None
+    
+    @pytest.mark.asyncio
+    async def test_lock_is_released_only_by_its_owner(self):
+        redis = FakeRedis()
+        cache = CacheManager(redis_client=redis, lock_timeout_seconds=0.01)
+        
+        async def loader():
+            # The lock expired mid-load and a peer took it over
+            redis.data["cache:lock:k"] = "peer"
+            return "value"
+        
+        assert await cache.get_or_load("k", loader) == "value"
+        assert redis.data["cache:lock:k"] == "peer"
+    
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_local_tier(self):
+        redis = FakeRedis()
+        metrics = Mock()
+        cache = CacheManager(redis_client=redis, metrics_collector=metrics)
+        redis.error = ConnectionError("redis down")
+        
+        await cache.set("k", "v")
+        
+        assert await cache.get("k") == "v"
+        metrics.increment_counter.assert_any_call("cache_backend_errors_total", tags={"operation": "set"})
+    
+    @pytest.mark.asyncio
+    async def test_uncacheable_value_is_skipped(self):
+        cache = CacheManager()
+        value = object()
+        
+        async def loader():
+            return value
+        
+        await cache.set("k", [value])
+        
+        assert await cache.get("k") is None
+        assert await cache.get_or_load("k2", loader) is value
+        assert await cache.get("k2") is None
@@ -0,0 +1,118 @@
+"""
+Tests for the leased, batched email queue worker
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.email.email_queue import EmailQueue
+
+
+def make_row(email_id, retry_count=0, max_retries=3):
+    return {
+        "email_id": email_id,
+        "to_email": f"{email_id}@example.com",
+        "template": "welcome",
+        "context": {},
+        "subject": None,
+        "body": None,
+        "retry_count": retry_count,
+        "max_retries": max_retries,
+    }
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=[])
+    conn.fetchrow = AsyncMock()
+    conn.execute = AsyncMock()
+    return conn
+
+
+@pytest.fixture
+def email_service():
+    service = Mock()
+    service.send_email = AsyncMock(return_value=True)
+    return service
+
+
+class TestEmailQueueBatches:
+    """Claim, concurrent send and bulk outcome update"""
+    
+    @pytest.mark.asyncio
+    async def test_claims_with_lease_for_this_worker(self, postgres_conn, email_service):
+        queue = EmailQueue(postgres_conn, email_service, batch_size=50, lease_seconds=120)
+        
+        assert await queue.process_batch() == 0
+        
+        query, *params = postgres_conn.fetch.await_args.args
+        assert "FOR UPDATE SKIP LOCKED" in query
+        assert "leased_until < NOW()" in query
+        assert params == ["processing", queue.worker_id, 120, 50]
+        postgres_conn.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_records_all_outcomes_in_one_update(self, postgres_conn, email_service):
+        postgres_conn.fetch.return_value = [
+            make_row("a"),
+            make_row("b"),
+            make_row("c", retry_count=2, max_retries=3),
+        ]
+        email_service.send_email.side_effect = [True, False, Exception("smtp down")]
+        metrics = Mock()
+        queue = EmailQueue(postgres_conn, email_service, metrics_collector=metrics)
+        
+        assert await queue.process_batch() == 3
+        
+        postgres_conn.execute.assert_awaited_once()
+        query, email_ids, statuses, retry_counts, errors, scheduled, worker_id = postgres_conn.execute.await_args.args
+        assert "unnest" in query
+        assert email_ids == ["a", "b", "c"]
+        assert statuses == ["sent", "retrying", "failed"]
+        assert retry_counts == [0, 1, 3]
+        assert errors == [None, "Email send failed", "smtp down"]
+        assert scheduled[0] is None and scheduled[1] is not None and scheduled[2] is None
+        assert worker_id == queue.worker_id
+    
+    @pytest.mark.asyncio
+    async def test_send_concurrency_is_bounded(self, postgres_conn, email_service):
+        postgres_conn.fetch.return_value = [make_row(str(i)) for i in range(10)]
+        active = 0
+        peak = 0
+        
+        async def send_email(**kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return True
+        
+        email_service.send_email.side_effect = send_email
+        queue = EmailQueue(postgres_conn, email_service, send_concurrency=3)
+        
+        await queue.process_batch()
+        
+        assert peak == 3
+
+
+class TestEmailQueueMetrics:
+    """Depth, age of oldest and throughput"""
+    
+    @pytest.mark.asyncio
+    async def test_record_queue_metrics(self, postgres_conn, email_service):
+        postgres_conn.fetchrow.return_value = {"depth": 42, "oldest_age_seconds": 12.5}
+        metrics = Mock()
+        queue = EmailQueue(postgres_conn, email_service, metrics_collector=metrics)
+        queue._processed_count = 10
+        
+        stats = await queue.record_queue_metrics()
+        
+        assert stats["depth"] == 42
+        assert stats["oldest_age_seconds"] == 12.5
+        assert stats["throughput_per_second"] > 0
+        metrics.record_gauge.assert_any_call("email_queue_depth", 42)
+        metrics.record_gauge.assert_any_call("email_queue_oldest_age_seconds", 12.5)
+        assert queue._processed_count == 0
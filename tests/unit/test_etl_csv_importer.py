@@ -0,0 +1,154 @@
+"""
+Tests for the streaming CSV importer
+"""
+
+import pytest
+from datetime import date
+from unittest.mock import Mock, MagicMock, AsyncMock
+from uuid import UUID
+
+from src.etl.csv_importer import CSVImporter
+
+
+EPISODE_ID = "6f1c1b1e-8a8e-4a57-9a43-2d3c0c7c9b11"
+HEADER = "day,episode_id,source,downloads,listeners,completion_rate,ctr,conversions,revenue_cents\n"
+
+
+class ChunkedStream:
+    """Upload stand-in that returns a fixed number of bytes per read"""
+    
+    def __init__(self, data: bytes, read_size: int):
+        self.data = data
+        self.read_size = read_size
+        self.offset = 0
+    
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self.data[self.offset:self.offset + self.read_size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def postgres_conn():
+    """Mock PostgresConnection whose acquire() yields a connection supporting COPY"""
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.fetchrow = AsyncMock(return_value={"imported": 2, "total": 3})
+    conn.transaction = MagicMock(return_value=AsyncContextManager())
+    
+    postgres = MagicMock()
+    postgres.execute = AsyncMock()
+    postgres.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    postgres.conn = conn
+    return postgres
+
+
+@pytest.fixture
+def importer(postgres_conn):
+    return CSVImporter(postgres_conn=postgres_conn, metrics_collector=Mock(), event_logger=Mock())
+
+
+class TestValidateChunk:
+    """Column-wise validation matches the MetricsDailyRow rules"""
+    
+    def test_valid_rows_become_typed_records(self, importer):
+        records, errors = importer.validate_chunk([
+            ["2024-01-01", EPISODE_ID, "spotify", "10", "", "0.5", "", "2", "199"],
+        ])
+        
+        assert errors == []
+        assert records == [
+            (date(2024, 1, 1), UUID(EPISODE_ID), "spotify", 10, None, 0.5, None, 2, 199, 2)
+        ]
+        assert isinstance(records[0][3], int)
+    
+    def test_invalid_rows_are_reported_with_line_numbers(self, importer):
+        records, errors = importer.validate_chunk([
+            ["2024-01-01", EPISODE_ID, "spotify", "10", "", "", "", "", ""],
+            ["2024-02-30", "not-a-uuid", "apple", "-1", "", "1.5", "", "", ""],
+            ["2024-01-02", EPISODE_ID, "apple", "1.5", "x", "", "", "", ""],
+            ["2024-01-03", EPISODE_ID],
+        ], first_row_num=10)
+        
+        assert [record[-1] for record in records] == [10]
+        assert len(errors) == 3
+        assert errors[0].startswith("Row 11:")
+        assert "day must be in YYYY-MM-DD format" in errors[0]
+        assert "episode_id must be a valid UUID" in errors[0]
+        assert "downloads must be a non-negative integer" in errors[0]
+        assert "completion_rate must be between 0 and 1" in errors[0]
+        assert "listeners must be a number" in errors[1]
+        assert "expected 9 fields" in errors[2]
+    
+    def test_integer_columns_are_exact_and_bounded(self, importer):
+        records, errors = importer.validate_chunk([
+            ["2024-01-01", EPISODE_ID, "spotify", "9007199254740993", "", "", "", "", "9223372036854775807"],
+            ["2024-01-02", EPISODE_ID, "spotify", "99999999999999999999", "", "", "", "", ""],
+            ["2024-01-03", EPISODE_ID, "spotify", "inf", "nan", "NaN", "", "", ""],
+        ])
+        
+        assert [(record[3], record[8]) for record in records] == [(2**53 + 1, 2**63 - 1)]
+        assert len(errors) == 2
+        assert "downloads must be at most 9223372036854775807" in errors[0]
+        assert "downloads must be a number" in errors[1]
+        assert "listeners must be a number" in errors[1]
+        assert "completion_rate must be a number" in errors[1]
+
+
+@pytest.mark.asyncio
+class TestImportStream:
+    """Uploads are streamed, COPYed to staging and merged once"""
+    
+    async def test_chunks_split_anywhere(self, importer):
+        body = (
+            HEADER
+            + f'2024-01-01,{EPISODE_ID},"spo\ntify",1,,,,,\n'
+            + f"2024-01-02,{EPISODE_ID},café,2,,,,,\n"
+            + f"2024-01-03,{EPISODE_ID},apple,3,,,,,"
+        ).encode("utf-8")
+        
+        chunks = []
+        async for first_row_num, rows in importer._iter_csv_chunks(ChunkedStream(body, 7), chunk_rows=2):
+            chunks.append((first_row_num, rows))
+        
+        assert [first for first, _ in chunks] == [2, 4]
+        assert [row[2] for _, rows in chunks for row in rows] == ["spo\ntify", "café", "apple"]
+    
+    async def test_import_stream_loads_and_merges(self, importer, postgres_conn):
+        body = HEADER + "".join(f"2024-01-0{day},{EPISODE_ID},spotify,{day},,,,,\n" for day in range(1, 4))
+        
+        result = await importer.import_stream(ChunkedStream(body.encode(), 64), "tenant-1", "import-1", chunk_rows=2)
+        
+        assert result == {"imported": 2, "failed": 1}
+        conn = postgres_conn.conn
+        assert conn.copy_records_to_table.await_count == 2
+        conn.transaction.assert_called_once()
+        conn.fetchrow.assert_awaited_once()
+        # Progress is written after every chunk
+        assert [c.args[3] for c in postgres_conn.execute.await_args_list] == [2, 3]
+        assert "DROP TABLE" in conn.execute.await_args_list[-1].args[0]
+    
+    async def test_invalid_file_is_not_merged(self, importer, postgres_conn):
+        body = HEADER + f"2024-01-01,{EPISODE_ID},spotify,1,,,,,\nbad,{EPISODE_ID},spotify,1,,,,,\n"
+        
+        with pytest.raises(ValueError, match="Row 3"):
+            await importer.import_stream(ChunkedStream(body.encode(), 1024), "tenant-1", "import-1")
+        
+        postgres_conn.conn.fetchrow.assert_not_awaited()
+        postgres_conn.conn.copy_records_to_table.assert_not_awaited()
+    
+    async def test_invalid_header(self, importer):
+        with pytest.raises(ValueError, match="Invalid CSV header"):
+            await importer.import_stream(ChunkedStream(b"a,b,c\n1,2,3\n", 1024), "tenant-1", "import-1")
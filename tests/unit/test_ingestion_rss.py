@@ -0,0 +1,230 @@
+"""
+Tests for conditional and incremental RSS polling
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from src.ingestion.rss_ingest import RSSIngestService, FeedPollScheduler, FeedSchedule
+from src.ingestion.feed_state import FeedState
+
+
+FEED_URL = "https://example.com/feed.xml"
+
+
+def make_feed(guids):
+    """RSS document with one item per guid "ep-N", published on day N of January 2024"""
+    items = "".join(
+        f"""
+        <item>
+            <title>Episode {guid}</title>
+            <guid>{guid}</guid>
+            <pubDate>{int(guid.split("-")[1]):02d} Jan 2024 00:00:00 GMT</pubDate>
+            <enclosure url="https://example.com/{guid}.mp3" type="audio/mpeg" length="1"/>
+        </item>"""
+        for guid in guids
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+    <channel>
+        <title>Test Show</title>
+        <description>A show</description>{items}
+    </channel>
+</rss>""".encode("utf-8")
+
+
+@pytest.fixture
+def service():
+    events = Mock()
+    events.log_event = AsyncMock()
+    return RSSIngestService(metrics_collector=Mock(), event_logger=events)
+
+
+@pytest.mark.asyncio
+class TestConditionalPolling:
+    """Unchanged feeds are not re-parsed"""
+    
+    async def test_first_poll_stores_validators(self, service):
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-2", "ep-1"]), {"ETag": '"v1"'}))
+        
+        metadata = await service.poll_feed(FEED_URL, "podcast-1")
+        
+        assert [episode.guid for episode in metadata.episodes] == ["ep-2", "ep-1"]
+        assert not metadata.not_modified
+        assert await service.state_store.get(FEED_URL) is None
+        
+        await service.save_feed_state(metadata)
+        state = await service.state_store.get(FEED_URL)
+        assert state.etag == '"v1"'
+        assert state.last_seen_guid == "ep-2"
+        assert state.feed_info["podcast_title"] == "Test Show"
+    
+    async def test_not_modified_returns_cached_metadata(self, service):
+        await service.state_store.save(FeedState(
+            feed_url=FEED_URL, etag='"v1"', feed_info={"podcast_title": "Test Show"}
+        ))
+        service._fetch_feed = AsyncMock(return_value=(304, b"", {}))
+        
+        metadata = await service.poll_feed(FEED_URL, "podcast-1")
+        
+        assert metadata.not_modified
+        assert metadata.episodes == []
+        assert metadata.podcast_title == "Test Show"
+        service.metrics.increment_counter.assert_any_call("feed_poll_not_modified", tags={"reason": "http_304"})
+    
+    async def test_unchanged_payload_is_not_parsed(self, service, monkeypatch):
+        payload = make_feed(["ep-1"])
+        service._fetch_feed = AsyncMock(return_value=(200, payload, {}))
+        await service.save_feed_state(await service.poll_feed(FEED_URL, "podcast-1"))
+        
+        parse = Mock(side_effect=AssertionError("payload should not be parsed"))
+        monkeypatch.setattr("src.ingestion.rss_ingest.feedparser.parse", parse)
+        metadata = await service.poll_feed(FEED_URL, "podcast-1")
+        
+        assert metadata.not_modified
+        parse.assert_not_called()
+    
+    async def test_only_new_entries_are_returned(self, service):
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-1"]), {}))
+        await service.save_feed_state(await service.poll_feed(FEED_URL, "podcast-1"))
+        
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-3", "ep-2", "ep-1"]), {}))
+        metadata = await service.poll_feed(FEED_URL, "podcast-1")
+        await service.save_feed_state(metadata)
+        
+        assert [episode.guid for episode in metadata.episodes] == ["ep-3", "ep-2"]
+        assert (await service.state_store.get(FEED_URL)).last_seen_guid == "ep-3"
+    
+    async def test_oldest_first_feeds(self, service):
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-1", "ep-2"]), {}))
+        await service.save_feed_state(await service.poll_feed(FEED_URL, "podcast-1"))
+        assert (await service.state_store.get(FEED_URL)).last_seen_guid == "ep-2"
+        
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-1", "ep-2", "ep-3"]), {}))
+        metadata = await service.poll_feed(FEED_URL, "podcast-1")
+        
+        assert [episode.guid for episode in metadata.episodes] == ["ep-3"]
+        assert metadata.pending_state.last_seen_guid == "ep-3"
+    
+    async def test_conditional_request_headers(self, service):
+        response = MagicMock(status=304, headers={})
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        service.session = Mock()
+        service.session.get = Mock(return_value=context)
+        
+        state = FeedState(feed_url=FEED_URL, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        status, body, _ = await service._fetch_feed(FEED_URL, state)
+        
+        assert (status, body) == (304, b"")
+        assert service.session.get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+
+class TestFeedPollScheduler:
+    """Per-feed adaptive scheduling"""
+    
+    @pytest.fixture
+    def scheduler(self, service):
+        storage = Mock()
+        storage.get_active_feeds = AsyncMock(return_value=[
+            {"feed_url": f"https://host-{i % 3}.example.com/feed", "podcast_id": f"podcast-{i}"}
+            for i in range(30)
+        ])
+        storage.store_feed_metadata = AsyncMock()
+        return FeedPollScheduler(service, storage, Mock(), min_interval=60, max_interval=86400)
+    
+    def test_interval_follows_publish_cadence(self, scheduler):
+        now = 1_000_000.0
+        hourly = FeedSchedule("u", "p", 900, now, publish_times=[now - 3 * 3600, now - 2 * 3600, now - 3600])
+        dormant = FeedSchedule("u", "p", 900, now, publish_times=[now - 90 * 86400, now - 60 * 86400])
+        
+        assert scheduler.compute_interval(hourly, now) == pytest.approx(900)
+        assert scheduler.compute_interval(dormant, now) == 86400
+        assert scheduler.compute_interval(FeedSchedule("u", "p", 900, now), now) == 900
+    
+    def test_failures_back_off(self, scheduler):
+        schedule = FeedSchedule("u", "p", 900, 0, consecutive_failures=2)
+        
+        assert scheduler.compute_interval(schedule, 0) == 3600
+    
+    @pytest.mark.asyncio
+    async def test_new_feeds_are_spread_over_the_interval(self, scheduler):
+        await scheduler.refresh_feeds(now=0)
+        
+        due_times = [schedule.next_due for schedule in scheduler.schedules.values()]
+        assert len(due_times) == 30
+        assert all(0 <= due < 900 for due in due_times)
+        assert len(set(due_times)) > 1
+    
+    @pytest.mark.asyncio
+    async def test_dispatch_reports_lag_and_reschedules(self, scheduler, service):
+        service.poll_feed_limited = AsyncMock(return_value=Mock(not_modified=True, episodes=[]))
+        await scheduler.refresh_feeds(now=0)
+        
+        # 4 polls per host at a time; the rest stay queued until a slot frees
+        started = [scheduler.dispatch_due(now=1000)]
+        assert scheduler._host_in_flight == {f"host-{i}.example.com": 4 for i in range(3)}
+        while scheduler._tasks:
+            await asyncio.gather(*scheduler._tasks)
+            started.append(scheduler.dispatch_due(now=1000))
+        
+        assert started[0] == 12 and sum(started) == 30
+        assert scheduler._host_in_flight == {}
+        lags = [c.args[1] for c in scheduler.metrics.record_histogram.call_args_list]
+        assert len(lags) == 30 and all(100 < lag <= 1000 for lag in lags)
+        assert all(schedule.next_due > 1000 for schedule in scheduler.schedules.values())
+        assert scheduler.queue_depth(now=1000) == 0
+        scheduler.feed_storage.store_feed_metadata.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_state_is_saved_only_after_episodes_are_stored(self, scheduler, service):
+        service._fetch_feed = AsyncMock(return_value=(200, make_feed(["ep-1"]), {"ETag": '"v1"'}))
+        scheduler.feed_storage.store_feed_metadata.side_effect = ConnectionError("db down")
+        schedule = FeedSchedule(FEED_URL, "podcast-1", 900, 0)
+        scheduler.schedules["podcast-1"] = schedule
+        
+        await scheduler._poll(schedule, "example.com")
+        assert await service.state_store.get(FEED_URL) is None
+        assert schedule.consecutive_failures == 1
+        
+        scheduler.feed_storage.store_feed_metadata.side_effect = None
+        await scheduler._poll(schedule, "example.com")
+        stored = scheduler.feed_storage.store_feed_metadata.await_args.args[1]
+        assert [episode.guid for episode in stored.episodes] == ["ep-1"]
+        assert (await service.state_store.get(FEED_URL)).etag == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_poll_all_feeds_respects_host_and_global_limits():
+    events = Mock()
+    events.log_event = AsyncMock()
+    service = RSSIngestService(Mock(), events, max_concurrency=5, per_host_concurrency=2)
+    active = {"global": 0, "max_global": 0}
+    per_host = {}
+    max_per_host = {}
+    
+    async def fake_poll(feed_url, podcast_id):
+        host = feed_url.split("/")[2]
+        active["global"] += 1
+        per_host[host] = per_host.get(host, 0) + 1
+        active["max_global"] = max(active["max_global"], active["global"])
+        max_per_host[host] = max(max_per_host.get(host, 0), per_host[host])
+        await asyncio.sleep(0.001)
+        active["global"] -= 1
+        per_host[host] -= 1
+        return podcast_id
+    
+    service.poll_feed = fake_poll
+    configs = [{"feed_url": f"https://h{i % 4}.example.com/{i}", "podcast_id": str(i)} for i in range(40)]
+    
+    results = await service.poll_all_feeds(configs)
+    
+    assert len(results) == 40
+    assert active["max_global"] <= 5
+    assert max(max_per_host.values()) <= 2
+    assert service._host_semaphores == {} and service._host_users == {}
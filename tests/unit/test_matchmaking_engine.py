@@ -0,0 +1,122 @@
+"""
+Tests for batch matchmaking
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock
+from uuid import UUID
+
+from src.matchmaking.engine import MatchmakingEngine
+
+
+ADVERTISERS = ["a0000000-0000-0000-0000-000000000001", "a0000000-0000-0000-0000-000000000002"]
+PODCASTS = [
+    "b0000000-0000-0000-0000-000000000001",
+    "b0000000-0000-0000-0000-000000000002",
+    "b0000000-0000-0000-0000-000000000003",
+]
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def postgres_conn():
+    """Mock PostgresConnection returning set-based signal rows"""
+    lift_rows = [{"sponsor_id": UUID(ADVERTISERS[1]), "podcast_id": UUID(PODCASTS[0]), "campaign_count": 3}]
+    podcast_rows = [
+        {"podcast_id": UUID(PODCASTS[0]), "episode_count": 4, "explicit_count": 0, "total_episodes": 8},
+        {"podcast_id": UUID(PODCASTS[1]), "episode_count": 20, "explicit_count": 5, "total_episodes": 10},
+    ]
+    
+    async def fetch(query, *args):
+        return lift_rows if "attribution_events" in query else podcast_rows
+    
+    conn = MagicMock()
+    conn.transaction = MagicMock(return_value=AsyncContextManager())
+    
+    conn.executemany = AsyncMock()
+    
+    async def fetch_match_ids(query, tenant_id, advertiser_ids, podcast_ids):
+        return [
+            {"match_id": f"m-{i}-{j}", "advertiser_id": UUID(a), "podcast_id": UUID(p)}
+            for i, a in enumerate(advertiser_ids)
+            for j, p in enumerate(podcast_ids)
+        ]
+    
+    conn.fetch = AsyncMock(side_effect=fetch_match_ids)
+    
+    postgres = MagicMock()
+    postgres.fetch = AsyncMock(side_effect=fetch)
+    postgres.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    postgres.conn = conn
+    return postgres
+
+
+@pytest.fixture
+def engine(postgres_conn):
+    return MatchmakingEngine(postgres_conn=postgres_conn, metrics_collector=Mock(), event_logger=Mock())
+
+
+def expected_score(lift, inventory, brand_safety):
+    """Per-pair formula the engine has always used"""
+    score = (0.5 * 0.15 + 0.5 * 0.20 + 0.5 * 0.25 + lift * 0.20 + inventory * 0.15 + brand_safety * 0.05) * 100
+    if brand_safety < 1.0:
+        score *= brand_safety
+    return round(max(0, min(100, score)), 2)
+
+
+@pytest.mark.asyncio
+class TestMatchMatrix:
+    """Whole-matrix scoring"""
+    
+    async def test_matrix_scores(self, engine, postgres_conn):
+        matrix = await engine.calculate_match_matrix(ADVERTISERS, PODCASTS, "tenant-1")
+        
+        # Two set-based queries regardless of matrix size
+        assert postgres_conn.fetch.await_count == 2
+        assert matrix.scores.shape == (2, 3)
+        assert matrix.pair(0, 0)["score"] == expected_score(0.3, 0.4, 1.0)
+        assert matrix.pair(1, 0)["score"] == expected_score(0.7, 0.4, 1.0)
+        assert matrix.pair(0, 1)["score"] == expected_score(0.3, 1.0, 0.75)
+        # Podcast without episodes: low inventory, fully brand safe
+        assert matrix.pair(1, 2)["score"] == expected_score(0.3, 0.2, 1.0)
+        assert matrix.pair(0, 1)["rationale"].endswith("Brand safety: 75.0%")
+        assert "Brand safety" not in matrix.pair(0, 0)["rationale"]
+    
+    async def test_single_pair_uses_matrix(self, engine):
+        result = await engine.calculate_match_score(ADVERTISERS[1], PODCASTS[0], "tenant-1")
+        
+        assert result["score"] == expected_score(0.7, 0.4, 1.0)
+        assert result["signals"]["historical_lift"] == 0.7
+    
+    async def test_save_matches_writes_rows_and_reads_ids_once(self, engine, postgres_conn):
+        matrix, match_ids = await engine.recalculate_matches([a.upper() for a in ADVERTISERS], PODCASTS, "tenant-1")
+        
+        conn = postgres_conn.conn
+        conn.executemany.assert_awaited_once()
+        rows = conn.executemany.await_args.args[1]
+        assert len(rows) == 6
+        assert json.loads(rows[0][6])["historical_lift"] == 0.3
+        conn.fetch.assert_awaited_once()
+        assert len(match_ids) == 6
+        assert match_ids[(ADVERTISERS[0].upper(), PODCASTS[0])] == "m-0-0"
+    
+    async def test_large_matrix_is_chunked_in_one_transaction(self, engine, postgres_conn):
+        engine.UPSERT_BATCH_SIZE = 4
+        
+        _, match_ids = await engine.recalculate_matches(ADVERTISERS, PODCASTS, "tenant-1")
+        
+        conn = postgres_conn.conn
+        assert [len(c.args[1]) for c in conn.executemany.await_args_list] == [4, 2]
+        conn.transaction.assert_called_once()
+        assert len(match_ids) == 6
@@ -0,0 +1,145 @@
+"""
+Tests for write-behind API usage metering
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.monetization.usage_meter import UsageMeter, UsageJournal, NO_API_KEY, minute_bucket
+from src.monetization.api_usage_tracker import APIUsageTracker
+
+TENANT = "11111111-1111-1111-1111-111111111111"
+NOW = 1_800_000_030.0
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    conn.execute = AsyncMock()
+    conn.fetchrow = AsyncMock()
+    return conn
+
+
+def record(meter, status_code=200, response_time_ms=10, endpoint="/api/v1/campaigns/{campaign_id}", timestamp=NOW, **kwargs):
+    meter.record(
+        tenant_id=TENANT,
+        endpoint=endpoint,
+        method="GET",
+        status_code=status_code,
+        response_time_ms=response_time_ms,
+        timestamp=timestamp,
+        **kwargs
+    )
+
+
+class TestUsageMeter:
+    """In-memory aggregation and bulk flush"""
+    
+    def test_record_aggregates_per_key_and_minute(self, postgres_conn):
+        meter = UsageMeter(postgres_conn)
+        record(meter, response_time_ms=10)
+        record(meter, response_time_ms=30, status_code=201)
+        record(meter, status_code=404)
+        record(meter, timestamp=NOW + 60)
+        
+        assert meter.pending_keys == 3
+        key, rollup = next(iter(meter._pending.items()))
+        assert key.api_key_id == NO_API_KEY
+        assert key.status_class == "2xx"
+        assert key.bucket_start == minute_bucket(NOW)
+        assert (rollup.call_count, rollup.total_response_time_ms, rollup.max_response_time_ms) == (2, 40, 30)
+    
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_bulk_statement(self, postgres_conn):
+        meter = UsageMeter(postgres_conn)
+        record(meter)
+        record(meter, status_code=500)
+        
+        assert await meter.flush() == 2
+        
+        postgres_conn.execute.assert_awaited_once()
+        args = postgres_conn.execute.await_args.args
+        assert "api_usage_flush_batches" in args[0]
+        assert args[2] == [TENANT, TENANT]
+        assert sorted(args[6]) == ["2xx", "5xx"]
+        assert meter.pending_keys == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_without_journal_is_retried(self, postgres_conn):
+        meter = UsageMeter(postgres_conn)
+        record(meter)
+        postgres_conn.execute.side_effect = Exception("db down")
+        
+        assert await meter.flush() == 0
+        record(meter)
+        assert meter.pending_keys == 1
+        
+        postgres_conn.execute.side_effect = None
+        await meter.flush()
+        assert postgres_conn.execute.await_args.args[8] == [2]
+    
+    @pytest.mark.asyncio
+    async def test_journaled_batch_is_replayed_with_same_batch_id(self, postgres_conn, tmp_path):
+        meter = UsageMeter(postgres_conn, journal_directory=str(tmp_path))
+        record(meter)
+        postgres_conn.execute.side_effect = Exception("db down")
+        await meter.flush()
+        
+        failed_batch_id = postgres_conn.execute.await_args.args[1]
+        assert meter.pending_keys == 0
+        assert [batch_id for batch_id, _ in UsageJournal(str(tmp_path)).pending()] == [failed_batch_id]
+        
+        # A new process replays the journal on start
+        postgres_conn.execute.side_effect = None
+        postgres_conn.execute.reset_mock()
+        restarted = UsageMeter(postgres_conn, journal_directory=str(tmp_path))
+        assert await restarted.replay_journal() == 1
+        assert postgres_conn.execute.await_args.args[1] == failed_batch_id
+        assert UsageJournal(str(tmp_path)).pending() == []
+    
+    def test_size_threshold_wakes_flush_loop(self, postgres_conn):
+        meter = UsageMeter(postgres_conn, max_pending_keys=2)
+        record(meter, endpoint="/a")
+        assert not meter._wake.is_set()
+        record(meter, endpoint="/b")
+        assert meter._wake.is_set()
+    
+    def test_buffer_cap_drops_new_keys(self, postgres_conn):
+        meter = UsageMeter(postgres_conn, max_buffered_keys=1)
+        record(meter, endpoint="/a")
+        record(meter, endpoint="/b")
+        record(meter, endpoint="/a")
+        
+        assert meter.pending_keys == 1
+        assert meter.dropped_calls == 1
+
+
+class TestAPIUsageTrackerRollups:
+    """Billing queries read api_usage_rollups"""
+    
+    @pytest.mark.asyncio
+    async def test_usage_summary_bills_successful_calls(self, postgres_conn):
+        postgres_conn.fetchrow.return_value = {
+            "total_calls": 25000,
+            "successful_calls": 24000,
+            "failed_calls": 1000,
+            "avg_response_time_ms": 12.5,
+            "unique_endpoints": 4,
+        }
+        tracker = APIUsageTracker(postgres_conn, Mock(), Mock())
+        
+        summary = await tracker.get_usage_summary(TENANT)
+        
+        assert "api_usage_rollups" in postgres_conn.fetchrow.await_args.args[0]
+        assert summary["total_cost_cents"] == 120
+        assert summary["avg_response_time_ms"] == 12.5
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_sums_rollups(self, postgres_conn):
+        postgres_conn.fetchrow.return_value = {"calls_last_hour": None}
+        tracker = APIUsageTracker(postgres_conn, Mock(), Mock())
+        
+        result = await tracker.check_rate_limit(TENANT, limit_per_hour=10)
+        
+        assert result["calls_last_hour"] == 0
+        assert result["remaining"] == 10
@@ -0,0 +1,143 @@
+"""
+Tests for single-pass keyword matching in ad detection
+"""
+
+import random
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.processing.keyword_matcher import AhoCorasick
+from src.processing.ad_detection import (
+    AdDetectionEngine,
+    AdKeywordMatcher,
+    SegmentIndex,
+    TranscriptSegment,
+)
+
+
+@pytest.fixture
+def engine():
+    events = Mock()
+    events.log_event = AsyncMock()
+    return AdDetectionEngine(Mock(), events)
+
+
+def segments_from(texts, length=10.0):
+    return [
+        TranscriptSegment(start_time=i * length, end_time=(i + 1) * length, text=text)
+        for i, text in enumerate(texts)
+    ]
+
+
+class TestAhoCorasick:
+    """Multi-pattern matching"""
+    
+    def test_reports_overlapping_and_nested_matches(self):
+        matcher = AhoCorasick(["promo code", "promo", "code", "ad"])
+        
+        matches = [(start, end, matcher.patterns[pid]) for start, end, pid in matcher.finditer("read promo code")]
+        
+        assert (2, 4, "ad") in matches
+        assert (5, 10, "promo") in matches
+        assert (5, 15, "promo code") in matches
+        assert (11, 15, "code") in matches
+    
+    def test_agrees_with_substring_search(self):
+        rng = random.Random(7)
+        patterns = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(20)]
+        matcher = AhoCorasick(patterns)
+        
+        for _ in range(50):
+            text = "".join(rng.choice("abc ") for _ in range(40))
+            found = {matcher.patterns[i] for i in matcher.search(text)}
+            assert found == {p for p in patterns if p in text}
+
+
+class TestAdKeywordMatcher:
+    """Transcript scans"""
+    
+    def test_scan_matches_per_segment_substring_checks(self, engine):
+        texts = [
+            "Welcome back to the show",
+            "This episode is sponsored by Acme, use code SAVE20",
+            "We'll be right back after this",
+            "Read the docs",
+        ]
+        segments = segments_from(texts)
+        
+        scan = engine.matcher.scan(segments)
+        
+        for i, text in enumerate(texts):
+            lower = text.lower()
+            assert scan.segment_keywords[i] == [kw for kw in engine.AD_KEYWORDS if kw in lower]
+            assert scan.segment_phrases[i] == [p for p in engine.TRANSITION_PHRASES if p in lower]
+    
+    def test_matches_do_not_cross_segments(self):
+        matcher = AdKeywordMatcher(["go to"], [])
+        
+        scan = matcher.scan(segments_from(["let's go", "to the store"]))
+        
+        assert scan.hits == []
+    
+    def test_hits_have_segment_offsets(self):
+        matcher = AdKeywordMatcher(["promo"], ["but first"])
+        
+        scan = matcher.scan(segments_from(["intro", "But first, a promo"]))
+        
+        assert [(h.segment_index, h.start, h.end, h.term, h.is_phrase) for h in scan.hits] == [
+            (1, 0, 9, "but first", True),
+            (1, 13, 18, "promo", False),
+        ]
+
+
+class TestSegmentIndex:
+    """Time window lookups"""
+    
+    def test_overlapping_matches_linear_scan(self):
+        rng = random.Random(3)
+        segments = []
+        t = 0.0
+        for _ in range(200):
+            length = rng.uniform(1, 20)
+            segments.append(TranscriptSegment(start_time=t, end_time=t + length, text=""))
+            t += length
+        index = SegmentIndex(segments)
+        
+        for start, end in [(0, 50), (100.5, 180.25), (t * 0.5, t * 0.55), (t, t + 10)]:
+            expected = [
+                i for i, s in enumerate(segments)
+                if start <= s.start_time <= end or start <= s.end_time <= end
+            ]
+            assert index.overlapping(start, end) == expected
+
+
+class TestAdDetectionEngine:
+    """Detection on top of one scan"""
+    
+    @pytest.mark.asyncio
+    async def test_detects_keyword_and_transition_slots(self, engine):
+        segments = segments_from([
+            "Welcome to the show",
+            "Let's take a break",
+            "Today's sponsor has a special offer, use code PODCAST",
+            "Back to the interview",
+        ], length=40.0)
+        
+        slots = await engine.detect_ads_from_transcript("ep1", segments, 160.0)
+        
+        assert slots
+        keywords = {kw for slot in slots for kw in slot.keywords_detected}
+        assert {"sponsor", "special offer", "use code", "let's take a break"} <= keywords
+    
+    def test_tenant_keywords_are_compiled_once(self, engine):
+        engine.set_tenant_keywords("t1", ["acme widgets"])
+        matcher = engine.get_matcher("t1")
+        segments = segments_from(["Acme Widgets keep you dry, sponsor of the week"])
+        
+        tenant_slots = engine._detect_by_keywords(segments, matcher.scan(segments))
+        default_slots = engine._detect_by_keywords(segments)
+        
+        assert engine.get_matcher("t1") is matcher
+        assert engine.get_matcher("other") is engine.matcher
+        assert tenant_slots[0].keywords_detected == ["sponsor", "acme widgets"]
+        assert default_slots == []
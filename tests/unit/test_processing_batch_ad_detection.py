@@ -0,0 +1,117 @@
+"""
+Tests for catalog-scale batch ad detection
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.processing.ad_detection import TranscriptSegment
+from src.processing.batch_ad_detection import (
+    BatchAdDetector, EpisodeTranscript, detect_shard, _worker_engines
+)
+
+
+def make_episode(episode_id, text="This episode is sponsored by Acme, use promo code SAVE"):
+    return EpisodeTranscript(
+        episode_id=episode_id,
+        segments=[
+            TranscriptSegment(0.0, 30.0, "Welcome to the show"),
+            TranscriptSegment(30.0, 60.0, text),
+            TranscriptSegment(60.0, 600.0, "Back to the interview"),
+        ],
+        duration_seconds=600.0
+    )
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=[])
+    conn.execute = AsyncMock()
+    return conn
+
+
+async def collect(detector, run_id, episodes, **kwargs):
+    return [result async for result in detector.detect(run_id, episodes, **kwargs)]
+
+
+class TestDetectShard:
+    """Worker-side detection"""
+    
+    def test_detects_slots_per_episode(self):
+        results = detect_shard([make_episode("e1"), make_episode("e2", text="Just chatting")])
+        
+        assert [r.episode_id for r in results] == ["e1", "e2"]
+        assert results[0].succeeded and len(results[0].slots) >= 1
+        assert results[1].slots == []
+    
+    def test_custom_keywords_engine_is_reused(self):
+        detect_shard([make_episode("e1", text="acmecorp widgets, use our link")], ("acmecorp",))
+        engine = _worker_engines[("acmecorp",)]
+        
+        results = detect_shard([make_episode("e2", text="acmecorp widgets, use our link")], ("acmecorp",))
+        
+        assert _worker_engines[("acmecorp",)] is engine
+        assert "acmecorp" in results[0].slots[0].keywords_detected
+
+
+class TestBatchAdDetector:
+    """Streaming, bulk writes and checkpoints"""
+    
+    @pytest.mark.asyncio
+    async def test_streams_results_and_writes_in_bulk(self, postgres_conn):
+        detector = BatchAdDetector(postgres_conn, workers=0, shard_size=2, write_batch_size=3)
+        episodes = (make_episode(f"e{i}") for i in range(5))
+        
+        results = await collect(detector, "run-1", episodes)
+        
+        assert sorted(r.episode_id for r in results) == [f"e{i}" for i in range(5)]
+        assert postgres_conn.execute.await_count == 2
+        written = []
+        for call in postgres_conn.execute.await_args_list:
+            query, run_id, episode_ids, slots, slot_counts = call.args
+            assert "unnest" in query and "ad_detection_checkpoints" in query
+            assert run_id == "run-1"
+            assert slot_counts == [len(json.loads(s)) for s in slots]
+            written.extend(episode_ids)
+        assert sorted(written) == [f"e{i}" for i in range(5)]
+        record = json.loads(slots[0])[0]
+        assert record["ad_type"] in ("pre_roll", "mid_roll", "post_roll")
+    
+    @pytest.mark.asyncio
+    async def test_resume_skips_checkpointed_episodes(self, postgres_conn):
+        postgres_conn.fetch.return_value = [{"episode_id": "e0"}, {"episode_id": "e1"}]
+        detector = BatchAdDetector(postgres_conn, workers=0)
+        
+        results = await collect(detector, "run-1", [make_episode(f"e{i}") for i in range(3)])
+        
+        assert [r.episode_id for r in results] == ["e2"]
+        postgres_conn.fetch.assert_awaited_once()
+        assert postgres_conn.fetch.await_args.args[1] == "run-1"
+    
+    @pytest.mark.asyncio
+    async def test_failed_episodes_are_not_checkpointed(self, postgres_conn):
+        metrics = Mock()
+        detector = BatchAdDetector(postgres_conn, metrics_collector=metrics, workers=0, shard_size=1)
+        broken = EpisodeTranscript(episode_id="bad", segments=None, duration_seconds=10.0)
+        
+        results = await collect(detector, "run-1", [make_episode("good"), broken])
+        
+        by_id = {r.episode_id: r for r in results}
+        assert by_id["good"].succeeded
+        assert not by_id["bad"].succeeded
+        _, _, episode_ids, _, _ = postgres_conn.execute.await_args.args
+        assert episode_ids == ["good"]
+        metrics.increment_counter.assert_any_call("ad_batch_episodes_total", tags={"status": "failed"})
+    
+    @pytest.mark.asyncio
+    async def test_runs_in_process_pool(self, postgres_conn):
+        detector = BatchAdDetector(postgres_conn, workers=1, shard_size=2)
+        try:
+            results = await collect(detector, "run-1", [make_episode(f"e{i}") for i in range(3)])
+        finally:
+            detector.shutdown()
+        
+        assert len(results) == 3
+        assert all(r.succeeded and r.slots for r in results)
@@ -0,0 +1,147 @@
+"""
+Tests for batch report jobs
+"""
+
+import json
+import zipfile
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock
+
+from src.reporting.report_generator import ReportGenerator, ReportFormat
+from src.reporting.batch_reports import BatchReportScheduler, BatchPackage, BatchJobStatus
+
+START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+END = datetime(2026, 9, 30, tzinfo=timezone.utc)
+CAMPAIGNS = [f"00000000-0000-4000-8000-00000000000{i}" for i in range(1, 4)]
+MISSING = "00000000-0000-4000-8000-000000000009"
+
+
+def campaign_row(campaign_id):
+    return {
+        "campaign_id": campaign_id,
+        "name": f"Campaign {campaign_id}",
+        "sponsor_name": "Acme",
+        "podcast_id": "p1",
+        "start_date": START,
+        "end_date": END,
+        "campaign_value": 100.0,
+        "updated_at": START,
+        "attribution_version": "1:x",
+    }
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    
+    async def fetch(query, *args):
+        if "FROM campaigns c" in query and "sponsor_name" in query:
+            return [campaign_row(c) for c in CAMPAIGNS]
+        if "FROM attribution_events ae" in query:
+            return [{
+                "campaign_id": CAMPAIGNS[0],
+                "attribution_events": 4,
+                "conversions": 2,
+                "conversion_value": 300.0,
+                "period_events": 3,
+                "period_conversions": 2,
+                "period_conversion_value": 250.0,
+            }]
+        return []
+    
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.fetchrow = AsyncMock()
+    conn.execute = AsyncMock()
+    return conn
+
+
+@pytest.fixture
+def timescale_conn():
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=[
+        {"campaign_id": CAMPAIGNS[0], "total_downloads": 1000, "total_streams": 10, "total_listeners": 5}
+    ])
+    return conn
+
+
+@pytest.fixture
+def scheduler(postgres_conn, timescale_conn, tmp_path):
+    generator = ReportGenerator(Mock(), Mock(), reports_dir=str(tmp_path), render_workers=0)
+    return BatchReportScheduler(generator, postgres_conn, timescale_conn, metrics_collector=Mock())
+
+
+async def run_job(scheduler, package, campaign_ids=CAMPAIGNS):
+    job = await scheduler.submit(campaign_ids, format=ReportFormat.CSV, package=package, user_id="u1")
+    return await scheduler._tasks[job.job_id]
+
+
+class TestBatchReportScheduler:
+    """Set-based fetches, fan-out and packaging"""
+    
+    @pytest.mark.asyncio
+    async def test_queries_run_once_for_the_whole_batch(self, scheduler, postgres_conn, timescale_conn):
+        job = await run_job(scheduler, BatchPackage.FILES)
+        
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.completed_count == 3
+        assert postgres_conn.fetch.await_count == 2
+        timescale_conn.fetch.assert_awaited_once()
+        flight_campaign_ids = timescale_conn.fetch.await_args.args[1]
+        assert flight_campaign_ids == CAMPAIGNS
+    
+    @pytest.mark.asyncio
+    async def test_sections_use_batch_aggregates(self, scheduler, tmp_path):
+        job = await run_job(scheduler, BatchPackage.FILES)
+        
+        file_name = job.artifacts[CAMPAIGNS[0]].rsplit("/", 1)[-1]
+        content = (tmp_path / file_name).read_text()
+        assert "performance,total_downloads,1000" in content
+        assert "attribution,conversions,2" in content
+        assert "roi,roi,150.0" in content
+    
+    @pytest.mark.asyncio
+    async def test_files_package_saves_reports_in_one_statement(self, scheduler, postgres_conn):
+        await run_job(scheduler, BatchPackage.FILES)
+        
+        inserts = [c for c in postgres_conn.execute.await_args_list if "INSERT INTO reports" in c.args[0]]
+        assert len(inserts) == 1
+        assert sorted(inserts[0].args[2]) == CAMPAIGNS
+    
+    @pytest.mark.asyncio
+    async def test_zip_package_archives_every_campaign(self, scheduler, postgres_conn, tmp_path):
+        job = await run_job(scheduler, BatchPackage.ZIP)
+        
+        archive_path = tmp_path / job.artifact_url.rsplit("/", 1)[-1]
+        with zipfile.ZipFile(archive_path) as archive:
+            assert len(archive.namelist()) == 3
+        # Only the archive is left in storage
+        assert [p.name for p in tmp_path.iterdir()] == [archive_path.name]
+        
+        finish = postgres_conn.execute.await_args_list[-1].args
+        assert finish[2] == "completed"
+        assert finish[5] == job.artifact_url
+    
+    @pytest.mark.asyncio
+    async def test_unknown_campaigns_are_reported_as_failed(self, scheduler, postgres_conn):
+        job = await run_job(scheduler, BatchPackage.FILES, campaign_ids=CAMPAIGNS + [MISSING])
+        
+        assert job.completed_count == 3
+        assert job.failed_count == 1
+        assert job.progress == 1.0
+        assert json.loads(postgres_conn.execute.await_args_list[-1].args[7]) == {MISSING: "Campaign not found"}
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_are_counted_once(self, scheduler):
+        job = await run_job(scheduler, BatchPackage.FILES, campaign_ids=CAMPAIGNS + [CAMPAIGNS[0].upper()])
+        
+        assert job.total_count == 3
+        assert job.completed_count == 3
+        assert job.progress == 1.0
+    
+    @pytest.mark.asyncio
+    async def test_invalid_ids_are_rejected_on_submit(self, scheduler, postgres_conn):
+        with pytest.raises(ValueError, match="Invalid campaign id: c1"):
+            await scheduler.submit(["c1"], format=ReportFormat.CSV)
+        
+        postgres_conn.execute.assert_not_awaited()
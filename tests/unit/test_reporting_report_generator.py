@@ -0,0 +1,192 @@
+"""
+Tests for concurrent, cached report generation
+"""
+
+import asyncio
+import csv
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock
+
+from src.analytics.analytics_store import CampaignPerformance
+from src.reporting.report_generator import ReportGenerator, ReportType, ReportFormat, render_report
+
+CAMPAIGN_ID = "22222222-2222-2222-2222-222222222222"
+START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+END = datetime(2026, 9, 30, tzinfo=timezone.utc)
+
+
+def campaign_row(updated_at=START, attribution_version="3:2026-09-30"):
+    return {
+        "campaign_id": CAMPAIGN_ID,
+        "name": "Fall Launch",
+        "sponsor_name": "Acme",
+        "podcast_id": "p1",
+        "start_date": START,
+        "end_date": END,
+        "campaign_value": 100.0,
+        "updated_at": updated_at,
+        "attribution_version": attribution_version,
+    }
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    conn.fetchrow = AsyncMock(return_value=campaign_row())
+    conn.fetch = AsyncMock(return_value=[])
+    conn.execute = AsyncMock()
+    return conn
+
+
+@pytest.fixture
+def analytics_store():
+    store = Mock()
+    
+    async def calculate_campaign_performance(**kwargs):
+        await asyncio.sleep(0.01)
+        return CampaignPerformance(
+            campaign_id=CAMPAIGN_ID,
+            podcast_id="p1",
+            start_date=START,
+            end_date=END,
+            total_downloads=1000,
+            total_streams=400,
+            total_listeners=300,
+            attribution_events=8,
+            conversions=5,
+            conversion_value=250.0
+        )
+    
+    store.calculate_campaign_performance = AsyncMock(side_effect=calculate_campaign_performance)
+    store.get_attribution_events = AsyncMock(return_value=[])
+    return store
+
+
+@pytest.fixture
+def generator(postgres_conn, tmp_path):
+    return ReportGenerator(Mock(), Mock(), postgres_conn=postgres_conn, reports_dir=str(tmp_path), render_workers=0)
+
+
+async def generate(generator, analytics_store, format=ReportFormat.CSV):
+    return await generator.generate_report(
+        campaign_id=CAMPAIGN_ID,
+        report_type=ReportType.SPONSOR_REPORT,
+        format=format,
+        analytics_store=analytics_store,
+        user_id="user-1"
+    )
+
+
+class TestReportSections:
+    """Concurrent section generation and section cache"""
+    
+    @pytest.mark.asyncio
+    async def test_performance_is_computed_once_for_all_sections(self, generator, analytics_store):
+        report_data, _ = await generator._generate_report_data(
+            CAMPAIGN_ID, generator._templates["basic_sponsor"], generator.postgres, analytics_store
+        )
+        
+        analytics_store.calculate_campaign_performance.assert_awaited_once()
+        assert list(report_data["sections"]) == ["overview", "performance", "attribution", "roi"]
+        assert report_data["sections"]["performance"]["data"]["total_downloads"] == 1000
+        assert report_data["sections"]["roi"]["data"]["roi"] == 150.0
+    
+    @pytest.mark.asyncio
+    async def test_sections_are_cached_per_data_version(self, generator, analytics_store, postgres_conn):
+        await generate(generator, analytics_store)
+        await generate(generator, analytics_store)
+        
+        assert analytics_store.calculate_campaign_performance.await_count == 1
+        assert analytics_store.get_attribution_events.await_count == 1
+        
+        # New attribution events change the data version
+        postgres_conn.fetchrow.return_value = campaign_row(attribution_version="4:2026-10-01")
+        await generate(generator, analytics_store)
+        
+        assert analytics_store.calculate_campaign_performance.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_sections_without_campaign_row_are_not_cached(self, generator, analytics_store, postgres_conn):
+        postgres_conn.fetchrow.return_value = None
+        
+        await generate(generator, analytics_store)
+        await generate(generator, analytics_store)
+        
+        assert len(generator.section_cache) == 0
+        assert analytics_store.get_attribution_events.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_sections_from_failed_sources_are_not_cached(self, generator, analytics_store):
+        performance = analytics_store.calculate_campaign_performance.side_effect
+        analytics_store.calculate_campaign_performance.side_effect = ConnectionError("db down")
+        
+        report_data, _ = await generator._generate_report_data(
+            CAMPAIGN_ID, generator._templates["basic_sponsor"], generator.postgres, analytics_store
+        )
+        assert report_data["sections"]["performance"]["data"]["total_downloads"] == 0
+        
+        analytics_store.calculate_campaign_performance.side_effect = performance
+        report_data, _ = await generator._generate_report_data(
+            CAMPAIGN_ID, generator._templates["basic_sponsor"], generator.postgres, analytics_store
+        )
+        assert report_data["sections"]["performance"]["data"]["total_downloads"] == 1000
+        assert report_data["sections"]["roi"]["data"]["roi"] == 150.0
+
+
+class TestReportOutput:
+    """Rendering to storage and persisted metadata"""
+    
+    @pytest.mark.asyncio
+    async def test_report_written_and_metadata_persisted(self, generator, analytics_store, postgres_conn, tmp_path):
+        report = await generate(generator, analytics_store)
+        
+        file_name = report.file_url.rsplit("/", 1)[-1]
+        with open(tmp_path / file_name, newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["Section", "Metric", "Value"]
+        assert ["performance", "total_downloads", "1000"] in rows
+        assert report.file_size_bytes == (tmp_path / file_name).stat().st_size
+        assert not list(tmp_path.glob("*.tmp"))
+        
+        query, *params = postgres_conn.execute.await_args.args
+        assert "INSERT INTO reports" in query
+        assert params[0] == report.report_id
+        assert params[2] == "user-1"
+        # Only metadata is persisted, not the report data
+        assert set(json.loads(params[11])) == {"sections", "data_version"}
+    
+    def test_render_excel_falls_back_to_csv(self, tmp_path):
+        try:
+            import openpyxl  # noqa: F401
+            expected = ".xlsx"
+        except ImportError:
+            expected = ".csv"
+        
+        file_path, size = render_report("excel", {"sections": {"overview": {"data": {"a": 1}}}}, str(tmp_path / "r"))
+        
+        assert file_path.endswith(expected)
+        assert size > 0
+    
+    @pytest.mark.asyncio
+    async def test_get_report_reads_reports_table(self, generator, postgres_conn):
+        postgres_conn.fetchrow.return_value = {
+            "report_id": "r1",
+            "campaign_id": CAMPAIGN_ID,
+            "template_id": "basic_sponsor",
+            "report_type": "sponsor_report",
+            "format": "pdf",
+            "generated_at": END,
+            "file_size_bytes": 10,
+            "file_url": "/api/v1/reports/r1.pdf",
+            "includes_roi": True,
+            "includes_attribution": True,
+            "metadata": '{"sections": ["overview"]}',
+        }
+        
+        report = await generator.get_report("r1")
+        
+        assert report.format == ReportFormat.PDF
+        assert report.metadata == {"sections": ["overview"]}
+        assert "FROM reports" in postgres_conn.fetchrow.await_args.args[0]
@@ -0,0 +1,137 @@
+"""
+Tests for the shared GCRA rate limiter
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from src.security.rate_limiting import LocalRateLimitStore, RateLimitService
+from src.security.api_security import RateLimiter
+
+
+class FakeRedisScript:
+    """Stands in for the Lua script, evaluating GCRA with a local store"""
+    
+    def __init__(self):
+        self.store = LocalRateLimitStore()
+        self.calls = []
+        self.error = None
+    
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if self.error:
+            raise self.error
+        emission_ms, window_ms, cost = args
+        limit = round(window_ms / emission_ms)
+        decision = self.store.acquire(keys[0], limit, window_ms / 1000, cost)
+        return [int(decision.allowed), decision.remaining, int(decision.retry_after * 1000), int(decision.reset_after * 1000)]
+
+
+@pytest.fixture
+def redis_script():
+    return FakeRedisScript()
+
+
+@pytest.fixture
+def redis_client(redis_script):
+    client = Mock()
+    client.register_script = Mock(return_value=redis_script)
+    return client
+
+
+class TestLocalRateLimitStore:
+    """In-process GCRA"""
+    
+    def test_allows_burst_then_paces(self):
+        store = LocalRateLimitStore()
+        
+        decisions = [store.acquire("ip", 3, 60, now=100.0) for _ in range(4)]
+        
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+        assert decisions[3].retry_after == pytest.approx(20.0)
+        # One emission interval later a single request is allowed again
+        assert store.acquire("ip", 3, 60, now=120.0).allowed
+        assert not store.acquire("ip", 3, 60, now=120.0).allowed
+    
+    def test_evicts_least_recently_used_keys(self):
+        store = LocalRateLimitStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            store.acquire(key, 1, 60, now=0.0)
+        
+        assert len(store) == 2
+        # "a" was evicted, so it has its full allowance again
+        assert store.acquire("a", 1, 60, now=0.0).allowed
+        assert not store.acquire("c", 1, 60, now=0.0).allowed
+
+
+class TestRateLimitService:
+    """Redis backend, leases and fallback"""
+    
+    @pytest.mark.asyncio
+    async def test_without_redis_uses_local_store(self):
+        service = RateLimitService()
+        
+        assert (await service.check("k", 1, 60)).allowed
+        assert not (await service.check("k", 1, 60)).allowed
+    
+    @pytest.mark.asyncio
+    async def test_small_limits_check_redis_every_time(self, redis_client, redis_script):
+        service = RateLimitService(redis_client)
+        
+        for _ in range(3):
+            await service.check("k", 5, 60)
+        
+        assert len(redis_script.calls) == 3
+        assert redis_script.calls[0][0] == ["ratelimit:k"]
+    
+    @pytest.mark.asyncio
+    async def test_high_limits_are_served_from_leases(self, redis_client, redis_script):
+        service = RateLimitService(redis_client, lease_size=10)
+        
+        decisions = [await service.check("k", 1000, 60) for _ in range(25)]
+        
+        assert all(d.allowed for d in decisions)
+        assert len(redis_script.calls) == 3
+        assert redis_script.calls[0][1][2] == 10
+        assert decisions[-1].remaining == 1000 - 25
+    
+    @pytest.mark.asyncio
+    async def test_lease_falls_back_to_single_token_near_limit(self, redis_client, redis_script):
+        service = RateLimitService(redis_client, lease_size=10)
+        redis_script.store.acquire("ratelimit:k", 100, 60, cost=95)
+        
+        decision = await service.check("k", 100, 60)
+        
+        assert decision.allowed
+        assert [args[2] for _, args in redis_script.calls] == [10, 1]
+    
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_local_limits(self, redis_client, redis_script):
+        metrics = Mock()
+        service = RateLimitService(redis_client, metrics_collector=metrics, fallback_seconds=60)
+        redis_script.error = ConnectionError("redis down")
+        
+        assert (await service.check("k", 1, 60)).allowed
+        assert not (await service.check("k", 1, 60)).allowed
+        
+        # Redis is not retried during the fallback window
+        assert len(redis_script.calls) == 1
+        metrics.increment_counter.assert_called_once_with("rate_limit_backend_errors_total")
+
+
+class TestAPIRateLimiter:
+    """security.api_security.RateLimiter on the shared service"""
+    
+    @pytest.mark.asyncio
+    async def test_check_rate_limit(self, redis_client):
+        metrics = Mock()
+        limiter = RateLimiter(metrics, rate_limiter=RateLimitService(redis_client))
+        
+        first = await limiter.check_rate_limit("user-1", 2, 60)
+        await limiter.check_rate_limit("user-1", 2, 60)
+        third = await limiter.check_rate_limit("user-1", 2, 60)
+        
+        assert first.allowed and first.remaining == 1
+        assert not third.allowed
+        metrics.increment_counter.assert_called_once_with("rate_limit_exceeded", tags={"key": "user-1"})
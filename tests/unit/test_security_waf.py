@@ -0,0 +1,175 @@
+"""
+Tests for the compiled WAF rule set and streaming body inspection
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from starlette.requests import ClientDisconnect
+
+from src.security.waf import WAF, CompiledRuleSet, WAFRule
+from src.security.rate_limiting import RateLimitService
+from src.middleware.waf_middleware import WAFMiddleware
+
+
+@pytest.fixture
+def waf():
+    return WAF(rate_limit_per_minute=1000)
+
+
+class TestCompiledRuleSet:
+    """Single-pass matching"""
+    
+    def test_scan_reports_matching_rule(self):
+        rules = [
+            WAFRule(name="log_dots", pattern=r"\.\./", action="log"),
+            WAFRule(name="traversal", pattern=r"\.\./", action="block"),
+        ]
+        matcher = CompiledRuleSet(rules)
+        
+        matches = list(matcher.scan("/files/../etc"))
+        
+        # Blocking rules win at the same position
+        assert [rule.name for rule, _ in matches] == ["traversal"]
+    
+    def test_clean_text_has_no_matches(self, waf):
+        assert list(waf.matcher.scan("/api/v1/campaigns/123")) == []
+
+
+class TestWAFCheckRequest:
+    """Request checks and hit counters"""
+    
+    @pytest.mark.asyncio
+    async def test_blocks_path_and_counts_hit(self, waf):
+        allowed, rule_name, _ = await waf.check_request("GET", "/api/../../etc/passwd", {})
+        
+        assert not allowed
+        assert rule_name == "path_traversal"
+        assert waf.get_rule_hits()["path_traversal"] == 1
+        assert waf.get_stats()["rule_hits"]["path_traversal"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_blocks_headers(self, waf):
+        allowed, rule_name, reason = await waf.check_request("GET", "/api", {"x-test": "<iframe src=x>"})
+        
+        assert not allowed
+        assert rule_name == "xss"
+        assert reason.endswith("(in headers)")
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_blocks_ip(self):
+        waf = WAF(rate_limit_per_minute=2, rate_limiter=RateLimitService())
+        
+        for _ in range(2):
+            assert (await waf.check_request("GET", "/api", {}, client_ip="10.0.0.1"))[0]
+        allowed, rule_name, _ = await waf.check_request("GET", "/api", {}, client_ip="10.0.0.1")
+        
+        assert not allowed
+        assert rule_name == "rate_limit"
+        assert "10.0.0.1" in waf.blocked_ips
+    
+    @pytest.mark.asyncio
+    async def test_log_only_counts_without_blocking(self):
+        waf = WAF(log_only=True)
+        
+        allowed, _, _ = await waf.check_request("GET", "/api/../x", {})
+        
+        assert allowed
+        assert waf.get_rule_hits()["path_traversal"] == 1
+        assert waf.get_rule_hits()["suspicious_pattern"] == 1
+
+
+class TestBodyInspector:
+    """Incremental body inspection"""
+    
+    def test_match_spanning_chunks_is_found(self, waf):
+        inspector = waf.body_inspector()
+        
+        assert inspector.feed(b"aaaa java") is None
+        assert inspector.feed(b"script:alert(1)") == ("xss", "XSS attack attempt detected (in body)")
+    
+    def test_size_limit_enforced_while_streaming(self):
+        waf = WAF(max_request_size=10)
+        inspector = waf.body_inspector()
+        
+        assert inspector.feed(b"12345") is None
+        rule_name, _ = inspector.feed(b"678901")
+        assert rule_name == "request_too_large"
+    
+    def test_multibyte_character_split_across_chunks(self, waf):
+        inspector = waf.body_inspector()
+        encoded = "café xp_cmdshell".encode()
+        
+        assert inspector.feed(encoded[:4]) is None
+        assert inspector.feed(encoded[4:])[0] == "sql_injection"
+
+
+class TestWAFMiddlewareStreaming:
+    """Middleware reads the body through the inspector"""
+    
+    def make_request(self, chunks, content_length=None):
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        
+        request = Mock()
+        request.method = "POST"
+        request.headers = {"content-length": content_length} if content_length else {}
+        request.stream = stream
+        return request
+    
+    @pytest.mark.asyncio
+    async def test_stops_reading_at_first_blocking_chunk(self, waf):
+        consumed = []
+        
+        async def stream():
+            for chunk in (b"<script>x</script>", b"never read"):
+                consumed.append(chunk)
+                yield chunk
+        
+        request = self.make_request([])
+        request.stream = stream
+        
+        allowed, rule_name, _ = await WAFMiddleware(Mock())._inspect_body(request, waf, None)
+        
+        assert not allowed
+        assert rule_name == "xss"
+        assert consumed == [b"<script>x</script>"]
+    
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_content_length_without_reading(self):
+        waf = WAF(max_request_size=10)
+        request = self.make_request([b"x" * 100], content_length="100")
+        request.stream = Mock(side_effect=AssertionError("body should not be read"))
+        
+        allowed, rule_name, _ = await WAFMiddleware(Mock())._inspect_body(request, waf, None)
+        
+        assert not allowed
+        assert rule_name == "request_too_large"
+    
+    @pytest.mark.asyncio
+    async def test_accepted_body_is_replayed(self, waf):
+        request = self.make_request([b"hello ", b"world"])
+        
+        allowed, _, _ = await WAFMiddleware(Mock())._inspect_body(request, waf, None)
+        
+        assert allowed
+        message = await request._receive()
+        assert message["body"] == b"hello world"
+    
+    @pytest.mark.asyncio
+    async def test_client_disconnect_is_not_forwarded(self, waf):
+        async def stream():
+            yield b"partial "
+            raise ClientDisconnect()
+        
+        request = self.make_request([])
+        request.stream = stream
+        request.url.path = "/api/v1/campaigns"
+        request.client = None
+        call_next = AsyncMock()
+        
+        with patch("src.middleware.waf_middleware.get_waf", return_value=waf):
+            response = await WAFMiddleware(Mock()).dispatch(request, call_next)
+        
+        assert response.status_code == 400
+        call_next.assert_not_awaited()
@@ -0,0 +1,107 @@
+"""
+Tests for APM streaming percentile sketches
+"""
+
+import random
+import pytest
+from src.telemetry.apm import APM, OVERFLOW_SERIES
+from src.telemetry.sketch import LogBucketSketch, WindowedSketch
+
+
+class TestLogBucketSketch:
+    """Test log-bucket sketch accuracy and merging"""
+    
+    def test_quantiles_within_relative_accuracy(self):
+        """Test quantile estimates are within the configured relative error"""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(0, 1) for _ in range(20000)]
+        sketch = LogBucketSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+        
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    
+    def test_merge_equals_combined(self):
+        """Test merging two sketches equals sketching all values"""
+        left, right, combined = LogBucketSketch(), LogBucketSketch(), LogBucketSketch()
+        for i in range(1, 1001):
+            (left if i % 2 else right).add(i / 10)
+            combined.add(i / 10)
+        
+        left.merge(right)
+        assert left.count == combined.count
+        assert left.quantile(0.99) == combined.quantile(0.99)
+    
+    def test_bucket_count_is_bounded(self):
+        """Test memory stays bounded for wide value ranges"""
+        sketch = LogBucketSketch(max_buckets=64)
+        for exponent in range(-300, 300):
+            sketch.add(10.0 ** (exponent / 10))
+        
+        assert len(sketch.bins) <= 64
+        assert sketch.count == 600
+
+
+class TestWindowedSketch:
+    """Test time-windowed rotation"""
+    
+    def test_old_windows_expire(self):
+        """Test values older than the window are not reported"""
+        sketch = WindowedSketch(window_seconds=60, num_windows=5)
+        sketch.add(1.0, now=0)
+        sketch.add(2.0, now=200)
+        
+        assert sketch.merged(now=250).count == 2
+        assert sketch.merged(now=330).count == 1
+    
+    def test_snapshot_round_trip(self):
+        """Test snapshots from several workers merge"""
+        workers = [WindowedSketch(window_seconds=60), WindowedSketch(window_seconds=60)]
+        for i, worker in enumerate(workers):
+            for _ in range(10):
+                worker.add(float(i + 1), now=100)
+        
+        merged = WindowedSketch.merge_dicts([w.to_dict(now=100) for w in workers], now=100)
+        assert merged.count == 20
+
+
+class TestAPM:
+    """Test APM statistics"""
+    
+    def test_get_stats_per_metric_and_transaction(self):
+        """Test stats are reported per metric and per transaction name"""
+        apm = APM()
+        for i in range(100):
+            apm._record_metric("transaction", 0.01 * (i + 1), {"name": "GET /podcasts"})
+        apm._record_metric("transaction", 5.0, {"name": "POST /reports"})
+        
+        stats = apm.get_stats()
+        assert stats["transaction"]["count"] == 101
+        assert stats["transaction"]["max"] == 5.0
+        
+        transactions = apm.get_transaction_stats()
+        assert transactions["GET /podcasts"]["p95"] == pytest.approx(0.95, rel=0.03)
+        assert transactions["POST /reports"]["count"] == 1
+    
+    def test_series_are_capped(self):
+        """Test unbounded transaction names share an overflow series"""
+        apm = APM(max_series=3)
+        for i in range(50):
+            apm._record_metric("transaction", 0.1, {"name": f"GET /episodes/{i}"})
+        
+        assert len(apm.metrics) == 4
+        assert apm.get_transaction_stats()[OVERFLOW_SERIES]["count"] == 47
+    
+    def test_stats_from_snapshots(self):
+        """Test combining snapshots from several processes"""
+        workers = [APM(), APM()]
+        for worker in workers:
+            with worker.transaction("GET /health"):
+                pass
+        
+        stats = APM.stats_from_snapshots([w.snapshot() for w in workers])
+        assert stats["transaction"]["count"] == 2
+        assert stats["transactions"]["GET /health"]["count"] == 2
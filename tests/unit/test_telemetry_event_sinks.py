@@ -0,0 +1,110 @@
+"""
+Tests for event sinks, spill-to-disk and EventLogger backpressure
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+from src.telemetry.events import EventLogger
+from src.telemetry.event_sinks import EventSink, PostgresEventSink
+
+
+class RecordingSink(EventSink):
+    """Sink that stores batches in memory and can be made to fail"""
+    
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+    
+    async def write(self, events):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(events))
+
+
+@pytest.mark.asyncio
+class TestEventSinks:
+    """Test event sink behaviour"""
+    
+    async def test_postgres_sink_single_round_trip(self):
+        """Test a batch is written with one statement"""
+        postgres_conn = Mock()
+        postgres_conn.execute = AsyncMock()
+        logger = EventLogger(postgres_conn=postgres_conn, batch_size=1000)
+        
+        for i in range(250):
+            await logger.log_event("feed.polled", None, {"feed": i})
+        await logger.flush()
+        
+        assert isinstance(logger.sink, PostgresEventSink)
+        postgres_conn.execute.assert_awaited_once()
+        event_ids = postgres_conn.execute.await_args.args[1]
+        assert len(event_ids) == 250
+        assert len(set(event_ids)) == 250
+    
+    async def test_postgres_sink_updates_rollup(self):
+        """Test stored batches are also added to the user activity rollup"""
+        postgres_conn = Mock()
+        postgres_conn.execute = AsyncMock()
+        rollup = Mock()
+        rollup.record = AsyncMock()
+        logger = EventLogger(sink=PostgresEventSink(postgres_conn, rollup=rollup))
+        
+        await logger.log_event("login", "user-1", {})
+        await logger.flush()
+        
+        postgres_conn.execute.assert_awaited_once()
+        events = rollup.record.await_args.args[0]
+        assert [event.user_id for event in events] == ["user-1"]
+    
+    async def test_spill_and_replay(self, tmp_path):
+        """Test failed batches spill to disk and replay once the sink recovers"""
+        sink = RecordingSink()
+        metrics = Mock()
+        logger = EventLogger(sink=sink, metrics_collector=metrics, spill_directory=str(tmp_path))
+        
+        sink.fail = True
+        await logger.log_event("match.recalculated", "user-1", {"score": 0.9})
+        await logger.flush()
+        assert len(logger.spill.pending_files()) == 1
+        
+        sink.fail = False
+        await logger.log_event("ad.detected", "user-2", {})
+        await logger.flush()
+        
+        assert logger.spill.pending_files() == []
+        replayed = [event for batch in sink.batches for event in batch]
+        assert [event.event_type for event in replayed] == ["ad.detected", "match.recalculated"]
+        assert replayed[1].properties == {"score": 0.9}
+        assert logger.dropped_events == 0
+    
+    async def test_failed_batch_without_spill_is_counted(self):
+        """Test dropped events are counted when no spill is configured"""
+        sink = RecordingSink()
+        sink.fail = True
+        logger = EventLogger(sink=sink)
+        
+        await logger.log_event("feed.polled", None, {})
+        await logger.flush()
+        
+        assert logger.dropped_events == 1
+    
+    async def test_buffer_limit_drops_events(self):
+        """Test events beyond max_buffer_size are dropped, not buffered"""
+        logger = EventLogger(sink=RecordingSink(), batch_size=1000, high_water_mark=1000, max_buffer_size=5)
+        
+        for _ in range(8):
+            await logger.log_event("feed.polled", None, {})
+        
+        assert len(logger.events) == 5
+        assert logger.dropped_events == 3
+    
+    async def test_high_water_mark_flushes_inline(self):
+        """Test producers flush synchronously once past the high-water mark"""
+        sink = RecordingSink()
+        logger = EventLogger(sink=sink, batch_size=1000, high_water_mark=3)
+        
+        for _ in range(3):
+            await logger.log_event("feed.polled", None, {})
+        
+        assert logger.events == []
+        assert len(sink.batches) == 1
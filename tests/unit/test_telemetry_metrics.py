@@ -28,7 +28,7 @@ class TestMetricsCollector:
         metrics_collector.increment_counter("test_counter", value=1.0, tags={"env": "test"})
         
         assert len(metrics_collector.metrics) == 1
-        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]][0]
+        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]]
         assert metric.name == "test_counter"
         assert metric.value == 1.0
         assert metric.metric_type == MetricType.COUNTER
@@ -39,7 +39,7 @@ class TestMetricsCollector:
         metrics_collector.record_gauge("test_gauge", value=42.0, tags={"env": "test"})
         
         assert len(metrics_collector.metrics) == 1
-        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]][0]
+        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]]
         assert metric.name == "test_gauge"
         assert metric.value == 42.0
         assert metric.metric_type == MetricType.GAUGE
@@ -49,7 +49,7 @@ class TestMetricsCollector:
         metrics_collector.record_histogram("test_histogram", value=100.0, tags={"env": "test"})
         
         assert len(metrics_collector.metrics) == 1
-        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]][0]
+        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]]
         assert metric.name == "test_histogram"
         assert metric.value == 100.0
         assert metric.metric_type == MetricType.HISTOGRAM
@@ -59,7 +59,7 @@ class TestMetricsCollector:
         metrics_collector.record_summary("test_summary", value=50.0, tags={"env": "test"})
         
         assert len(metrics_collector.metrics) == 1
-        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]][0]
+        metric = metrics_collector.metrics[list(metrics_collector.metrics.keys())[0]]
         assert metric.name == "test_summary"
         assert metric.value == 50.0
         assert metric.metric_type == MetricType.SUMMARY
@@ -91,5 +91,54 @@ class TestMetricsCollector:
         metrics_collector.increment_counter("test_counter")
         assert len(metrics_collector.metrics) > 0
         
-        metrics_collector.clear()
+        metrics_collector.clear_metrics()
         assert len(metrics_collector.metrics) == 0
+    
+    def test_counter_aggregates_in_place(self, metrics_collector):
+        """Test repeated increments update a single running sum"""
+        for _ in range(1000):
+            metrics_collector.increment_counter("requests", tags={"route": "/health"})
+        
+        assert len(metrics_collector.metrics) == 1
+        assert metrics_collector.metrics["requests{route=/health}"].value == 1000.0
+    
+    def test_gauge_keeps_last_value(self, metrics_collector):
+        """Test gauges keep only the last recorded value"""
+        metrics_collector.record_gauge("queue_depth", 5.0)
+        metrics_collector.record_gauge("queue_depth", 2.0)
+        
+        assert metrics_collector.metrics["queue_depth{}"].value == 2.0
+    
+    def test_histogram_buckets(self, metrics_collector):
+        """Test histogram observations land in fixed buckets"""
+        for value in (3.0, 30.0, 300.0, 30000.0):
+            metrics_collector.record_histogram("latency_ms", value)
+        
+        series = metrics_collector.metrics["latency_ms{}"]
+        assert series.count == 4
+        assert series.value == 30333.0
+        assert sum(series.bucket_counts) == 4
+        assert series.bucket_counts[-1] == 1  # +Inf bucket
+    
+    def test_cardinality_cap_overflow(self):
+        """Test tag combinations beyond the cap fold into one overflow series"""
+        collector = MetricsCollector(max_series_per_metric=10)
+        for i in range(500):
+            collector.increment_counter("feed_polls", tags={"feed_url": f"https://example.com/{i}.xml"})
+        
+        assert len(collector.metrics) == 11
+        assert collector.metrics["feed_polls{overflow=true}"].value == 490.0
+        assert collector.get_overflow_counts() == {"feed_polls": 490}
+    
+    def test_render_prometheus(self, metrics_collector):
+        """Test Prometheus text exposition"""
+        metrics_collector.increment_counter("api_calls", value=3.0, tags={"method": "GET"})
+        metrics_collector.record_histogram("latency_ms", 12.0, buckets=[10.0, 100.0])
+        
+        text = metrics_collector.render_prometheus()
+        assert "# TYPE api_calls counter" in text
+        assert 'api_calls{method="GET"} 3.0' in text
+        assert 'latency_ms_bucket{le="10.0"} 0' in text
+        assert 'latency_ms_bucket{le="100.0"} 1' in text
+        assert 'latency_ms_bucket{le="+Inf"} 1' in text
+        assert "latency_ms_count 1" in text
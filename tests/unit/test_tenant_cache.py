@@ -0,0 +1,148 @@
+"""
+Tests for the tenant resolution cache and per-connection RLS context
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock
+
+from src.database.postgres import PostgresConnection, set_current_tenant, reset_current_tenant
+from src.tenants.tenant_cache import TenantCache, TenantCacheInvalidator
+from src.tenants.tenant_manager import TenantManager, Tenant
+
+
+def make_row(tenant_id="tenant-1", slug="acme", status="active"):
+    return {
+        "tenant_id": tenant_id,
+        "name": "Acme",
+        "slug": slug,
+        "domain": None,
+        "subscription_tier": "free",
+        "status": status,
+        "billing_email": None,
+        "created_at": None,
+        "updated_at": None,
+        "metadata": {},
+    }
+
+
+@pytest.fixture
+def postgres_conn():
+    conn = Mock()
+    conn.fetchrow = AsyncMock(return_value=make_row())
+    conn.execute = AsyncMock()
+    return conn
+
+
+@pytest.fixture
+def tenant_manager(postgres_conn):
+    events = Mock()
+    events.log_event = AsyncMock()
+    return TenantManager(metrics_collector=Mock(), event_logger=events, postgres_conn=postgres_conn)
+
+
+class TestTenantCache:
+    """TTL cache keyed by id and slug"""
+    
+    def test_put_indexes_id_and_slug(self):
+        cache = TenantCache()
+        tenant = Tenant(tenant_id="tenant-1", name="Acme", slug="acme")
+        cache.put(tenant)
+        
+        assert cache.get_by_id("tenant-1") == (True, tenant)
+        assert cache.get_by_slug("acme") == (True, tenant)
+        
+        cache.invalidate(tenant_id="tenant-1")
+        assert cache.get_by_slug("acme") == (False, None)
+    
+    def test_entries_expire(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("src.tenants.tenant_cache.time.monotonic", lambda: now[0])
+        cache = TenantCache(ttl_seconds=30, negative_ttl_seconds=5)
+        cache.put(Tenant(tenant_id="tenant-1", name="Acme", slug="acme"))
+        cache.put_missing(tenant_id="missing")
+        
+        now[0] += 10
+        assert cache.get_by_id("tenant-1")[0]
+        assert cache.get_by_id("missing") == (False, None)
+        now[0] += 30
+        assert cache.get_by_id("tenant-1") == (False, None)
+    
+    def test_max_entries(self):
+        cache = TenantCache(max_entries=2)
+        for i in range(3):
+            cache.put(Tenant(tenant_id=f"tenant-{i}", name="T", slug=f"t{i}"))
+        
+        assert cache.get_by_id("tenant-0") == (False, None)
+        assert cache.get_by_id("tenant-2")[0]
+    
+    def test_notification_invalidates(self):
+        cache = TenantCache()
+        cache.put(Tenant(tenant_id="tenant-1", name="Acme", slug="acme"))
+        invalidator = TenantCacheInvalidator(Mock(), cache)
+        
+        invalidator._on_notification(None, 1, "tenant_changed", json.dumps({"tenant_id": "tenant-1", "slug": "acme"}))
+        
+        assert cache.get_by_id("tenant-1") == (False, None)
+
+
+@pytest.mark.asyncio
+class TestCachedResolution:
+    """TenantManager serves per-request lookups from the cache"""
+    
+    async def test_cached_lookup_queries_once(self, tenant_manager, postgres_conn):
+        first = await tenant_manager.get_tenant("tenant-1", cached=True)
+        second = await tenant_manager.get_tenant("tenant-1", cached=True)
+        by_slug = await tenant_manager.get_tenant_by_slug("acme", cached=True)
+        
+        assert first is second is by_slug
+        postgres_conn.fetchrow.assert_awaited_once()
+    
+    async def test_unknown_tenant_is_negatively_cached(self, tenant_manager, postgres_conn):
+        postgres_conn.fetchrow.return_value = None
+        
+        assert await tenant_manager.get_tenant("nope", cached=True) is None
+        assert await tenant_manager.get_tenant("nope", cached=True) is None
+        postgres_conn.fetchrow.assert_awaited_once()
+    
+    async def test_update_invalidates(self, tenant_manager, postgres_conn):
+        await tenant_manager.get_tenant("tenant-1", cached=True)
+        postgres_conn.fetchrow.return_value = make_row(status="suspended")
+        
+        await tenant_manager.update_tenant("tenant-1", {"status": "suspended"})
+        tenant = await tenant_manager.get_tenant("tenant-1", cached=True)
+        
+        assert tenant.status.value == "suspended"
+
+
+class AsyncContextManager:
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_tenant_context_applied_on_acquired_connection():
+    postgres = PostgresConnection("localhost", 5432, "db", "user", "password")
+    conn = Mock()
+    conn.execute = AsyncMock()
+    postgres.pool = Mock()
+    postgres.pool.acquire = MagicMock(return_value=AsyncContextManager(conn))
+    
+    async with postgres.acquire():
+        pass
+    conn.execute.assert_not_awaited()
+    
+    token = set_current_tenant("tenant-1")
+    try:
+        async with postgres.acquire() as acquired:
+            assert acquired is conn
+    finally:
+        reset_current_tenant(token)
+    
+    conn.execute.assert_awaited_once_with("SELECT set_config('app.current_tenant', $1, false)", "tenant-1")